@@ -4,8 +4,8 @@ Bootcamp F2025
 Main process to setup and manage all the other working processes
 """
 
-import multiprocessing as mp
-import queue
+import pathlib
+import threading
 import time
 
 from pymavlink import mavutil
@@ -13,13 +13,17 @@ from pymavlink import mavutil
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
-from modules.command import command_worker
-from modules.heartbeat import heartbeat_receiver_worker
-from modules.heartbeat import heartbeat_sender_worker
-from modules.telemetry import telemetry_worker
+from modules.command import command
+from modules.mavlink_mux import mavlink_mux
+from utilities.workers import metrics_exporter
+from utilities.workers import pipeline as pipeline_loader
+from utilities.workers import process_resources
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
 from utilities.workers import worker_controller
 from utilities.workers import worker_manager
+from utilities.workers import worker_metrics
+from utilities.workers import worker_supervisor
 
 
 # MAVLink connection
@@ -28,21 +32,48 @@ CONNECTION_STRING = "tcp:localhost:12345"
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
-# Set queue max sizes (<= 0 for infinity)
-TELEMETRY_QUEUE_MAXSIZE = 100
-COMMAND_QUEUE_MAXSIZE = 50
-HEARTBEAT_QUEUE_MAXSIZE = 10
-
-# Set worker counts
-NUM_HEARTBEAT_SENDERS = 1
-NUM_HEARTBEAT_RECEIVERS = 1
-NUM_TELEMETRY_WORKERS = 1
-NUM_COMMAND_WORKERS = 1
+# Stages, worker counts, and queues, sized from the rates declared there
+PIPELINE_FILE_PATH = pathlib.Path("pipeline.yaml")
+
+# How worker processes start, None for the platform default, which is spawn on Windows and
+# macOS where fork is unavailable or unsafe. forkserver forks workers from a server that has
+# imported the preload modules once, but like spawn every worker argument must be picklable,
+# which the real connection given to the first worker (mux or not) is not.
+WORKER_START_METHOD = None
+WORKER_PRELOAD_MODULES = [
+    "pymavlink.mavutil",
+    "modules.common.modules.logger.logger",
+    "utilities.workers.worker_trampoline",
+    "modules.command.command_worker",
+    "modules.heartbeat.heartbeat_receiver_worker",
+    "modules.heartbeat.heartbeat_sender_worker",
+    "modules.mavlink_mux.mavlink_mux_worker",
+    "modules.telemetry.telemetry_worker",
+]
+
+# Restart workers that die
+SUPERVISE_WORKERS = True
+RESTART_INITIAL_BACKOFF = 0.5  # seconds
+RESTART_MAX_BACKOFF = 8  # seconds
+RESTART_CRASH_BUDGET = 5  # crashes per worker within the window
+RESTART_BUDGET_WINDOW = 60  # seconds
+# Kill and restart workers that are alive but stopped looping, None to not check
+HANG_DEADLINE = 10  # seconds, longer than the slowest loop including startup
+
+# Scale stages with a max_count in the pipeline description between count and max_count
+AUTOSCALE_PERIOD = 1.0  # seconds between scaling decisions
+AUTOSCALE_TARGET_UTILIZATION = 0.7  # fraction of time each worker should be busy
+AUTOSCALE_UP_FILL = 0.5  # input queue fill that adds a worker right away
+AUTOSCALE_DOWN_DELAY = 10  # seconds fewer workers must have been enough before retiring one
 
 # Any other constants
-TELEMETRY_PERIOD = 1
-HEARTBEAT_PERIOD = 1
-TARGET = (10, 20, 30)
+MAIN_BATCH_SIZE = 16  # most items main takes from a queue at once
+MAIN_SELECT_TIMEOUT = 0.05  # seconds
+METRICS_SUMMARY_PERIOD = 10  # seconds between worker metrics tables, CPU and memory use
+# Text metrics endpoint for scraping, e.g. "tcp:localhost:9101" or "unix:bootcamp_metrics.sock",
+# None to disable
+METRICS_EXPORTER_ADDRESS = None
+TARGET = command.Position(10, 20, 30)
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -71,6 +102,11 @@ def main() -> int:
     # Get Pylance to stop complaining
     assert main_logger is not None
 
+    if not worker_manager.configure_start_method(
+        WORKER_START_METHOD, WORKER_PRELOAD_MODULES, main_logger
+    ):
+        return -1
+
     # Create a connection to the drone. Assume that this is safe to pass around to all processes
     # In reality, this will not work, but to simplify the bootamp, preetend it is allowed
     # To test, you will run each of your workers individually to see if they work
@@ -85,123 +121,188 @@ def main() -> int:
     # Create a worker controller
     controller = worker_controller.WorkerController()
 
-    # Create a multiprocess manager for synchronized queues
-    manager = mp.Manager()
+    # Create a multiprocess manager for synchronized queues, with batch support
+    manager = queue_proxy_wrapper.QueueManager()
+    manager.start()  # pylint: disable=consider-using-with
 
     # Create queues
-    receiver_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, TELEMETRY_QUEUE_MAXSIZE)
-    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, TELEMETRY_QUEUE_MAXSIZE)
-    command_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, COMMAND_QUEUE_MAXSIZE)
-    heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(manager, HEARTBEAT_QUEUE_MAXSIZE)
-
-    # Create worker properties for each worker type (what inputs it takes, how many workers)
-    workers = []
-
-    # Heartbeat sender
-    result, hb_send_props = worker_manager.WorkerProperties.create(
-        count=NUM_HEARTBEAT_SENDERS,
-        target=heartbeat_sender_worker.heartbeat_sender_worker,
-        work_arguments=(connection, HEARTBEAT_PERIOD),
-        input_queues=[],
-        output_queues=[],
-        controller=controller,
-        local_logger=main_logger,
-    )
-    if result:
-        result, hb_send_manager = worker_manager.WorkerManager.create(hb_send_props, main_logger)
-        if result:
-            workers.append(hb_send_manager)
-
-    # Heartbeat receiver
-    result, hb_receive_props = worker_manager.WorkerProperties.create(
-        count=NUM_HEARTBEAT_RECEIVERS,
-        target=heartbeat_receiver_worker.heartbeat_receiver_worker,
-        work_arguments=(
-            connection,
-            HEARTBEAT_PERIOD,
-        ),
-        input_queues=[],
-        output_queues=[receiver_queue],
-        controller=controller,
-        local_logger=main_logger,
+    result, pipeline = pipeline_loader.Pipeline.create(PIPELINE_FILE_PATH, manager, main_logger)
+    if not result:
+        return -1
+
+    # Get Pylance to stop complaining
+    assert pipeline is not None
+
+    # Heartbeat and command results in lanes, served ahead of telemetry
+    inbox_queue = pipeline.get_queue("main_inbox")
+    # Own subscription, so main and the command worker each read every sample
+    telemetry_queue = pipeline.subscribe("telemetry", "main")
+
+    # Wakes main when any of its queues has data, must exist before the workers start
+    # Selected queues are returned in this order, so the inbox is always read first
+    main_selector = queue_selector.QueueSelector(
+        [inbox_queue, telemetry_queue],
+        pipeline.get_lane_senders("main_inbox") + [pipeline.get_queue("telemetry")],
     )
-    if result:
-        result, hb_receiver_manager = worker_manager.WorkerManager.create(
-            hb_receive_props, main_logger
+
+    # Connection owner, every other worker gets a stand-in connection
+    bindings = {
+        "connection": connection,
+        "heartbeat_connection": connection,
+        "telemetry_connection": connection,
+        "command_connection": connection,
+        "target": TARGET,
+    }
+    outgoing_queue = pipeline.get_queue("mux_outgoing")
+    if outgoing_queue is not None:
+        subscription_queues = {
+            "HEARTBEAT": pipeline.get_queue("mux_heartbeat"),
+            "ATTITUDE": pipeline.get_queue("mux_telemetry"),
+            "LOCAL_POSITION_NED": pipeline.get_queue("mux_telemetry"),
+            "COMMAND_ACK": pipeline.get_queue("mux_command"),
+        }
+        bindings["mux_subscriptions"] = {
+            message_type: [queue] for message_type, queue in subscription_queues.items()
+        }
+        bindings["heartbeat_connection"] = mavlink_mux.MuxedConnection(
+            subscription_queues["HEARTBEAT"], outgoing_queue
         )
-        if result:
-            workers.append(hb_receiver_manager)
-
-    # Telemetry
-    result, telemetry_props = worker_manager.WorkerProperties.create(
-        count=NUM_TELEMETRY_WORKERS,
-        target=telemetry_worker.telemetry_worker,
-        work_arguments=(connection),
-        input_queues=[],
-        output_queues=[telemetry_queue],
-        controller=controller,
-        local_logger=main_logger,
-    )
-    if result:
-        result, telemetry_manager = worker_manager.WorkerManager.create(
-            telemetry_props, main_logger
+        bindings["telemetry_connection"] = mavlink_mux.MuxedConnection(
+            subscription_queues["ATTITUDE"], outgoing_queue
+        )
+        bindings["command_connection"] = mavlink_mux.MuxedConnection(
+            subscription_queues["COMMAND_ACK"], outgoing_queue
         )
-        if result:
-            workers.append(telemetry_manager)
-
-    # Command
-    result, command_props = worker_manager.WorkerProperties.create(
-        count=NUM_COMMAND_WORKERS,
-        target=command_worker.command_worker,
-        work_arguments=(
-            connection,
-            TARGET,
-            TELEMETRY_PERIOD,
-        ),
-        input_queues=[telemetry_queue],
-        output_queues=[command_queue],
-        controller=controller,
-        local_logger=main_logger,
-    )
-    if result:
-        result, command_manager = worker_manager.WorkerManager.create(command_props, main_logger)
-        if result:
-            workers.append(command_manager)
 
     # Create the workers (processes) and obtain their managers
+    result, workers = pipeline.create_workers(bindings, controller)
+    if not result:
+        return -1
 
     # Start worker processes
     for manager in workers:
         manager.start_workers()
     main_logger.info("Started")
 
+    # Restart dead and hung workers in the background
+    supervisor = None
+    supervisor_thread = None
+    if SUPERVISE_WORKERS:
+        result, supervisor = worker_supervisor.WorkerSupervisor.create(
+            workers,
+            RESTART_INITIAL_BACKOFF,
+            RESTART_MAX_BACKOFF,
+            RESTART_CRASH_BUDGET,
+            RESTART_BUDGET_WINDOW,
+            main_logger,
+            HANG_DEADLINE,
+        )
+        if result:
+            supervisor_thread = threading.Thread(target=supervisor.run)
+            supervisor_thread.start()
+
+    # Scale workers with their load, checked from main's loop
+    result, autoscalers = pipeline.create_autoscalers(
+        AUTOSCALE_TARGET_UTILIZATION, AUTOSCALE_UP_FILL, AUTOSCALE_DOWN_DELAY
+    )
+    if not result:
+        return -1
+
+    # Serve metrics in the background, read from shared counters only
+    exporter = None
+    exporter_thread = None
+    if METRICS_EXPORTER_ADDRESS is not None:
+        result, exporter = metrics_exporter.MetricsExporter.create(
+            METRICS_EXPORTER_ADDRESS,
+            workers,
+            pipeline.get_named_queues(),
+            pipeline.get_channels(),
+            pipeline.get_lane_queues(),
+            main_logger,
+        )
+        if result:
+            exporter_thread = threading.Thread(target=exporter.run)
+            exporter_thread.start()
+
     # Main's work: read from all queues that output to main, and log any commands that we make
     # Continue running for 100 seconds or until the drone disconnects
     curr_time = time.time()
-    while (time.time() - curr_time) <= 100:
-        for q in (command_queue, telemetry_queue, heartbeat_queue):
-            try:
-                res = q.queue.get_nowait()  # non-blocking
+    next_metrics_time = curr_time + METRICS_SUMMARY_PERIOD
+    # CPU use is since the previous summary, so the first summary has memory use only
+    usage_reader = process_resources.ProcessUsageReader()
+    next_autoscale_time = curr_time + AUTOSCALE_PERIOD
+    is_disconnected = False
+    while not is_disconnected and (time.time() - curr_time) <= 100:
+        for q in main_selector.select(MAIN_SELECT_TIMEOUT):
+            for res in q.get_many(MAIN_BATCH_SIZE, 0.0):  # non-blocking
                 if res:
                     if res == "Disconnected":
+                        main_logger.warning("Drone disconnected")
+                        is_disconnected = True
                         break
                     main_logger.info(f"Main received: {res}", False)
-            except queue.Empty:
-                continue
+
+        if time.time() >= next_autoscale_time:
+            for autoscaler in autoscalers:
+                autoscaler.run_once()
+            next_autoscale_time += AUTOSCALE_PERIOD
+
+        if time.time() >= next_metrics_time:
+            worker_manager.log_metrics_summary(workers, main_logger)
+            worker_manager.log_resource_usage(workers, usage_reader, main_logger)
+            next_metrics_time += METRICS_SUMMARY_PERIOD
+
+    for manager in workers:
+        manager.log_startup_timeline()
+    channels = pipeline.get_channels()
+    lane_queues = pipeline.get_lane_queues()
+    for name, q in pipeline.get_named_queues().items():
+        # Broadcast channels report per subscriber and lane queues per lane below
+        if name not in channels and name not in lane_queues and q.get_dropped_count() > 0:
+            main_logger.info(
+                f"Queue {name}: {q.overflow_policy.name} dropped {q.get_dropped_count()} items"
+            )
+    for name, channel in channels.items():
+        for subscriber_name, lag, lost in channel.get_subscriber_stats():
+            main_logger.info(f"Queue {name}: subscriber {subscriber_name} lag {lag}, lost {lost}")
+    for name, lanes in lane_queues.items():
+        for stats in lanes.get_lane_stats():
+            main_logger.info(
+                f"Queue {name} lane {stats.name}: {stats.wait.count} items, "
+                f"wait p50 {worker_metrics.format_milliseconds(stats.wait.percentile(0.5))} ms, "
+                f"p99 {worker_metrics.format_milliseconds(stats.wait.percentile(0.99))} ms, "
+                f"dropped {stats.dropped_count}"
+            )
+    worker_manager.log_metrics_summary(workers, main_logger)
+
+    # Stop supervising first so exiting workers are not restarted
+    if supervisor_thread is not None:
+        supervisor.stop()
+        supervisor_thread.join()
+        for record in supervisor.records:
+            main_logger.info(f"Restart: {record}")
+
+    if exporter_thread is not None:
+        exporter.stop()
+        exporter_thread.join()
+
     # Stop the processes
     controller.request_exit()
     main_logger.info("Requested exit")
 
-    # Fill and drain queues from END TO START
-    for q in (command_queue, telemetry_queue, heartbeat_queue):
-        q.fill_and_drain_queue()
-    main_logger.info("Queues cleared")
+    # Wake workers blocked on queues, without waiting for them
+    for q in pipeline.get_queues():
+        q.close()
+    main_logger.info("Queues closed")
 
     # Clean up worker processes
     for manager in workers:
         manager.join_workers()
     main_logger.info("Stopped")
 
+    # Free shared memory backed queues
+    pipeline.release()
+
     # We can reset controller in case we want to reuse it
     # Alternatively, create a new WorkerController instance
 
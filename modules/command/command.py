@@ -7,6 +7,7 @@ import math
 from pymavlink import mavutil
 from modules.telemetry import telemetry
 
+from . import running_statistics
 from ..common.modules.logger import logger
 
 
@@ -60,9 +61,10 @@ class Command:  # pylint: disable=too-many-instance-attributes
         self.target = target
         self.local_logger = local_logger
         self.start = None
-        self.v_x = []
-        self.v_y = []
-        self.v_z = []
+        # Constant memory per axis regardless of flight length
+        self.v_x = running_statistics.RunningStatistics()
+        self.v_y = running_statistics.RunningStatistics()
+        self.v_z = running_statistics.RunningStatistics()
         # Do any intializiation here
 
     def run(self, data: telemetry.TelemetryData) -> list:
@@ -77,15 +79,11 @@ class Command:  # pylint: disable=too-many-instance-attributes
             if not self.start:
                 self.start = Position(telemetry_data.x, telemetry_data.y, telemetry_data.z)
 
-            self.v_x.append(telemetry_data.x_velocity)
-            self.v_y.append(telemetry_data.y_velocity)
-            self.v_z.append(telemetry_data.z_velocity)
+            self.v_x.update(telemetry_data.x_velocity)
+            self.v_y.update(telemetry_data.y_velocity)
+            self.v_z.update(telemetry_data.z_velocity)
 
-            avg_v = [
-                sum(self.v_x) / len(self.v_x),
-                sum(self.v_y) / len(self.v_y),
-                sum(self.v_z) / len(self.v_z),
-            ]
+            avg_v = [self.v_x.mean, self.v_y.mean, self.v_z.mean]
 
             self.local_logger.info(f"Average velocity: {avg_v}")
             # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
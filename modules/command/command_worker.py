@@ -8,7 +8,9 @@ import pathlib
 from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_memory_blackboard
 from utilities.workers import worker_controller
+from utilities.workers import worker_metrics
 from . import command
 from ..common.modules.logger import logger
 
@@ -19,19 +21,25 @@ from ..common.modules.logger import logger
 def command_worker(
     connection: mavutil.mavfile,
     target: command.Position,
-    data_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    data_queue: queue_proxy_wrapper.QueueProxyWrapper | None,
     response_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
     # Add other necessary worker arguments here
+    blackboard: shared_memory_blackboard.SharedMemoryBlackboard | None = None,
+    poll_period: float = 0.01,
+    batch_size: int = 8,
 ) -> None:
     """
     Worker process.
 
     connection: mavlink connection for sending messages
     target: target position
-    data_queue: queue to read test telemetry data
+    data_queue: queue to read test telemetry data, None if blackboard is set
     response_queue: queue to pass results to
     controller: worker controller to control running/stopping of command worker
+    blackboard: if set, act only on the latest telemetry here instead of data_queue
+    poll_period: time between blackboard reads, or longest wait for queued telemetry
+    batch_size: most telemetry samples taken from data_queue at once
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -63,15 +71,46 @@ def command_worker(
         local_logger.error("Failed to create CommandWorker", True)
         return
     # Main loop: do work.
+    metrics = worker_metrics.WorkerMetrics.get_current()
+    if blackboard is not None:
+        reader = shared_memory_blackboard.BlackboardReader(blackboard)
+        while not controller.is_exit_requested():
+            controller.check_pause()
+            skipped_count = reader.skipped_count
+            is_new, telemetry_data = reader.read_latest()
+            if not is_new:
+                controller.wait_for_exit(poll_period)
+                continue
+
+            # Samples replaced before this worker read them, and how old the read one is
+            metrics.increment("telemetry_read")
+            metrics.increment("telemetry_skipped", reader.skipped_count - skipped_count)
+            metrics.observe("telemetry_staleness", reader.staleness())
+            try:
+                for q in command_worker_object.run(telemetry_data):
+                    response_queue.queue.put(q)
+                    metrics.increment("commands")
+            except (OSError, ValueError, EOFError) as e:
+                local_logger.error(f"Error in command worker: {e}", True)
+
+        local_logger.info(
+            f"Read {reader.new_count} telemetry samples, skipped {reader.skipped_count}", True
+        )
+        return
+
     while not controller.is_exit_requested():
         controller.check_pause()
         try:
-            if not data_queue.queue.empty():
-                telemetry_data = data_queue.queue.get()
-                if telemetry_data:
-                    queues = command_worker_object.run(telemetry_data)
-                for q in queues:
-                    response_queue.queue.put(q)
+            responses = []
+            batch = data_queue.get_many(batch_size, poll_period)
+            metrics.set_gauge("batch_size", len(batch))
+            for telemetry_data in batch:
+                # Sentinel
+                if telemetry_data is None:
+                    continue
+                responses.extend(command_worker_object.run(telemetry_data))
+            response_queue.put_many(responses)
+            metrics.increment("commands", len(responses))
         except (OSError, ValueError, EOFError) as e:
             local_logger.error(f"Error in command worker: {e}", True)
 
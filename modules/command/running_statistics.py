@@ -0,0 +1,79 @@
+"""
+Constant time and memory statistics over a stream of samples.
+"""
+
+import collections
+
+
+class RunningStatistics:  # pylint: disable=too-many-instance-attributes
+    """
+    Running mean, minimum and maximum, with optional
+    exponentially weighted and fixed window means.
+    """
+
+    def __init__(self, ewma_alpha: "float | None" = None, window_size: "int | None" = None) -> None:
+        """
+        ewma_alpha: Weight of the newest sample in (0, 1], None to disable.
+        window_size: Number of most recent samples in the window mean, None to disable.
+        """
+        if ewma_alpha is not None and not 0.0 < ewma_alpha <= 1.0:
+            raise ValueError("EWMA alpha must be in (0, 1]")
+
+        if window_size is not None and window_size <= 0:
+            raise ValueError("Window size must be greater than 0")
+
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.__total = 0
+
+        self.__ewma_alpha = ewma_alpha
+        self.ewma_mean = None
+
+        self.__window = collections.deque(maxlen=window_size) if window_size is not None else None
+        self.__window_total = 0
+
+    def update(self, value: float) -> None:
+        """
+        Adds a sample.
+        """
+        self.count += 1
+        # Accumulate in arrival order so the mean matches sum(samples) / len(samples)
+        self.__total += value
+
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+        if self.__ewma_alpha is not None:
+            if self.ewma_mean is None:
+                self.ewma_mean = value
+            else:
+                self.ewma_mean += self.__ewma_alpha * (value - self.ewma_mean)
+
+        if self.__window is not None:
+            if len(self.__window) == self.__window.maxlen:
+                self.__window_total -= self.__window[0]
+            self.__window.append(value)
+            self.__window_total += value
+
+    @property
+    def mean(self) -> "float | None":
+        """
+        Mean of all samples, None if there are none.
+        """
+        if self.count == 0:
+            return None
+
+        return self.__total / self.count
+
+    @property
+    def window_mean(self) -> "float | None":
+        """
+        Mean of the most recent window_size samples, None if disabled or there are none.
+        """
+        if not self.__window:
+            return None
+
+        return self.__window_total / len(self.__window)
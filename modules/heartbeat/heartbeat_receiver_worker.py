@@ -4,12 +4,13 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
+import queue as queue_module
 
 from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
+from utilities.workers import worker_metrics
 from . import heartbeat_receiver
 from ..common.modules.logger import logger
 
@@ -19,16 +20,19 @@ from ..common.modules.logger import logger
 # =================================================================================================
 def heartbeat_receiver_worker(
     connection: mavutil.mavfile,
+    period: int,
     queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
-    period: int,
-    main_logger: logger.Logger,
+    main_logger: "logger.Logger | None" = None,
 ) -> None:
     """
     Worker process.
 
-    connection: MAVUtil connection object that is used to send out heartbeats
+    connection: MAVUtil connection object that is used to receive heartbeats
     period: time period between heartbeats
+    queue: queue to pass the connection state to main
+    controller: controls start/stop of worker
+    main_logger: if set, also log the connection state here
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -58,15 +62,62 @@ def heartbeat_receiver_worker(
         local_logger.error("Failed to create HeartbeatReceiver", True)
         return
     # Main loop: do work.
-
+    metrics = worker_metrics.WorkerMetrics.get_current()
     while not controller.is_exit_requested():
         controller.check_pause()
         receiver.run()
         current_state = receiver.state
+        metrics.set_gauge("heartbeat_connected", 1.0 if current_state == "Connected" else 0.0)
         queue.queue.put(current_state)
         local_logger.info(f"Current state: {current_state}", True)
-        main_logger.info(f"Current state: {current_state}", True)
-        time.sleep(period)
+        if main_logger is not None:
+            main_logger.info(f"Current state: {current_state}", True)
+        controller.wait_for_exit(period)
+
+
+async def heartbeat_receiver_worker_async(
+    connection: mavutil.mavfile,
+    period: int,
+    queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Coroutine worker, same as heartbeat_receiver_worker but sharing an event loop with others.
+
+    connection: MAVUtil connection object that is used to receive heartbeats
+    period: time period between heartbeats
+    queue: queue to pass the connection state to main
+    controller: controls start/stop of worker
+    """
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_async_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger=local_logger
+    )
+    if not result:
+        local_logger.error("Failed to create HeartbeatReceiver", True)
+        return
+
+    metrics = worker_metrics.WorkerMetrics.get_current()
+    while not controller.is_exit_requested():
+        await controller.check_pause_async()
+        # Non-blocking receive, so the event loop is never held up
+        receiver.run()
+        current_state = receiver.state
+        metrics.set_gauge("heartbeat_connected", 1.0 if current_state == "Connected" else 0.0)
+        try:
+            queue.queue.put_nowait(current_state)
+        except queue_module.Full:
+            local_logger.warning("Main is not reading the connection state", True)
+        await controller.wait_for_exit_async(period)
 
 
 # =================================================================================================
@@ -4,7 +4,6 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
@@ -18,8 +17,8 @@ from ..common.modules.logger import logger
 # =================================================================================================
 def heartbeat_sender_worker(
     connection: mavutil.mavfile,
-    controller: worker_controller.WorkerController,
     period: int,
+    controller: worker_controller.WorkerController,
     # Add other necessary worker arguments here
 ) -> None:
     """
@@ -27,6 +26,7 @@ def heartbeat_sender_worker(
 
     connection: MAVUtil connection object that is used to send out heartbeats
     period: time period between heartbeats
+    controller: controls start/stop of worker
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -61,7 +61,44 @@ def heartbeat_sender_worker(
             sender.run(local_logger)
         except (OSError, ValueError, EOFError) as e:
             local_logger.error(f"Error in heartbeat sender worker: {e}", True)
-        time.sleep(period)
+        controller.wait_for_exit(period)
+
+
+async def heartbeat_sender_worker_async(
+    connection: mavutil.mavfile,
+    period: int,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Coroutine worker, same as heartbeat_sender_worker but sharing an event loop with others.
+
+    connection: MAVUtil connection object that is used to send out heartbeats
+    period: time period between heartbeats
+    controller: controls start/stop of worker
+    """
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_async_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    result, sender = heartbeat_sender.HeartbeatSender.create(connection)
+    if not result:
+        local_logger.error("Failed to create HeartbeatSender", True)
+        return
+    local_logger.info("HeartbeatSender Initialized")
+
+    while not controller.is_exit_requested():
+        await controller.check_pause_async()
+        try:
+            sender.run(local_logger)
+        except (OSError, ValueError, EOFError) as e:
+            local_logger.error(f"Error in heartbeat sender worker: {e}", True)
+        await controller.wait_for_exit_async(period)
 
 
 # =================================================================================================
@@ -0,0 +1,197 @@
+"""
+Fast path decoder for the few MAVLink message types the workers use.
+Reads the message ID from the raw frame header and skips every other frame without decoding it.
+"""
+
+import binascii
+import importlib
+import re
+import struct
+
+from pymavlink import mavutil
+
+
+V1_START = 0xFE
+V2_START = 0xFD
+V1_HEADER_LENGTH = 6
+V2_HEADER_LENGTH = 10
+CHECKSUM_LENGTH = 2
+SIGNATURE_LENGTH = 13
+# Incompatibility flag of a MAVLink 2 frame followed by a signature
+V2_SIGNED = 0x01
+
+# Each byte with its bits in reverse order
+REVERSED_BITS = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+
+
+def x25_checksum(data: bytes, extra: "bytes | None" = None) -> int:
+    """
+    Returns the MAVLink checksum (CRC-16/MCRF4XX) of the data followed by the extra bytes.
+    binascii computes the unreflected form of the same CRC in C,
+    so it is used on the bit reversed bytes, and the result reversed back.
+    """
+    crc = binascii.crc_hqx(data.translate(REVERSED_BITS), 0xFFFF)
+    if extra is not None:
+        crc = binascii.crc_hqx(extra.translate(REVERSED_BITS), crc)
+
+    return REVERSED_BITS[crc & 0xFF] << 8 | REVERSED_BITS[crc >> 8]
+
+
+class DecodedMessage:
+    """
+    Message from the FrameDecoder with the fields and type of the pymavlink message,
+    so subscribers written for pymavlink messages work unchanged.
+    """
+
+    def __init__(self, message_type: str, fields: "dict[str, object]") -> None:
+        self.__dict__ = fields
+        self._type = message_type
+
+    def get_type(self) -> str:
+        """
+        Returns the message type, e.g. "ATTITUDE".
+        """
+        return self._type
+
+    def __str__(self) -> str:
+        fields = ", ".join(
+            f"{name} : {value}" for name, value in self.__dict__.items() if name != "_type"
+        )
+        return f"{self._type} {{{fields}}}"
+
+
+class MessageLayout:
+    """
+    Wire layout of a message type, taken once from the MAVLink 2 form of the pymavlink dialect,
+    which includes the extension fields.
+    """
+
+    def __init__(self, message_class: type) -> None:
+        """
+        message_class: pymavlink message class, e.g. `MAVLink_attitude_message`.
+        """
+        self.message_type: str = message_class.msgname
+        # Fields in wire order, largest type first
+        self.field_names: "tuple[str, ...]" = tuple(message_class.ordered_fieldnames)
+        self.unpacker: struct.Struct = message_class.unpacker
+        self.checksum_extra = bytes([message_class.crc_extra])
+
+
+class FrameDecoder:
+    """
+    Splits a MAVLink 1 and 2 byte stream into frames, and decodes only the wanted types.
+    Wanted frames are checked and unpacked with the cached layout of their type.
+    Other frames are skipped by their length without checking them,
+    so a corrupt length can hide the frames after it until the next start byte.
+    """
+
+    __private_key = object()
+
+    __START_PATTERN = re.compile(b"[" + bytes([V1_START, V2_START]) + b"]")
+
+    @classmethod
+    def create(
+        cls,
+        message_types: "list[str]",
+    ) -> "tuple[True, FrameDecoder] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a FrameDecoder object.
+
+        message_types: Types to decode, all in the dialect of mavutil and without array fields.
+        """
+        # Extension fields only exist in the MAVLink 2 form, MAVLink 1 frames leave them zero
+        dialect = importlib.import_module(f"pymavlink.dialects.v20.{mavutil.current_dialect}")
+        message_classes = {
+            message_class.msgname: message_class for message_class in dialect.mavlink_map.values()
+        }
+
+        layouts = {}
+        for message_type in message_types:
+            message_class = message_classes.get(message_type)
+            if message_class is None or any(message_class.array_lengths):
+                return False, None
+
+            layouts[message_class.id] = MessageLayout(message_class)
+
+        return True, FrameDecoder(cls.__private_key, layouts)
+
+    def __init__(self, key: object, layouts: "dict[int, MessageLayout]") -> None:
+        assert key is FrameDecoder.__private_key, "Use create() method"
+
+        self.__layouts = layouts
+        # Bytes of frames that have not fully arrived yet
+        self.__buffer = bytearray()
+
+        self.decoded_count = 0
+        self.skipped_count = 0
+        self.bad_checksum_count = 0
+
+    def decode(self, data: bytes) -> "list[DecodedMessage]":
+        """
+        Adds the received bytes to the stream.
+
+        Returns the messages of the wanted types completed by the bytes, in order.
+        """
+        buffer = self.__buffer
+        buffer += data
+        end = len(buffer)
+        messages = []
+        position = 0
+        while True:
+            match = self.__START_PATTERN.search(buffer, position)
+            if match is None:
+                position = end
+                break
+
+            position = match.start()
+            if buffer[position] == V2_START:
+                header_length = V2_HEADER_LENGTH
+                if end - position < header_length:
+                    break
+
+                message_id = int.from_bytes(buffer[position + 7 : position + 10], "little")
+                signature_length = SIGNATURE_LENGTH if buffer[position + 2] & V2_SIGNED else 0
+            else:
+                header_length = V1_HEADER_LENGTH
+                if end - position < header_length:
+                    break
+
+                message_id = buffer[position + 5]
+                signature_length = 0
+
+            payload_start = position + header_length
+            payload_end = payload_start + buffer[position + 1]
+            frame_end = payload_end + CHECKSUM_LENGTH + signature_length
+            if frame_end > end:
+                break
+
+            layout = self.__layouts.get(message_id)
+            if layout is None:
+                self.skipped_count += 1
+                position = frame_end
+                continue
+
+            checksum = x25_checksum(buffer[position + 1 : payload_end], layout.checksum_extra)
+            if checksum != buffer[payload_end] | buffer[payload_end + 1] << 8:
+                # Not a frame after all, or a corrupt one, look for the next start byte
+                self.bad_checksum_count += 1
+                position += 1
+                continue
+
+            if payload_end - payload_start >= layout.unpacker.size:
+                values = layout.unpacker.unpack_from(buffer, payload_start)
+            else:
+                # MAVLink 2 drops trailing zero bytes, and MAVLink 1 has no extension fields
+                payload = bytes(buffer[payload_start:payload_end])
+                values = layout.unpacker.unpack(
+                    payload + bytes(layout.unpacker.size - len(payload))
+                )
+
+            messages.append(
+                DecodedMessage(layout.message_type, dict(zip(layout.field_names, values)))
+            )
+            self.decoded_count += 1
+            position = frame_end
+
+        del buffer[:position]
+        return messages
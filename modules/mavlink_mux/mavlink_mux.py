@@ -0,0 +1,236 @@
+"""
+Single owner of the MAVLink connection.
+Reads and decodes each frame once, routes it to subscribers by message type,
+and serializes all outgoing messages through one writer.
+"""
+
+import queue
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from . import frame_decoder
+from ..common.modules.logger import logger
+
+
+# Message types routed by the multiplexer by default
+DEFAULT_MESSAGE_TYPES = ("HEARTBEAT", "ATTITUDE", "LOCAL_POSITION_NED", "COMMAND_ACK")
+
+
+class MuxedSender:
+    """
+    Stand-in for `mavfile.mav` that forwards send calls to the connection owner.
+    """
+
+    def __init__(self, outgoing_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        self.__outgoing_queue = outgoing_queue
+
+    def __post(self, name: str, args: "tuple") -> None:
+        self.__outgoing_queue.queue.put((name, args))
+
+    def heartbeat_send(self, *args: object) -> None:
+        """
+        Queues a HEARTBEAT for the connection owner to send.
+        """
+        self.__post("heartbeat_send", args)
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Queues a COMMAND_LONG for the connection owner to send.
+        """
+        self.__post("command_long_send", args)
+
+
+class MuxedConnection:
+    """
+    Stand-in for `mavutil.mavfile` given to workers instead of the real connection.
+    Receives only the message types it subscribed to.
+    """
+
+    def __init__(
+        self,
+        subscription_queue: queue_proxy_wrapper.QueueProxyWrapper,
+        outgoing_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    ) -> None:
+        """
+        subscription_queue: Messages routed to this subscriber.
+        outgoing_queue: Send requests for the connection owner.
+        """
+        self.__subscription_queue = subscription_queue
+        self.mav = MuxedSender(outgoing_queue)
+
+    def recv_match(
+        self,
+        condition: None = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: "float | None" = None,
+    ) -> "object | None":
+        """
+        Same as `mavfile.recv_match()` except `condition` is not supported.
+
+        Returns the next subscribed message matching type, or None if there is none in time.
+        """
+        assert condition is None, "condition is not supported"
+
+        if isinstance(type, str):
+            type = [type]
+
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                if not blocking:
+                    message = self.__subscription_queue.queue.get_nowait()
+                elif deadline is None:
+                    message = self.__subscription_queue.queue.get()
+                else:
+                    message = self.__subscription_queue.queue.get(
+                        timeout=max(deadline - time.time(), 0.0)
+                    )
+            except queue.Empty:
+                return None
+
+            # Sentinel
+            if message is None:
+                return None
+
+            if type is None or message.get_type() in type:
+                return message
+
+
+class MavlinkMux:  # pylint: disable=too-many-instance-attributes
+    """
+    Owns the MAVLink connection on behalf of all other workers.
+    """
+
+    __private_key = object()
+
+    # Upper bound of messages read in one run() before servicing outgoing messages
+    __MAX_READS_PER_RUN = 100
+    # Upper bound of bytes read in one run() by the decoder, about 100 telemetry frames
+    __DECODER_READ_SIZE = 4096
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+        outgoing_queue: queue_proxy_wrapper.QueueProxyWrapper,
+        read_timeout: float,
+        local_logger: logger.Logger,
+        decoder: frame_decoder.FrameDecoder | None = None,
+    ) -> "tuple[True, MavlinkMux] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a MavlinkMux object.
+
+        connection: The only connection reader and writer.
+        subscriptions: Subscriber queues for each message type.
+        outgoing_queue: Send requests from the MuxedSenders.
+        read_timeout: Time to wait for an incoming message in seconds, must be greater than 0 .
+        decoder: Reads raw bytes and decodes only the subscribed types instead of
+        decoding every message with pymavlink, None to use pymavlink.
+        """
+        if read_timeout <= 0.0:
+            local_logger.error("Read timeout must be greater than 0", True)
+            return False, None
+
+        return True, MavlinkMux(
+            cls.__private_key,
+            connection,
+            subscriptions,
+            outgoing_queue,
+            read_timeout,
+            local_logger,
+            decoder,
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+        outgoing_queue: queue_proxy_wrapper.QueueProxyWrapper,
+        read_timeout: float,
+        local_logger: logger.Logger,
+        decoder: frame_decoder.FrameDecoder | None,
+    ) -> None:
+        assert key is MavlinkMux.__private_key, "Use create() method"
+
+        self.__connection = connection
+        self.__subscriptions = subscriptions
+        self.__outgoing_queue = outgoing_queue
+        self.__read_timeout = read_timeout
+        self.__local_logger = local_logger
+        self.__decoder = decoder
+
+        self.received_count = 0
+        self.dropped_count = 0
+        self.sent_count = 0
+
+    def run(self) -> None:
+        """
+        Waits for incoming messages and routes all that have arrived,
+        then sends all pending outgoing messages.
+        """
+        if self.__decoder is not None:
+            self.__run_decoded()
+            return
+
+        message = self.__connection.recv_match(blocking=True, timeout=self.__read_timeout)
+        reads = 0
+        while message is not None and reads < self.__MAX_READS_PER_RUN:
+            self.__route(message)
+            reads += 1
+            message = self.__connection.recv_match(blocking=False)
+
+        if message is not None:
+            self.__route(message)
+
+        self.__flush_outgoing()
+
+    def __run_decoded(self) -> None:
+        """
+        Same as run(), but reads raw bytes through the decoder.
+        """
+        messages = self.__decoder.decode(self.__connection.recv(self.__DECODER_READ_SIZE))
+        if not messages and self.__connection.select(self.__read_timeout):
+            messages = self.__decoder.decode(self.__connection.recv(self.__DECODER_READ_SIZE))
+
+        for message in messages:
+            self.__route(message)
+
+        self.__flush_outgoing()
+
+    def __route(self, message: object) -> None:
+        """
+        Delivers the message to every subscriber of its type.
+        A full subscriber queue drops the message rather than stall the reader.
+        """
+        self.received_count += 1
+        for subscriber in self.__subscriptions.get(message.get_type(), []):
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                self.dropped_count += 1
+
+    def __flush_outgoing(self) -> None:
+        """
+        Sends queued messages in the order they were requested.
+        """
+        while True:
+            try:
+                request = self.__outgoing_queue.queue.get_nowait()
+            except queue.Empty:
+                return
+
+            # Sentinel, a closed queue returns it on every get
+            if request is None:
+                return
+
+            name, args = request
+            try:
+                getattr(self.__connection.mav, name)(*args)
+                self.sent_count += 1
+            except (OSError, ValueError, EOFError) as e:
+                self.__local_logger.error(f"Failed to send {name}: {e}", True)
@@ -0,0 +1,88 @@
+"""
+Connection owner worker that multiplexes the MAVLink connection between workers.
+"""
+
+import os
+import pathlib
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import frame_decoder
+from . import mavlink_mux
+from ..common.modules.logger import logger
+
+
+def mavlink_mux_worker(
+    connection: mavutil.mavfile,
+    subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+    read_timeout: float,
+    outgoing_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+    fast_decode: bool = False,
+) -> None:
+    """
+    Worker process.
+
+    connection: MAVLink connection, no other worker may read from or write to it
+    subscriptions: subscriber queues for each message type
+    read_timeout: time to wait for an incoming message before servicing outgoing messages
+    outgoing_queue: send requests from the other workers
+    controller: worker controller to control running/stopping of the worker
+    fast_decode: decode only the subscribed message types from the raw bytes
+    """
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    decoder = None
+    if fast_decode:
+        result, decoder = frame_decoder.FrameDecoder.create(list(subscriptions))
+        if not result:
+            local_logger.error(f"Cannot decode all of {list(subscriptions)}", True)
+            return
+
+    # Instantiate class object (mavlink_mux.MavlinkMux)
+    result, mux = mavlink_mux.MavlinkMux.create(
+        connection,
+        subscriptions,
+        outgoing_queue,
+        read_timeout,
+        local_logger,
+        decoder,
+    )
+    if not result:
+        local_logger.error("Failed to create MavlinkMux", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert mux is not None
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        try:
+            mux.run()
+        except (OSError, ValueError, EOFError) as e:
+            local_logger.error(f"Error in MAVLink multiplexer: {e}", True)
+
+    local_logger.info(
+        f"Received {mux.received_count}, dropped {mux.dropped_count}, sent {mux.sent_count}",
+        True,
+    )
+    if decoder is not None:
+        local_logger.info(
+            f"Decoded {decoder.decoded_count}, skipped {decoder.skipped_count}, "
+            f"bad checksums {decoder.bad_checksum_count}",
+            True,
+        )
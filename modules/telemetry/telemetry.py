@@ -2,18 +2,45 @@
 Telemetry gathering logic.
 """
 
+import enum
+import select
+import struct
 import time
+import typing
 
 from pymavlink import mavutil
 
 from ..common.modules.logger import logger
 
+if typing.TYPE_CHECKING:
+    from . import telemetry_fusion
+
 
 class TelemetryData:  # pylint: disable=too-many-instance-attributes
     """
     Python struct to represent Telemtry Data. Contains the most recent attitude and position reading.
     """
 
+    __slots__ = (
+        "time_since_boot",
+        "x",
+        "y",
+        "z",
+        "x_velocity",
+        "y_velocity",
+        "z_velocity",
+        "roll",
+        "pitch",
+        "yaw",
+        "roll_speed",
+        "pitch_speed",
+        "yaw_speed",
+    )
+
+    # Fixed layout: bitmask of fields that are not None, time_since_boot, remaining fields
+    __LAYOUT = struct.Struct("<Hq12d")
+    __ALL_PRESENT = (1 << len(__slots__)) - 1
+
     def __init__(
         self,
         time_since_boot: int | None = None,  # ms
@@ -61,10 +88,61 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
             yaw_speed: {self.yaw_speed}
         }}"""
 
+    def to_bytes(self) -> bytes:
+        """
+        Packs into the fixed layout, much smaller and faster than pickling.
+        """
+        values = (
+            self.time_since_boot,
+            self.x,
+            self.y,
+            self.z,
+            self.x_velocity,
+            self.y_velocity,
+            self.z_velocity,
+            self.roll,
+            self.pitch,
+            self.yaw,
+            self.roll_speed,
+            self.pitch_speed,
+            self.yaw_speed,
+        )
+        if None not in values:
+            return self.__LAYOUT.pack(self.__ALL_PRESENT, *values)
+
+        mask = 0
+        for i, value in enumerate(values):
+            if value is not None:
+                mask |= 1 << i
+
+        return self.__LAYOUT.pack(mask, *(0 if value is None else value for value in values))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TelemetryData":
+        """
+        Unpacks from the fixed layout created by to_bytes().
+        """
+        mask, *values = cls.__LAYOUT.unpack(data)
+        if mask == cls.__ALL_PRESENT:
+            return cls(*values)
+
+        return cls(*(value if mask >> i & 1 else None for i, value in enumerate(values)))
+
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+class WaitMode(enum.Enum):
+    """
+    How Telemetry waits for messages that have not arrived yet.
+    """
+
+    # Poll the connection without blocking
+    SPIN = 0
+    # Block on the connection's file descriptor until it is readable
+    EVENT = 1
+
+
 class Telemetry:
     """
     Telemetry class to read position and attitude (orientation).
@@ -72,17 +150,25 @@ class Telemetry:
 
     __private_key = object()
 
+    # Give up if no message arrives for this long
+    __TIMEOUT = 1  # seconds
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        wait_mode: WaitMode = WaitMode.SPIN,
+        fusion: "telemetry_fusion.TelemetryFusion | None" = None,
     ) -> "tuple[True, Telemetry] | tuple[False, None]":
         """
         Falliable create (instantiation) method to create a Telemetry object.
+
+        fusion: Emit interpolated telemetry at a fixed rate instead of pairing the first
+        attitude and position to arrive.
         """
         try:
-            telemetry = cls(cls.__private_key, connection, local_logger)
+            telemetry = cls(cls.__private_key, connection, local_logger, wait_mode, fusion)
             return [True, telemetry]
         except (OSError, ValueError, EOFError):
             return [False, None]
@@ -92,16 +178,40 @@ class Telemetry:
         key: object,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        wait_mode: WaitMode,
+        fusion: "telemetry_fusion.TelemetryFusion | None",
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
 
         # Do any intializiation here
         self.local_logger = local_logger
         self.connection = connection
+        self.wait_mode = wait_mode
+        self.fusion = fusion
         self.last_attitude = None
         self.last_position = None
         self.last_time = time.time()
 
+    def __receive(self, timeout: float) -> "object | None":
+        """
+        Returns the next message, or None if there is none yet.
+        In event mode, waits up to timeout seconds for the connection to become readable.
+        """
+        msg = self.connection.recv_match(blocking=False)
+        if msg is not None or self.wait_mode == WaitMode.SPIN:
+            return msg
+
+        # Connections without a file descriptor implement their own blocking wait
+        fd = getattr(self.connection, "fd", None)
+        if fd is None:
+            return self.connection.recv_match(blocking=True, timeout=timeout)
+
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            return None
+
+        return self.connection.recv_match(blocking=False)
+
     def run(
         self,
     ) -> "TelemetryData | None":
@@ -109,9 +219,12 @@ class Telemetry:
         Receive LOCAL_POSITION_NED and ATTITUDE messages from the drone,
         combining them together to form a single TelemetryData object.
         """
+        if self.fusion is not None:
+            return self.__run_fused()
+
         self.last_time = time.time()
-        while (time.time() - self.last_time) < 1:
-            msg = self.connection.recv_match(blocking=False)
+        while (time.time() - self.last_time) < self.__TIMEOUT:
+            msg = self.__receive(self.__TIMEOUT - (time.time() - self.last_time))
             if msg is None:
                 continue
 
@@ -154,6 +267,24 @@ class Telemetry:
         self.last_position = None
         return None
 
+    def __run_fused(self) -> "TelemetryData | None":
+        """
+        Feeds messages into the fusion until it has the next output sample.
+        """
+        self.last_time = time.time()
+        while True:
+            telemetry_data = self.fusion.pop_ready()
+            if telemetry_data is not None:
+                return telemetry_data
+
+            remaining = self.__TIMEOUT - (time.time() - self.last_time)
+            if remaining <= 0:
+                return None
+
+            msg = self.__receive(remaining)
+            if msg is not None and self.fusion.add_message(msg):
+                self.last_time = time.time()
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -0,0 +1,191 @@
+"""
+Timestamp-aligned fusion of attitude and position into telemetry at a fixed rate.
+"""
+
+import collections
+import math
+
+from . import telemetry
+
+
+def wrap_angle(angle: float) -> float:
+    """
+    Wraps an angle in radians to [-pi, pi).
+    """
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def interpolate_linear(start: float, end: float, fraction: float) -> float:
+    """
+    Linear interpolation.
+    """
+    return start + (end - start) * fraction
+
+
+def interpolate_angle(start: float, end: float, fraction: float) -> float:
+    """
+    Interpolation along the shorter arc between 2 angles in radians.
+    """
+    return wrap_angle(start + wrap_angle(end - start) * fraction)
+
+
+class TelemetryFusion:
+    """
+    Buffers ATTITUDE and LOCAL_POSITION_NED samples by time_boot_ms and emits TelemetryData
+    interpolated at evenly spaced output times, once both streams have samples on either side.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        output_rate: float,
+        buffer_length: int,
+    ) -> "tuple[True, TelemetryFusion] | tuple[False, None]":
+        """
+        Falliable create (instantiation) method to create a TelemetryFusion object.
+
+        output_rate: Output samples per second of drone time, must be greater than 0 .
+        buffer_length: Samples kept per stream, must be at least 2 .
+        """
+        if output_rate <= 0.0:
+            return False, None
+
+        if buffer_length < 2:
+            return False, None
+
+        return True, TelemetryFusion(cls.__private_key, output_rate, buffer_length)
+
+    def __init__(self, key: object, output_rate: float, buffer_length: int) -> None:
+        assert key is TelemetryFusion.__private_key, "Use create() method"
+
+        self.__output_period_ms = 1000.0 / output_rate
+        self.__buffer_length = buffer_length
+        # (time_boot_ms, roll, pitch, yaw, rollspeed, pitchspeed, yawspeed)
+        self.__attitudes = collections.deque(maxlen=buffer_length)
+        # (time_boot_ms, x, y, z, vx, vy, vz)
+        self.__positions = collections.deque(maxlen=buffer_length)
+        self.__next_output_ms = None
+
+    def reset(self) -> None:
+        """
+        Clears all buffered samples, e.g. when the drone reboots.
+        """
+        self.__attitudes.clear()
+        self.__positions.clear()
+        self.__next_output_ms = None
+
+    def add_message(self, msg: object) -> bool:
+        """
+        Buffers an ATTITUDE or LOCAL_POSITION_NED message.
+
+        Returns whether the message was used.
+        """
+        message_type = msg.get_type()
+        if message_type == "ATTITUDE":
+            sample = (
+                msg.time_boot_ms,
+                msg.roll,
+                msg.pitch,
+                msg.yaw,
+                msg.rollspeed,
+                msg.pitchspeed,
+                msg.yawspeed,
+            )
+            return self.__add_sample(self.__attitudes, sample)
+
+        if message_type == "LOCAL_POSITION_NED":
+            sample = (msg.time_boot_ms, msg.x, msg.y, msg.z, msg.vx, msg.vy, msg.vz)
+            return self.__add_sample(self.__positions, sample)
+
+        return False
+
+    def __add_sample(self, samples: "collections.deque", sample: "tuple") -> bool:
+        if samples:
+            latest_ms = samples[-1][0]
+            # Drone clock went backwards, so it rebooted
+            if sample[0] < latest_ms - self.__buffer_length * self.__output_period_ms:
+                self.reset()
+            # Duplicate or out of order
+            elif sample[0] <= latest_ms:
+                return False
+
+        samples.append(sample)
+        return True
+
+    @staticmethod
+    def __bracket(samples: "collections.deque", time_ms: float) -> "tuple[tuple, tuple] | None":
+        """
+        Returns the samples immediately before and after the time, or None if not yet received.
+        """
+        previous = None
+        for sample in samples:
+            if sample[0] >= time_ms:
+                if previous is None:
+                    return sample, sample
+                return previous, sample
+            previous = sample
+
+        return None
+
+    def pop_ready(self) -> "telemetry.TelemetryData | None":
+        """
+        Returns the telemetry for the next output time if both streams cover it, otherwise None.
+        """
+        if not self.__attitudes or not self.__positions:
+            return None
+
+        # Output times can only start once both streams have started
+        oldest_ms = max(self.__attitudes[0][0], self.__positions[0][0])
+        if self.__next_output_ms is None or self.__next_output_ms < oldest_ms:
+            self.__next_output_ms = oldest_ms
+
+        time_ms = self.__next_output_ms
+        attitude_bracket = self.__bracket(self.__attitudes, time_ms)
+        position_bracket = self.__bracket(self.__positions, time_ms)
+        if attitude_bracket is None or position_bracket is None:
+            return None
+
+        self.__next_output_ms += self.__output_period_ms
+
+        roll, pitch, yaw, roll_speed, pitch_speed, yaw_speed = self.__interpolate(
+            attitude_bracket, time_ms, (True, True, True, False, False, False)
+        )
+        x, y, z, x_velocity, y_velocity, z_velocity = self.__interpolate(
+            position_bracket, time_ms, (False,) * 6
+        )
+
+        return telemetry.TelemetryData(
+            time_since_boot=int(round(time_ms)),
+            x=x,
+            y=y,
+            z=z,
+            x_velocity=x_velocity,
+            y_velocity=y_velocity,
+            z_velocity=z_velocity,
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            roll_speed=roll_speed,
+            pitch_speed=pitch_speed,
+            yaw_speed=yaw_speed,
+        )
+
+    @staticmethod
+    def __interpolate(
+        bracket: "tuple[tuple, tuple]", time_ms: float, is_angle: "tuple[bool, ...]"
+    ) -> "list[float]":
+        before, after = bracket
+        if after[0] == before[0]:
+            return list(after[1:])
+
+        fraction = (time_ms - before[0]) / (after[0] - before[0])
+        return [
+            (
+                interpolate_angle(start, end, fraction)
+                if angle
+                else interpolate_linear(start, end, fraction)
+            )
+            for start, end, angle in zip(before[1:], after[1:], is_angle)
+        ]
@@ -4,13 +4,15 @@ Telemtry worker that gathers GPS data.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_memory_blackboard
 from utilities.workers import worker_controller
+from utilities.workers import worker_metrics
 from . import telemetry
+from . import telemetry_fusion
 from ..common.modules.logger import logger
 
 
@@ -21,6 +23,9 @@ def telemetry_worker(
     connection: mavutil.mavfile,
     queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
+    output_rate: "float | None" = None,
+    fusion_buffer_length: int = 8,
+    blackboard: shared_memory_blackboard.SharedMemoryBlackboard | None = None,
 ) -> None:
     """
     Worker process.
@@ -29,6 +34,9 @@ def telemetry_worker(
     controller: controls start/stop of worker
     queue: message/information queue for communication
     period: telemetry timeout period
+    output_rate: if set, output interpolated telemetry at this many samples per second
+    fusion_buffer_length: samples buffered per message type when output_rate is set
+    blackboard: if set, also publish the latest telemetry here for readers that skip old samples
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -50,23 +58,38 @@ def telemetry_worker(
     # =============================================================================================
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
+    fusion = None
+    if output_rate is not None:
+        result, fusion = telemetry_fusion.TelemetryFusion.create(output_rate, fusion_buffer_length)
+        if not result:
+            local_logger.error("Failed to create telemetry fusion", True)
+            return
+
     # Instantiate class object (telemetry.Telemetry)
-    result, telemetry_object = telemetry.Telemetry.create(connection, local_logger)
+    # Event mode blocks on the connection instead of spinning, so no extra sleep is needed
+    result, telemetry_object = telemetry.Telemetry.create(
+        connection, local_logger, telemetry.WaitMode.EVENT, fusion
+    )
     if not result:
         local_logger.error("Failed to create telemetry object", True)
         return
     # Main loop: do work.
     local_logger.info("Telemetry worker started", True)
+    metrics = worker_metrics.WorkerMetrics.get_current()
 
     while not controller.is_exit_requested():
         controller.check_pause()
         telemetry_data = telemetry_object.run()
         if telemetry_data:
+            if blackboard is not None:
+                blackboard.publish(telemetry_data)
+                metrics.increment("published")
             queue.queue.put(telemetry_data)
+            metrics.increment("queued")
             local_logger.info(f"Telemetry data queued: {telemetry_data}", False)
         else:
+            metrics.increment("no_data")
             local_logger.info("No data received")
-        time.sleep(0.1)
 
     local_logger.info("Telemetry worker stopped", True)
 
@@ -0,0 +1,112 @@
+"""
+Benchmark startup time and memory of periodic workers,
+one process each versus coroutines in one asyncio host process. To run:
+```
+python -m tests.benchmarks.benchmark_asyncio_host
+```
+"""
+
+import asyncio
+import multiprocessing as mp
+import time
+
+from pymavlink import mavutil
+
+from utilities.workers import asyncio_host
+from utilities.workers import worker_controller
+
+
+WORKER_COUNT = 4
+TICK_PERIOD = 0.1  # seconds
+
+
+def process_pss_kilobytes(pid: int) -> int:
+    """
+    Returns the proportional set size of a process, which splits shared pages between sharers.
+    """
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as smaps_file:
+        for line in smaps_file:
+            if line.startswith("Pss:"):
+                return int(line.split()[1])
+
+    return 0
+
+
+def tick_worker(
+    started: "mp.sharedctypes.Synchronized", controller: worker_controller.WorkerController
+) -> None:
+    """
+    Periodic worker as a process, with the MAVLink dialect loaded like the heartbeat workers.
+    """
+    assert mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT == 0
+    with started.get_lock():
+        started.value += 1
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        time.sleep(TICK_PERIOD)
+
+
+async def tick_worker_async(
+    started: "mp.sharedctypes.Synchronized", controller: worker_controller.WorkerController
+) -> None:
+    """
+    Periodic worker as a coroutine.
+    """
+    assert mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT == 0
+    with started.get_lock():
+        started.value += 1
+    while not controller.is_exit_requested():
+        await controller.check_pause_async()
+        await asyncio.sleep(TICK_PERIOD)
+
+
+def run_mode(is_asyncio: bool) -> "tuple[float, int]":
+    """
+    Starts the workers and waits until all of them run.
+
+    Returns the startup time in seconds and the total PSS in kilobytes.
+    """
+    controller = worker_controller.WorkerController()
+    started = mp.Value("i", 0)
+    if is_asyncio:
+        workers = [(tick_worker_async, (started, controller), {})] * WORKER_COUNT
+        processes = [
+            mp.Process(target=asyncio_host.asyncio_host_worker, args=(workers, controller))
+        ]
+    else:
+        processes = [
+            mp.Process(target=tick_worker, args=(started, controller)) for _ in range(WORKER_COUNT)
+        ]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    while started.value < WORKER_COUNT:
+        time.sleep(0.001)
+    startup = time.perf_counter() - start
+
+    pss = sum(process_pss_kilobytes(process.pid) for process in processes)
+
+    controller.request_exit()
+    for process in processes:
+        process.join()
+
+    return startup, pss
+
+
+def main() -> int:
+    """
+    Compare both execution modes.
+    """
+    print(f"{WORKER_COUNT} periodic workers, start method {mp.get_start_method()}")
+    for name, is_asyncio in (("process", False), ("asyncio", True)):
+        startup, pss = run_mode(is_asyncio)
+        print(f"{name:>8}: startup {startup * 1000:>7.1f} ms, PSS {pss / 1024:>6.1f} MiB")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
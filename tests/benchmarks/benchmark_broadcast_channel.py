@@ -0,0 +1,109 @@
+"""
+Benchmark fanning out items to several consumer processes. To run:
+```
+python -m tests.benchmarks.benchmark_broadcast_channel
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import broadcast_channel
+from utilities.workers import queue_proxy_wrapper
+
+
+MESSAGE_COUNT = 20000
+CAPACITY = 128
+BATCH_SIZE = 64
+SUBSCRIBER_COUNTS = (1, 2, 4)
+
+
+def consumer(queue: queue_proxy_wrapper.QueueProxyWrapper, result_queue: mp.Queue) -> None:
+    """
+    Reads until the sentinel, then reports how many items arrived.
+    """
+    received = 0
+    while True:
+        items = queue.get_many(BATCH_SIZE)
+        if None in items:
+            received += items.index(None)
+            break
+        received += len(items)
+
+    result_queue.put(received)
+
+
+def run_fan_out(
+    producer_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+    consumer_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+) -> "tuple[float, float]":
+    """
+    Puts every item into each producer queue, consumer processes read the consumer queues.
+
+    Returns producer CPU microseconds per item and the fraction of items delivered.
+    CPU time, since on few cores the consumers would otherwise count towards the producer.
+    """
+    result_queue = mp.Queue()
+    workers = [mp.Process(target=consumer, args=(queue, result_queue)) for queue in consumer_queues]
+    for worker in workers:
+        worker.start()
+
+    start = time.process_time()
+    for i in range(MESSAGE_COUNT):
+        for queue in producer_queues:
+            queue.queue.put(i)
+    elapsed = time.process_time() - start
+    for queue in producer_queues:
+        queue.queue.put(None)
+
+    received = sum(result_queue.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+
+    return elapsed / MESSAGE_COUNT * 1e6, received / (MESSAGE_COUNT * len(workers))
+
+
+def main() -> int:
+    """
+    Compare one broadcast channel to a shared memory queue per consumer.
+    """
+    print(f"{MESSAGE_COUNT} messages, capacity {CAPACITY}")
+    for subscriber_count in SUBSCRIBER_COUNTS:
+        channel = broadcast_channel.BroadcastChannel(CAPACITY, subscriber_count)
+        publisher = queue_proxy_wrapper.QueueProxyWrapper.from_broadcast(
+            channel.get_publisher(), CAPACITY
+        )
+        subscribers = [
+            queue_proxy_wrapper.QueueProxyWrapper.from_broadcast(
+                channel.subscribe(f"consumer {i}"), CAPACITY
+            )
+            for i in range(subscriber_count)
+        ]
+        put_us, delivered = run_fan_out([publisher], subscribers)
+        print(
+            f"{subscriber_count} consumers,  broadcast: "
+            f"{put_us:>7.2f} CPU us/item put, {delivered:>6.1%} delivered"
+        )
+        channel.release()
+
+        queues = [
+            queue_proxy_wrapper.QueueProxyWrapper(
+                None, CAPACITY, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+            )
+            for _ in range(subscriber_count)
+        ]
+        put_us, delivered = run_fan_out(queues, queues)
+        print(
+            f"{subscriber_count} consumers, queue each: "
+            f"{put_us:>7.2f} CPU us/item put, {delivered:>6.1%} delivered"
+        )
+        for queue in queues:
+            queue.release()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
@@ -0,0 +1,132 @@
+"""
+Benchmark startup time and queue throughput of process and thread workers. To run:
+```
+python -m tests.benchmarks.benchmark_execution_mode
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+WORKER_COUNT = 4
+MESSAGE_COUNT = 5000  # per worker
+QUEUE_MAXSIZE = 100
+
+# Execution mode and the queue backend it is used with
+MODES = (
+    (worker_manager.ExecutionMode.PROCESS, queue_proxy_wrapper.QueueBackend.MANAGER),
+    (worker_manager.ExecutionMode.PROCESS, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY),
+    (worker_manager.ExecutionMode.THREAD, queue_proxy_wrapper.QueueBackend.THREAD),
+)
+
+
+def producer_worker(
+    count: int,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Announces itself, puts messages, then puts a sentinel.
+    """
+    output_queue.queue.put("started")
+    for i in range(count):
+        if controller.is_exit_requested():
+            break
+        output_queue.queue.put(i)
+
+    output_queue.queue.put(None)
+
+
+def run_mode(
+    execution_mode: worker_manager.ExecutionMode,
+    backend: queue_proxy_wrapper.QueueBackend,
+    local_logger: logger.Logger,
+) -> "tuple[float, float]":
+    """
+    Starts the producers and receives everything they put.
+
+    Returns the startup time in seconds and messages per second.
+    """
+    mp_manager = queue_proxy_wrapper.QueueManager()
+    mp_manager.start()  # pylint: disable=consider-using-with
+    output_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE, backend)
+    controller = worker_controller.WorkerController(
+        execution_mode == worker_manager.ExecutionMode.THREAD
+    )
+
+    result, properties = worker_manager.WorkerProperties.create(
+        count=WORKER_COUNT,
+        target=producer_worker,
+        work_arguments=(MESSAGE_COUNT,),
+        input_queues=[],
+        output_queues=[output_queue],
+        controller=controller,
+        local_logger=local_logger,
+        execution_mode=execution_mode,
+    )
+    assert result
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)
+    assert result
+
+    start = time.perf_counter()
+    manager.start_workers()
+
+    started_count = 0
+    while started_count < WORKER_COUNT:
+        if output_queue.queue.get() == "started":
+            started_count += 1
+    startup = time.perf_counter() - start
+
+    received = 0
+    ended_count = 0
+    while ended_count < WORKER_COUNT:
+        for message in output_queue.get_many(QUEUE_MAXSIZE):
+            if message is None:
+                ended_count += 1
+            elif message != "started":
+                received += 1
+    elapsed = time.perf_counter() - start
+
+    manager.join_workers()
+    output_queue.release()
+    mp_manager.shutdown()
+
+    return startup, received / elapsed
+
+
+def main() -> int:
+    """
+    Compare the execution modes.
+    """
+    result, local_logger = logger.Logger.create("benchmark_execution_mode", False)
+    if not result:
+        print("ERROR: Failed to create logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    print(
+        f"{WORKER_COUNT} producers of {MESSAGE_COUNT} messages each, "
+        f"start method {mp.get_start_method()}"
+    )
+    for execution_mode, backend in MODES:
+        startup, rate = run_mode(execution_mode, backend, local_logger)
+        print(
+            f"{execution_mode.name:>8} {backend.name:>14}: startup {startup * 1000:>7.1f} ms, "
+            f"{rate:>9.0f} msg/s"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
@@ -0,0 +1,109 @@
+"""
+Benchmark decoded frames per second of pymavlink against the fast path decoder
+on a recorded stream, or on a synthetic ArduPilot-like stream. To run:
+```
+python -m tests.benchmarks.benchmark_frame_decoder [raw MAVLink capture]
+```
+"""
+
+import sys
+import time
+
+from pymavlink.dialects.v20 import ardupilotmega as mavlink2
+
+from modules.mavlink_mux import frame_decoder
+from modules.mavlink_mux import mavlink_mux
+
+
+SYNTHETIC_SECONDS = 600
+READ_SIZE = 4096  # bytes, same as the multiplexer
+REPEATS = 3
+
+
+def synthetic_stream() -> bytes:
+    """
+    Returns a stream with ArduPilot's default rates, where most frames are not wanted.
+    """
+    mav = mavlink2.MAVLink(None, srcSystem=1, srcComponent=1)
+    # Message and frames per second
+    rates = [
+        (mavlink2.MAVLink_heartbeat_message(2, 3, 81, 4, 4, 3), 1),
+        (mavlink2.MAVLink_attitude_message(1000, 0.1, -0.2, 3.0, 0.01, 0.02, -0.03), 10),
+        (mavlink2.MAVLink_local_position_ned_message(1000, 1.5, -2.5, -10.0, 0.5, 0.2, 0.1), 10),
+        (mavlink2.MAVLink_command_ack_message(400, 0), 1),
+        (mavlink2.MAVLink_sys_status_message(1, 2, 3, 500, 12000, -1, 90, 0, 0, 0, 0, 0, 0), 2),
+        (mavlink2.MAVLink_raw_imu_message(1000, 1, 2, 3, 4, 5, 6, 7, 8, 9), 10),
+        (mavlink2.MAVLink_scaled_pressure_message(1000, 1013.0, 0.1, 2500), 2),
+        (mavlink2.MAVLink_global_position_int_message(1000, 1, 2, 3, 4, 5, 6, 7, 8), 10),
+        (mavlink2.MAVLink_gps_raw_int_message(1000, 3, 1, 2, 3, 100, 100, 5, 90, 10), 5),
+        (mavlink2.MAVLink_vfr_hud_message(5.0, 5.5, 90, 50, 12.5, 0.3), 4),
+        (mavlink2.MAVLink_servo_output_raw_message(1000, 0, *[1500] * 8), 4),
+        (mavlink2.MAVLink_rc_channels_message(1000, 8, *[1500] * 18, 255), 4),
+    ]
+    second = b""
+    for i in range(max(rate for _, rate in rates)):
+        for message, rate in rates:
+            if i < rate:
+                second += message.pack(mav)
+
+    return second * SYNTHETIC_SECONDS
+
+
+def time_pymavlink(stream: bytes) -> "tuple[float, int, int]":
+    """
+    Parses every frame like `mavfile.recv_match()` and keeps the wanted types.
+
+    Returns the seconds, frames, and wanted messages.
+    """
+    mav = mavlink2.MAVLink(None)
+    frame_count = 0
+    wanted_count = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), READ_SIZE):
+        for message in mav.parse_buffer(stream[offset : offset + READ_SIZE]) or []:
+            frame_count += 1
+            if message.get_type() in mavlink_mux.DEFAULT_MESSAGE_TYPES:
+                wanted_count += 1
+
+    return time.perf_counter() - start, frame_count, wanted_count
+
+
+def time_frame_decoder(stream: bytes) -> "tuple[float, int, int]":
+    """
+    Decodes only the wanted types.
+
+    Returns the seconds, frames, and wanted messages.
+    """
+    _, decoder = frame_decoder.FrameDecoder.create(list(mavlink_mux.DEFAULT_MESSAGE_TYPES))
+    wanted_count = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), READ_SIZE):
+        wanted_count += len(decoder.decode(stream[offset : offset + READ_SIZE]))
+
+    elapsed = time.perf_counter() - start
+    return elapsed, decoder.decoded_count + decoder.skipped_count, wanted_count
+
+
+def main() -> int:
+    """
+    Compare frames per second of both decoders on the same stream.
+    """
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as capture:
+            stream = capture.read()
+    else:
+        stream = synthetic_stream()
+
+    print(f"Stream of {len(stream) / 2**20:.1f} MiB")
+    print(f"{'':>14} {'frames':>8} {'wanted':>8} {'frames/s':>10}")
+    for name, benchmark in (("pymavlink", time_pymavlink), ("frame decoder", time_frame_decoder)):
+        elapsed, frame_count, wanted_count = min(benchmark(stream) for _ in range(REPEATS))
+        print(f"{name:>14} {frame_count:>8} {wanted_count:>8} {frame_count / elapsed:>10.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
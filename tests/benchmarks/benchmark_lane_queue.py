@@ -0,0 +1,112 @@
+"""
+Benchmark how long control items wait behind bulk items. To run:
+```
+python -m tests.benchmarks.benchmark_lane_queue
+```
+"""
+
+import threading
+import time
+
+from utilities.workers import lane_queue
+
+
+BULK_COUNT = 20000
+CONTROL_PERIOD = 100  # One control item per this many bulk items
+LANE_MAXSIZE = 256
+BATCH_SIZE = 16
+CONSUME_TIME = 0.00002  # seconds per item
+
+
+def bulk_producer(lanes: lane_queue.LaneQueue, bulk_lane: int) -> None:
+    """
+    Keeps the bulk lane full.
+    """
+    for i in range(BULK_COUNT):
+        lanes.put(i, lane=bulk_lane)
+
+
+def control_producer(lanes: lane_queue.LaneQueue, done: threading.Event) -> None:
+    """
+    Puts a control item now and then until the bulk producer is done.
+    """
+    while not done.is_set():
+        lanes.put("control", lane=0)
+        time.sleep(CONSUME_TIME * CONTROL_PERIOD)
+
+
+def run_load(
+    lane_configs: "list[lane_queue.LaneConfig]", scheduling: lane_queue.LaneScheduling
+) -> lane_queue.LaneStats:
+    """
+    Consumes bulk and control items, simulating work per item.
+
+    Returns the statistics of the control lane.
+    """
+    lanes = lane_queue.LaneQueue(lane_configs, scheduling)
+    bulk_lane = len(lane_configs) - 1
+    done = threading.Event()
+    producers = [
+        threading.Thread(target=bulk_producer, args=(lanes, bulk_lane)),
+        threading.Thread(target=control_producer, args=(lanes, done)),
+    ]
+    for producer in producers:
+        producer.start()
+
+    consumed = 0
+    while consumed < BULK_COUNT:
+        items = lanes.get_many(BATCH_SIZE)
+        consumed += sum(1 for item in items if item != "control")
+        time.sleep(CONSUME_TIME * len(items))
+
+    done.set()
+    for producer in producers:
+        producer.join()
+
+    return lanes.get_lane_stats()[0]
+
+
+def main() -> int:
+    """
+    Compare control item waits in one shared FIFO lane to a separate prioritised lane.
+    """
+    print(f"{BULK_COUNT} bulk items, lane maxsize {LANE_MAXSIZE}")
+    cases = [
+        (
+            "FIFO",
+            [lane_queue.LaneConfig("shared", LANE_MAXSIZE)],
+            lane_queue.LaneScheduling.STRICT,
+        ),
+        (
+            "STRICT",
+            [
+                lane_queue.LaneConfig("control", LANE_MAXSIZE),
+                lane_queue.LaneConfig("bulk", LANE_MAXSIZE),
+            ],
+            lane_queue.LaneScheduling.STRICT,
+        ),
+        (
+            "WEIGHTED",
+            [
+                lane_queue.LaneConfig("control", LANE_MAXSIZE, 4),
+                lane_queue.LaneConfig("bulk", LANE_MAXSIZE, 1),
+            ],
+            lane_queue.LaneScheduling.WEIGHTED,
+        ),
+    ]
+    for label, lane_configs, scheduling in cases:
+        stats = run_load(lane_configs, scheduling)
+        # FIFO statistics include bulk items, which wait as long as control items there
+        print(
+            f"{label:>8}: control wait "
+            f"p50 {stats.wait.percentile(0.5) * 1000:>8.3f} ms, "
+            f"p99 {stats.wait.percentile(0.99) * 1000:>8.3f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
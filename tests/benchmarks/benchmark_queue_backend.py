@@ -0,0 +1,84 @@
+"""
+Benchmark the queue backends of the queue proxy wrapper. To run:
+```
+python -m tests.benchmarks.benchmark_queue_backend
+```
+"""
+
+import multiprocessing as mp
+import multiprocessing.managers
+import statistics
+import time
+
+from utilities.workers import queue_proxy_wrapper
+
+
+MESSAGE_COUNT = 20000
+QUEUE_MAXSIZE = 100
+
+
+def producer(queue: queue_proxy_wrapper.QueueProxyWrapper, count: int) -> None:
+    """
+    Puts timestamped messages followed by a sentinel.
+    """
+    for i in range(count):
+        queue.queue.put((i, time.perf_counter_ns()))
+
+    queue.queue.put(None)
+
+
+def run_backend(
+    mp_manager: multiprocessing.managers.SyncManager, backend: queue_proxy_wrapper.QueueBackend
+) -> "tuple[float, float]":
+    """
+    Sends messages from a producer process to this process.
+
+    Returns messages per second and p99 latency in microseconds.
+    """
+    queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE, backend)
+    worker = mp.Process(target=producer, args=(queue, MESSAGE_COUNT))
+
+    latencies_ns = []
+    start = time.perf_counter()
+    worker.start()
+    while True:
+        message = queue.queue.get()
+        if message is None:
+            break
+
+        _, sent_ns = message
+        latencies_ns.append(time.perf_counter_ns() - sent_ns)
+
+    elapsed = time.perf_counter() - start
+    worker.join()
+    queue.release()
+
+    p99_us = statistics.quantiles(latencies_ns, n=100)[98] / 1000
+    return len(latencies_ns) / elapsed, p99_us
+
+
+def main() -> int:
+    """
+    Compare all backends.
+    """
+    mp_manager = mp.Manager()
+
+    print(f"{MESSAGE_COUNT} messages, maxsize {QUEUE_MAXSIZE}")
+    for backend in queue_proxy_wrapper.QueueBackend:
+        # Not a single queue, see benchmark_broadcast_channel and benchmark_lane_queue
+        if backend in (
+            queue_proxy_wrapper.QueueBackend.BROADCAST,
+            queue_proxy_wrapper.QueueBackend.LANES,
+        ):
+            continue
+
+        rate, p99_us = run_backend(mp_manager, backend)
+        print(f"{backend.name:>14}: {rate:>10.0f} msg/s, p99 latency {p99_us:>8.1f} us")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
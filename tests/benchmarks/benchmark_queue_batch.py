@@ -0,0 +1,89 @@
+"""
+Benchmark batched puts and gets of the queue proxy wrapper. To run:
+```
+python -m tests.benchmarks.benchmark_queue_batch
+```
+"""
+
+import multiprocessing as mp
+import multiprocessing.managers
+import time
+
+from utilities.workers import queue_proxy_wrapper
+
+
+MESSAGE_COUNT = 20000
+QUEUE_MAXSIZE = 128
+BATCH_SIZES = (1, 8, 64)
+
+
+def producer(queue: queue_proxy_wrapper.QueueProxyWrapper, count: int, batch_size: int) -> None:
+    """
+    Puts messages in batches followed by a sentinel.
+    """
+    for start in range(0, count, batch_size):
+        queue.put_many(list(range(start, min(start + batch_size, count))))
+
+    queue.queue.put(None)
+
+
+def run_batch_size(
+    mp_manager: multiprocessing.managers.SyncManager,
+    backend: queue_proxy_wrapper.QueueBackend,
+    batch_size: int,
+) -> float:
+    """
+    Sends messages from a producer process to this process.
+
+    Returns messages per second.
+    """
+    queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE, backend)
+    worker = mp.Process(target=producer, args=(queue, MESSAGE_COUNT, batch_size))
+
+    received = 0
+    start = time.perf_counter()
+    worker.start()
+    is_done = False
+    while not is_done:
+        for message in queue.get_many(batch_size):
+            if message is None:
+                is_done = True
+                break
+            received += 1
+
+    elapsed = time.perf_counter() - start
+    worker.join()
+    queue.release()
+
+    return received / elapsed
+
+
+def main() -> int:
+    """
+    Compare batch sizes on every backend.
+    """
+    mp_manager = queue_proxy_wrapper.QueueManager()
+    mp_manager.start()  # pylint: disable=consider-using-with
+
+    print(f"{MESSAGE_COUNT} messages, maxsize {QUEUE_MAXSIZE}")
+    for backend in queue_proxy_wrapper.QueueBackend:
+        # Not a single queue, see benchmark_broadcast_channel and benchmark_lane_queue
+        if backend in (
+            queue_proxy_wrapper.QueueBackend.BROADCAST,
+            queue_proxy_wrapper.QueueBackend.LANES,
+        ):
+            continue
+
+        for batch_size in BATCH_SIZES:
+            rate = run_batch_size(mp_manager, backend, batch_size)
+            print(f"{backend.name:>14} batch {batch_size:>3}: {rate:>10.0f} msg/s")
+
+    mp_manager.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
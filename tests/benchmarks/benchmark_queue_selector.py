@@ -0,0 +1,109 @@
+"""
+Benchmark CPU usage of main's queue loop while idle, spinning versus selecting. To run:
+```
+python -m tests.benchmarks.benchmark_queue_selector
+```
+"""
+
+import os
+import queue
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
+
+
+RUN_TIME = 3.0  # seconds
+QUEUE_MAXSIZE = 10
+SELECT_TIMEOUT = 0.05  # seconds
+
+
+def process_cpu_seconds(pid: int) -> float:
+    """
+    Returns user and system CPU time of a process from /proc .
+    """
+    with open(f"/proc/{pid}/stat", encoding="utf-8") as stat_file:
+        # Fields after the parenthesised command name, utime and stime are 14 and 15
+        fields = stat_file.read().rsplit(")", 1)[1].split()
+
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def spin(queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> int:
+    """
+    Main's original loop: get_nowait() on every queue without sleeping.
+
+    Returns the number of loop iterations.
+    """
+    iterations = 0
+    start = time.monotonic()
+    while time.monotonic() - start <= RUN_TIME:
+        for wrapper in queues:
+            try:
+                wrapper.queue.get_nowait()
+            except queue.Empty:
+                continue
+        iterations += 1
+
+    return iterations
+
+
+def select(selector: queue_selector.QueueSelector) -> int:
+    """
+    Main's loop with the selector.
+
+    Returns the number of loop iterations.
+    """
+    iterations = 0
+    start = time.monotonic()
+    while time.monotonic() - start <= RUN_TIME:
+        for wrapper in selector.select(SELECT_TIMEOUT):
+            wrapper.get_many(QUEUE_MAXSIZE, 0.0)
+        iterations += 1
+
+    return iterations
+
+
+def main() -> int:
+    """
+    Measure CPU usage of main and the manager over idle queues.
+    """
+    mp_manager = queue_proxy_wrapper.QueueManager()
+    mp_manager.start()  # pylint: disable=consider-using-with
+    manager_pid = mp_manager._process.pid  # pylint: disable=protected-access
+
+    # Same backends as main's command, telemetry, and heartbeat queues
+    queues = [
+        queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE),
+        queue_proxy_wrapper.QueueProxyWrapper(
+            mp_manager, QUEUE_MAXSIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        ),
+        queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE),
+    ]
+
+    print(f"Idle queues for {RUN_TIME} s")
+    for name, loop in (
+        ("spin", lambda: spin(queues)),
+        ("select", lambda: select(queue_selector.QueueSelector(queues))),
+    ):
+        main_cpu = time.process_time()
+        manager_cpu = process_cpu_seconds(manager_pid)
+        iterations = loop()
+        main_percent = (time.process_time() - main_cpu) / RUN_TIME * 100
+        manager_percent = (process_cpu_seconds(manager_pid) - manager_cpu) / RUN_TIME * 100
+        print(
+            f"{name:>6}: {iterations:>8} iterations, "
+            f"main {main_percent:>5.1f}% CPU, manager {manager_percent:>5.1f}% CPU"
+        )
+
+    for wrapper in queues:
+        wrapper.release()
+    mp_manager.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
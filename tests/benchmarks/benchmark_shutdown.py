@@ -0,0 +1,131 @@
+"""
+Benchmark pipeline shutdown time, filling and draining every queue versus closing them. To run:
+```
+python -m tests.benchmarks.benchmark_shutdown
+```
+"""
+
+import multiprocessing as mp
+import queue
+import statistics
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+STAGE_COUNTS = [1, 4, 8]
+RUNS = 5
+QUEUE_MAXSIZE = 10
+POLL_TIMEOUT = 0.1  # seconds, same as the queue timeouts of the workers
+SETTLE_TIME = 0.3  # seconds
+
+
+def relay_worker(
+    input_queue: "queue_proxy_wrapper.QueueProxyWrapper | None",
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Forwards items, or produces them if there is no input queue.
+    Uses timeouts like the bootcamp workers so it also exits with fill and drain.
+    """
+    count = 0
+    while not controller.is_exit_requested():
+        if input_queue is None:
+            item = count
+            count += 1
+        else:
+            try:
+                item = input_queue.queue.get(timeout=POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+
+        try:
+            output_queue.queue.put(item, timeout=POLL_TIMEOUT)
+        except queue.Full:
+            continue
+
+
+def fill_and_drain(
+    controller: worker_controller.WorkerController,
+    queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+) -> None:
+    """
+    Original shutdown of main.
+    """
+    controller.request_exit()
+    time.sleep(POLL_TIMEOUT)
+    for wrapper in reversed(queues):
+        wrapper.fill_and_drain_queue()
+
+
+def close(
+    controller: worker_controller.WorkerController,
+    queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+) -> None:
+    """
+    Shutdown with the close protocol.
+    """
+    controller.request_exit()
+    for wrapper in queues:
+        wrapper.close()
+
+
+def measure_shutdown(
+    mp_manager: queue_proxy_wrapper.QueueManager,
+    stage_count: int,
+    shutdown: "(...) -> None",  # type: ignore
+) -> float:
+    """
+    Runs a chain of relays whose last queue nobody reads, so every stage ends up blocked.
+
+    Returns seconds from the start of shutdown until every worker is joined.
+    """
+    controller = worker_controller.WorkerController()
+    queues = [
+        queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE) for _ in range(stage_count)
+    ]
+    workers = [
+        mp.Process(
+            target=relay_worker,
+            args=(queues[i - 1] if i > 0 else None, queues[i], controller),
+        )
+        for i in range(stage_count)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(SETTLE_TIME)
+
+    start = time.monotonic()
+    shutdown(controller, queues)
+    for worker in workers:
+        worker.join()
+
+    return time.monotonic() - start
+
+
+def main() -> int:
+    """
+    Compare median shutdown time of both protocols by pipeline length.
+    """
+    mp_manager = queue_proxy_wrapper.QueueManager()
+    mp_manager.start()  # pylint: disable=consider-using-with
+
+    for stage_count in STAGE_COUNTS:
+        for shutdown in [fill_and_drain, close]:
+            times = [measure_shutdown(mp_manager, stage_count, shutdown) for _ in range(RUNS)]
+            print(
+                f"{stage_count} stages, {shutdown.__name__:>14}: "
+                f"{statistics.median(times) * 1000:7.1f} ms median shutdown"
+            )
+
+    mp_manager.shutdown()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
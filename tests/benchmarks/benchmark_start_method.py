@@ -0,0 +1,103 @@
+"""
+Benchmark worker startup time with each start method. To run:
+```
+python -m tests.benchmarks.benchmark_start_method
+```
+"""
+
+import multiprocessing as mp
+import multiprocessing.forkserver
+import statistics
+import time
+
+# Imported by every spawned worker, like the real workers
+from pymavlink import mavutil
+
+from utilities.workers import worker_controller
+from utilities.workers import worker_metrics
+from utilities.workers import worker_trampoline
+
+
+WORKER_COUNT = 4
+PRELOAD_MODULES = ["pymavlink.mavutil", "utilities.workers.worker_trampoline"]
+
+# Start method and whether the fork server preloads
+START_METHODS = (
+    ("fork", False),
+    ("spawn", False),
+    ("forkserver", False),
+    ("forkserver", True),
+)
+
+
+def idle_worker(controller: worker_controller.WorkerController) -> None:
+    """
+    Worker that only loops.
+    """
+    assert mavutil.mavlink.MAVLINK_MSG_ID_HEARTBEAT == 0
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        time.sleep(0.01)
+
+
+def run_start_method(start_method: str, is_preloaded: bool) -> "list[float]":
+    """
+    Starts the workers and waits for each of them to reach its first loop.
+
+    Returns the seconds from start to first loop of each worker.
+    """
+    context = mp.get_context(start_method)
+    if start_method == "forkserver":
+        # The preload list only applies to a new fork server
+        multiprocessing.forkserver._forkserver._stop()  # pylint: disable=protected-access
+        context.set_forkserver_preload(PRELOAD_MODULES if is_preloaded else [])
+        # Started ahead of the workers, like configure_start_method() does
+        multiprocessing.forkserver.ensure_running()
+
+    # Bound to the start method, so created afterwards
+    mp.set_start_method(start_method, force=True)
+    controller = worker_controller.WorkerController()
+    timeline = worker_trampoline.StartupTimeline(WORKER_COUNT)
+    metrics_registry = worker_metrics.MetricsRegistry(WORKER_COUNT)
+
+    workers = [
+        context.Process(
+            target=worker_trampoline.run_worker,
+            args=(idle_worker, (controller,), {}, timeline, i, metrics_registry),
+        )
+        for i in range(WORKER_COUNT)
+    ]
+    for i, worker in enumerate(workers):
+        timeline.mark_started(i)
+        worker.start()
+
+    while any(timeline.get_durations(i)[1] is None for i in range(WORKER_COUNT)):
+        time.sleep(0.001)
+
+    controller.request_exit()
+    for worker in workers:
+        worker.join()
+
+    return [timeline.get_durations(i)[1] for i in range(WORKER_COUNT)]
+
+
+def main() -> int:
+    """
+    Compare the start methods.
+    """
+    print(f"{WORKER_COUNT} workers, time from start() to first loop")
+    for start_method, is_preloaded in START_METHODS:
+        durations = run_start_method(start_method, is_preloaded)
+        name = f"{start_method}{' + preload' if is_preloaded else ''}"
+        print(
+            f"{name:>20}: median {statistics.median(durations) * 1000:>7.1f} ms, "
+            f"max {max(durations) * 1000:>7.1f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
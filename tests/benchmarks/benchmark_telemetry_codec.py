@@ -0,0 +1,57 @@
+"""
+Benchmark serialized size and encode/decode time of telemetry data. To run:
+```
+python -m tests.benchmarks.benchmark_telemetry_codec
+```
+"""
+
+import pickle
+import time
+
+from modules.telemetry import telemetry
+
+
+NUM_RECORDS = 100000
+
+
+def time_per_record_ns(function: "(...) -> object", argument: object) -> float:  # type: ignore
+    """
+    Returns the average time of a call in nanoseconds.
+    """
+    start = time.perf_counter_ns()
+    for _ in range(NUM_RECORDS):
+        function(argument)
+
+    return (time.perf_counter_ns() - start) / NUM_RECORDS
+
+
+def main() -> int:
+    """
+    Compare pickling against the fixed layout codec.
+    """
+    telemetry_data = telemetry.TelemetryData(
+        1234, 1.0, 2.0, 3.0, 0.1, 0.2, 0.3, 0.01, 0.02, 0.03, 0.001, 0.002, 0.003
+    )
+
+    pickled = pickle.dumps(telemetry_data, pickle.HIGHEST_PROTOCOL)
+    packed = telemetry_data.to_bytes()
+
+    print(f"{'':>7} {'size (B)':>9} {'encode (ns)':>12} {'decode (ns)':>12}")
+    print(
+        f"{'pickle':>7} {len(pickled):>9} "
+        f"{time_per_record_ns(lambda data: pickle.dumps(data, pickle.HIGHEST_PROTOCOL), telemetry_data):>12.0f} "
+        f"{time_per_record_ns(pickle.loads, pickled):>12.0f}"
+    )
+    print(
+        f"{'struct':>7} {len(packed):>9} "
+        f"{time_per_record_ns(telemetry.TelemetryData.to_bytes, telemetry_data):>12.0f} "
+        f"{time_per_record_ns(telemetry.TelemetryData.from_bytes, packed):>12.0f}"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
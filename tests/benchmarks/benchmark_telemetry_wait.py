@@ -0,0 +1,100 @@
+"""
+Benchmark idle CPU usage and emit latency of the telemetry wait modes. To run:
+```
+python -m tests.benchmarks.benchmark_telemetry_wait
+```
+"""
+
+import statistics
+import threading
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.telemetry import telemetry
+
+
+DRONE_CONNECTION_STRING = "udpin:localhost:14551"
+GCS_CONNECTION_STRING = "udpout:localhost:14551"
+NUM_TRIALS = 20
+SEND_DELAY = 0.05  # seconds
+
+
+def send_pairs(connection: mavutil.mavfile, sent_times: "list[float]") -> None:
+    """
+    Sends attitude and position pairs, recording the time the second half was sent.
+    """
+    for i in range(NUM_TRIALS):
+        time.sleep(SEND_DELAY)
+        connection.mav.attitude_send(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        sent_times.append(time.perf_counter())
+        connection.mav.local_position_ned_send(i, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def run_mode(
+    gcs: mavutil.mavfile,
+    drone: mavutil.mavfile,
+    wait_mode: telemetry.WaitMode,
+    local_logger: logger.Logger,
+) -> "tuple[float, float]":
+    """
+    Returns idle CPU usage in percent of one core and median emit latency in milliseconds.
+    """
+    result, telemetry_object = telemetry.Telemetry.create(gcs, local_logger, wait_mode)
+    assert result
+    assert telemetry_object is not None
+
+    # Idle: nothing is sent, so run() times out
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    telemetry_object.run()
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+    # Active: measure time from the second half being sent to run() returning
+    sent_times = []
+    sender = threading.Thread(target=send_pairs, args=(drone, sent_times))
+    sender.start()
+    latencies = []
+    for _ in range(NUM_TRIALS):
+        telemetry_data = telemetry_object.run()
+        received = time.perf_counter()
+        if telemetry_data is not None and len(sent_times) > len(latencies):
+            latencies.append(received - sent_times[len(latencies)])
+    sender.join()
+
+    return idle_cpu * 100, statistics.median(latencies) * 1000
+
+
+def main() -> int:
+    """
+    Compare the wait modes over a loopback connection.
+    """
+    result, local_logger = logger.Logger.create("benchmark_telemetry_wait", False)
+    if not result:
+        print("ERROR: Failed to create logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    drone = mavutil.mavlink_connection(DRONE_CONNECTION_STRING, source_system=1)
+    gcs = mavutil.mavlink_connection(GCS_CONNECTION_STRING)
+    gcs.mav.heartbeat_send(
+        mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+    )
+    drone.wait_heartbeat(timeout=5)
+
+    for wait_mode in telemetry.WaitMode:
+        idle_cpu, latency_ms = run_mode(gcs, drone, wait_mode, local_logger)
+        print(
+            f"{wait_mode.name:>5}: idle CPU {idle_cpu:>5.1f}%, median emit latency {latency_ms:.2f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
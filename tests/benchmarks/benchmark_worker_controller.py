@@ -0,0 +1,70 @@
+"""
+Benchmark the per-iteration overhead of worker controller checks. To run:
+```
+python -m tests.benchmarks.benchmark_worker_controller
+```
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import worker_controller
+
+
+NUM_ITERATIONS = 200000
+
+
+class QueueSemaphoreController:
+    """
+    Previous controller, for comparison: exit is a queue, pause is a semaphore.
+    """
+
+    def __init__(self) -> None:
+        self.__pause = mp.BoundedSemaphore(1)
+        self.__exit_queue = mp.Queue(1)
+
+    def check_pause(self) -> None:
+        """
+        Blocks worker if main has requested it to pause, otherwise continues.
+        """
+        self.__pause.acquire()
+        self.__pause.release()
+
+    def is_exit_requested(self) -> bool:
+        """
+        Returns whether main has requested the worker process to exit.
+        """
+        return not self.__exit_queue.empty()
+
+
+def time_per_iteration_ns(
+    controller: "worker_controller.WorkerController | QueueSemaphoreController",
+) -> float:
+    """
+    Returns the average time of an empty worker loop iteration in nanoseconds.
+    """
+    start = time.perf_counter_ns()
+    for _ in range(NUM_ITERATIONS):
+        if controller.is_exit_requested():
+            break
+        controller.check_pause()
+
+    return (time.perf_counter_ns() - start) / NUM_ITERATIONS
+
+
+def main() -> int:
+    """
+    Compare the controllers.
+    """
+    print(f"queue and semaphore: {time_per_iteration_ns(QueueSemaphoreController()):>6.0f} ns")
+    print(
+        f"shared flags:        {time_per_iteration_ns(worker_controller.WorkerController()):>6.0f} ns"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"ERROR: Status code: {result_main}")
@@ -100,7 +100,7 @@ def main() -> int:
     # Just set a timer to stop the worker after a while, since the worker infinite loops
     threading.Timer(HEARTBEAT_PERIOD * NUM_TRIALS, lambda: stop(controller)).start()
 
-    heartbeat_sender_worker.heartbeat_sender_worker(connection, controller, HEARTBEAT_PERIOD)
+    heartbeat_sender_worker.heartbeat_sender_worker(connection, HEARTBEAT_PERIOD, controller)
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
     # =============================================================================================
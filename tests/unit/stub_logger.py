@@ -0,0 +1,47 @@
+"""
+Logger stand-in for unit tests, keeps the messages instead of writing log files.
+"""
+
+
+class StubLogger:
+    """
+    Same logging methods as `logger.Logger`.
+    """
+
+    def __init__(self) -> None:
+        # (level, message)
+        self.messages: "list[tuple[str, str]]" = []
+
+    def debug(self, message: str, log_with_frame_info: bool = True) -> None:
+        """
+        Keeps a debug message.
+        """
+        del log_with_frame_info
+        self.messages.append(("debug", message))
+
+    def info(self, message: str, log_with_frame_info: bool = True) -> None:
+        """
+        Keeps an info message.
+        """
+        del log_with_frame_info
+        self.messages.append(("info", message))
+
+    def warning(self, message: str, log_with_frame_info: bool = True) -> None:
+        """
+        Keeps a warning message.
+        """
+        del log_with_frame_info
+        self.messages.append(("warning", message))
+
+    def error(self, message: str, log_with_frame_info: bool = True) -> None:
+        """
+        Keeps an error message.
+        """
+        del log_with_frame_info
+        self.messages.append(("error", message))
+
+    def get_messages(self, level: str) -> "list[str]":
+        """
+        Returns the kept messages of the level, e.g. "error".
+        """
+        return [message for message_level, message in self.messages if message_level == level]
@@ -0,0 +1,122 @@
+"""
+Test the asyncio worker host.
+"""
+
+import asyncio
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import asyncio_host
+from utilities.workers import worker_controller
+
+
+TICK_PERIOD = 0.01  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Creates a controller with no requests.
+    """
+    yield worker_controller.WorkerController()  # type: ignore
+
+
+async def count_ticks(
+    counter: "mp.sharedctypes.Synchronized", controller: worker_controller.WorkerController
+) -> None:
+    """
+    Periodic coroutine worker.
+    """
+    while not controller.is_exit_requested():
+        await controller.check_pause_async()
+        with counter.get_lock():
+            counter.value += 1
+        await asyncio.sleep(TICK_PERIOD)
+
+
+async def fail(_controller: worker_controller.WorkerController) -> None:
+    """
+    Coroutine worker that crashes.
+    """
+    await asyncio.sleep(TICK_PERIOD)
+    raise ValueError("Crashed")
+
+
+class TestAsyncioHost:
+    """
+    Coroutine workers share one process and the controller semantics.
+    """
+
+    def test_workers_share_process(self, controller: worker_controller.WorkerController) -> None:
+        """
+        All workers run concurrently and exit when requested.
+        """
+        # Setup
+        counters = [mp.Value("i", 0) for _ in range(3)]
+        workers = [(count_ticks, (counter, controller), {}) for counter in counters]
+        host = mp.Process(target=asyncio_host.asyncio_host_worker, args=(workers, controller))
+
+        # Run
+        host.start()
+        time.sleep(0.3)
+        controller.request_exit()
+        host.join(timeout=5)
+
+        # Test
+        assert host.exitcode == 0
+        for counter in counters:
+            assert counter.value > 5
+
+    def test_pause_yields_to_loop(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Paused workers stop ticking without blocking the process, and resume.
+        """
+        # Setup
+        counter = mp.Value("i", 0)
+        workers = [(count_ticks, (counter, controller), {})]
+        host = mp.Process(target=asyncio_host.asyncio_host_worker, args=(workers, controller))
+        host.start()
+        time.sleep(0.2)
+
+        # Run
+        controller.request_pause()
+        time.sleep(0.1)
+        paused_count = counter.value
+        time.sleep(0.2)
+        still_paused_count = counter.value
+        controller.request_resume()
+        time.sleep(0.2)
+        resumed_count = counter.value
+        controller.request_exit()
+        host.join(timeout=5)
+
+        # Test
+        assert still_paused_count == paused_count
+        assert resumed_count > paused_count
+
+    def test_failure_ends_host(self, controller: worker_controller.WorkerController) -> None:
+        """
+        A crashing worker cancels the others and the host exits with an error.
+        """
+        # Setup
+        counter = mp.Value("i", 0)
+        workers = [
+            (count_ticks, (counter, controller), {}),
+            (fail, (controller,), {}),
+        ]
+        host = mp.Process(target=asyncio_host.asyncio_host_worker, args=(workers, controller))
+
+        # Run
+        host.start()
+        host.join(timeout=5)
+
+        # Test
+        assert host.exitcode == 1
+        assert not controller.is_exit_requested()
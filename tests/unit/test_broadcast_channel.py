@@ -0,0 +1,315 @@
+"""
+Test the broadcast channel.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import pytest
+
+from utilities.workers import broadcast_channel
+from utilities.workers import queue_proxy_wrapper
+
+
+NUM_ITEMS = 2000
+CAPACITY = 8
+MAX_WAKE_TIME = 0.5  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def channel() -> broadcast_channel.BroadcastChannel:  # type: ignore
+    """
+    Creates an empty channel skipping lagging subscribers to the oldest item.
+    """
+    created = broadcast_channel.BroadcastChannel(CAPACITY, 4)
+    yield created  # type: ignore
+    created.release()
+
+
+def publish_range(publisher: broadcast_channel.BroadcastPublisher, count: int) -> None:
+    """
+    Producer process publishing 0 to count - 1 .
+    """
+    for i in range(count):
+        publisher.put(i)
+
+
+def read_all(subscriber: broadcast_channel.BroadcastSubscriber, result_queue: mp.Queue) -> None:
+    """
+    Consumer process reading until the channel is closed, then reporting what it read.
+    """
+    items = []
+    while True:
+        item = subscriber.get()
+        if item is None:
+            break
+        items.append(item)
+    result_queue.put(items)
+
+
+class TestBroadcastChannel:
+    """
+    Every subscriber reads every item once, in order.
+    """
+
+    def test_every_subscriber_reads_every_item(
+        self, channel: broadcast_channel.BroadcastChannel
+    ) -> None:
+        """
+        Items are stored once and read by each subscriber.
+        """
+        # Setup
+        first = channel.subscribe("first")
+        second = channel.subscribe("second")
+        publisher = channel.get_publisher()
+
+        # Run
+        publisher.put_many([1, 2, 3])
+        first_items = first.get_many(10, 0.0)
+        second_items = [second.get(), second.get_nowait(), second.get(timeout=0.0)]
+
+        # Test
+        assert first_items == [1, 2, 3]
+        assert second_items == [1, 2, 3]
+        assert first.empty() and second.empty()
+        with pytest.raises(queue.Empty):
+            first.get_nowait()
+
+    def test_subscriber_starts_at_subscription(
+        self, channel: broadcast_channel.BroadcastChannel
+    ) -> None:
+        """
+        Items published before subscribing are not read.
+        """
+        # Setup
+        publisher = channel.get_publisher()
+        publisher.put("old")
+        subscriber = channel.subscribe("late")
+
+        # Run
+        publisher.put("new")
+
+        # Test
+        assert subscriber.get_many(10, 0.0) == ["new"]
+
+    def test_subscriptions_run_out(self) -> None:
+        """
+        Subscribing beyond max_subscribers fails.
+        """
+        # Setup
+        small_channel = broadcast_channel.BroadcastChannel(CAPACITY, 1)
+        small_channel.subscribe("only")
+
+        # Run and test
+        with pytest.raises(ValueError):
+            small_channel.subscribe("extra")
+
+        small_channel.release()
+
+    def test_item_too_large(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Items that do not fit in a slot are rejected.
+        """
+        # Setup
+        publisher = channel.get_publisher()
+
+        # Run and test
+        with pytest.raises(ValueError):
+            publisher.put(bytes(broadcast_channel.BroadcastChannel.DEFAULT_SLOT_SIZE))
+
+    def test_wrong_end(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Reading from the publisher or publishing from a subscriber is a type error.
+        """
+        # Setup
+        subscriber = channel.subscribe("only")
+        publisher = channel.get_publisher()
+
+        # Run and test
+        with pytest.raises(TypeError):
+            publisher.get_nowait()
+        with pytest.raises(TypeError):
+            publisher.get_many(10, 0.0)
+        with pytest.raises(TypeError):
+            subscriber.put_nowait("item")
+        with pytest.raises(TypeError):
+            subscriber.put_many(["item"])
+        assert subscriber.empty()
+
+    def test_cross_process(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Subscriber processes each read everything a producer process published.
+        """
+        # Setup
+        subscribers = [channel.subscribe(f"reader {i}") for i in range(2)]
+        result_queue = mp.Queue()
+        readers = [
+            mp.Process(target=read_all, args=(subscriber, result_queue))
+            for subscriber in subscribers
+        ]
+        for reader in readers:
+            reader.start()
+
+        # Run
+        # A small capacity would make the producer overwrite unread items
+        publish_range(channel.get_publisher(), CAPACITY)
+        while any(channel.get_lag(i) > 0 for i in range(2)):
+            time.sleep(0.01)
+        channel.close()
+        results = [result_queue.get(timeout=10) for _ in readers]
+        for reader in readers:
+            reader.join()
+
+        # Test
+        assert results == [list(range(CAPACITY))] * 2
+
+
+class TestLag:
+    """
+    Subscribers that fall behind lose items according to the lag policy.
+    """
+
+    def test_skip_to_oldest(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        A lagging subscriber continues at the oldest item still kept.
+        """
+        # Setup
+        slow = channel.subscribe("slow")
+        fast = channel.subscribe("fast")
+        publisher = channel.get_publisher()
+
+        # Run
+        fast_items = []
+        for i in range(CAPACITY + 3):
+            publisher.put(i)
+            fast_items.extend(fast.get_many(10, 0.0))
+        lag = channel.get_lag(0)
+        slow_items = slow.get_many(100, 0.0)
+
+        # Test
+        assert lag == CAPACITY + 3
+        assert slow_items == list(range(3, CAPACITY + 3))
+        assert slow.get_dropped_count() == 3
+        assert fast_items == list(range(CAPACITY + 3))
+        assert fast.get_dropped_count() == 0
+        assert channel.get_subscriber_stats() == [("slow", 0, 3), ("fast", 0, 0)]
+
+    def test_skip_to_latest(self) -> None:
+        """
+        A lagging subscriber continues at the newest item.
+        """
+        # Setup
+        latest_channel = broadcast_channel.BroadcastChannel(
+            CAPACITY, lag_policy=broadcast_channel.LagPolicy.SKIP_TO_LATEST
+        )
+        subscriber = latest_channel.subscribe("slow")
+        publisher = latest_channel.get_publisher()
+
+        # Run
+        publisher.put_many(list(range(CAPACITY + 3)))
+        items = subscriber.get_many(100, 0.0)
+
+        # Test
+        assert items == [CAPACITY + 2]
+        assert subscriber.get_dropped_count() == CAPACITY + 2
+        assert publisher.get_dropped_count() == CAPACITY + 2
+
+        latest_channel.release()
+
+    def test_publisher_never_blocks(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Publishing with a subscriber that never reads takes no waiting.
+        """
+        # Setup
+        channel.subscribe("stalled")
+        publisher = channel.get_publisher()
+
+        # Run
+        start = time.monotonic()
+        publish_range(publisher, NUM_ITEMS)
+        duration = time.monotonic() - start
+
+        # Test
+        assert not publisher.full()
+        assert publisher.qsize() == CAPACITY
+        assert duration < MAX_WAKE_TIME * 10
+
+
+class TestClose:
+    """
+    Closing wakes waiting subscribers.
+    """
+
+    def test_close_wakes_subscriber(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        A subscriber blocked without timeout returns the sentinel right away.
+        """
+        # Setup
+        subscriber = channel.subscribe("blocked")
+        results = []
+        thread = threading.Thread(target=lambda: results.append(subscriber.get()))
+        thread.start()
+        time.sleep(0.1)
+
+        # Run
+        start = time.monotonic()
+        channel.get_publisher().close()
+        thread.join(MAX_WAKE_TIME)
+
+        # Test
+        assert not thread.is_alive()
+        assert time.monotonic() - start < MAX_WAKE_TIME
+        assert results == [None]
+        assert subscriber.get_many(10, None) == []
+
+    def test_publish_after_close(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Items published after closing are discarded.
+        """
+        # Setup
+        publisher = channel.get_publisher()
+        channel.close()
+
+        # Run and test
+        assert publisher.put_many([1, 2]) == 0
+        assert publisher.empty()
+
+
+class TestWrapper:
+    """
+    Wrapped channel ends behave like other queues for workers.
+    """
+
+    def test_from_broadcast(self, channel: broadcast_channel.BroadcastChannel) -> None:
+        """
+        Puts go through the publisher wrapper, both subscriber wrappers read them.
+        """
+        # Setup
+        publisher = queue_proxy_wrapper.QueueProxyWrapper.from_broadcast(
+            channel.get_publisher(), CAPACITY
+        )
+        subscribers = [
+            queue_proxy_wrapper.QueueProxyWrapper.from_broadcast(
+                channel.subscribe(f"reader {i}"), CAPACITY
+            )
+            for i in range(2)
+        ]
+
+        # Run
+        publisher.queue.put("a")
+        publisher.put_many(["b", "c"])
+        results = [subscriber.get_many(10, 0.0) for subscriber in subscribers]
+        publisher.close()
+
+        # Test
+        assert publisher.backend == queue_proxy_wrapper.QueueBackend.BROADCAST
+        assert results == [["a", "b", "c"]] * 2
+        assert subscribers[0].queue.get() is None
+        assert publisher.get_dropped_count() == 0
@@ -0,0 +1,173 @@
+"""
+Test the fast path MAVLink decoder against pymavlink.
+"""
+
+import os
+import pickle
+
+import pytest
+from pymavlink.dialects.v10 import ardupilotmega as mavlink1
+from pymavlink.dialects.v20 import ardupilotmega as mavlink2
+from pymavlink.generator import mavcrc
+
+from modules.mavlink_mux import frame_decoder
+
+
+WANTED_TYPES = ["HEARTBEAT", "ATTITUDE", "LOCAL_POSITION_NED", "COMMAND_ACK"]
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def decoder() -> frame_decoder.FrameDecoder:  # type: ignore
+    """
+    Decodes the types the workers use.
+    """
+    result, created = frame_decoder.FrameDecoder.create(WANTED_TYPES)
+    assert result
+    assert created is not None
+
+    yield created  # type: ignore
+
+
+def encode_stream(dialect: object) -> "tuple[bytes, list[object]]":
+    """
+    Returns frames of wanted and unwanted types, and the wanted messages as pymavlink decodes them.
+    """
+    mav = dialect.MAVLink(None, srcSystem=1, srcComponent=1)
+    messages = [
+        dialect.MAVLink_heartbeat_message(2, 3, 81, 4, 4, 3),
+        dialect.MAVLink_sys_status_message(1, 2, 3, 500, 12000, -1, 90, 0, 0, 0, 0, 0, 0),
+        dialect.MAVLink_attitude_message(1000, 0.1, -0.2, 3.0, 0.01, 0.02, -0.03),
+        dialect.MAVLink_vfr_hud_message(5.0, 5.5, 90, 50, 12.5, 0.3),
+        dialect.MAVLink_local_position_ned_message(1010, 1.5, -2.5, -10.0, 0.5, 0.25, -0.125),
+        dialect.MAVLink_command_ack_message(400, 0),
+    ]
+    stream = b"".join(message.pack(mav) for message in messages)
+    decoded = dialect.MAVLink(None).parse_buffer(stream)
+    wanted = [message for message in decoded if message.get_type() in WANTED_TYPES]
+    return stream, wanted
+
+
+@pytest.mark.parametrize("dialect", [mavlink1, mavlink2])
+def test_same_as_pymavlink(dialect: object, decoder: frame_decoder.FrameDecoder) -> None:
+    """
+    Wanted messages have the same type and fields as pymavlink decodes, the rest are skipped.
+    """
+    # Setup
+    stream, wanted = encode_stream(dialect)
+
+    # Run
+    messages = decoder.decode(stream)
+
+    # Test
+    assert [message.get_type() for message in messages] == [
+        message.get_type() for message in wanted
+    ]
+    for message, expected in zip(messages, wanted):
+        assert {name: getattr(message, name) for name in expected.fieldnames} == {
+            name: getattr(expected, name) for name in expected.fieldnames
+        }
+    assert decoder.decoded_count == 4
+    assert decoder.skipped_count == 2
+    assert decoder.bad_checksum_count == 0
+
+
+def test_split_frames(decoder: frame_decoder.FrameDecoder) -> None:
+    """
+    Frames split across reads are decoded once they are complete.
+    """
+    # Setup
+    stream, wanted = encode_stream(mavlink2)
+
+    # Run
+    messages = []
+    for i in range(len(stream)):
+        messages += decoder.decode(stream[i : i + 1])
+
+    # Test
+    assert [message.get_type() for message in messages] == [
+        message.get_type() for message in wanted
+    ]
+    assert messages[1].time_boot_ms == 1000
+
+
+def test_truncated_payload(decoder: frame_decoder.FrameDecoder) -> None:
+    """
+    Trailing zero bytes dropped by MAVLink 2, and extensions missing in MAVLink 1, are zero.
+    """
+    # Setup
+    mav1 = mavlink1.MAVLink(None, srcSystem=1, srcComponent=1)
+    mav2 = mavlink2.MAVLink(None, srcSystem=1, srcComponent=1)
+    frames = mavlink1.MAVLink_command_ack_message(400, 4).pack(mav1) + (
+        mavlink2.MAVLink_command_ack_message(400, 4, 0, 0, 0, 0).pack(mav2)
+    )
+
+    # Run
+    v1_ack, v2_ack = decoder.decode(frames)
+
+    # Test
+    assert frames[1] == 3
+    assert (v1_ack.command, v1_ack.result, v1_ack.progress, v1_ack.target_system) == (400, 4, 0, 0)
+    assert (v2_ack.command, v2_ack.result, v2_ack.progress, v2_ack.target_system) == (400, 4, 0, 0)
+
+
+def test_corrupt_frame(decoder: frame_decoder.FrameDecoder) -> None:
+    """
+    A wanted frame with a bad checksum is dropped, and the frames after it are still found.
+    """
+    # Setup
+    stream, wanted = encode_stream(mavlink2)
+    corrupt = bytearray(stream)
+    # A payload byte of the heartbeat
+    corrupt[frame_decoder.V2_HEADER_LENGTH] ^= 0xFF
+
+    # Run
+    messages = decoder.decode(b"\x00garbage" + bytes(corrupt))
+
+    # Test
+    assert [message.get_type() for message in messages] == [
+        message.get_type() for message in wanted[1:]
+    ]
+    assert decoder.bad_checksum_count >= 1
+
+
+def test_invalid_types() -> None:
+    """
+    Unknown types and types with array fields cannot be decoded.
+    """
+    # Run and test
+    assert not frame_decoder.FrameDecoder.create(["NOT_A_MESSAGE"])[0]
+    assert not frame_decoder.FrameDecoder.create(["STATUSTEXT"])[0]
+
+
+def test_checksum() -> None:
+    """
+    Same checksum as pymavlink.
+    """
+    # Setup
+    data = os.urandom(64)
+
+    # Run and test
+    assert frame_decoder.x25_checksum(data) == mavcrc.x25crc(data).crc
+    assert frame_decoder.x25_checksum(data[:10], data[10:]) == mavcrc.x25crc(data).crc
+
+
+def test_pickle(decoder: frame_decoder.FrameDecoder) -> None:
+    """
+    Decoded messages can be put into process queues.
+    """
+    # Setup
+    stream, _ = encode_stream(mavlink2)
+    message = decoder.decode(stream)[1]
+
+    # Run
+    unpickled = pickle.loads(pickle.dumps(message))
+
+    # Test
+    assert unpickled.get_type() == "ATTITUDE"
+    assert unpickled.roll == message.roll
+    assert str(unpickled) == str(message)
@@ -0,0 +1,290 @@
+"""
+Test the lane queue.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import pytest
+
+from utilities.workers import lane_queue
+from utilities.workers import queue_proxy_wrapper
+
+
+LANE_MAXSIZE = 4
+MAX_WAKE_TIME = 0.5  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def create_lanes() -> "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue":  # type: ignore
+    """
+    Creates lane queues with a control lane of weight 3 and a bulk lane of weight 1.
+    """
+
+    def create(
+        scheduling: lane_queue.LaneScheduling,
+        control_policy: queue_proxy_wrapper.OverflowPolicy = queue_proxy_wrapper.OverflowPolicy.BLOCK,
+    ) -> lane_queue.LaneQueue:
+        return lane_queue.LaneQueue(
+            [
+                lane_queue.LaneConfig("control", LANE_MAXSIZE, 3, control_policy, 2),
+                lane_queue.LaneConfig("bulk", LANE_MAXSIZE, 1),
+            ],
+            scheduling,
+        )
+
+    yield create  # type: ignore
+
+
+def put_lane(sender: queue_proxy_wrapper.QueueProxyWrapper, items: "list") -> None:
+    """
+    Producer process putting items into its lane.
+    """
+    for item in items:
+        sender.queue.put(item)
+
+
+class TestScheduling:
+    """
+    Gets choose lanes by the scheduling policy, FIFO within a lane.
+    """
+
+    def test_strict(self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue") -> None:  # type: ignore
+        """
+        The control lane is emptied before any bulk item, even if bulk arrived first.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.STRICT)
+        lanes.put_many(["b1", "b2", "b3"], lane=1)
+        lanes.put_many(["c1", "c2"], lane=0)
+
+        # Run
+        items = lanes.get_many(10, 0.0)
+
+        # Test
+        assert items == ["c1", "c2", "b1", "b2", "b3"]
+
+    def test_weighted(self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue") -> None:  # type: ignore
+        """
+        Lanes share gets by weight while both have items, and bulk is not starved.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.WEIGHTED)
+        lanes.put_many(["b1", "b2", "b3", "b4"], lane=1)
+        lanes.put_many(["c1", "c2", "c3", "c4"], lane=0)
+
+        # Run
+        first = lanes.get_many(4, 0.0)
+        rest = lanes.get_many(10, 0.0)
+
+        # Test
+        assert sorted(first) == ["b1", "c1", "c2", "c3"]
+        assert rest == ["c4", "b2", "b3", "b4"]
+
+    def test_empty(self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue") -> None:  # type: ignore
+        """
+        Gets from an empty queue time out.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.STRICT)
+
+        # Run and test
+        assert lanes.empty()
+        assert lanes.get_many(10, 0.0) == []
+        with pytest.raises(queue.Empty):
+            lanes.get(timeout=0.01)
+
+
+class TestBounds:
+    """
+    Each lane is bounded on its own.
+    """
+
+    def test_full_lane_blocks_only_itself(
+        self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue"  # type: ignore
+    ) -> None:
+        """
+        A full bulk lane does not keep control items out.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.STRICT)
+        lanes.put_many(list(range(LANE_MAXSIZE)), lane=1)
+
+        # Run
+        lanes.put("control", lane=0)
+
+        # Test
+        assert lanes.full(1) and not lanes.full()
+        assert lanes.qsize() == LANE_MAXSIZE + 1
+        with pytest.raises(queue.Full):
+            lanes.put("bulk", False, lane=1)
+        assert lanes.put_many(["bulk"], 0.0, lane=1) == 0
+
+    def test_overflow_policy(
+        self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue"  # type: ignore
+    ) -> None:
+        """
+        A lane with an overflow policy drops instead of blocking, and counts the drops.
+        """
+        # Setup
+        lanes = create_lanes(
+            lane_queue.LaneScheduling.STRICT, queue_proxy_wrapper.OverflowPolicy.KEEP_LATEST_N
+        )
+
+        # Run
+        for i in range(LANE_MAXSIZE + 1):
+            lanes.put(i, lane=0)
+        items = lanes.get_many(10, 0.0)
+
+        # Test
+        assert items == [LANE_MAXSIZE - 1, LANE_MAXSIZE]
+        assert lanes.get_dropped_count(0) == LANE_MAXSIZE - 1
+        assert lanes.get_dropped_count() == LANE_MAXSIZE - 1
+
+    def test_invalid_lanes(self) -> None:
+        """
+        Lanes are validated on creation.
+        """
+        # Run and test
+        with pytest.raises(ValueError):
+            lane_queue.LaneQueue([])
+        with pytest.raises(ValueError):
+            lane_queue.LaneQueue([lane_queue.LaneConfig("zero weight", 1, 0)])
+        with pytest.raises(ValueError):
+            lane_queue.LaneQueue(
+                [
+                    lane_queue.LaneConfig(
+                        "unbounded", 0, 1, queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST
+                    )
+                ]
+            )
+
+
+class TestStats:
+    """
+    Lane statistics show how long items waited in each lane.
+    """
+
+    def test_wait_histograms(
+        self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue"  # type: ignore
+    ) -> None:
+        """
+        Every get is recorded in the histogram of its lane.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.STRICT)
+        lanes.put("bulk", lane=1)
+        time.sleep(0.01)
+        lanes.put("control", lane=0)
+
+        # Run
+        lanes.get_many(10, 0.0)
+        control, bulk = lanes.get_lane_stats()
+
+        # Test
+        assert (control.name, bulk.name) == ("control", "bulk")
+        assert control.wait.count == bulk.wait.count == 1
+        assert bulk.wait.total >= 0.01 > control.wait.total
+        assert bulk.wait.percentile(0.99) > control.wait.percentile(0.99)
+        assert control.depth == bulk.depth == 0
+
+
+class TestClose:
+    """
+    Closing wakes blocked producers and consumers.
+    """
+
+    def test_close_wakes_consumer(
+        self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue"  # type: ignore
+    ) -> None:
+        """
+        A consumer blocked without timeout returns the sentinel right away.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.WEIGHTED)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(lanes.get()))
+        thread.start()
+        time.sleep(0.1)
+
+        # Run
+        start = time.monotonic()
+        lanes.close()
+        thread.join(MAX_WAKE_TIME)
+
+        # Test
+        assert not thread.is_alive()
+        assert time.monotonic() - start < MAX_WAKE_TIME
+        assert results == [None]
+        lanes.put("discarded", lane=0)
+        assert lanes.get_many(10, None) == []
+
+
+class TestManager:
+    """
+    Lane queues served by a manager work across processes through lane senders.
+    """
+
+    def test_cross_process(self) -> None:
+        """
+        Producer processes put into their own lane, the consumer reads by priority.
+        """
+        # Setup
+        mp_manager = queue_proxy_wrapper.QueueManager()
+        mp_manager.start()  # pylint: disable=consider-using-with
+        proxy = mp_manager.LaneQueue(
+            [lane_queue.LaneConfig("control", 0), lane_queue.LaneConfig("bulk", 0)]
+        )
+        consumer = queue_proxy_wrapper.QueueProxyWrapper.from_lanes(proxy, 0)
+        senders = [
+            queue_proxy_wrapper.QueueProxyWrapper.from_lanes(lane_queue.LaneSender(proxy, lane), 0)
+            for lane in range(2)
+        ]
+
+        # Run
+        for sender, items in ((senders[1], ["b1", "b2"]), (senders[0], ["c1"])):
+            producer = mp.Process(target=put_lane, args=(sender, items))
+            producer.start()
+            producer.join()
+        items = consumer.get_many(10, 0.0)
+        senders[0].close()
+
+        # Test
+        assert consumer.backend == queue_proxy_wrapper.QueueBackend.LANES
+        assert items == ["c1", "b1", "b2"]
+        assert senders[1].queue.qsize() == 0
+        assert consumer.queue.get() is None
+        assert [stats.wait.count for stats in proxy.get_lane_stats()] == [1, 2]
+
+        mp_manager.shutdown()
+
+
+class TestSender:
+    """
+    The end of one lane only puts.
+    """
+
+    def test_sender_cannot_get(
+        self, create_lanes: "(lane_queue.LaneScheduling) -> lane_queue.LaneQueue"  # type: ignore
+    ) -> None:
+        """
+        Reading from the end of one lane is a type error.
+        """
+        # Setup
+        lanes = create_lanes(lane_queue.LaneScheduling.STRICT)
+        sender = lane_queue.LaneSender(lanes, 1)
+        sender.put("bulk")
+
+        # Run and test
+        with pytest.raises(TypeError):
+            sender.get_nowait()
+        with pytest.raises(TypeError):
+            sender.get_many(10, 0.0)
+        assert lanes.get(False) == "bulk"
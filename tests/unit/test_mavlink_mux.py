@@ -0,0 +1,371 @@
+"""
+Test the MAVLink multiplexer and the stand-in connections of the other workers.
+"""
+
+import time
+
+import pytest
+from pymavlink.dialects.v20 import ardupilotmega as mavlink2
+
+from modules.mavlink_mux import frame_decoder
+from modules.mavlink_mux import mavlink_mux
+from tests.unit import stub_logger
+from utilities.workers import queue_proxy_wrapper
+
+
+READ_TIMEOUT = 0.01  # seconds
+RECV_TIMEOUT = 0.2  # seconds
+# Timer slack
+TOLERANCE = 0.2  # seconds
+SUBSCRIPTION_MAXSIZE = 2
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class FakeMav:
+    """
+    Stand-in for `mavfile.mav`, records the send calls.
+    """
+
+    def __init__(self, failing_name: "str | None" = None) -> None:
+        """
+        failing_name: Send call that raises, None for none.
+        """
+        self.__failing_name = failing_name
+        self.sent: "list[tuple[str, tuple]]" = []
+
+    def __send(self, name: str, args: "tuple") -> None:
+        if name == self.__failing_name:
+            raise OSError("Connection lost")
+
+        self.sent.append((name, args))
+
+    def heartbeat_send(self, *args: object) -> None:
+        """
+        Records a HEARTBEAT.
+        """
+        self.__send("heartbeat_send", args)
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Records a COMMAND_LONG.
+        """
+        self.__send("command_long_send", args)
+
+
+class FakeConnection:
+    """
+    Stand-in for `mavutil.mavfile`, receives the given messages or bytes then nothing.
+    """
+
+    def __init__(self, incoming: "list", mav: "FakeMav | None" = None) -> None:
+        """
+        incoming: Messages for recv_match(), or chunks of bytes for recv().
+        """
+        self.__incoming = list(incoming)
+        self.mav = FakeMav() if mav is None else mav
+
+    def recv_match(self, blocking: bool = False, timeout: "float | None" = None) -> "object | None":
+        """
+        Returns the next message, None once there are no more.
+        """
+        del blocking, timeout
+        return self.__incoming.pop(0) if self.__incoming else None
+
+    def recv(self, size: int) -> bytes:
+        """
+        Returns the next chunk of bytes, empty once there are no more.
+        """
+        del size
+        return self.__incoming.pop(0) if self.__incoming else b""
+
+    def select(self, timeout: float) -> bool:
+        """
+        Returns whether there are more bytes.
+        """
+        del timeout
+        return len(self.__incoming) > 0
+
+
+def create_queue(maxsize: int = 0) -> queue_proxy_wrapper.QueueProxyWrapper:
+    """
+    In process queue.
+    """
+    return queue_proxy_wrapper.QueueProxyWrapper(
+        None, maxsize, queue_proxy_wrapper.QueueBackend.THREAD  # type: ignore
+    )
+
+
+def drain(subscription_queue: queue_proxy_wrapper.QueueProxyWrapper) -> "list[str]":
+    """
+    Returns the types of the messages in the queue.
+    """
+    return [message.get_type() for message in subscription_queue.get_many(100, 0.0)]
+
+
+@pytest.fixture()
+def local_logger() -> stub_logger.StubLogger:  # type: ignore
+    """
+    Logger that keeps the messages.
+    """
+    yield stub_logger.StubLogger()  # type: ignore
+
+
+@pytest.fixture()
+def messages() -> "list[object]":  # type: ignore
+    """
+    One message of each routed type, and one nobody subscribes to.
+    """
+    yield [  # type: ignore
+        mavlink2.MAVLink_heartbeat_message(2, 3, 81, 4, 4, 3),
+        mavlink2.MAVLink_attitude_message(1000, 0.1, -0.2, 3.0, 0.01, 0.02, -0.03),
+        mavlink2.MAVLink_vfr_hud_message(5.0, 5.5, 90, 50, 12.5, 0.3),
+        mavlink2.MAVLink_local_position_ned_message(1010, 1.5, -2.5, -10.0, 0.5, 0.2, 0.1),
+        mavlink2.MAVLink_command_ack_message(400, 0),
+    ]
+
+
+def create_mux(
+    connection: FakeConnection,
+    subscriptions: "dict[str, list[queue_proxy_wrapper.QueueProxyWrapper]]",
+    outgoing_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    local_logger: stub_logger.StubLogger,
+    decoder: "frame_decoder.FrameDecoder | None" = None,
+) -> mavlink_mux.MavlinkMux:
+    """
+    Multiplexer of the fake connection.
+    """
+    result, mux = mavlink_mux.MavlinkMux.create(
+        connection,  # type: ignore
+        subscriptions,
+        outgoing_queue,
+        READ_TIMEOUT,
+        local_logger,  # type: ignore
+        decoder,
+    )
+    assert result
+    assert mux is not None
+
+    return mux
+
+
+class TestMavlinkMux:
+    """
+    Routing incoming messages and serializing outgoing ones.
+    """
+
+    def test_route_by_type(
+        self, messages: "list[object]", local_logger: stub_logger.StubLogger
+    ) -> None:
+        """
+        Each message reaches every subscriber of its type, and no one else.
+        """
+        # Setup
+        heartbeat_queue = create_queue()
+        telemetry_queue = create_queue()
+        command_queue = create_queue()
+        subscriptions = {
+            "HEARTBEAT": [heartbeat_queue, telemetry_queue],
+            "ATTITUDE": [telemetry_queue],
+            "LOCAL_POSITION_NED": [telemetry_queue],
+            "COMMAND_ACK": [command_queue],
+        }
+        mux = create_mux(FakeConnection(messages), subscriptions, create_queue(), local_logger)
+
+        # Run
+        mux.run()
+
+        # Test
+        assert drain(heartbeat_queue) == ["HEARTBEAT"]
+        assert drain(telemetry_queue) == ["HEARTBEAT", "ATTITUDE", "LOCAL_POSITION_NED"]
+        assert drain(command_queue) == ["COMMAND_ACK"]
+        assert mux.received_count == len(messages)
+        assert mux.dropped_count == 0
+
+    def test_route_decoded(
+        self, messages: "list[object]", local_logger: stub_logger.StubLogger
+    ) -> None:
+        """
+        With a decoder, only subscribed types are decoded from the raw bytes and routed.
+        """
+        # Setup
+        mav = mavlink2.MAVLink(None, srcSystem=1, srcComponent=1)
+        stream = b"".join(message.pack(mav) for message in messages)
+        telemetry_queue = create_queue()
+        subscriptions = {"ATTITUDE": [telemetry_queue], "LOCAL_POSITION_NED": [telemetry_queue]}
+        result, decoder = frame_decoder.FrameDecoder.create(list(subscriptions))
+        assert result
+        assert decoder is not None
+        # Split inside a frame
+        connection = FakeConnection([b"", stream[:20], stream[20:]])
+        mux = create_mux(connection, subscriptions, create_queue(), local_logger, decoder)
+
+        # Run
+        mux.run()
+        mux.run()
+
+        # Test
+        assert drain(telemetry_queue) == ["ATTITUDE", "LOCAL_POSITION_NED"]
+        assert mux.received_count == 2
+        assert decoder.skipped_count == len(messages) - 2
+
+    def test_full_subscription_drops(
+        self, messages: "list[object]", local_logger: stub_logger.StubLogger
+    ) -> None:
+        """
+        A full subscriber queue drops its newest messages without blocking the others.
+        """
+        # Setup
+        slow_queue = create_queue(SUBSCRIPTION_MAXSIZE)
+        fast_queue = create_queue()
+        subscriptions = {"HEARTBEAT": [slow_queue, fast_queue]}
+        heartbeats = [messages[0]] * (SUBSCRIPTION_MAXSIZE + 3)
+        mux = create_mux(FakeConnection(heartbeats), subscriptions, create_queue(), local_logger)
+
+        # Run
+        start = time.monotonic()
+        mux.run()
+        elapsed = time.monotonic() - start
+
+        # Test
+        assert elapsed < TOLERANCE
+        assert len(drain(slow_queue)) == SUBSCRIPTION_MAXSIZE
+        assert len(drain(fast_queue)) == len(heartbeats)
+        assert mux.dropped_count == len(heartbeats) - SUBSCRIPTION_MAXSIZE
+
+    def test_outgoing_in_request_order(self, local_logger: stub_logger.StubLogger) -> None:
+        """
+        Send requests of several workers go out through the connection in request order.
+        """
+        # Setup
+        outgoing_queue = create_queue()
+        heartbeat_connection = mavlink_mux.MuxedConnection(create_queue(), outgoing_queue)
+        command_connection = mavlink_mux.MuxedConnection(create_queue(), outgoing_queue)
+        connection = FakeConnection([])
+        mux = create_mux(connection, {}, outgoing_queue, local_logger)
+
+        # Run
+        heartbeat_connection.mav.heartbeat_send(6, 8, 0, 0, 0)
+        command_connection.mav.command_long_send(1, 0, 400, 0, 1, 0, 0, 0, 0, 0, 0)
+        heartbeat_connection.mav.heartbeat_send(6, 8, 0, 0, 1)
+        mux.run()
+
+        # Test
+        assert connection.mav.sent == [
+            ("heartbeat_send", (6, 8, 0, 0, 0)),
+            ("command_long_send", (1, 0, 400, 0, 1, 0, 0, 0, 0, 0, 0)),
+            ("heartbeat_send", (6, 8, 0, 0, 1)),
+        ]
+        assert mux.sent_count == 3
+        assert outgoing_queue.queue.empty()
+
+    def test_failed_send(self, local_logger: stub_logger.StubLogger) -> None:
+        """
+        A failed send is logged and does not hold back the requests after it.
+        """
+        # Setup
+        outgoing_queue = create_queue()
+        sender = mavlink_mux.MuxedSender(outgoing_queue)
+        connection = FakeConnection([], FakeMav("command_long_send"))
+        mux = create_mux(connection, {}, outgoing_queue, local_logger)
+
+        # Run
+        sender.command_long_send(1, 0, 400, 0, 1, 0, 0, 0, 0, 0, 0)
+        sender.heartbeat_send(6, 8, 0, 0, 0)
+        mux.run()
+
+        # Test
+        assert connection.mav.sent == [("heartbeat_send", (6, 8, 0, 0, 0))]
+        assert mux.sent_count == 1
+        assert len(local_logger.get_messages("error")) == 1
+
+    def test_invalid_read_timeout(self, local_logger: stub_logger.StubLogger) -> None:
+        """
+        The read timeout must be greater than 0.
+        """
+        # Run
+        result, mux = mavlink_mux.MavlinkMux.create(
+            FakeConnection([]), {}, create_queue(), 0.0, local_logger  # type: ignore
+        )
+
+        # Test
+        assert not result
+        assert mux is None
+
+
+class TestMuxedConnection:
+    """
+    Receiving routed messages like `mavfile.recv_match()`.
+    """
+
+    def test_blocking_timeout(self) -> None:
+        """
+        A blocking receive with nothing routed returns None after the timeout.
+        """
+        # Setup
+        connection = mavlink_mux.MuxedConnection(create_queue(), create_queue())
+
+        # Run
+        start = time.monotonic()
+        message = connection.recv_match(type="HEARTBEAT", blocking=True, timeout=RECV_TIMEOUT)
+        elapsed = time.monotonic() - start
+
+        # Test
+        assert message is None
+        assert RECV_TIMEOUT <= elapsed <= RECV_TIMEOUT + TOLERANCE
+
+    def test_non_blocking(self) -> None:
+        """
+        A non blocking receive with nothing routed returns None right away.
+        """
+        # Setup
+        connection = mavlink_mux.MuxedConnection(create_queue(), create_queue())
+
+        # Run
+        start = time.monotonic()
+        message = connection.recv_match(blocking=False)
+        elapsed = time.monotonic() - start
+
+        # Test
+        assert message is None
+        assert elapsed < TOLERANCE
+
+    def test_type_filter(self, messages: "list[object]") -> None:
+        """
+        Messages of other types are skipped, and the timeout still applies once none match.
+        """
+        # Setup
+        subscription_queue = create_queue()
+        for message in messages:
+            subscription_queue.queue.put(message)
+        connection = mavlink_mux.MuxedConnection(subscription_queue, create_queue())
+
+        # Run
+        ack = connection.recv_match(type=["COMMAND_ACK"], blocking=True, timeout=RECV_TIMEOUT)
+        start = time.monotonic()
+        attitude = connection.recv_match(type="ATTITUDE", blocking=True, timeout=RECV_TIMEOUT)
+        elapsed = time.monotonic() - start
+
+        # Test
+        assert ack is not None
+        assert ack.get_type() == "COMMAND_ACK"
+        assert attitude is None
+        assert RECV_TIMEOUT <= elapsed <= RECV_TIMEOUT + TOLERANCE
+
+    def test_sentinel(self) -> None:
+        """
+        A blocking receive without a timeout returns None once the queue is closed.
+        """
+        # Setup
+        subscription_queue = create_queue()
+        subscription_queue.queue.put(None)
+        connection = mavlink_mux.MuxedConnection(subscription_queue, create_queue())
+
+        # Run
+        message = connection.recv_match(blocking=True)
+
+        # Test
+        assert message is None
@@ -0,0 +1,236 @@
+"""
+Test serving worker and queue metrics for scraping.
+"""
+
+import pathlib
+import re
+import socket
+import threading
+
+import pytest
+
+from tests.unit import stub_logger
+from utilities.workers import broadcast_channel
+from utilities.workers import lane_queue
+from utilities.workers import metrics_exporter
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_metrics
+
+
+QUEUE_MAXSIZE = 4
+CHANNEL_CAPACITY = 4
+SCRAPE_TIMEOUT = 5.0  # seconds
+
+SAMPLE_PATTERN = re.compile(r"^(\w+)(?:\{(.*)\})? (\S+)$")
+LABEL_PATTERN = re.compile(r'(\w+)="([^"]*)"')
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class StubManager:
+    """
+    Stand-in for `WorkerManager` whose workers recorded into a real metrics registry.
+    """
+
+    def __init__(self, target_name: str, registry: worker_metrics.MetricsRegistry) -> None:
+        self.__target_name = target_name
+        self.__registry = registry
+
+    def get_target_name(self) -> str:
+        """
+        Returns the target name.
+        """
+        return self.__target_name
+
+    def get_restart_count(self) -> int:
+        """
+        Returns a made up restart count.
+        """
+        return 2
+
+    def get_metrics_snapshot(self) -> "list[dict[str, int | float | object]]":
+        """
+        Returns the metrics of 2 workers.
+        """
+        return [self.__registry.snapshot(0), self.__registry.snapshot(1)]
+
+
+def parse_scrape(text: str) -> "dict[tuple[str, frozenset], float]":
+    """
+    Parses the Prometheus text format.
+
+    Returns the value of each sample by name and labels, and checks every family has a TYPE.
+    """
+    samples = {}
+    typed = set()
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            typed.add(line.split()[2])
+            continue
+        if line.startswith("#"):
+            continue
+
+        match = SAMPLE_PATTERN.match(line)
+        assert match is not None, line
+        name, labels, value = match.groups()
+        family = re.sub(r"_(bucket|sum|count)$", "", name)
+        assert name in typed or family in typed, line
+        samples[(name, frozenset(LABEL_PATTERN.findall(labels or "")))] = float(value)
+
+    return samples
+
+
+def scrape_unix(path: str, request_path: str = "/metrics") -> "tuple[str, str]":
+    """
+    Sends a GET over the Unix socket.
+
+    Returns the status line and the body.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(SCRAPE_TIMEOUT)
+        client.connect(path)
+        client.sendall(f"GET {request_path} HTTP/1.0\r\n\r\n".encode())
+        response = b""
+        while True:
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            response += chunk
+
+    head, _, body = response.decode().partition("\r\n\r\n")
+    return head.splitlines()[0], body
+
+
+@pytest.fixture()
+def local_logger() -> stub_logger.StubLogger:  # type: ignore
+    """
+    Logger that keeps the messages.
+    """
+    yield stub_logger.StubLogger()  # type: ignore
+
+
+@pytest.fixture()
+def exporter(
+    tmp_path: pathlib.Path, local_logger: stub_logger.StubLogger
+) -> metrics_exporter.MetricsExporter:  # type: ignore
+    """
+    Exporter on a Unix socket, serving a queue, a broadcast channel, a lane queue, and a stage
+    whose workers recorded a counter, a gauge, and a loop histogram.
+    """
+    work_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None,  # type: ignore
+        QUEUE_MAXSIZE,
+        queue_proxy_wrapper.QueueBackend.THREAD,
+        overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_NEWEST,
+    )
+    for item in range(QUEUE_MAXSIZE + 1):
+        work_queue.queue.put(item)
+
+    channel = broadcast_channel.BroadcastChannel(CHANNEL_CAPACITY, 1)
+    channel.subscribe("main")
+    channel.get_publisher().put_many(list(range(3)))
+
+    lanes = lane_queue.LaneQueue(
+        [lane_queue.LaneConfig("control", 2), lane_queue.LaneConfig("bulk", QUEUE_MAXSIZE)]
+    )
+    lanes.put("ack", lane=0)
+    lanes.put_many(["a", "b"], lane=1)
+    lanes.get()
+
+    registry = worker_metrics.MetricsRegistry(2)
+    recorder = registry.get_recorder(1)
+    recorder.increment("commands", 3)
+    recorder.set_gauge("batch_size", 2.5)
+    recorder.observe("loop", 0.001)
+    recorder.observe("loop", 0.003)
+
+    result, created = metrics_exporter.MetricsExporter.create(
+        f"unix:{tmp_path / 'metrics.sock'}",
+        [StubManager("command_worker", registry)],  # type: ignore
+        {"work": work_queue},
+        {"telemetry": channel},
+        {"main_inbox": lanes},
+        local_logger,  # type: ignore
+    )
+    assert result
+    assert created is not None
+    thread = threading.Thread(target=created.run)
+    thread.start()
+
+    yield created  # type: ignore
+
+    created.stop()
+    thread.join()
+    channel.release()
+
+
+def test_scrape(exporter: metrics_exporter.MetricsExporter, tmp_path: pathlib.Path) -> None:
+    """
+    A scrape over the socket has the queue, subscriber, lane, and worker metrics.
+    """
+    # Run
+    status, body = scrape_unix(str(tmp_path / "metrics.sock"))
+    samples = parse_scrape(body)
+
+    # Test
+    assert status.split()[1] == "200"
+    assert body == exporter.render()
+
+    work = frozenset({("queue", "work")})
+    assert samples[("bootcamp_queue_depth", work)] == QUEUE_MAXSIZE
+    assert samples[("bootcamp_queue_capacity", work)] == QUEUE_MAXSIZE
+    assert samples[("bootcamp_queue_dropped_total", work)] == 1
+
+    main = frozenset({("queue", "telemetry"), ("subscriber", "main")})
+    assert samples[("bootcamp_subscriber_lag", main)] == 3
+    assert samples[("bootcamp_subscriber_lost_total", main)] == 0
+
+    control = frozenset({("queue", "main_inbox"), ("lane", "control")})
+    bulk = frozenset({("queue", "main_inbox"), ("lane", "bulk")})
+    assert samples[("bootcamp_lane_depth", control)] == 0
+    assert samples[("bootcamp_lane_depth", bulk)] == 2
+    assert samples[("bootcamp_lane_wait_seconds_count", control)] == 1
+    assert samples[("bootcamp_lane_dropped_total", bulk)] == 0
+
+    worker = frozenset({("worker", "command_worker"), ("index", "1")})
+    assert (
+        samples[("bootcamp_worker_restarts_total", frozenset({("worker", "command_worker")}))] == 2
+    )
+    assert samples[("bootcamp_worker_commands_total", worker)] == 3
+    assert samples[("bootcamp_worker_batch_size", worker)] == 2.5
+    assert samples[("bootcamp_worker_loop_seconds_count", worker)] == 2
+    assert samples[("bootcamp_worker_loop_seconds_sum", worker)] == pytest.approx(0.004)
+    infinite_bucket = worker | {("le", "+Inf")}
+    assert samples[("bootcamp_worker_loop_seconds_bucket", infinite_bucket)] == 2
+    idle_worker = frozenset({("worker", "command_worker"), ("index", "0")})
+    assert ("bootcamp_worker_commands_total", idle_worker) not in samples
+
+
+def test_unknown_path(exporter: metrics_exporter.MetricsExporter, tmp_path: pathlib.Path) -> None:
+    """
+    Only /metrics and / are served.
+    """
+    # Run
+    status, _ = scrape_unix(str(tmp_path / "metrics.sock"), "/other")
+
+    # Test
+    assert exporter is not None
+    assert status.split()[1] == "404"
+
+
+@pytest.mark.parametrize("address", ["udp:localhost:9101", "tcp:localhost:port"])
+def test_invalid_address(address: str, local_logger: stub_logger.StubLogger) -> None:
+    """
+    Unknown schemes and ports are rejected.
+    """
+    # Run
+    result, exporter = metrics_exporter.MetricsExporter.create(
+        address, [], {}, {}, {}, local_logger  # type: ignore
+    )
+
+    # Test
+    assert not result
+    assert exporter is None
@@ -0,0 +1,212 @@
+"""
+Test building the queues and workers of the pipeline description main uses.
+"""
+
+import pathlib
+
+import pytest
+
+from tests.unit import stub_logger
+from utilities.workers import pipeline as pipeline_loader
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+PIPELINE_FILE_PATH = pathlib.Path(__file__).parents[2] / "pipeline.yaml"
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def local_logger() -> stub_logger.StubLogger:  # type: ignore
+    """
+    Logger that keeps the messages.
+    """
+    yield stub_logger.StubLogger()  # type: ignore
+
+
+@pytest.fixture()
+def pipeline(local_logger: stub_logger.StubLogger) -> pipeline_loader.Pipeline:  # type: ignore
+    """
+    Queues of pipeline.yaml.
+    """
+    manager = queue_proxy_wrapper.QueueManager()
+    manager.start()  # pylint: disable=consider-using-with
+    result, created = pipeline_loader.Pipeline.create(
+        PIPELINE_FILE_PATH, manager, local_logger  # type: ignore
+    )
+    assert result
+    assert created is not None
+
+    yield created  # type: ignore
+
+    created.release()
+    manager.shutdown()
+
+
+@pytest.fixture()
+def bindings() -> "dict[str, object]":  # type: ignore
+    """
+    Stand-ins for the objects main binds, each told apart by its name.
+    """
+    yield {  # type: ignore
+        name: f"stub {name}"
+        for name in [
+            "connection",
+            "heartbeat_connection",
+            "telemetry_connection",
+            "command_connection",
+            "mux_subscriptions",
+            "target",
+        ]
+    }
+
+
+def get_properties(manager: worker_manager.WorkerManager) -> worker_manager.WorkerProperties:
+    """
+    Returns the worker properties the manager was created with.
+    """
+    return manager._WorkerManager__worker_properties  # type: ignore
+
+
+def test_create_workers(
+    pipeline: pipeline_loader.Pipeline,
+    bindings: "dict[str, object]",
+    local_logger: stub_logger.StubLogger,
+) -> None:
+    """
+    Every stage gets a manager with its bindings substituted, broadcast inputs are subscriptions
+    of the stage, and the ASYNCIO heartbeat stages share one host.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+
+    # Run
+    result, managers = pipeline.create_workers(bindings, controller)
+
+    # Test
+    assert result
+    by_target = {manager.get_target_name(): manager for manager in managers}
+    assert sorted(by_target) == [
+        "asyncio_host_worker",
+        "command_worker",
+        "mavlink_mux_worker",
+        "telemetry_worker",
+    ]
+
+    mux_arguments = get_properties(by_target["mavlink_mux_worker"]).get_worker_arguments()
+    assert mux_arguments[:3] == ("stub connection", "stub mux_subscriptions", 0.05)
+    assert mux_arguments[3] is pipeline.get_queue("mux_outgoing")
+    assert mux_arguments[-1] is controller
+
+    command_properties = get_properties(by_target["command_worker"])
+    command_arguments = command_properties.get_worker_arguments()
+    assert command_arguments[:2] == ("stub command_connection", "stub target")
+    # Own subscription of the channel, not its publisher
+    assert command_arguments[2].backend == queue_proxy_wrapper.QueueBackend.BROADCAST
+    assert command_arguments[2] is not pipeline.get_queue("telemetry")
+    assert command_arguments[3] is pipeline.get_queue("main_inbox.command")
+    assert command_properties.get_input_queues() == [command_arguments[2]]
+    subscribers = [
+        name for name, _, _ in pipeline.get_channels()["telemetry"].get_subscriber_stats()
+    ]
+    assert subscribers == ["command"]
+
+    telemetry_properties = get_properties(by_target["telemetry_worker"])
+    assert telemetry_properties.get_worker_keyword_arguments() == {"output_rate": 10}
+    assert telemetry_properties.get_worker_arguments()[1] is pipeline.get_queue("telemetry")
+
+    host_properties = get_properties(by_target["asyncio_host_worker"])
+    assert host_properties.get_execution_mode() == worker_manager.ExecutionMode.PROCESS
+    assert host_properties.get_worker_count() == 1
+    hosted = host_properties.get_worker_arguments()[0]
+    assert [target.__name__ for target, _, _ in hosted] == [
+        "heartbeat_sender_worker_async",
+        "heartbeat_receiver_worker_async",
+    ]
+    sender_arguments, receiver_arguments = [arguments for _, arguments, _ in hosted]
+    assert sender_arguments == ("stub heartbeat_connection", 1, controller)
+    assert receiver_arguments[:2] == ("stub heartbeat_connection", 1)
+    assert receiver_arguments[2] is pipeline.get_queue("main_inbox.heartbeat")
+    assert len(local_logger.get_messages("error")) == 0
+
+
+def test_missing_binding(
+    pipeline: pipeline_loader.Pipeline,
+    bindings: "dict[str, object]",
+    local_logger: stub_logger.StubLogger,
+) -> None:
+    """
+    No workers are created unless main provides every binding.
+    """
+    # Setup
+    del bindings["target"]
+
+    # Run
+    result, managers = pipeline.create_workers(bindings, worker_controller.WorkerController())
+
+    # Test
+    assert not result
+    assert managers == []
+    assert "target" in local_logger.get_messages("error")[0]
+
+
+def test_telemetry_blackboard(
+    tmp_path: pathlib.Path,
+    bindings: "dict[str, object]",
+    local_logger: stub_logger.StubLogger,
+) -> None:
+    """
+    With the blackboard option of pipeline.yaml enabled, the telemetry and command stages
+    share one blackboard, and the command stage no longer subscribes to telemetry.
+    """
+    # Setup
+    description = PIPELINE_FILE_PATH.read_text(encoding="utf-8")
+    for commented, enabled in [
+        ("      # blackboard: $telemetry_latest", "      blackboard: $telemetry_latest"),
+        (
+            "# blackboards:\n#   telemetry_latest:\n#     codec:",
+            "blackboards:\n  telemetry_latest:\n    codec:",
+        ),
+        (
+            "    arguments: [$command_connection, $target]\n    inputs:\n      telemetry: 100\n",
+            "    arguments: [$command_connection, $target, null]\n"
+            "    keyword_arguments:\n      blackboard: $telemetry_latest\n",
+        ),
+    ]:
+        assert commented in description
+        description = description.replace(commented, enabled)
+    file_path = tmp_path / "pipeline.yaml"
+    file_path.write_text(description, encoding="utf-8")
+    manager = queue_proxy_wrapper.QueueManager()
+    manager.start()  # pylint: disable=consider-using-with
+    result, pipeline = pipeline_loader.Pipeline.create(
+        file_path, manager, local_logger  # type: ignore
+    )
+    assert result
+    assert pipeline is not None
+
+    # Run
+    result, managers = pipeline.create_workers(bindings, worker_controller.WorkerController())
+
+    # Test
+    assert result
+    by_target = {manager.get_target_name(): manager for manager in managers}
+    blackboard = pipeline.get_blackboards()["telemetry_latest"]
+    telemetry_properties = get_properties(by_target["telemetry_worker"])
+    assert telemetry_properties.get_worker_keyword_arguments()["blackboard"] is blackboard
+    command_properties = get_properties(by_target["command_worker"])
+    assert command_properties.get_worker_keyword_arguments() == {"blackboard": blackboard}
+    assert command_properties.get_worker_arguments()[2] is None
+    assert command_properties.get_input_queues() == []
+    subscribers = [
+        name for name, _, _ in pipeline.get_channels()["telemetry"].get_subscriber_stats()
+    ]
+    assert subscribers == []
+
+    pipeline.release()
+    manager.shutdown()
@@ -0,0 +1,455 @@
+"""
+Test the pipeline description validation and queue sizing.
+"""
+
+import os
+
+import pytest
+
+from utilities.workers import broadcast_channel
+from utilities.workers import lane_queue
+from utilities.workers import pipeline_config
+from utilities.workers import process_resources
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_memory_blackboard
+from utilities.workers import worker_controller
+
+
+TEST_MODULE = "tests.unit.test_pipeline_config"
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def producer_worker(
+    period: float,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+    blackboard: object = None,
+) -> None:
+    """
+    Worker with one argument and one output.
+    """
+    assert (period, output_queue, controller, blackboard) is not None
+
+
+def consumer_worker(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker with one input.
+    """
+    assert (input_queue, controller) is not None
+
+
+@pytest.fixture()
+def description() -> dict:  # type: ignore
+    """
+    A producer and 2 consumers connected by one queue.
+    """
+    yield {  # type: ignore
+        "queues": {"samples": {"backend": "SHARED_MEMORY", "max_latency": 0.5}},
+        "stages": {
+            "producer": {
+                "target": f"{TEST_MODULE}.producer_worker",
+                "count": 2,
+                "arguments": [0.1],
+                "keyword_arguments": {"blackboard": "$blackboard"},
+                "outputs": {"samples": 30},
+            },
+            "consumer": {
+                "target": f"{TEST_MODULE}.consumer_worker",
+                "count": 2,
+                "inputs": {"samples": 100},
+            },
+        },
+    }
+
+
+class TestPipelineConfig:
+    """
+    Descriptions are fully validated before anything is created.
+    """
+
+    def test_valid(self, description: dict) -> None:
+        """
+        Queues are sized from the producer rates, and bindings are collected.
+        """
+        # Run
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        assert not problems
+        assert config is not None
+        (samples,) = config.queues
+        assert samples.backend == queue_proxy_wrapper.QueueBackend.SHARED_MEMORY
+        assert samples.producer_rate == 60
+        assert samples.consumer_rate == 200
+        assert samples.maxsize == 30
+        assert config.get_bindings() == {"blackboard"}
+
+    def test_explicit_maxsize(self, description: dict) -> None:
+        """
+        A declared maxsize is used as is.
+        """
+        # Setup
+        description["queues"]["samples"]["maxsize"] = 7
+
+        # Run
+        result, config, _ = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        assert config.queues[0].maxsize == 7
+
+    def test_saturated_queue_warns(self, description: dict) -> None:
+        """
+        Consumers slower than producers are reported without failing.
+        """
+        # Setup
+        description["stages"]["consumer"]["inputs"]["samples"] = 10
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        assert len(problems) == 1
+        assert "stay full" in problems[0]
+
+    def test_overflow_policy(self, description: dict) -> None:
+        """
+        Overflow policies are parsed, and saturation warns that items will be dropped.
+        """
+        # Setup
+        description["queues"]["samples"]["overflow"] = "KEEP_LATEST_N"
+        description["queues"]["samples"]["keep_count"] = 3
+        description["stages"]["consumer"]["inputs"]["samples"] = 10
+
+        # Run
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        (samples,) = config.queues
+        assert samples.overflow_policy == queue_proxy_wrapper.OverflowPolicy.KEEP_LATEST_N
+        assert samples.keep_count == 3
+        assert "drop" in problems[0]
+
+    def test_invalid_overflow_policy(self, description: dict) -> None:
+        """
+        Unknown policies and keep counts beyond maxsize are errors.
+        """
+        # Setup
+        description["queues"]["samples"]["overflow"] = "DROP_EVERYTHING"
+        description["queues"]["other"] = {
+            "maxsize": 2,
+            "overflow": "KEEP_LATEST_N",
+            "keep_count": 3,
+        }
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 2
+
+    def test_broadcast(self, description: dict) -> None:
+        """
+        Every consumer of a broadcast queue reads every item,
+        so the slowest one decides saturation, and each gets a subscription.
+        """
+        # Setup
+        description["queues"]["samples"] = {
+            "backend": "BROADCAST",
+            "lag_policy": "SKIP_TO_LATEST",
+            "consumer_rate": 50,
+        }
+
+        # Run
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        (samples,) = config.queues
+        assert samples.backend == queue_proxy_wrapper.QueueBackend.BROADCAST
+        assert samples.lag_policy == broadcast_channel.LagPolicy.SKIP_TO_LATEST
+        assert samples.subscriber_count == 2
+        assert samples.consumer_rate == 50
+        assert "lose" in problems[0]
+
+    def test_invalid_broadcast(self, description: dict) -> None:
+        """
+        Broadcast queues have no overflow policy, and only they have a lag policy.
+        """
+        # Setup
+        description["queues"]["samples"] = {"backend": "BROADCAST", "overflow": "DROP_OLDEST"}
+        description["queues"]["other"] = {"maxsize": 2, "lag_policy": "SKIP_TO_LATEST"}
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 2
+
+    def test_lanes(self, description: dict) -> None:
+        """
+        Producers put into lanes, each lane is sized on its own,
+        and the queue holds the sum of its lanes.
+        """
+        # Setup
+        description["queues"]["samples"] = {
+            "backend": "LANES",
+            "scheduling": "WEIGHTED",
+            "max_latency": 0.5,
+            "lanes": {
+                "control": {"weight": 4, "overflow": "KEEP_LATEST_N", "keep_count": 2},
+                "bulk": {"maxsize": 50, "producer_rate": 20},
+            },
+        }
+        description["stages"]["producer"]["outputs"] = {"samples.control": 30}
+
+        # Run
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        assert not problems
+        (samples,) = config.queues
+        assert samples.backend == queue_proxy_wrapper.QueueBackend.LANES
+        assert samples.scheduling == lane_queue.LaneScheduling.WEIGHTED
+        control, bulk = samples.lanes
+        assert (control.name, control.maxsize, control.weight) == ("control", 30, 4)
+        assert control.overflow_policy == queue_proxy_wrapper.OverflowPolicy.KEEP_LATEST_N
+        assert (bulk.name, bulk.maxsize, bulk.weight) == ("bulk", 50, 1)
+        assert samples.maxsize == 80
+
+    def test_invalid_lanes(self, description: dict) -> None:
+        """
+        Producers must put into a declared lane, consumers read the whole queue,
+        and lane settings are not set on the queue.
+        """
+        # Setup
+        description["queues"]["samples"] = {
+            "backend": "LANES",
+            "overflow": "DROP_OLDEST",
+            "lanes": {"control": {"maxsize": 10}},
+        }
+        description["queues"]["other"] = {"maxsize": 2, "scheduling": "STRICT"}
+        description["stages"]["producer"]["outputs"] = {"samples.missing": 30}
+        description["stages"]["consumer"]["inputs"] = {"samples.control": 100}
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 4
+
+    def test_invalid_max_count(self, description: dict) -> None:
+        """
+        max_count is not less than count, and ASYNCIO stages cannot be autoscaled.
+        """
+        # Setup
+        description["stages"]["producer"]["max_count"] = 4
+        description["stages"]["consumer"]["max_count"] = 1
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+        description["stages"]["consumer"]["max_count"] = 3
+        description["stages"]["consumer"]["mode"] = "ASYNCIO"
+        invalid_result, _, invalid_problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 1
+        assert "max_count" in problems[0]
+        assert not invalid_result
+        assert any("cannot scale" in problem for problem in invalid_problems)
+
+    def test_autoscaled_sizing(self, description: dict) -> None:
+        """
+        Rates are multiplied by the most workers, not the starting count.
+        """
+        # Setup
+        description["stages"]["producer"]["max_count"] = 4
+
+        # Run
+        result, config, _ = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        producer, consumer = config.stages
+        assert producer.is_autoscaled() and not consumer.is_autoscaled()
+        (samples,) = config.queues
+        assert samples.producer_rate == 120
+        assert samples.maxsize == 60
+
+    def test_placement(self, description: dict) -> None:
+        """
+        Placement settings are collected, and stages without any have no placement.
+        """
+        # Setup
+        cpu = min(os.sched_getaffinity(0))
+        description["stages"]["producer"]["cpu_affinity"] = [cpu]
+        description["stages"]["producer"]["nice"] = 5
+        description["stages"]["producer"]["memory_limit"] = 512
+
+        # Run
+        result, config, _ = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        producer, consumer = config.stages
+        assert producer.placement.cpu_affinity == [cpu]
+        assert producer.placement.nice == 5
+        assert producer.placement.memory_limit == 512 * 2**20
+        assert consumer.placement is None
+
+    def test_invalid_placement(self, description: dict) -> None:
+        """
+        CPUs must be available to main, niceness in range, the memory limit positive,
+        and only worker processes can be placed.
+        """
+        # Setup
+        # Sized without the rates of the invalid producer
+        description["queues"]["samples"]["maxsize"] = 10
+        description["stages"]["producer"]["cpu_affinity"] = [max(os.sched_getaffinity(0)) + 1]
+        description["stages"]["producer"]["nice"] = 20
+        description["stages"]["producer"]["memory_limit"] = 0
+        description["stages"]["consumer"]["mode"] = "THREAD"
+        description["stages"]["consumer"]["nice"] = 5
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 4
+
+    def test_unsupported_placement(
+        self, description: dict, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        Placement settings the platform lacks are errors.
+        """
+        # Setup
+        monkeypatch.setattr(process_resources, "HAS_MEMORY_LIMIT", False)
+        # Sized without the rates of the invalid producer
+        description["queues"]["samples"]["maxsize"] = 10
+        description["stages"]["producer"]["memory_limit"] = 512
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert problems == ["Stage producer: ['memory_limit'] not supported on this platform"]
+
+    def test_argument_count_mismatch(self, description: dict) -> None:
+        """
+        Arguments that do not fit the worker signature are an error.
+        """
+        # Setup
+        description["stages"]["producer"]["arguments"] = [0.1, "extra"]
+
+        # Run
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert config is None
+        assert len(problems) == 1
+        assert "producer" in problems[0]
+
+    def test_all_errors_reported(self, description: dict) -> None:
+        """
+        Every problem is reported at once, not just the first.
+        """
+        # Setup
+        description["stages"]["consumer"]["inputs"] = {"missing": 1}
+        description["stages"]["producer"]["target"] = f"{TEST_MODULE}.no_such_worker"
+        description["stages"]["producer"]["mode"] = "FIBER"
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 4
+
+    def test_unknown_rate_needs_maxsize(self, description: dict) -> None:
+        """
+        A queue cannot be sized if a producer rate is unknown.
+        """
+        # Setup
+        description["stages"]["producer"]["outputs"]["samples"] = None
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert "maxsize" in problems[0]
+
+    def test_async_mode_mismatch(self, description: dict) -> None:
+        """
+        ASYNCIO mode requires an async target.
+        """
+        # Setup
+        description["stages"]["consumer"]["mode"] = "ASYNCIO"
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert "async" in problems[0]
+
+    def test_blackboards(self, description: dict) -> None:
+        """
+        Blackboards are bindings the pipeline provides, and unused ones are reported.
+        """
+        # Setup
+        description["blackboards"] = {
+            "blackboard": {"codec": f"{TEST_MODULE}.TestPipelineConfig", "payload_size": 64},
+            "unused": None,
+        }
+
+        # Run
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert result
+        used, unused = config.blackboards
+        assert (used.name, used.codec, used.payload_size) == ("blackboard", TestPipelineConfig, 64)
+        assert unused.codec is None
+        assert unused.payload_size == (
+            shared_memory_blackboard.SharedMemoryBlackboard.DEFAULT_PAYLOAD_SIZE
+        )
+        assert config.get_bindings() == set()
+        assert problems == ["Blackboard unused: no stage uses $unused"]
+
+    def test_invalid_blackboards(self, description: dict) -> None:
+        """
+        Unknown keys and codecs, and empty payloads are errors.
+        """
+        # Setup
+        description["blackboards"] = {
+            "blackboard": {"payload_size": 0},
+            "missing_codec": {"codec": f"{TEST_MODULE}.MissingCodec"},
+            "unknown_key": {"maxsize": 1},
+        }
+
+        # Run
+        result, _, problems = pipeline_config.PipelineConfig.create(description)
+
+        # Test
+        assert not result
+        assert len(problems) == 3
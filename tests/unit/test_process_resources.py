@@ -0,0 +1,223 @@
+"""
+Test worker process placement and reading process use from /proc.
+"""
+
+import multiprocessing as mp
+import os
+import pathlib
+import resource
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utilities.workers import process_resources
+from utilities.workers import worker_controller
+from utilities.workers import worker_metrics
+from utilities.workers import worker_trampoline
+
+
+NICE = 5
+MEMORY_HEADROOM = 64 * 2**20  # bytes
+ALLOCATION = 256 * 2**20  # bytes
+BUSY_TIME = 0.2  # seconds
+REPOSITORY_PATH = pathlib.Path(__file__).parents[2]
+
+
+def report_placement(
+    result_queue: "mp.Queue",
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that reports where it runs and whether it can allocate beyond its memory limit.
+    """
+    try:
+        allocation = bytearray(ALLOCATION)
+        is_allocated = len(allocation) == ALLOCATION
+    except MemoryError:
+        is_allocated = False
+
+    result_queue.put(
+        (
+            os.sched_getaffinity(0),
+            os.getpriority(os.PRIO_PROCESS, 0),
+            resource.getrlimit(resource.RLIMIT_AS)[0],
+            is_allocated,
+        )
+    )
+    assert controller is not None
+
+
+def get_address_space() -> int:
+    """
+    Returns the address space of this process in bytes.
+    """
+    with open("/proc/self/statm", encoding="utf-8") as statm_file:
+        return int(statm_file.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def test_invalid_placement() -> None:
+    """
+    CPUs must be available, niceness in range, and the memory limit positive.
+    """
+    # Setup
+    unavailable_cpu = max(os.sched_getaffinity(0)) + 1
+
+    # Run and test
+    assert not process_resources.ProcessPlacement.create(cpu_affinity=[])[0]
+    assert not process_resources.ProcessPlacement.create(cpu_affinity=[unavailable_cpu])[0]
+    assert not process_resources.ProcessPlacement.create(nice=process_resources.MAX_NICE + 1)[0]
+    assert not process_resources.ProcessPlacement.create(memory_limit=0)[0]
+
+
+@pytest.mark.parametrize(
+    "unsupported,settings",
+    [
+        ("HAS_CPU_AFFINITY", {"cpu_affinity": [0]}),
+        ("HAS_NICE", {"nice": NICE}),
+        ("HAS_MEMORY_LIMIT", {"memory_limit": ALLOCATION}),
+    ],
+)
+def test_unsupported_placement(
+    unsupported: str, settings: "dict[str, object]", monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Settings the platform lacks are rejected instead of failing in the worker.
+    """
+    # Setup
+    monkeypatch.setattr(process_resources, unsupported, False)
+
+    # Run
+    result, placement = process_resources.ProcessPlacement.create(**settings)  # type: ignore
+
+    # Test
+    assert not result
+    assert placement is None
+
+
+def test_import_without_resource() -> None:
+    """
+    Importing needs no resource module, which Windows lacks, and memory limits are rejected.
+    """
+    # Run
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "sys.modules['resource'] = None\n"
+            "from utilities.workers import process_resources\n"
+            "print(process_resources.ProcessPlacement.create(memory_limit=1)[0])",
+        ],
+        cwd=REPOSITORY_PATH,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    # Test
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "False"
+
+
+def test_placement_applied() -> None:
+    """
+    The worker process runs on its CPUs, with its niceness and memory limit,
+    and main is not affected.
+    """
+    # Setup
+    cpu = min(os.sched_getaffinity(0))
+    memory_limit = get_address_space() + MEMORY_HEADROOM
+    result, placement = process_resources.ProcessPlacement.create([cpu], NICE, memory_limit)
+    assert result
+    result_queue = mp.Queue()
+    worker = mp.Process(
+        target=worker_trampoline.run_worker,
+        args=(
+            report_placement,
+            (result_queue, worker_controller.WorkerController()),
+            {},
+            worker_trampoline.StartupTimeline(1),
+            0,
+            worker_metrics.MetricsRegistry(1),
+            None,
+            None,
+            placement,
+        ),
+    )
+    main_nice = os.getpriority(os.PRIO_PROCESS, 0)
+
+    # Run
+    worker.start()
+    cpu_affinity, nice, limit, is_allocated = result_queue.get(timeout=5)
+    worker.join(timeout=5)
+
+    # Test
+    assert worker.exitcode == 0
+    assert cpu_affinity == {cpu}
+    assert nice == NICE
+    assert limit == memory_limit
+    assert not is_allocated
+    assert os.getpriority(os.PRIO_PROCESS, 0) == main_nice
+    assert str(placement).startswith(f"CPUs [{cpu}], nice {NICE}, memory limit ")
+
+
+def test_usage() -> None:
+    """
+    CPU use is measured between reads, memory and CPUs are read each time.
+    """
+    # Setup
+    reader = process_resources.ProcessUsageReader()
+    pid = os.getpid()
+
+    # Run
+    first_result, first = reader.read(pid)
+    end = time.monotonic() + BUSY_TIME
+    while time.monotonic() < end:
+        pass
+    second_result, second = reader.read(pid)
+
+    # Test
+    assert first_result and second_result
+    assert first.cpu_fraction is None
+    assert 0.0 < second.cpu_fraction <= 1.5
+    assert second.rss > 0
+    assert second.last_cpu in os.sched_getaffinity(0)
+    assert second.cpu_affinity == sorted(os.sched_getaffinity(0))
+    assert second.nice == os.getpriority(os.PRIO_PROCESS, 0)
+
+
+def test_usage_of_ended_process() -> None:
+    """
+    A process that ended cannot be read.
+    """
+    # Setup
+    reader = process_resources.ProcessUsageReader()
+    process = mp.Process(target=time.sleep, args=(0.0,))
+    process.start()
+    process.join()
+
+    # Run
+    result, usage = reader.read(process.pid)  # type: ignore
+
+    # Test
+    assert not result
+    assert usage is None
+
+
+def test_usage_unsupported(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Without the calls to read the use, e.g. on macOS, nothing is read instead of raising.
+    """
+    # Setup
+    monkeypatch.delattr(os, "sched_getaffinity")
+    reader = process_resources.ProcessUsageReader()
+
+    # Run
+    result, usage = reader.read(os.getpid())
+
+    # Test
+    assert not reader.is_supported()
+    assert not result
+    assert usage is None
@@ -0,0 +1,64 @@
+"""
+Test the Prometheus text format.
+"""
+
+from utilities.workers import prometheus_text
+from utilities.workers import worker_metrics
+
+
+def test_families_grouped() -> None:
+    """
+    Samples of a family follow a single HELP and TYPE, in the order they were added.
+    """
+    # Setup
+    text = prometheus_text.PrometheusText()
+
+    # Run
+    text.add_sample("queue_depth", "gauge", "Items in the queue.", {"queue": "a"}, 1)
+    text.add_sample("restarts_total", "counter", "Restarts.", {}, 0)
+    text.add_sample("queue_depth", "gauge", "Items in the queue.", {"queue": "b"}, 2)
+    lines = text.render().splitlines()
+
+    # Test
+    assert lines == [
+        "# HELP queue_depth Items in the queue.",
+        "# TYPE queue_depth gauge",
+        'queue_depth{queue="a"} 1',
+        'queue_depth{queue="b"} 2',
+        "# HELP restarts_total Restarts.",
+        "# TYPE restarts_total counter",
+        "restarts_total 0",
+    ]
+
+
+def test_histogram_cumulative() -> None:
+    """
+    Buckets are cumulative and end with +Inf, which equals the count.
+    """
+    # Setup
+    registry = worker_metrics.MetricsRegistry(1)
+    recorder = registry.get_recorder(0)
+    recorder.observe("loop", 0.0000005)
+    recorder.observe("loop", 0.003)
+    text = prometheus_text.PrometheusText()
+
+    # Run
+    text.add_histogram("loop_seconds", "Loop.", {"worker": "w"}, registry.snapshot(0)["loop"])
+    lines = text.render().splitlines()
+
+    # Test
+    assert 'loop_seconds_bucket{worker="w",le="1e-06"} 1' in lines
+    assert 'loop_seconds_bucket{worker="w",le="0.004096"} 2' in lines
+    assert 'loop_seconds_bucket{worker="w",le="+Inf"} 2' in lines
+    assert 'loop_seconds_count{worker="w"} 2' in lines
+    assert lines[-2].startswith('loop_seconds_sum{worker="w"} 0.0030')
+
+
+def test_names_and_labels_escaped() -> None:
+    """
+    Metric names are sanitized and label values escaped.
+    """
+    assert prometheus_text.metric_name("get-wait.p99") == "get_wait_p99"
+    assert prometheus_text.metric_name("9lives") == "_9lives"
+    assert prometheus_text.format_labels({"path": 'a"b\\c'}) == '{path="a\\"b\\\\c"}'
+    assert prometheus_text.format_value(float("inf")) == "+Inf"
@@ -0,0 +1,342 @@
+"""
+Test the queue proxy wrapper.
+"""
+
+import multiprocessing as mp
+import queue
+import struct
+import threading
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+
+
+QUEUE_MAXSIZE = 4
+BLOCKED_TIMEOUT = 10.0  # seconds
+MAX_WAKE_TIME = 0.5  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class Point:
+    """
+    Minimal codec type.
+    """
+
+    __LAYOUT = struct.Struct("<dd")
+
+    def __init__(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the point.
+        """
+        return self.__LAYOUT.pack(self.x, self.y)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Point":
+        """
+        Unpacks the point.
+        """
+        return cls(*cls.__LAYOUT.unpack(data))
+
+
+def test_codec_round_trip() -> None:
+    """
+    Codec items are stored as raw bytes and decoded on the way out, sentinels pass through.
+    """
+    # Setup
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+        None,  # type: ignore
+        QUEUE_MAXSIZE,
+        queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        Point,
+    )
+
+    # Run
+    wrapper.queue.put(Point(1.5, -2.0))
+    wrapper.queue.put(None)
+    stored = wrapper._QueueProxyWrapper__backend_queue.get()  # type: ignore
+    wrapper._QueueProxyWrapper__backend_queue.put(stored)  # type: ignore
+    sentinel = wrapper.queue.get()
+    point = wrapper.queue.get()
+
+    # Test
+    assert isinstance(stored, bytes)
+    assert sentinel is None
+    assert (point.x, point.y) == (1.5, -2.0)
+    wrapper.release()
+
+
+@pytest.fixture(params=["shared_memory", "thread", "batch_manager", "sync_manager"])
+def wrapper(request: pytest.FixtureRequest) -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Creates an empty queue for each kind of backend, with and without native batches.
+    """
+    if request.param == "shared_memory":
+        wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAXSIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+        )
+        yield wrapper  # type: ignore
+        wrapper.release()
+        return
+
+    if request.param == "thread":
+        yield queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAXSIZE, queue_proxy_wrapper.QueueBackend.THREAD  # type: ignore
+        )
+        return
+
+    if request.param == "batch_manager":
+        mp_manager = queue_proxy_wrapper.QueueManager()
+        mp_manager.start()  # pylint: disable=consider-using-with
+    else:
+        mp_manager = mp.Manager()
+
+    yield queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE)  # type: ignore
+    mp_manager.shutdown()
+
+
+class TestBatch:
+    """
+    Batches behave the same on every backend.
+    """
+
+    def test_round_trip(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A batch comes out in order, limited by max_items.
+        """
+        # Run
+        put_count = wrapper.put_many([1, None, "three"])
+        first = wrapper.get_many(2, 0.0)
+        rest = wrapper.get_many(QUEUE_MAXSIZE, 0.0)
+
+        # Test
+        assert put_count == 3
+        assert first == [1, None]
+        assert rest == ["three"]
+
+    def test_put_many_full(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Items beyond maxsize are not put once the timeout expires.
+        """
+        # Run
+        put_count = wrapper.put_many(list(range(QUEUE_MAXSIZE + 2)), 0.05)
+        items = wrapper.get_many(QUEUE_MAXSIZE + 2, 0.0)
+
+        # Test
+        assert put_count == QUEUE_MAXSIZE
+        assert items == list(range(QUEUE_MAXSIZE))
+
+    def test_get_many_empty(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Nothing is returned once the timeout expires.
+        """
+        # Run
+        items = wrapper.get_many(QUEUE_MAXSIZE, 0.05)
+
+        # Test
+        assert not items
+
+
+class TestClose:
+    """
+    Closing wakes blocked workers on every backend.
+    """
+
+    def test_open_queue_times_out(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Before closing, a full or empty queue still raises once the timeout expires.
+        """
+        # Run
+        with pytest.raises(queue.Empty):
+            wrapper.queue.get(timeout=0.05)
+        for i in range(QUEUE_MAXSIZE):
+            wrapper.queue.put_nowait(i)
+        with pytest.raises(queue.Full):
+            wrapper.queue.put(QUEUE_MAXSIZE, timeout=0.05)
+
+        # Test
+        assert wrapper.queue.get() == 0
+
+    def test_wakes_blocked_get(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A consumer blocked on an empty queue receives the sentinel.
+        """
+        # Setup
+        results = []
+        consumer = threading.Thread(
+            target=lambda: results.append(wrapper.queue.get(timeout=BLOCKED_TIMEOUT))
+        )
+        consumer.start()
+        time.sleep(0.1)
+
+        # Run
+        start = time.monotonic()
+        wrapper.close()
+        consumer.join(BLOCKED_TIMEOUT)
+        wake_time = time.monotonic() - start
+
+        # Test
+        assert results == [None]
+        assert wake_time < MAX_WAKE_TIME
+
+    def test_wakes_blocked_put(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        A producer blocked on a full queue returns.
+        """
+        # Setup
+        wrapper.put_many(list(range(QUEUE_MAXSIZE)))
+        producer = threading.Thread(
+            target=lambda: wrapper.queue.put(QUEUE_MAXSIZE, timeout=BLOCKED_TIMEOUT)
+        )
+        producer.start()
+        time.sleep(0.1)
+
+        # Run
+        start = time.monotonic()
+        wrapper.close()
+        producer.join(BLOCKED_TIMEOUT)
+        wake_time = time.monotonic() - start
+
+        # Test
+        assert not producer.is_alive()
+        assert wake_time < MAX_WAKE_TIME
+
+    def test_closed_never_blocks(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        After closing, puts are discarded and gets return immediately.
+        """
+        if not wrapper._QueueProxyWrapper__is_batched:  # type: ignore
+            pytest.skip("Plain manager queues are only filled with sentinels")
+
+        # Setup
+        wrapper.put_many(list(range(QUEUE_MAXSIZE)))
+
+        # Run
+        wrapper.close()
+        wrapper.queue.put("discarded")
+        put_count = wrapper.put_many(["discarded"], BLOCKED_TIMEOUT)
+        item = wrapper.queue.get()
+        items = wrapper.get_many(QUEUE_MAXSIZE)
+
+        # Test
+        assert put_count == 0
+        assert item is None
+        assert not items
+
+
+@pytest.fixture(params=["shared_memory", "thread", "batch_manager", "sync_manager"])
+def create_wrapper(request: pytest.FixtureRequest) -> "(...) -> object":  # type: ignore
+    """
+    Creates queues with an overflow policy on one kind of backend.
+    """
+    mp_manager = None
+    if request.param == "batch_manager":
+        mp_manager = queue_proxy_wrapper.QueueManager()
+        mp_manager.start()  # pylint: disable=consider-using-with
+    elif request.param == "sync_manager":
+        mp_manager = mp.Manager()
+
+    backend = {
+        "shared_memory": queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+        "thread": queue_proxy_wrapper.QueueBackend.THREAD,
+    }.get(request.param, queue_proxy_wrapper.QueueBackend.MANAGER)
+    wrappers = []
+
+    def create(
+        policy: queue_proxy_wrapper.OverflowPolicy, keep_count: int = 1
+    ) -> queue_proxy_wrapper.QueueProxyWrapper:
+        wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+            mp_manager, QUEUE_MAXSIZE, backend, None, policy, keep_count  # type: ignore
+        )
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield create  # type: ignore
+
+    for wrapper in wrappers:
+        wrapper.release()
+    if mp_manager is not None:
+        mp_manager.shutdown()
+
+
+class TestOverflow:
+    """
+    Puts into a full queue drop items instead of blocking, and count them.
+    """
+
+    def test_drop_newest(self, create_wrapper: "(...) -> object") -> None:
+        """
+        The items that do not fit are dropped.
+        """
+        # Setup
+        wrapper = create_wrapper(queue_proxy_wrapper.OverflowPolicy.DROP_NEWEST)
+
+        # Run
+        put_count = wrapper.put_many(list(range(QUEUE_MAXSIZE + 2)))
+        wrapper.queue.put(QUEUE_MAXSIZE + 2)
+        items = wrapper.get_many(QUEUE_MAXSIZE + 3, 0.0)
+
+        # Test
+        assert put_count == QUEUE_MAXSIZE
+        assert items == list(range(QUEUE_MAXSIZE))
+        assert wrapper.get_dropped_count() == 3
+
+    def test_drop_oldest(self, create_wrapper: "(...) -> object") -> None:
+        """
+        The oldest items make room for new ones.
+        """
+        # Setup
+        wrapper = create_wrapper(queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST)
+
+        # Run
+        for i in range(QUEUE_MAXSIZE + 2):
+            wrapper.queue.put(i)
+        items = wrapper.get_many(QUEUE_MAXSIZE, 0.0)
+
+        # Test
+        assert items == list(range(2, QUEUE_MAXSIZE + 2))
+        assert wrapper.get_dropped_count() == 2
+
+    def test_keep_latest_n(self, create_wrapper: "(...) -> object") -> None:
+        """
+        A full queue is cut down to the newest items at once.
+        """
+        # Setup
+        wrapper = create_wrapper(queue_proxy_wrapper.OverflowPolicy.KEEP_LATEST_N, 2)
+
+        # Run
+        for i in range(QUEUE_MAXSIZE + 1):
+            wrapper.queue.put(i)
+        items = wrapper.get_many(QUEUE_MAXSIZE, 0.0)
+
+        # Test
+        assert items == [QUEUE_MAXSIZE - 1, QUEUE_MAXSIZE]
+        assert wrapper.get_dropped_count() == QUEUE_MAXSIZE - 1
+
+    def test_block_counts_nothing(self, wrapper: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        The default policy has no adapter and never drops.
+        """
+        assert wrapper.overflow_policy == queue_proxy_wrapper.OverflowPolicy.BLOCK
+        assert wrapper.get_dropped_count() == 0
+
+    def test_requires_maxsize(self) -> None:
+        """
+        Dropping needs a bound to overflow.
+        """
+        with pytest.raises(ValueError):
+            queue_proxy_wrapper.QueueProxyWrapper(
+                None,  # type: ignore
+                0,
+                queue_proxy_wrapper.QueueBackend.THREAD,
+                overflow_policy=queue_proxy_wrapper.OverflowPolicy.DROP_OLDEST,
+            )
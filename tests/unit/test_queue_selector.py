@@ -0,0 +1,104 @@
+"""
+Test the queue selector.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import queue_selector
+
+
+QUEUE_MAXSIZE = 4
+PUT_DELAY = 0.2  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def queues() -> "list[queue_proxy_wrapper.QueueProxyWrapper]":  # type: ignore
+    """
+    Creates 2 empty shared memory queues.
+    """
+    wrappers = [
+        queue_proxy_wrapper.QueueProxyWrapper(
+            None, QUEUE_MAXSIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+        )
+        for _ in range(2)
+    ]
+    yield wrappers  # type: ignore
+    for wrapper in wrappers:
+        wrapper.release()
+
+
+def put_later(wrapper: queue_proxy_wrapper.QueueProxyWrapper, item: object) -> None:
+    """
+    Producer process.
+    """
+    time.sleep(PUT_DELAY)
+    wrapper.queue.put(item)
+
+
+class TestQueueSelector:
+    """
+    Select returns exactly the queues with data.
+    """
+
+    def test_returns_ready_queues(
+        self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]"
+    ) -> None:
+        """
+        Only queues with data are returned.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector(queues)
+
+        # Run
+        queues[1].put_many([1, 2])
+        ready = selector.select(0.0)
+
+        # Test
+        assert ready == [queues[1]]
+
+    def test_timeout(self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+        """
+        Nothing is returned once the timeout expires.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector(queues)
+
+        # Run
+        start = time.monotonic()
+        ready = selector.select(0.1)
+        elapsed = time.monotonic() - start
+
+        # Test
+        assert not ready
+        assert elapsed >= 0.1
+
+    def test_wakes_on_put_from_process(
+        self, queues: "list[queue_proxy_wrapper.QueueProxyWrapper]"
+    ) -> None:
+        """
+        A put in another process wakes the selector before the timeout.
+        """
+        # Setup
+        selector = queue_selector.QueueSelector(queues)
+        worker = mp.Process(target=put_later, args=(queues[0], "item"))
+        worker.start()
+
+        # Run
+        start = time.monotonic()
+        ready = selector.select(5.0)
+        elapsed = time.monotonic() - start
+        worker.join()
+
+        # Test
+        assert ready == [queues[0]]
+        assert elapsed < 1.0
+        assert queues[0].queue.get_nowait() == "item"
@@ -0,0 +1,106 @@
+"""
+Test the running statistics used by the command worker.
+"""
+
+import math
+
+import pytest
+
+from modules.command import running_statistics
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SAMPLES = [0.1, -2.5, 3.75, 1e-3, 7.0, -0.3, 2.2]
+
+
+@pytest.fixture()
+def statistics() -> running_statistics.RunningStatistics:  # type: ignore
+    """
+    Statistics with every optional mean enabled.
+    """
+    stats = running_statistics.RunningStatistics(ewma_alpha=0.5, window_size=3)
+    yield stats  # type: ignore
+
+
+class TestRunningStatistics:
+    """
+    Incremental results match recomputing over the full history.
+    """
+
+    def test_empty(self, statistics: running_statistics.RunningStatistics) -> None:
+        """
+        No samples, no statistics.
+        """
+        assert statistics.mean is None
+        assert statistics.window_mean is None
+        assert statistics.ewma_mean is None
+        assert statistics.minimum is None
+
+    def test_mean_matches_sum(self, statistics: running_statistics.RunningStatistics) -> None:
+        """
+        Mean is bit for bit the previous sum / len result after every sample.
+        """
+        for i, sample in enumerate(SAMPLES):
+            # Run
+            statistics.update(sample)
+
+            # Test
+            expected = sum(SAMPLES[: i + 1]) / len(SAMPLES[: i + 1])
+            assert statistics.mean == expected
+
+    def test_min_max(self, statistics: running_statistics.RunningStatistics) -> None:
+        """
+        Extremes over all samples.
+        """
+        # Run
+        for sample in SAMPLES:
+            statistics.update(sample)
+
+        # Test
+        assert statistics.minimum == min(SAMPLES)
+        assert statistics.maximum == max(SAMPLES)
+        assert statistics.count == len(SAMPLES)
+
+    def test_window_mean(self, statistics: running_statistics.RunningStatistics) -> None:
+        """
+        Window mean only covers the last window_size samples.
+        """
+        # Setup
+        expected = sum(SAMPLES[-3:]) / 3
+
+        # Run
+        for sample in SAMPLES:
+            statistics.update(sample)
+
+        # Test
+        assert math.isclose(statistics.window_mean, expected)
+
+    def test_ewma(self, statistics: running_statistics.RunningStatistics) -> None:
+        """
+        EWMA starts at the first sample and moves alpha of the way to each new sample.
+        """
+        # Setup
+        expected = SAMPLES[0]
+        for sample in SAMPLES[1:]:
+            expected = 0.5 * sample + 0.5 * expected
+
+        # Run
+        for sample in SAMPLES:
+            statistics.update(sample)
+
+        # Test
+        assert math.isclose(statistics.ewma_mean, expected)
+
+    def test_invalid_settings(self) -> None:
+        """
+        Out of range settings are rejected.
+        """
+        with pytest.raises(ValueError):
+            running_statistics.RunningStatistics(ewma_alpha=0.0)
+
+        with pytest.raises(ValueError):
+            running_statistics.RunningStatistics(window_size=0)
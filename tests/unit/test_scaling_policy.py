@@ -0,0 +1,127 @@
+"""
+Test the worker scaling policy.
+"""
+
+import pytest
+
+from utilities.workers import scaling_policy
+
+
+MIN_COUNT = 1
+MAX_COUNT = 4
+TARGET_UTILIZATION = 0.5
+SCALE_UP_FILL = 0.5
+SCALE_DOWN_DELAY = 10.0  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def policy() -> scaling_policy.ScalingPolicy:  # type: ignore
+    """
+    Scales between 1 and 4 workers, each busy half of the time.
+    """
+    result, created = scaling_policy.ScalingPolicy.create(
+        MIN_COUNT, MAX_COUNT, TARGET_UTILIZATION, SCALE_UP_FILL, SCALE_DOWN_DELAY
+    )
+    assert result
+    assert created is not None
+
+    yield created  # type: ignore
+
+
+def load(
+    timestamp: float, worker_count: int, fill: "float | None", utilization: "float | None"
+) -> scaling_policy.LoadSample:
+    """
+    Returns a sample with the throughput left out, since the policy does not use it.
+    """
+    return scaling_policy.LoadSample(timestamp, worker_count, fill, utilization, 0.0)
+
+
+class TestScaleUp:
+    """
+    Workers are added as soon as they are needed.
+    """
+
+    def test_utilization(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        Workers are added until each is busy for at most the target fraction.
+        """
+        # Run and test
+        assert policy.decide(load(0.0, 2, 0.0, 0.9)) == 4
+        assert policy.decide(load(1.0, 2, 0.0, 0.7)) == 3
+        assert policy.decide(load(2.0, 2, 0.0, 0.5)) == 2
+
+    def test_fill(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        A backed up input adds a worker even if the workers do not look busy.
+        """
+        # Run and test
+        assert policy.decide(load(0.0, 2, 0.6, 0.1)) == 3
+        assert policy.decide(load(1.0, 2, None, None)) == 2
+
+    def test_bounds(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        The count stays within the bounds.
+        """
+        # Run and test
+        assert policy.decide(load(0.0, 4, 1.0, 1.0)) == MAX_COUNT
+        assert policy.get_needed_count(load(0.0, 4, 1.0, 1.0)) == 8
+
+
+class TestScaleDown:
+    """
+    Workers are retired one at a time once fewer have been enough for a while.
+    """
+
+    def test_delay(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        Idle workers are kept until the delay has passed, then retired one by one.
+        """
+        # Run
+        counts = [
+            policy.decide(load(timestamp, 3, 0.0, 0.0))
+            for timestamp in (0.0, SCALE_DOWN_DELAY / 2, SCALE_DOWN_DELAY)
+        ]
+        next_count = policy.decide(load(SCALE_DOWN_DELAY + 1, 2, 0.0, 0.0))
+
+        # Test
+        assert counts == [3, 3, 2]
+        # The delay starts over for the next retirement
+        assert next_count == 2
+
+    def test_load_resets_delay(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        A busy moment restarts the delay.
+        """
+        # Run
+        policy.decide(load(0.0, 3, 0.0, 0.0))
+        policy.decide(load(SCALE_DOWN_DELAY / 2, 3, 0.0, 0.5))
+        count = policy.decide(load(SCALE_DOWN_DELAY, 3, 0.0, 0.0))
+
+        # Test
+        assert count == 3
+
+    def test_never_below_min(self, policy: scaling_policy.ScalingPolicy) -> None:
+        """
+        The last worker is not retired.
+        """
+        # Run and test
+        assert policy.decide(load(0.0, MIN_COUNT, 0.0, 0.0)) == MIN_COUNT
+        assert policy.decide(load(SCALE_DOWN_DELAY * 2, MIN_COUNT, 0.0, 0.0)) == MIN_COUNT
+
+
+def test_invalid_policy() -> None:
+    """
+    Bounds and thresholds are validated.
+    """
+    # Run and test
+    assert not scaling_policy.ScalingPolicy.create(0, 2, 0.5, 0.5, 1.0)[0]
+    assert not scaling_policy.ScalingPolicy.create(3, 2, 0.5, 0.5, 1.0)[0]
+    assert not scaling_policy.ScalingPolicy.create(1, 2, 0.0, 0.5, 1.0)[0]
+    assert not scaling_policy.ScalingPolicy.create(1, 2, 0.5, 1.5, 1.0)[0]
+    assert not scaling_policy.ScalingPolicy.create(1, 2, 0.5, 0.5, -1.0)[0]
@@ -0,0 +1,148 @@
+"""
+Test the shared memory blackboard.
+"""
+
+import multiprocessing as mp
+import threading
+import time
+
+import pytest
+
+from utilities.workers import shared_memory_blackboard
+
+
+NUM_ITEMS = 2000
+WRITE_TIME = 0.05  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def blackboard() -> shared_memory_blackboard.SharedMemoryBlackboard:  # type: ignore
+    """
+    Creates an empty blackboard of pickled items.
+    """
+    board = shared_memory_blackboard.SharedMemoryBlackboard()
+    yield board  # type: ignore
+    board.release()
+
+
+def publish_range(board: shared_memory_blackboard.SharedMemoryBlackboard, count: int) -> None:
+    """
+    Writer process publishing consistent pairs.
+    """
+    for i in range(1, count + 1):
+        board.publish((i, -i))
+
+
+class SlowClock:
+    """
+    Stand-in for the time module that stalls the writer while the slot is half updated.
+    """
+
+    def __init__(self) -> None:
+        self.writing = threading.Event()
+
+    def monotonic_ns(self) -> int:
+        """
+        Signals the reader, then holds the writer with the new payload but the old header.
+        """
+        self.writing.set()
+        time.sleep(WRITE_TIME)
+        return time.monotonic_ns()
+
+
+class TestBlackboard:
+    """
+    Readers see the newest item and count what they missed.
+    """
+
+    def test_empty(self, blackboard: shared_memory_blackboard.SharedMemoryBlackboard) -> None:
+        """
+        Nothing published yet.
+        """
+        # Setup
+        reader = shared_memory_blackboard.BlackboardReader(blackboard)
+
+        # Run
+        is_new, item = reader.read_latest()
+
+        # Test
+        assert not is_new
+        assert item is None
+        assert reader.staleness() is None
+
+    def test_latest_and_skipped(
+        self, blackboard: shared_memory_blackboard.SharedMemoryBlackboard
+    ) -> None:
+        """
+        Only the newest item is read, older ones count as skipped.
+        """
+        # Setup
+        reader = shared_memory_blackboard.BlackboardReader(blackboard)
+
+        # Run
+        for i in range(3):
+            blackboard.publish(i)
+        first = reader.read_latest()
+        second = reader.read_latest()
+
+        # Test
+        assert first == (True, 2)
+        assert second == (False, 2)
+        assert reader.skipped_count == 2
+        assert reader.last_sequence == blackboard.published_count() == 3
+        assert reader.staleness() >= 0.0
+
+    def test_no_torn_reads(
+        self, blackboard: shared_memory_blackboard.SharedMemoryBlackboard
+    ) -> None:
+        """
+        Reads concurrent with a writer process are never a mix of 2 items.
+        """
+        # Setup
+        reader = shared_memory_blackboard.BlackboardReader(blackboard)
+        writer = mp.Process(target=publish_range, args=(blackboard, NUM_ITEMS))
+
+        # Run
+        writer.start()
+        items = []
+        while writer.is_alive() or reader.last_sequence < NUM_ITEMS:
+            is_new, item = reader.read_latest()
+            if is_new:
+                items.append(item)
+        writer.join()
+
+        # Test
+        assert all(first == -second for first, second in items)
+        assert items[-1] == (NUM_ITEMS, -NUM_ITEMS)
+        assert reader.new_count + reader.skipped_count == NUM_ITEMS
+
+    def test_reader_retries_during_write(
+        self,
+        blackboard: shared_memory_blackboard.SharedMemoryBlackboard,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """
+        A read while the writer is between the payload and the header retries
+        until the write is done, instead of returning the new payload with the old length.
+        """
+        # Setup
+        blackboard.publish(("short", 1))
+        clock = SlowClock()
+        monkeypatch.setattr(shared_memory_blackboard, "time", clock)
+        writer = threading.Thread(target=blackboard.publish, args=(("much longer item", 2),))
+
+        # Run
+        writer.start()
+        clock.writing.wait()
+        sequence, _, item = blackboard.read()
+        writer.join()
+
+        # Test
+        assert blackboard.retry_count > 0
+        assert sequence == 2
+        assert item == ("much longer item", 2)
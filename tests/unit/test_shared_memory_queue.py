@@ -0,0 +1,144 @@
+"""
+Test the shared memory queue backend.
+"""
+
+import multiprocessing as mp
+import queue
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_memory_queue
+
+
+QUEUE_MAXSIZE = 4
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def shared_queue() -> shared_memory_queue.SharedMemoryQueue:  # type: ignore
+    """
+    Creates an empty shared memory queue.
+    """
+    ring = shared_memory_queue.SharedMemoryQueue(QUEUE_MAXSIZE)
+    yield ring  # type: ignore
+    ring.release()
+
+
+def put_range(ring: shared_memory_queue.SharedMemoryQueue, count: int) -> None:
+    """
+    Producer process.
+    """
+    for i in range(count):
+        ring.put(i)
+
+
+class TestSharedMemoryQueue:
+    """
+    Queue semantics match `queue.Queue`.
+    """
+
+    def test_fifo_order(self, shared_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items come out in the order they went in.
+        """
+        # Setup
+        expected = [1, "two", (3.0, None)]
+
+        # Run
+        for item in expected:
+            shared_queue.put(item)
+        actual = [shared_queue.get() for _ in expected]
+
+        # Test
+        assert actual == expected
+
+    def test_wraps_around(self, shared_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Slots are reused after the write index passes maxsize.
+        """
+        # Setup
+        expected = list(range(QUEUE_MAXSIZE * 3))
+
+        # Run
+        actual = []
+        for item in expected:
+            shared_queue.put(item)
+            actual.append(shared_queue.get())
+
+        # Test
+        assert actual == expected
+        assert shared_queue.empty()
+
+    def test_full_raises(self, shared_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Putting into a full queue times out like `queue.Queue`.
+        """
+        # Setup
+        for i in range(QUEUE_MAXSIZE):
+            shared_queue.put(i)
+
+        # Run and test
+        assert shared_queue.full()
+        with pytest.raises(queue.Full):
+            shared_queue.put(QUEUE_MAXSIZE, timeout=0.01)
+
+    def test_empty_raises(self, shared_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Getting from an empty queue times out like `queue.Queue`.
+        """
+        with pytest.raises(queue.Empty):
+            shared_queue.get_nowait()
+
+    def test_oversized_item(self, shared_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        Items larger than a slot are rejected without consuming a slot.
+        """
+        # Setup
+        item = b"0" * shared_memory_queue.SharedMemoryQueue.DEFAULT_SLOT_SIZE
+
+        # Run and test
+        with pytest.raises(ValueError):
+            shared_queue.put(item)
+        assert shared_queue.qsize() == 0
+
+    def test_across_processes(self, shared_queue: shared_memory_queue.SharedMemoryQueue) -> None:
+        """
+        A producer process blocks on the full queue until this process drains it.
+        """
+        # Setup
+        count = QUEUE_MAXSIZE * 10
+        expected = list(range(count))
+        producer = mp.Process(target=put_range, args=(shared_queue, count))
+
+        # Run
+        producer.start()
+        actual = [shared_queue.get(timeout=5) for _ in range(count)]
+        producer.join()
+
+        # Test
+        assert actual == expected
+
+
+def test_wrapper_shared_memory_backend() -> None:
+    """
+    Wrapper keeps the sentinel behaviour on the shared memory backend.
+    """
+    # Setup
+    wrapper = queue_proxy_wrapper.QueueProxyWrapper(
+        None, QUEUE_MAXSIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+
+    # Run
+    wrapper.fill_queue_with_sentinel()
+    is_full = wrapper.queue.full()
+    wrapper.drain_queue()
+
+    # Test
+    assert is_full
+    assert wrapper.queue.empty()
+    wrapper.release()
@@ -0,0 +1,140 @@
+"""
+Test shutdown latency of a pipeline of worker processes.
+"""
+
+import multiprocessing as mp
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+
+
+QUEUE_MAXSIZE = 4
+WORKER_PERIOD = 10.0  # seconds
+SLOW_ITERATION = 0.2  # seconds
+# Scheduling margin on top of the slowest loop iteration
+MAX_SHUTDOWN_MARGIN = 0.5  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def source_worker(
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Produces faster than consumed, so ends up blocked on a full queue.
+    """
+    count = 0
+    while not controller.is_exit_requested():
+        output_queue.queue.put(count)
+        count += 1
+
+
+def relay_worker(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Forwards items to a queue nobody reads, so ends up blocked on either queue.
+    """
+    while not controller.is_exit_requested():
+        item = input_queue.queue.get()
+        if item is None:
+            continue
+        output_queue.queue.put(item)
+
+
+def idle_worker(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Blocked on an empty queue.
+    """
+    while not controller.is_exit_requested():
+        input_queue.queue.get()
+
+
+def periodic_worker(controller: worker_controller.WorkerController) -> None:
+    """
+    Waits a long period between iterations.
+    """
+    while not controller.is_exit_requested():
+        controller.wait_for_exit(WORKER_PERIOD)
+
+
+def slow_worker(controller: worker_controller.WorkerController) -> None:
+    """
+    Busy for a whole iteration, so cannot be woken early.
+    """
+    while not controller.is_exit_requested():
+        deadline = time.monotonic() + SLOW_ITERATION
+        while time.monotonic() < deadline:
+            pass
+
+
+@pytest.fixture(params=["shared_memory", "batch_manager"])
+def queues(  # type: ignore
+    request: pytest.FixtureRequest,
+) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+    """
+    Creates the 3 queues of the pipeline on one kind of backend.
+    """
+    if request.param == "shared_memory":
+        queues = [
+            queue_proxy_wrapper.QueueProxyWrapper(
+                None, QUEUE_MAXSIZE, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+            )
+            for _ in range(3)
+        ]
+        yield queues  # type: ignore
+        for wrapper in queues:
+            wrapper.release()
+        return
+
+    mp_manager = queue_proxy_wrapper.QueueManager()
+    mp_manager.start()  # pylint: disable=consider-using-with
+    yield [  # type: ignore
+        queue_proxy_wrapper.QueueProxyWrapper(mp_manager, QUEUE_MAXSIZE) for _ in range(3)
+    ]
+    mp_manager.shutdown()
+
+
+def test_shutdown_latency(queues: "list[queue_proxy_wrapper.QueueProxyWrapper]") -> None:
+    """
+    Every worker exits within the slowest loop iteration, however long the others block for.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    source_to_relay, relay_to_none, idle = queues
+    workers = [
+        mp.Process(target=source_worker, args=(source_to_relay, controller)),
+        mp.Process(target=relay_worker, args=(source_to_relay, relay_to_none, controller)),
+        mp.Process(target=idle_worker, args=(idle, controller)),
+        mp.Process(target=periodic_worker, args=(controller,)),
+        mp.Process(target=slow_worker, args=(controller,)),
+    ]
+    for worker in workers:
+        worker.start()
+    # Let the source and relay block on full queues
+    time.sleep(0.5)
+
+    # Run
+    start = time.monotonic()
+    controller.request_exit()
+    for wrapper in queues:
+        wrapper.close()
+    for worker in workers:
+        worker.join(WORKER_PERIOD)
+    shutdown_time = time.monotonic() - start
+
+    # Test
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert shutdown_time < SLOW_ITERATION + MAX_SHUTDOWN_MARGIN
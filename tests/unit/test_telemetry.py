@@ -0,0 +1,286 @@
+"""
+Test waiting for telemetry messages, and packing telemetry into bytes.
+"""
+
+import socket
+import struct
+import threading
+import time
+
+import pytest
+from pymavlink.dialects.v20 import ardupilotmega as mavlink2
+
+from modules.telemetry import telemetry
+from tests.unit import stub_logger
+
+
+ARRIVAL_TIME = 0.1  # seconds
+# Timer slack
+TOLERANCE = 0.2  # seconds
+# Telemetry gives up after this long without messages
+TELEMETRY_TIMEOUT = 1.0  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class SocketConnection:
+    """
+    Stand-in for `mavutil.mavfile` whose file descriptor becomes readable when a message arrives.
+    """
+
+    def __init__(self) -> None:
+        self.__reading_end, self.__writing_end = socket.socketpair()
+        self.__reading_end.setblocking(False)
+        self.__messages: "list[object]" = []
+        self.fd = self.__reading_end.fileno()
+        self.recv_calls: "list[tuple[bool, float | None]]" = []
+
+    def arrive(self, msg: object) -> None:
+        """
+        Delivers a message, making the file descriptor readable.
+        """
+        self.__messages.append(msg)
+        self.__writing_end.send(b"\x00")
+
+    def recv_match(self, blocking: bool = False, timeout: "float | None" = None) -> "object | None":
+        """
+        Returns the next message that arrived, None if there is none.
+        """
+        self.recv_calls.append((blocking, timeout))
+        try:
+            self.__reading_end.recv(1)
+        except BlockingIOError:
+            return None
+
+        return self.__messages.pop(0)
+
+    def close(self) -> None:
+        """
+        Closes both ends of the socket pair.
+        """
+        self.__reading_end.close()
+        self.__writing_end.close()
+
+
+class BlockingConnection:
+    """
+    Stand-in for a `mavutil.mavfile` without a file descriptor, records the blocking waits.
+    """
+
+    def __init__(self, msg: "object | None") -> None:
+        """
+        msg: Message a blocking wait returns.
+        """
+        self.__msg = msg
+        self.recv_calls: "list[tuple[bool, float | None]]" = []
+
+    def recv_match(self, blocking: bool = False, timeout: "float | None" = None) -> "object | None":
+        """
+        Returns the message only to a blocking wait.
+        """
+        self.recv_calls.append((blocking, timeout))
+        return self.__msg if blocking else None
+
+
+def full_telemetry() -> telemetry.TelemetryData:
+    """
+    Telemetry with every field set to a distinct value.
+    """
+    return telemetry.TelemetryData(
+        *[1234] + [float(i) + 0.5 for i in range(len(telemetry.TelemetryData.__slots__) - 1)]
+    )
+
+
+def get_fields(telemetry_data: telemetry.TelemetryData) -> "list[object]":
+    """
+    Returns the field values in layout order.
+    """
+    return [getattr(telemetry_data, name) for name in telemetry.TelemetryData.__slots__]
+
+
+def attitude() -> object:
+    """
+    An ATTITUDE message.
+    """
+    return mavlink2.MAVLink_attitude_message(100, 0.1, 0.2, 0.3, 0.0, 0.0, 0.0)
+
+
+def create_telemetry(connection: object) -> telemetry.Telemetry:
+    """
+    Telemetry waiting on the connection in event mode.
+    """
+    result, created = telemetry.Telemetry.create(
+        connection, stub_logger.StubLogger(), telemetry.WaitMode.EVENT  # type: ignore
+    )
+    assert result
+    assert created is not None
+
+    return created
+
+
+@pytest.fixture()
+def connection() -> SocketConnection:  # type: ignore
+    """
+    Connection with a socket pair file descriptor and no messages yet.
+    """
+    created = SocketConnection()
+
+    yield created  # type: ignore
+
+    created.close()
+
+
+class TestEventWait:
+    """
+    Event mode blocks on the connection instead of polling it.
+    """
+
+    def test_message_before_deadline(self, connection: SocketConnection) -> None:
+        """
+        A message arriving during the wait is returned as soon as it arrives.
+        """
+        # Setup
+        telemetry_object = create_telemetry(connection)
+        msg = attitude()
+        timer = threading.Timer(ARRIVAL_TIME, connection.arrive, args=(msg,))
+
+        # Run
+        start = time.monotonic()
+        timer.start()
+        received = telemetry_object._Telemetry__receive(ARRIVAL_TIME + TOLERANCE * 2)
+        elapsed = time.monotonic() - start
+        timer.join()
+
+        # Test
+        assert received is msg
+        assert ARRIVAL_TIME <= elapsed < ARRIVAL_TIME + TOLERANCE
+        # Checked once before waiting and once when readable
+        assert connection.recv_calls == [(False, None), (False, None)]
+
+    def test_message_after_deadline(self, connection: SocketConnection) -> None:
+        """
+        The wait ends at its deadline, and a later message is returned by the next wait.
+        """
+        # Setup
+        telemetry_object = create_telemetry(connection)
+        msg = attitude()
+        timer = threading.Timer(ARRIVAL_TIME * 3, connection.arrive, args=(msg,))
+
+        # Run
+        start = time.monotonic()
+        timer.start()
+        first = telemetry_object._Telemetry__receive(ARRIVAL_TIME)
+        elapsed = time.monotonic() - start
+        timer.join()
+        second = telemetry_object._Telemetry__receive(ARRIVAL_TIME)
+
+        # Test
+        assert first is None
+        assert ARRIVAL_TIME <= elapsed < ARRIVAL_TIME + TOLERANCE
+        assert second is msg
+
+    def test_without_fd(self) -> None:
+        """
+        Connections without a file descriptor are waited on with a blocking recv_match.
+        """
+        # Setup
+        msg = attitude()
+        blocking_connection = BlockingConnection(msg)
+        telemetry_object = create_telemetry(blocking_connection)
+
+        # Run
+        received = telemetry_object._Telemetry__receive(ARRIVAL_TIME)
+
+        # Test
+        assert received is msg
+        assert blocking_connection.recv_calls == [(False, None), (True, ARRIVAL_TIME)]
+
+    def test_timeout(self, connection: SocketConnection) -> None:
+        """
+        With nothing arriving, run() gives up after the telemetry timeout without spinning.
+        """
+        # Setup
+        telemetry_object = create_telemetry(connection)
+
+        # Run
+        start = time.monotonic()
+        telemetry_data = telemetry_object.run()
+        elapsed = time.monotonic() - start
+
+        # Test
+        assert telemetry_data is None
+        assert TELEMETRY_TIMEOUT <= elapsed < TELEMETRY_TIMEOUT + TOLERANCE
+        assert len(connection.recv_calls) < 10
+
+
+class TestCodec:
+    """
+    Telemetry packs into a fixed layout with a mask of the fields that are set.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Every field comes back unchanged.
+        """
+        # Setup
+        telemetry_data = full_telemetry()
+
+        # Run
+        data = telemetry_data.to_bytes()
+        unpacked = telemetry.TelemetryData.from_bytes(data)
+
+        # Test
+        assert get_fields(unpacked) == get_fields(telemetry_data)
+        assert isinstance(unpacked.time_since_boot, int)
+        mask = struct.unpack_from("<H", data)[0]
+        assert mask == (1 << len(telemetry.TelemetryData.__slots__)) - 1
+
+    def test_round_trip_with_none(self) -> None:
+        """
+        Fields that are None are left out of the mask and come back as None, not 0.
+        """
+        # Setup
+        telemetry_data = full_telemetry()
+        telemetry_data.time_since_boot = None
+        telemetry_data.y = None
+        telemetry_data.yaw_speed = None
+        names = telemetry.TelemetryData.__slots__
+
+        # Run
+        data = telemetry_data.to_bytes()
+        unpacked = telemetry.TelemetryData.from_bytes(data)
+
+        # Test
+        assert get_fields(unpacked) == get_fields(telemetry_data)
+        mask = struct.unpack_from("<H", data)[0]
+        none_bits = [names.index(name) for name in ("time_since_boot", "y", "yaw_speed")]
+        for i in range(len(names)):
+            assert (mask >> i & 1) == (i not in none_bits)
+
+    @pytest.mark.parametrize("length_change", [-1, 1])
+    def test_wrong_length(self, length_change: int) -> None:
+        """
+        Buffers shorter or longer than the layout are rejected.
+        """
+        # Setup
+        data = full_telemetry().to_bytes()
+        data = data[:length_change] if length_change < 0 else data + bytes(length_change)
+
+        # Run and test
+        with pytest.raises(struct.error):
+            telemetry.TelemetryData.from_bytes(data)
+
+    def test_unknown_attribute(self) -> None:
+        """
+        Only the declared fields can be set.
+        """
+        # Setup
+        telemetry_data = full_telemetry()
+
+        # Run and test
+        with pytest.raises(AttributeError):
+            setattr(telemetry_data, "altitude", 1.0)
+        assert not hasattr(telemetry_data, "__dict__")
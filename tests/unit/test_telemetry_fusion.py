@@ -0,0 +1,200 @@
+"""
+Test fusing attitude and position into telemetry at a fixed rate.
+"""
+
+import math
+
+import pytest
+from pymavlink.dialects.v20 import ardupilotmega as mavlink2
+
+from modules.telemetry import telemetry_fusion
+
+
+OUTPUT_RATE = 10  # samples per second, one every 100 ms
+BUFFER_LENGTH = 4
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def attitude(time_boot_ms: int, roll: float = 0.0, yaw: float = 0.0) -> object:
+    """
+    ATTITUDE message rolling and yawing at rates of 1 rad/s.
+    """
+    return mavlink2.MAVLink_attitude_message(time_boot_ms, roll, 0.0, yaw, 1.0, 0.0, 1.0)
+
+
+def position(time_boot_ms: int, x: float = 0.0) -> object:
+    """
+    LOCAL_POSITION_NED message moving north at 10 m/s.
+    """
+    return mavlink2.MAVLink_local_position_ned_message(time_boot_ms, x, 0.0, 0.0, 10.0, 0.0, 0.0)
+
+
+def pop_all(fusion: telemetry_fusion.TelemetryFusion) -> "list":
+    """
+    Returns the telemetry of every output time the buffered samples cover.
+    """
+    outputs = []
+    telemetry_data = fusion.pop_ready()
+    while telemetry_data is not None:
+        outputs.append(telemetry_data)
+        telemetry_data = fusion.pop_ready()
+
+    return outputs
+
+
+@pytest.fixture()
+def fusion() -> telemetry_fusion.TelemetryFusion:  # type: ignore
+    """
+    Fusion at 10 samples per second with 4 samples per stream.
+    """
+    result, created = telemetry_fusion.TelemetryFusion.create(OUTPUT_RATE, BUFFER_LENGTH)
+    assert result
+    assert created is not None
+
+    yield created  # type: ignore
+
+
+def test_fixed_rate(fusion: telemetry_fusion.TelemetryFusion) -> None:
+    """
+    Streams sampled every 200 ms are output every 100 ms, interpolated linearly in between.
+    """
+    # Setup
+    for time_ms in (0, 200, 400):
+        fusion.add_message(attitude(time_ms, roll=time_ms / 1000))
+        fusion.add_message(position(time_ms, x=time_ms / 100))
+
+    # Run
+    outputs = pop_all(fusion)
+
+    # Test
+    assert [output.time_since_boot for output in outputs] == [0, 100, 200, 300, 400]
+    assert [output.x for output in outputs] == pytest.approx([0.0, 1.0, 2.0, 3.0, 4.0])
+    assert [output.roll for output in outputs] == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    assert all(output.x_velocity == pytest.approx(10.0) for output in outputs)
+    assert all(output.yaw_speed == pytest.approx(1.0) for output in outputs)
+
+
+def test_yaw_across_pi(fusion: telemetry_fusion.TelemetryFusion) -> None:
+    """
+    Yaw turning through pi takes the shorter arc and stays wrapped, instead of sweeping
+    back through 0.
+    """
+    # Setup
+    for time_ms, yaw in ((0, 3.0), (400, -3.0)):
+        fusion.add_message(attitude(time_ms, yaw=yaw))
+        fusion.add_message(position(time_ms))
+    arc = 2 * math.pi - 6.0
+
+    # Run
+    yaws = [output.yaw for output in pop_all(fusion)]
+
+    # Test
+    assert yaws[1] == pytest.approx(3.0 + arc / 4)
+    assert yaws[3] == pytest.approx(-3.0 - arc / 4)
+    assert all(abs(yaw) >= 3.0 for yaw in yaws)
+    assert all(-math.pi <= yaw < math.pi for yaw in yaws)
+
+
+def test_reboot_resets(fusion: telemetry_fusion.TelemetryFusion) -> None:
+    """
+    A time_since_boot far behind the buffered samples is a reboot,
+    which drops both streams and starts the output times again.
+    """
+    # Setup
+    for time_ms in (10000, 10100):
+        fusion.add_message(attitude(time_ms))
+        fusion.add_message(position(time_ms))
+    pop_all(fusion)
+
+    # Run
+    is_used = fusion.add_message(attitude(50))
+    before_position = fusion.pop_ready()
+    fusion.add_message(position(50))
+    fusion.add_message(attitude(150))
+    fusion.add_message(position(150))
+    outputs = pop_all(fusion)
+
+    # Test
+    assert is_used
+    assert before_position is None
+    assert [output.time_since_boot for output in outputs] == [50, 150]
+
+
+def test_duplicate_and_out_of_order(fusion: telemetry_fusion.TelemetryFusion) -> None:
+    """
+    Samples not newer than the latest of their stream, and other messages, are not used.
+    """
+    # Setup
+    fusion.add_message(attitude(0))
+    fusion.add_message(attitude(200))
+
+    # Run
+    is_duplicate_used = fusion.add_message(attitude(200))
+    is_out_of_order_used = fusion.add_message(attitude(100))
+    is_heartbeat_used = fusion.add_message(mavlink2.MAVLink_heartbeat_message(0, 0, 0, 0, 0, 0))
+    is_position_used = fusion.add_message(position(100))
+
+    # Test
+    assert not is_duplicate_used
+    assert not is_out_of_order_used
+    assert not is_heartbeat_used
+    assert is_position_used
+    assert [sample[0] for sample in fusion._TelemetryFusion__attitudes] == [0, 200]
+
+
+def test_waits_for_bracket(fusion: telemetry_fusion.TelemetryFusion) -> None:
+    """
+    An output time is only popped once both streams have samples at or after it.
+    """
+    # Setup
+    fusion.add_message(attitude(0))
+    fusion.add_message(attitude(200))
+    fusion.add_message(position(0, x=0.0))
+
+    # Run
+    first = pop_all(fusion)
+    fusion.add_message(position(200, x=2.0))
+    second = pop_all(fusion)
+
+    # Test
+    assert [output.time_since_boot for output in first] == [0]
+    assert [output.time_since_boot for output in second] == [100, 200]
+    assert second[0].x == pytest.approx(1.0)
+
+
+def test_buffer_length() -> None:
+    """
+    Each stream keeps only the newest buffer_length samples, so output starts at the oldest kept.
+    """
+    # Setup
+    result, fusion = telemetry_fusion.TelemetryFusion.create(OUTPUT_RATE, 2)
+    assert result
+    assert fusion is not None
+
+    # Run
+    for time_ms in (0, 100, 200):
+        fusion.add_message(attitude(time_ms))
+        fusion.add_message(position(time_ms))
+    outputs = pop_all(fusion)
+
+    # Test
+    assert len(fusion._TelemetryFusion__attitudes) == 2
+    assert len(fusion._TelemetryFusion__positions) == 2
+    assert [output.time_since_boot for output in outputs] == [100, 200]
+
+
+@pytest.mark.parametrize("output_rate,buffer_length", [(0.0, BUFFER_LENGTH), (OUTPUT_RATE, 1)])
+def test_invalid_create(output_rate: float, buffer_length: int) -> None:
+    """
+    The output rate must be positive and each stream must hold a bracket.
+    """
+    # Run
+    result, fusion = telemetry_fusion.TelemetryFusion.create(output_rate, buffer_length)
+
+    # Test
+    assert not result
+    assert fusion is None
@@ -0,0 +1,281 @@
+"""
+Test scaling workers with their load.
+"""
+
+import os
+import time
+
+import pytest
+
+from tests.unit import stub_logger
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import scaling_policy
+from utilities.workers import worker_autoscaler
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+from utilities.workers import worker_metrics
+
+
+ITEM_COUNT = 60
+ITEM_TIME = 0.01  # seconds
+BATCH_SIZE = 4
+MAX_COUNT = 3
+# Process start and drain slack
+TIMEOUT = 10.0  # seconds
+INPUT_MAXSIZE = 10
+TARGET_UTILIZATION = 0.5
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def slow_echo(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that holds a batch of items and outputs each with its process ID.
+    """
+    while not controller.is_exit_requested():
+        for item in input_queue.get_many(BATCH_SIZE, ITEM_TIME):
+            time.sleep(ITEM_TIME)
+            output_queue.queue.put((item, os.getpid()))
+
+
+class StubManager:
+    """
+    Stand-in for `WorkerManager` with given metric snapshots.
+    """
+
+    def __init__(self, worker_count: int) -> None:
+        self.snapshots: "list[dict[str, int | float | worker_metrics.HistogramSnapshot]]" = []
+        self.worker_count = worker_count
+        self.scaled_to: "list[int]" = []
+
+    def get_metrics_snapshot(self) -> "list[dict[str, int | float | object]]":
+        """
+        Returns the current snapshots.
+        """
+        return self.snapshots
+
+    def get_worker_count(self) -> int:
+        """
+        Returns the number of workers.
+        """
+        return self.worker_count
+
+    def get_max_worker_count(self) -> int:
+        """
+        Returns the most workers.
+        """
+        return MAX_COUNT
+
+    def get_target_name(self) -> str:
+        """
+        Returns a made up target name.
+        """
+        return "stub"
+
+    def scale_to(self, count: int) -> bool:
+        """
+        Records the count.
+        """
+        self.scaled_to.append(count)
+        self.worker_count = count
+        return True
+
+
+def worker_snapshot(
+    loop_count: int, loop_seconds: float, get_wait: float, put_wait: float
+) -> "dict[str, worker_metrics.HistogramSnapshot]":
+    """
+    Returns the metrics the trampoline records for a worker.
+    """
+    buckets = [0] * worker_metrics.HISTOGRAM_BUCKET_COUNT
+    return {
+        "loop": worker_metrics.HistogramSnapshot(loop_count, loop_seconds, buckets),
+        "get_wait": worker_metrics.HistogramSnapshot(loop_count, get_wait, buckets),
+        "put_wait": worker_metrics.HistogramSnapshot(loop_count, put_wait, buckets),
+    }
+
+
+@pytest.fixture()
+def local_logger() -> stub_logger.StubLogger:  # type: ignore
+    """
+    Logger that keeps the messages.
+    """
+    yield stub_logger.StubLogger()  # type: ignore
+
+
+@pytest.fixture()
+def policy() -> scaling_policy.ScalingPolicy:  # type: ignore
+    """
+    Scales between 1 and 3 workers, each busy half of the time.
+    """
+    result, created = scaling_policy.ScalingPolicy.create(
+        1, MAX_COUNT, TARGET_UTILIZATION, 1.0, 0.0
+    )
+    assert result
+    assert created is not None
+
+    yield created  # type: ignore
+
+
+def test_scale_under_load(local_logger: stub_logger.StubLogger) -> None:
+    """
+    Retired workers output the items they hold before ending, so scaling loses no items.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    input_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, ITEM_COUNT, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+    output_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, ITEM_COUNT, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+    for item in range(ITEM_COUNT):
+        input_queue.queue.put(item)
+    result, properties = worker_manager.WorkerProperties.create(
+        count=1,
+        target=slow_echo,
+        work_arguments=(),
+        input_queues=[input_queue],
+        output_queues=[output_queue],
+        controller=controller,
+        local_logger=local_logger,  # type: ignore
+        max_count=MAX_COUNT,
+    )
+    assert result
+    assert properties is not None
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)  # type: ignore
+    assert result
+    assert manager is not None
+
+    # Run
+    manager.start_workers()
+    time.sleep(ITEM_TIME * BATCH_SIZE * 2)
+    scaled_up = manager.scale_to(MAX_COUNT)
+    time.sleep(ITEM_TIME * BATCH_SIZE * 2)
+    retired_pids = set(manager.get_worker_pids().values()) - {manager.get_worker_pids()[0]}
+    scaled_down = manager.scale_to(1)
+    scaled_down_count = manager.get_worker_count()
+    # Reuses a retired slot once its worker has ended
+    deadline = time.monotonic() + TIMEOUT
+    while not manager.scale_to(2) and time.monotonic() < deadline:
+        time.sleep(ITEM_TIME)
+
+    outputs = []
+    while len(outputs) < ITEM_COUNT and time.monotonic() < deadline:
+        outputs += output_queue.get_many(ITEM_COUNT, ITEM_TIME)
+    controller.request_exit()
+    manager.join_workers()
+    input_queue.release()
+    output_queue.release()
+
+    # Test
+    assert scaled_up
+    assert scaled_down
+    assert scaled_down_count == 1
+    assert manager.get_worker_count() == 2
+    assert sorted(item for item, _ in outputs) == list(range(ITEM_COUNT))
+    assert len(retired_pids) == MAX_COUNT - 1
+    assert retired_pids & {pid for _, pid in outputs} == retired_pids
+
+
+class TestSample:
+    """
+    Load computed from the differences between metric snapshots.
+    """
+
+    def test_utilization(
+        self, policy: scaling_policy.ScalingPolicy, local_logger: stub_logger.StubLogger
+    ) -> None:
+        """
+        Utilization is loop time not spent waiting on queues, over the workers seen before,
+        and fill is the depth over the capacity of the bounded input queues.
+        """
+        # Setup
+        manager = StubManager(1)
+        bounded_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, INPUT_MAXSIZE, queue_proxy_wrapper.QueueBackend.THREAD  # type: ignore
+        )
+        unbounded_queue = queue_proxy_wrapper.QueueProxyWrapper(
+            None, 0, queue_proxy_wrapper.QueueBackend.THREAD  # type: ignore
+        )
+        for item in range(INPUT_MAXSIZE // 2):
+            bounded_queue.queue.put(item)
+            unbounded_queue.queue.put(item)
+        result, autoscaler = worker_autoscaler.WorkerAutoscaler.create(
+            manager, [bounded_queue, unbounded_queue], policy, local_logger  # type: ignore
+        )
+        assert result
+        assert autoscaler is not None
+
+        # Run
+        manager.snapshots = [worker_snapshot(10, 1.0, 0.5, 0.0)]
+        first = autoscaler.sample()
+        manager.worker_count = 2
+        manager.snapshots = [
+            worker_snapshot(30, 3.0, 0.9, 0.1),
+            # Started after the first sample, counts from the next one
+            worker_snapshot(5, 0.5, 0.0, 0.0),
+        ]
+        second = autoscaler.sample()
+        third = autoscaler.sample()
+
+        # Test
+        assert first.utilization is None
+        assert first.worker_count == 1
+        assert second.worker_count == 2
+        assert first.fill == pytest.approx(0.5)
+        assert second.utilization == pytest.approx(0.75)
+        assert second.throughput > 0.0
+        assert third.utilization is None
+        assert third.throughput == 0.0
+
+    def test_run_once_scales(
+        self, policy: scaling_policy.ScalingPolicy, local_logger: stub_logger.StubLogger
+    ) -> None:
+        """
+        Workers busier than the target are scaled up to the count the policy decides.
+        """
+        # Setup
+        manager = StubManager(2)
+        result, autoscaler = worker_autoscaler.WorkerAutoscaler.create(
+            manager, [], policy, local_logger  # type: ignore
+        )
+        assert result
+        assert autoscaler is not None
+        manager.snapshots = [worker_snapshot(0, 0.0, 0.0, 0.0)] * 2
+        autoscaler.run_once()
+
+        # Run
+        manager.snapshots = [worker_snapshot(10, 1.0, 0.25, 0.0)] * 2
+        is_scaled = autoscaler.run_once()
+
+        # Test
+        assert is_scaled
+        assert manager.scaled_to == [MAX_COUNT]
+        assert len(local_logger.get_messages("info")) == 1
+
+    def test_policy_above_manager(
+        self, policy: scaling_policy.ScalingPolicy, local_logger: stub_logger.StubLogger
+    ) -> None:
+        """
+        A policy allowing more workers than the manager can have is rejected.
+        """
+        # Setup
+        manager = StubManager(1)
+        manager.get_max_worker_count = lambda: MAX_COUNT - 1  # type: ignore
+
+        # Run
+        result, autoscaler = worker_autoscaler.WorkerAutoscaler.create(
+            manager, [], policy, local_logger  # type: ignore
+        )
+
+        # Test
+        assert not result
+        assert autoscaler is None
@@ -0,0 +1,138 @@
+"""
+Test the worker controller.
+"""
+
+import asyncio
+import multiprocessing as mp
+import threading
+import time
+
+import pytest
+
+from utilities.workers import worker_controller
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture(params=[False, True], ids=["process", "thread"])
+def is_thread_only(request: pytest.FixtureRequest) -> bool:  # type: ignore
+    """
+    Whether workers are threads instead of processes.
+    """
+    yield request.param  # type: ignore
+
+
+@pytest.fixture()
+def controller(is_thread_only: bool) -> worker_controller.WorkerController:  # type: ignore
+    """
+    Creates a controller with no requests.
+    """
+    yield worker_controller.WorkerController(is_thread_only)  # type: ignore
+
+
+def count_until_exit(
+    controller: worker_controller.WorkerController, counter: "mp.sharedctypes.Synchronized"
+) -> None:
+    """
+    Worker loop counting its iterations.
+    """
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        with counter.get_lock():
+            counter.value += 1
+        time.sleep(0.001)
+
+
+class TestWorkerController:
+    """
+    Requests from main are seen by worker processes.
+    """
+
+    def test_exit_flag(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Exit can be requested and cleared repeatedly.
+        """
+        assert not controller.is_exit_requested()
+
+        controller.request_exit()
+        controller.request_exit()
+        assert controller.is_exit_requested()
+
+        controller.clear_exit()
+        assert not controller.is_exit_requested()
+
+    def test_pause_and_exit_worker(
+        self, controller: worker_controller.WorkerController, is_thread_only: bool
+    ) -> None:
+        """
+        A paused worker stops iterating until resumed, and exits when requested.
+        """
+        # Setup
+        counter = mp.Value("i", 0)
+        if is_thread_only:
+            worker = threading.Thread(target=count_until_exit, args=(controller, counter))
+        else:
+            worker = mp.Process(target=count_until_exit, args=(controller, counter))
+        worker.start()
+        time.sleep(0.2)
+
+        # Run
+        controller.request_pause()
+        time.sleep(0.1)
+        paused_count = counter.value
+        time.sleep(0.2)
+        still_paused_count = counter.value
+
+        controller.request_resume()
+        time.sleep(0.2)
+        resumed_count = counter.value
+
+        controller.request_exit()
+        worker.join(timeout=5)
+
+        # Test
+        assert still_paused_count == paused_count
+        assert resumed_count > paused_count
+        assert not worker.is_alive()
+
+    def test_wait_for_exit(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Waiting times out without a request, and wakes immediately on one.
+        """
+        # Setup
+        timer = threading.Timer(0.1, controller.request_exit)
+
+        # Run
+        is_exit_requested_early = controller.wait_for_exit(0.05)
+        start = time.monotonic()
+        timer.start()
+        is_exit_requested = controller.wait_for_exit(10.0)
+        wait_time = time.monotonic() - start
+
+        # Test
+        assert not is_exit_requested_early
+        assert is_exit_requested
+        assert wait_time < 1.0
+        assert controller.wait_for_exit(10.0)
+
+    def test_wait_for_exit_async(self, controller: worker_controller.WorkerController) -> None:
+        """
+        Same as the blocking wait, without blocking the event loop.
+        """
+        # Setup
+        timer = threading.Timer(0.1, controller.request_exit)
+
+        # Run
+        is_exit_requested_early = asyncio.run(controller.wait_for_exit_async(0.05))
+        start = time.monotonic()
+        timer.start()
+        is_exit_requested = asyncio.run(controller.wait_for_exit_async(10.0))
+        wait_time = time.monotonic() - start
+
+        # Test
+        assert not is_exit_requested_early
+        assert is_exit_requested
+        assert wait_time < 1.0
@@ -0,0 +1,376 @@
+"""
+Test hung worker detection.
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import time
+
+import pytest
+
+from utilities.workers import asyncio_host
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from utilities.workers import worker_metrics
+from utilities.workers import worker_trampoline
+
+
+DEADLINE = 0.3  # seconds
+CHECK_PERIOD = DEADLINE / 4  # seconds
+# Forking and reaching the stall
+STARTUP_TIME = 0.5  # seconds
+OBSERVATION_TIME = DEADLINE * 4  # seconds
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def stalled_put(
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that blocks on a full queue nobody reads.
+    """
+    while not controller.is_exit_requested():
+        output_queue.queue.put(None)
+
+
+def polling_loop(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that polls an empty queue.
+    """
+    while not controller.is_exit_requested():
+        input_queue.get_many(1, CHECK_PERIOD / 2)
+
+
+def idle_loop(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that waits for input for longer than the deadline.
+    """
+    while not controller.is_exit_requested():
+        input_queue.get_many(1, OBSERVATION_TIME * 2)
+
+
+def paused_loop(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that checks for a pause on every loop.
+    """
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        input_queue.get_many(1, 0.0)
+
+
+def slow_loop(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker whose loop is busy for most of the deadline.
+    """
+    while not controller.is_exit_requested():
+        input_queue.get_many(1, 0.0)
+        time.sleep(DEADLINE * 0.6)
+
+
+async def periodic_coroutine(
+    period: float,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Coroutine worker that awaits its period, which may be longer than the deadline.
+    """
+    while not controller.is_exit_requested():
+        await controller.check_pause_async()
+        await controller.wait_for_exit_async(period)
+
+
+async def polling_coroutine(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Coroutine worker that polls an empty queue.
+    """
+    while not controller.is_exit_requested():
+        input_queue.get_many(1, 0.0)
+        await asyncio.sleep(CHECK_PERIOD / 2)
+
+
+async def blocking_coroutine(
+    period: float,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Coroutine worker that blocks its event loop.
+    """
+    while not controller.is_exit_requested():
+        time.sleep(period)
+
+
+@pytest.fixture()
+def queue() -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Full queue of one item.
+    """
+    created = queue_proxy_wrapper.QueueProxyWrapper(
+        None, 1, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+    created.queue.put(None)
+
+    yield created  # type: ignore
+
+    created.release()
+
+
+def start_worker(
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+    liveness: worker_liveness.LivenessCounters,
+) -> mp.Process:
+    """
+    Starts the target as worker 0, watched by the liveness counters.
+    """
+    liveness.reset(0)
+    worker = mp.Process(
+        target=worker_trampoline.run_worker,
+        args=(
+            target,
+            args,
+            {},
+            worker_trampoline.StartupTimeline(1),
+            0,
+            worker_metrics.MetricsRegistry(1),
+            None,
+            liveness,
+        ),
+    )
+    worker.start()
+    return worker
+
+
+class TestHangDetector:
+    """
+    Progress is noticed between checks.
+    """
+
+    def test_stalled_time(self) -> None:
+        """
+        Time without ticks is counted from the check that first saw the ticks.
+        """
+        # Setup
+        liveness = worker_liveness.LivenessCounters(2)
+        detector = worker_liveness.HangDetector(liveness)
+
+        # Run
+        first = detector.get_stalled_time(1, 10.0)
+        stalled = detector.is_hung(1, DEADLINE, 10.0 + DEADLINE * 2)
+        liveness.tick(1)
+        ticked = detector.is_hung(1, DEADLINE, 10.0 + DEADLINE * 3)
+        late = detector.get_stalled_time(1, 10.0 + DEADLINE * 4)
+
+        # Test
+        assert first == 0.0
+        assert stalled
+        assert not ticked
+        assert late == pytest.approx(DEADLINE)
+        assert detector.get_stalled_time(0, 10.0) == 0.0
+
+    def test_waiting(self) -> None:
+        """
+        A waiting worker is never hung, and its time starts over once it stops waiting.
+        """
+        # Setup
+        liveness = worker_liveness.LivenessCounters(1)
+        detector = worker_liveness.HangDetector(liveness)
+        liveness.set_waiting(0, True)
+
+        # Run
+        detector.get_stalled_time(0, 0.0)
+        waiting = detector.is_hung(0, DEADLINE, DEADLINE * 10)
+        liveness.set_waiting(0, False)
+        resumed = detector.is_hung(0, DEADLINE, DEADLINE * 10.5)
+
+        # Test
+        assert not waiting
+        assert not resumed
+
+    def test_reset(self) -> None:
+        """
+        A restarted worker starts with no ticks and a new baseline.
+        """
+        # Setup
+        liveness = worker_liveness.LivenessCounters(1)
+        detector = worker_liveness.HangDetector(liveness)
+        liveness.tick(0)
+        liveness.set_waiting(0, True)
+        detector.get_stalled_time(0, 0.0)
+
+        # Run
+        liveness.reset(0)
+        detector.reset(0)
+
+        # Test
+        assert liveness.get_ticks(0) == 0
+        assert not liveness.is_waiting(0)
+        assert not detector.is_hung(0, DEADLINE, DEADLINE * 10)
+
+
+def test_stalled_worker_detected(queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+    """
+    A worker blocked on a full queue is hung within a check period after the deadline.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    liveness = worker_liveness.LivenessCounters(1)
+    detector = worker_liveness.HangDetector(liveness)
+    start = time.monotonic()
+    worker = start_worker(stalled_put, (queue, controller), liveness)
+
+    # Run
+    detected = None
+    while detected is None and time.monotonic() - start < DEADLINE + STARTUP_TIME * 2:
+        time.sleep(CHECK_PERIOD)
+        if detector.is_hung(0, DEADLINE):
+            detected = time.monotonic()
+    worker.kill()
+    worker.join(timeout=5)
+
+    # Test
+    assert detected is not None
+    assert liveness.get_ticks(0) == 1
+    assert DEADLINE <= detected - start <= DEADLINE + CHECK_PERIOD + STARTUP_TIME
+
+
+@pytest.mark.parametrize("target", [polling_loop, idle_loop, paused_loop, slow_loop])
+def test_no_false_positives(
+    target: "(...) -> object",  # type: ignore
+    queue: queue_proxy_wrapper.QueueProxyWrapper,
+) -> None:
+    """
+    Workers that loop, wait for input, are paused, or are slow but within the deadline
+    are never hung.
+    """
+    # Setup
+    queue.queue.get()
+    controller = worker_controller.WorkerController()
+    if target is paused_loop:
+        controller.request_pause()
+    liveness = worker_liveness.LivenessCounters(1)
+    detector = worker_liveness.HangDetector(liveness)
+    worker = start_worker(target, (queue, controller), liveness)
+
+    # Run
+    hung_checks = 0
+    check_count = int(OBSERVATION_TIME / CHECK_PERIOD)
+    for _ in range(check_count):
+        time.sleep(CHECK_PERIOD)
+        hung_checks += detector.is_hung(0, DEADLINE)
+    controller.request_exit()
+    controller.request_resume()
+    queue.queue.put(None)
+    worker.join(timeout=5)
+
+    # Test
+    assert worker.exitcode == 0
+    assert hung_checks == 0
+
+
+def test_asyncio_host_no_false_positives(queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+    """
+    An asyncio host is not hung while its coroutines await periods longer than the deadline
+    or poll for input.
+    """
+    # Setup
+    queue.queue.get()
+    controller = worker_controller.WorkerController()
+    liveness = worker_liveness.LivenessCounters(1)
+    detector = worker_liveness.HangDetector(liveness)
+    workers = [
+        (periodic_coroutine, (OBSERVATION_TIME * 2, controller), {}),
+        (polling_coroutine, (queue, controller), {}),
+    ]
+    worker = start_worker(asyncio_host.asyncio_host_worker, (workers, controller), liveness)
+
+    # Run
+    hung_checks = 0
+    check_count = int(OBSERVATION_TIME / CHECK_PERIOD)
+    for _ in range(check_count):
+        time.sleep(CHECK_PERIOD)
+        hung_checks += detector.is_hung(0, DEADLINE)
+    controller.request_exit()
+    worker.join(timeout=5)
+
+    # Test
+    assert worker.exitcode == 0
+    assert hung_checks == 0
+    assert liveness.get_ticks(0) > check_count
+
+
+def test_asyncio_host_blocked_loop_detected() -> None:
+    """
+    An asyncio host is hung when one coroutine blocks the event loop,
+    even while another awaits its period.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    liveness = worker_liveness.LivenessCounters(1)
+    detector = worker_liveness.HangDetector(liveness)
+    workers = [
+        (periodic_coroutine, (OBSERVATION_TIME * 2, controller), {}),
+        (blocking_coroutine, (OBSERVATION_TIME * 2, controller), {}),
+    ]
+    start = time.monotonic()
+    worker = start_worker(asyncio_host.asyncio_host_worker, (workers, controller), liveness)
+
+    # Run
+    detected = None
+    while detected is None and time.monotonic() - start < DEADLINE + STARTUP_TIME * 2:
+        time.sleep(CHECK_PERIOD)
+        if detector.is_hung(0, DEADLINE):
+            detected = time.monotonic()
+    worker.kill()
+    worker.join(timeout=5)
+
+    # Test
+    assert detected is not None
+
+
+@pytest.mark.skipif(
+    worker_trampoline.STACK_DUMP_SIGNAL is None, reason="No stack dump signal on this platform"
+)
+def test_stack_dump(
+    queue: queue_proxy_wrapper.QueueProxyWrapper, capfd: pytest.CaptureFixture
+) -> None:
+    """
+    A worker process writes the stack of each thread to its stderr when signalled.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    liveness = worker_liveness.LivenessCounters(1)
+    worker = start_worker(stalled_put, (queue, controller), liveness)
+    time.sleep(STARTUP_TIME)
+
+    # Run
+    os.kill(worker.pid, worker_trampoline.STACK_DUMP_SIGNAL)  # type: ignore
+    time.sleep(STARTUP_TIME)
+    worker.kill()
+    worker.join(timeout=5)
+    _, err = capfd.readouterr()
+
+    # Test
+    assert "stalled_put" in err
+    assert "run_worker" in err
@@ -0,0 +1,131 @@
+"""
+Test the worker metrics registry.
+"""
+
+import multiprocessing as mp
+
+import pytest
+
+from utilities.workers import worker_metrics
+
+
+METRICS_PER_WORKER = 4
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def registry() -> worker_metrics.MetricsRegistry:  # type: ignore
+    """
+    Creates a registry for 2 workers with no metrics.
+    """
+    yield worker_metrics.MetricsRegistry(2, METRICS_PER_WORKER)  # type: ignore
+
+
+def record_in_worker(registry: worker_metrics.MetricsRegistry) -> None:
+    """
+    Records one of each kind as worker 1.
+    """
+    recorder = registry.get_recorder(1)
+    recorder.increment("messages", 3)
+    recorder.set_gauge("depth", 2.5)
+    recorder.observe("loop", 0.001)
+
+
+class TestMetricsRegistry:
+    """
+    Workers record metrics that main reads back.
+    """
+
+    def test_across_processes(self, registry: worker_metrics.MetricsRegistry) -> None:
+        """
+        Metrics recorded by a worker process are read by main.
+        """
+        # Run
+        worker = mp.Process(target=record_in_worker, args=(registry,))
+        worker.start()
+        worker.join(timeout=5)
+        metrics = registry.snapshot(1)
+
+        # Test
+        assert registry.snapshot(0) == {}
+        assert metrics["messages"] == 3
+        assert metrics["depth"] == 2.5
+        assert metrics["loop"].count == 1
+        assert metrics["loop"].mean() == pytest.approx(0.001)
+
+    def test_restart_continues(self, registry: worker_metrics.MetricsRegistry) -> None:
+        """
+        A new recorder of the same worker continues the existing metrics.
+        """
+        # Setup
+        registry.get_recorder(0).increment("messages")
+
+        # Run
+        registry.get_recorder(0).increment("messages")
+
+        # Test
+        assert registry.snapshot(0) == {"messages": 2}
+
+    def test_conflicts_ignored(self, registry: worker_metrics.MetricsRegistry) -> None:
+        """
+        Metrics of another kind under the same name, or beyond the slots, are not recorded.
+        """
+        # Setup
+        recorder = registry.get_recorder(0)
+
+        # Run
+        recorder.increment("messages")
+        recorder.set_gauge("messages", 1.0)
+        for i in range(METRICS_PER_WORKER + 1):
+            recorder.increment(f"counter_{i}")
+
+        # Test
+        metrics = registry.snapshot(0)
+        assert len(metrics) == METRICS_PER_WORKER
+        assert metrics["messages"] == 1
+        assert f"counter_{METRICS_PER_WORKER - 1}" not in metrics
+
+
+def test_histogram_percentile() -> None:
+    """
+    Percentiles are the upper bound of the bucket they fall into.
+    """
+    # Setup
+    registry = worker_metrics.MetricsRegistry(1)
+    recorder = registry.get_recorder(0)
+
+    # Run
+    for _ in range(98):
+        recorder.observe("latency", 0.0001)
+    recorder.observe("latency", 0.01)
+    recorder.observe("latency", 0.01)
+    histogram = registry.snapshot(0)["latency"]
+
+    # Test
+    # 100 us is in [64, 128) us, 10 ms in [8192, 16384) us
+    assert histogram.percentile(0.5) == 128e-6
+    assert histogram.percentile(0.99) == 16384e-6
+    assert worker_metrics.HistogramSnapshot(0, 0.0, []).percentile(0.5) is None
+
+
+def test_format_summary() -> None:
+    """
+    One row per worker after the header, with unknown metrics listed at the end.
+    """
+    # Setup
+    registry = worker_metrics.MetricsRegistry(1)
+    recorder = registry.get_recorder(0)
+    recorder.observe("loop", 0.002)
+    recorder.increment("no_data", 4)
+
+    # Run
+    lines = worker_metrics.format_summary({"telemetry_worker[0]": registry.snapshot(0)})
+
+    # Test
+    assert len(lines) == 2
+    assert lines[1].startswith("telemetry_worker[0]")
+    assert lines[1].endswith("no_data=4")
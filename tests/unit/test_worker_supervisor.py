@@ -0,0 +1,245 @@
+"""
+Test restarting crashed workers with backoff and a crash budget.
+"""
+
+import multiprocessing as mp
+import sys
+import time
+
+import pytest
+
+from tests.unit import stub_logger
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+from utilities.workers import worker_supervisor
+
+
+INITIAL_BACKOFF = 0.1  # seconds
+MAX_BACKOFF = 0.4  # seconds
+CRASH_BUDGET = 3
+BUDGET_WINDOW = 60  # seconds
+# Timer and process start slack
+TOLERANCE = 0.5  # seconds
+CRASH_EXIT_CODE = 3
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+def crash_until(
+    starts: "mp.sharedctypes.Synchronized",
+    crash_count: int,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that crashes on its first crash_count starts, then runs until asked to exit.
+    """
+    with starts.get_lock():
+        starts.value += 1
+        start = starts.value
+
+    if start <= crash_count:
+        sys.exit(CRASH_EXIT_CODE)
+
+    while not controller.is_exit_requested():
+        controller.wait_for_exit(0.01)
+
+
+@pytest.fixture()
+def local_logger() -> stub_logger.StubLogger:  # type: ignore
+    """
+    Logger that keeps the messages.
+    """
+    yield stub_logger.StubLogger()  # type: ignore
+
+
+@pytest.fixture()
+def controller() -> worker_controller.WorkerController:  # type: ignore
+    """
+    Controller of the supervised workers, asked to exit after each test.
+    """
+    created = worker_controller.WorkerController()
+
+    yield created  # type: ignore
+
+    created.request_exit()
+
+
+def create_manager(
+    starts: "mp.sharedctypes.Synchronized",
+    crash_count: int,
+    controller: worker_controller.WorkerController,
+    local_logger: stub_logger.StubLogger,
+) -> worker_manager.WorkerManager:
+    """
+    Starts one worker that crashes on its first crash_count starts.
+    """
+    result, properties = worker_manager.WorkerProperties.create(
+        count=1,
+        target=crash_until,
+        work_arguments=(starts, crash_count),
+        input_queues=[],
+        output_queues=[],
+        controller=controller,
+        local_logger=local_logger,  # type: ignore
+    )
+    assert result
+    assert properties is not None
+
+    result, manager = worker_manager.WorkerManager.create(properties, local_logger)  # type: ignore
+    assert result
+    assert manager is not None
+
+    manager.start_workers()
+    return manager
+
+
+def create_supervisor(
+    manager: worker_manager.WorkerManager, local_logger: stub_logger.StubLogger
+) -> worker_supervisor.WorkerSupervisor:
+    """
+    Supervises the manager with the test backoff and budget.
+    """
+    result, supervisor = worker_supervisor.WorkerSupervisor.create(
+        [manager],
+        INITIAL_BACKOFF,
+        MAX_BACKOFF,
+        CRASH_BUDGET,
+        BUDGET_WINDOW,
+        local_logger,  # type: ignore
+    )
+    assert result
+    assert supervisor is not None
+
+    return supervisor
+
+
+def supervise_until(
+    supervisor: worker_supervisor.WorkerSupervisor, record_count: int, timeout: float
+) -> None:
+    """
+    Runs the supervisor until it has made record_count records or the timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while len(supervisor.records) < record_count and time.monotonic() < deadline:
+        supervisor.run_once(0.05)
+
+
+def test_restart_after_backoff(
+    controller: worker_controller.WorkerController, local_logger: stub_logger.StubLogger
+) -> None:
+    """
+    A crashed worker is restarted once the initial backoff has elapsed.
+    """
+    # Setup
+    starts = mp.Value("i", 0)
+    manager = create_manager(starts, 1, controller, local_logger)
+    supervisor = create_supervisor(manager, local_logger)
+
+    # Run
+    supervise_until(supervisor, 1, INITIAL_BACKOFF + TOLERANCE * 2)
+    time.sleep(TOLERANCE)
+    supervise_until(supervisor, 2, TOLERANCE)
+    controller.request_exit()
+    manager.join_workers()
+
+    # Test
+    assert len(supervisor.records) == 1
+    record = supervisor.records[0]
+    assert record.exit_code == CRASH_EXIT_CODE
+    assert record.restart_latency is not None
+    assert INITIAL_BACKOFF <= record.restart_latency <= INITIAL_BACKOFF + TOLERANCE
+    assert manager.get_restart_count() == 1
+    assert starts.value == 2
+    assert manager.get_worker_exit_code(0) == 0
+
+
+def test_backoff_grows(
+    controller: worker_controller.WorkerController, local_logger: stub_logger.StubLogger
+) -> None:
+    """
+    Each crash within the window doubles the backoff, up to the maximum.
+    """
+    # Setup
+    starts = mp.Value("i", 0)
+    manager = create_manager(starts, CRASH_BUDGET, controller, local_logger)
+    supervisor = create_supervisor(manager, local_logger)
+    expected_backoffs = [INITIAL_BACKOFF, INITIAL_BACKOFF * 2, MAX_BACKOFF]
+
+    # Run
+    supervise_until(supervisor, CRASH_BUDGET, sum(expected_backoffs) + TOLERANCE * CRASH_BUDGET)
+    controller.request_exit()
+    manager.join_workers()
+
+    # Test
+    latencies = [record.restart_latency for record in supervisor.records]
+    assert len(latencies) == CRASH_BUDGET
+    for latency, backoff in zip(latencies, expected_backoffs):
+        assert latency is not None
+        assert backoff <= latency <= backoff + TOLERANCE
+    assert manager.get_restart_count() == CRASH_BUDGET
+
+
+def test_crash_budget(
+    controller: worker_controller.WorkerController, local_logger: stub_logger.StubLogger
+) -> None:
+    """
+    A worker that crashes more often than the budget allows is given up on.
+    """
+    # Setup
+    starts = mp.Value("i", 0)
+    manager = create_manager(starts, CRASH_BUDGET + 10, controller, local_logger)
+    supervisor = create_supervisor(manager, local_logger)
+    total_backoff = INITIAL_BACKOFF + INITIAL_BACKOFF * 2 + MAX_BACKOFF
+
+    # Run
+    supervise_until(supervisor, CRASH_BUDGET + 1, total_backoff + TOLERANCE * (CRASH_BUDGET + 1))
+    # Not restarted or reported again
+    supervise_until(supervisor, CRASH_BUDGET + 2, MAX_BACKOFF + TOLERANCE)
+
+    # Test
+    assert len(supervisor.records) == CRASH_BUDGET + 1
+    assert supervisor.records[-1].restart_latency is None
+    assert supervisor.records[-1].exit_code == CRASH_EXIT_CODE
+    assert manager.get_restart_count() == CRASH_BUDGET
+    assert starts.value == CRASH_BUDGET + 1
+    assert len(local_logger.get_messages("error")) == 1
+
+
+@pytest.mark.parametrize(
+    "initial_backoff,max_backoff,crash_budget,budget_window,hang_deadline",
+    [
+        (-1.0, MAX_BACKOFF, CRASH_BUDGET, BUDGET_WINDOW, None),
+        (MAX_BACKOFF, INITIAL_BACKOFF, CRASH_BUDGET, BUDGET_WINDOW, None),
+        (INITIAL_BACKOFF, MAX_BACKOFF, 0, BUDGET_WINDOW, None),
+        (INITIAL_BACKOFF, MAX_BACKOFF, CRASH_BUDGET, 0.0, None),
+        (INITIAL_BACKOFF, MAX_BACKOFF, CRASH_BUDGET, BUDGET_WINDOW, 0.0),
+    ],
+)
+def test_invalid_create(
+    initial_backoff: float,
+    max_backoff: float,
+    crash_budget: int,
+    budget_window: float,
+    hang_deadline: "float | None",
+    local_logger: stub_logger.StubLogger,
+) -> None:
+    """
+    Negative or inverted backoffs, an empty budget, and a zero hang deadline are rejected.
+    """
+    # Run
+    result, supervisor = worker_supervisor.WorkerSupervisor.create(
+        [],
+        initial_backoff,
+        max_backoff,
+        crash_budget,
+        budget_window,
+        local_logger,  # type: ignore
+        hang_deadline,
+    )
+
+    # Test
+    assert not result
+    assert supervisor is None
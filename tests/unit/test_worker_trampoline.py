@@ -0,0 +1,182 @@
+"""
+Test the worker trampoline.
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_metrics
+from utilities.workers import worker_trampoline
+
+
+STARTUP_DELAY = 0.1  # seconds
+GET_TIMEOUT = 0.01  # seconds
+ITEM_COUNT = 20
+SLOW_ITEM_TIME = 0.02  # seconds
+
+
+def delayed_loop(controller: worker_controller.WorkerController) -> None:
+    """
+    Worker that takes a while to set up before its loop.
+    """
+    time.sleep(STARTUP_DELAY)
+    while not controller.is_exit_requested():
+        controller.check_pause()
+        time.sleep(0.01)
+
+
+def polling_loop(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that polls an empty queue and counts its loops itself.
+    """
+    metrics = worker_metrics.WorkerMetrics.get_current()
+    while not controller.is_exit_requested():
+        input_queue.get_many(1, GET_TIMEOUT)
+        metrics.increment("polls")
+
+
+def slow_relay(
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker that takes a while for each item it forwards.
+    """
+    while not controller.is_exit_requested():
+        for item in input_queue.get_many(1, GET_TIMEOUT):
+            time.sleep(SLOW_ITEM_TIME)
+            output_queue.queue.put(item)
+
+
+def test_startup_timeline() -> None:
+    """
+    Entering the target and the first loop are recorded in order.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    timeline = worker_trampoline.StartupTimeline(2)
+    worker = mp.Process(
+        target=worker_trampoline.run_worker,
+        args=(delayed_loop, (controller,), {}, timeline, 1, worker_metrics.MetricsRegistry(2)),
+    )
+
+    # Run
+    timeline.mark_started(1)
+    worker.start()
+    time.sleep(STARTUP_DELAY * 3)
+    controller.request_exit()
+    worker.join(timeout=5)
+    entered, first_loop = timeline.get_durations(1)
+
+    # Test
+    assert timeline.get_durations(0) == (None, None)
+    assert entered is not None
+    assert first_loop is not None
+    assert first_loop - entered >= STARTUP_DELAY
+
+
+def test_restart_clears_times() -> None:
+    """
+    Starting a worker again forgets its previous startup.
+    """
+    # Setup
+    timeline = worker_trampoline.StartupTimeline(1)
+    timeline.mark_started(0)
+    timeline.mark_entered(0)
+    timeline.mark_first_loop(0)
+
+    # Run
+    timeline.mark_started(0)
+
+    # Test
+    assert timeline.get_durations(0) == (None, None)
+
+
+def test_worker_metrics() -> None:
+    """
+    Loops and queue waits are recorded without the worker doing anything,
+    next to the worker's own metrics.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    input_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, 1, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+    registry = worker_metrics.MetricsRegistry(1)
+    worker = mp.Process(
+        target=worker_trampoline.run_worker,
+        args=(
+            polling_loop,
+            (input_queue,),
+            {"controller": controller},
+            worker_trampoline.StartupTimeline(1),
+            0,
+            registry,
+        ),
+    )
+
+    # Run
+    worker.start()
+    time.sleep(STARTUP_DELAY * 3)
+    controller.request_exit()
+    worker.join(timeout=5)
+    metrics = registry.snapshot(0)
+
+    # Test
+    assert metrics["polls"] > 0
+    assert metrics["loop"].count == metrics["polls"]
+    assert metrics["get_wait"].count >= metrics["polls"]
+    assert metrics["get_wait"].percentile(0.5) >= GET_TIMEOUT
+    input_queue.release()
+
+
+def test_retirement() -> None:
+    """
+    A retired worker ends at its next exit check without losing the item it holds,
+    and its controller still has no exit request.
+    """
+    # Setup
+    controller = worker_controller.WorkerController()
+    input_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, ITEM_COUNT, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+    output_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        None, ITEM_COUNT, queue_proxy_wrapper.QueueBackend.SHARED_MEMORY  # type: ignore
+    )
+    input_queue.put_many(list(range(ITEM_COUNT)))
+    retirement = worker_trampoline.RetirementFlags(2)
+    worker = mp.Process(
+        target=worker_trampoline.run_worker,
+        args=(
+            slow_relay,
+            (input_queue, output_queue, controller),
+            {},
+            worker_trampoline.StartupTimeline(2),
+            1,
+            worker_metrics.MetricsRegistry(2),
+            retirement,
+        ),
+    )
+
+    # Run
+    worker.start()
+    time.sleep(SLOW_ITEM_TIME * ITEM_COUNT / 2)
+    retirement.request(1)
+    worker.join(timeout=5)
+    relayed = output_queue.get_many(ITEM_COUNT, 0.0)
+    remaining = input_queue.get_many(ITEM_COUNT, 0.0)
+
+    # Test
+    assert worker.exitcode == 0
+    assert not controller.is_exit_requested()
+    assert not retirement.is_requested(0)
+    assert 0 < len(relayed) < ITEM_COUNT
+    assert relayed + remaining == list(range(ITEM_COUNT))
+    input_queue.release()
+    output_queue.release()
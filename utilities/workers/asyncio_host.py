@@ -0,0 +1,82 @@
+"""
+Runs several coroutine workers on one event loop in one process.
+"""
+
+import asyncio
+
+from utilities.workers import worker_controller
+from utilities.workers import worker_trampoline
+
+
+# Time between liveness ticks of the host, well below any hang deadline
+LIVENESS_PERIOD = 0.1  # seconds
+
+
+async def tick_liveness(controller: worker_trampoline.InstrumentedController) -> None:
+    """
+    Ticks the liveness of the host for as long as its event loop is not blocked,
+    so coroutines awaiting e.g. their period or input do not make the host hung.
+    """
+    while True:
+        controller.tick()
+        await asyncio.sleep(LIVENESS_PERIOD)
+
+
+async def run_coroutine_workers(workers: "list[tuple]") -> None:
+    """
+    Runs the coroutine workers until all return, or cancels the rest once one raises.
+    """
+    tasks = [asyncio.create_task(target(*args, **kwargs)) for target, args, kwargs in workers]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    # Raise the first failure so the host process exits with an error
+    for task in done:
+        task.result()
+
+
+async def run_hosted_workers(
+    workers: "list[tuple]",
+    host_controller: worker_trampoline.InstrumentedController,
+) -> None:
+    """
+    Same as run_coroutine_workers(), while ticking the liveness of the host.
+    """
+    ticker = asyncio.create_task(tick_liveness(host_controller))
+    try:
+        await run_coroutine_workers(workers)
+    finally:
+        ticker.cancel()
+        await asyncio.gather(ticker, return_exceptions=True)
+
+
+def asyncio_host_worker(
+    workers: "list[tuple]",
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    workers: Coroutine workers as (async target, arguments, keyword arguments),
+    each with its own controller in its arguments.
+    controller: Worker controller, only checked before starting the event loop.
+
+    If any coroutine worker raises, the others are cancelled and the process exits with an error,
+    so the host is restarted as a whole.
+    When run by the worker trampoline, the controller and queues of each coroutine worker
+    are instrumented as part of the host, and the host is hung only when its event loop is blocked.
+    """
+    if controller.is_exit_requested():
+        return
+
+    if not isinstance(controller, worker_trampoline.InstrumentedController):
+        asyncio.run(run_coroutine_workers(workers))
+        return
+
+    hosted_workers = [
+        (target, *controller.instrument_hosted_arguments(args, kwargs))
+        for target, args, kwargs in workers
+    ]
+    asyncio.run(run_hosted_workers(hosted_workers, controller))
@@ -0,0 +1,500 @@
+"""
+Publish/subscribe channel that stores each item once for any number of subscribers.
+"""
+
+import enum
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import os
+import pickle
+import queue
+import struct
+import time
+
+
+class LagPolicy(enum.Enum):
+    """
+    What a subscriber reads after the producer has overwritten items it had not read yet.
+    """
+
+    # Continue from the oldest item still in the buffer
+    SKIP_TO_OLDEST = 0
+    # Continue from the newest item only
+    SKIP_TO_LATEST = 1
+
+
+class BroadcastChannel:  # pylint: disable=too-many-instance-attributes
+    """
+    Fixed-slot ring buffer in shared memory with a read cursor per subscriber.
+
+    Publishing never waits for subscribers: the newest item overwrites the oldest,
+    and only subscribers that are waiting get a wakeup. So adding a subscriber costs
+    the producer next to nothing. A subscriber that falls more than the capacity behind
+    loses the overwritten items, which are counted, and continues according to the lag policy.
+
+    Subscribe in main before starting the workers, since names are only known to main.
+    Workers sharing one subscription share its cursor, so each item goes to one of them.
+    """
+
+    # Header: write sequence, closed
+    __HEADER = struct.Struct("=QQ")
+    # Per subscriber: active, cursor, lost items, readers waiting for a wakeup
+    __SUBSCRIBER = struct.Struct("=QQQQ")
+    # Slot prefix: sequence, payload length
+    __SLOT_PREFIX = struct.Struct("=QI")
+
+    DEFAULT_MAX_SUBSCRIBERS = 8
+    DEFAULT_SLOT_SIZE = 4096  # bytes
+
+    def __init__(
+        self,
+        capacity: int,
+        max_subscribers: int = DEFAULT_MAX_SUBSCRIBERS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        lag_policy: LagPolicy = LagPolicy.SKIP_TO_OLDEST,
+    ) -> None:
+        """
+        capacity: Number of slots, must be greater than 0 .
+        max_subscribers: Number of subscriptions available.
+        slot_size: Size of each slot in bytes, including the prefix.
+        lag_policy: What a subscriber that fell behind by more than the capacity reads next.
+        """
+        if capacity <= 0:
+            raise ValueError("Broadcast channel requires capacity greater than 0")
+
+        if max_subscribers <= 0:
+            raise ValueError("Broadcast channel requires max_subscribers greater than 0")
+
+        if slot_size <= self.__SLOT_PREFIX.size:
+            raise ValueError(f"Slot size must be greater than {self.__SLOT_PREFIX.size} bytes")
+
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.lag_policy = lag_policy
+        self.__max_subscribers = max_subscribers
+        self.__subscriber_names: "list[str]" = []
+
+        self.__slots_offset = self.__HEADER.size + max_subscribers * self.__SUBSCRIBER.size
+        self.__memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__slots_offset + capacity * slot_size,
+        )
+        self.__memory.buf[: self.__slots_offset] = bytes(self.__slots_offset)
+        self.__owner_pid = os.getpid()
+
+        # Guards the whole buffer
+        self.__lock = mp.Lock()
+        # Released for each waiting reader of the subscription on publish,
+        # unlike notifying a condition this never waits for the readers to wake
+        self.__wakeups = [mp.Semaphore(0) for _ in range(max_subscribers)]
+
+    def __read_header(self) -> "tuple[int, int]":
+        return self.__HEADER.unpack_from(self.__memory.buf, 0)
+
+    def __subscriber_offset(self, index: int) -> int:
+        return self.__HEADER.size + index * self.__SUBSCRIBER.size
+
+    def __read_subscriber(self, index: int) -> "tuple[int, int, int, int]":
+        return self.__SUBSCRIBER.unpack_from(self.__memory.buf, self.__subscriber_offset(index))
+
+    def __write_subscriber(self, index: int, cursor: int, lost: int, waiting: int) -> None:
+        self.__SUBSCRIBER.pack_into(
+            self.__memory.buf, self.__subscriber_offset(index), 1, cursor, lost, waiting
+        )
+
+    def __wake_waiting(self) -> None:
+        """
+        Wakes every waiting reader, call with the lock held.
+        """
+        for index in range(self.__max_subscribers):
+            active, cursor, lost, waiting = self.__read_subscriber(index)
+            if not active or not waiting:
+                continue
+
+            self.__write_subscriber(index, cursor, lost, 0)
+            for _ in range(waiting):
+                self.__wakeups[index].release()
+
+    def __slot_offset(self, sequence: int) -> int:
+        return self.__slots_offset + (sequence % self.capacity) * self.slot_size
+
+    def subscribe(self, name: str) -> "BroadcastSubscriber":
+        """
+        Adds a subscriber that reads items published from now on.
+
+        name: Name of the subscriber in statistics.
+
+        Returns the subscriber, raises `ValueError` if all subscriptions are taken.
+        """
+        with self.__lock:
+            for index in range(self.__max_subscribers):
+                active, _, _, _ = self.__read_subscriber(index)
+                if active:
+                    continue
+
+                write_sequence, _ = self.__read_header()
+                self.__write_subscriber(index, write_sequence, 0, 0)
+                self.__subscriber_names.append(name)
+                return BroadcastSubscriber(self, index)
+
+        raise ValueError(f"All {self.__max_subscribers} subscriptions are taken")
+
+    def get_publisher(self) -> "BroadcastPublisher":
+        """
+        Returns the publishing end, for any number of producers.
+        """
+        return BroadcastPublisher(self)
+
+    def publish(self, items: "list") -> int:
+        """
+        Publishes items in order, overwriting the oldest if subscribers have not read them.
+        Never waits for subscribers.
+
+        Returns the number of items published, 0 if the channel is closed.
+        Raises `ValueError` if any pickled item does not fit in a slot, before publishing any.
+        """
+        payloads = []
+        for item in items:
+            payload = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+            if len(payload) > self.slot_size - self.__SLOT_PREFIX.size:
+                raise ValueError(
+                    f"Item of {len(payload)} bytes does not fit in slot of {self.slot_size} bytes"
+                )
+            payloads.append(payload)
+
+        with self.__lock:
+            write_sequence, closed = self.__read_header()
+            if closed:
+                return 0
+
+            for payload in payloads:
+                offset = self.__slot_offset(write_sequence)
+                self.__SLOT_PREFIX.pack_into(
+                    self.__memory.buf, offset, write_sequence, len(payload)
+                )
+                start = offset + self.__SLOT_PREFIX.size
+                self.__memory.buf[start : start + len(payload)] = payload
+                write_sequence += 1
+            self.__HEADER.pack_into(self.__memory.buf, 0, write_sequence, closed)
+            self.__wake_waiting()
+
+        return len(payloads)
+
+    def __catch_up(self, index: int, write_sequence: int) -> int:
+        """
+        Moves the cursor of a subscriber that fell behind according to the lag policy.
+
+        Returns the cursor.
+        """
+        _, cursor, lost, waiting = self.__read_subscriber(index)
+        oldest = max(write_sequence - self.capacity, 0)
+        if cursor >= oldest:
+            return cursor
+
+        if self.lag_policy == LagPolicy.SKIP_TO_LATEST:
+            new_cursor = write_sequence - 1
+        else:
+            new_cursor = oldest
+        self.__write_subscriber(index, new_cursor, lost + new_cursor - cursor, waiting)
+
+        return new_cursor
+
+    def __read_payloads(
+        self, index: int, cursor: int, write_sequence: int, max_items: int
+    ) -> "list[bytes]":
+        """
+        Copies up to max_items payloads from the cursor and advances it, call with the lock held.
+        """
+        payloads = []
+        while cursor < write_sequence and len(payloads) < max_items:
+            offset = self.__slot_offset(cursor)
+            _, length = self.__SLOT_PREFIX.unpack_from(self.__memory.buf, offset)
+            start = offset + self.__SLOT_PREFIX.size
+            payloads.append(bytes(self.__memory.buf[start : start + length]))
+            cursor += 1
+
+        _, _, lost, waiting = self.__read_subscriber(index)
+        self.__write_subscriber(index, cursor, lost, waiting)
+
+        return payloads
+
+    def read(self, index: int, max_items: int, timeout: "float | None") -> "list | None":
+        """
+        Reads up to max_items unread items of a subscriber.
+
+        timeout: Time to wait for the first item in seconds, None to wait indefinitely.
+        The rest are only read if already available.
+
+        Returns the items, empty if none arrived in time, None if the channel is closed.
+        """
+        if max_items <= 0:
+            return []
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.__lock:
+                write_sequence, closed = self.__read_header()
+                if closed:
+                    return None
+
+                cursor = self.__catch_up(index, write_sequence)
+                if cursor < write_sequence:
+                    payloads = self.__read_payloads(index, cursor, write_sequence, max_items)
+                    break
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0.0:
+                        return []
+
+                _, cursor, lost, waiting = self.__read_subscriber(index)
+                self.__write_subscriber(index, cursor, lost, waiting + 1)
+
+            # A wakeup left over from an earlier timeout only costs one more check
+            self.__wakeups[index].acquire(timeout=remaining)
+
+        return [pickle.loads(payload) for payload in payloads]
+
+    def get_lag(self, index: int) -> int:
+        """
+        Returns the number of published items the subscriber has not read yet,
+        more than the capacity if it has already lost some.
+        """
+        write_sequence, _ = self.__read_header()
+        _, cursor, _, _ = self.__read_subscriber(index)
+        return write_sequence - cursor
+
+    def get_lost_count(self, index: "int | None" = None) -> int:
+        """
+        Returns the number of items the subscriber lost by falling behind,
+        the total of all subscribers if index is None.
+        """
+        if index is not None:
+            _, _, lost, _ = self.__read_subscriber(index)
+            return lost
+
+        return sum(self.get_lost_count(i) for i in range(self.__max_subscribers))
+
+    def get_subscriber_stats(self) -> "list[tuple[str, int, int]]":
+        """
+        Returns the name, lag, and number of lost items of each subscriber.
+        Only complete in the process that subscribed.
+        """
+        return [
+            (name, self.get_lag(index), self.get_lost_count(index))
+            for index, name in enumerate(self.__subscriber_names)
+        ]
+
+    def get_fill(self) -> int:
+        """
+        Returns the number of items in the buffer.
+        """
+        write_sequence, _ = self.__read_header()
+        return min(write_sequence, self.capacity)
+
+    def close(self) -> None:
+        """
+        Closes the channel and wakes every waiting subscriber.
+        Afterwards publishing discards items and reading returns None.
+        """
+        with self.__lock:
+            write_sequence, _ = self.__read_header()
+            self.__HEADER.pack_into(self.__memory.buf, 0, write_sequence, 1)
+            self.__wake_waiting()
+
+    def release(self) -> None:
+        """
+        Detaches from the shared memory, and frees it if called by the creating process.
+        The channel must not be used afterwards.
+        """
+        self.__memory.close()
+        if os.getpid() == self.__owner_pid:
+            self.__memory.unlink()
+
+
+class BroadcastPublisher:
+    """
+    Publishing end of a broadcast channel with the interface of a queue.
+    Puts never block, reading is only possible through a subscriber.
+    """
+
+    def __init__(self, channel: BroadcastChannel) -> None:
+        self.__channel = channel
+
+    # Same signature as the other queues, but never blocks
+    # pylint: disable-next=unused-argument
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Publishes an item without blocking, block and timeout are ignored.
+        """
+        self.__channel.publish([item])
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    # pylint: disable-next=unused-argument
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Publishes items in order without blocking, timeout is ignored.
+
+        Returns the number of items published.
+        """
+        return self.__channel.publish(items)
+
+    # pylint: disable-next=unused-argument
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Not available, subscribe to read.
+
+        Raises `TypeError`.
+        """
+        raise TypeError("Subscribe to the broadcast channel to read from it")
+
+    def get_nowait(self) -> object:
+        """
+        Not available, subscribe to read.
+
+        Raises `TypeError`.
+        """
+        return self.get(False)
+
+    # pylint: disable-next=unused-argument
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Not available, subscribe to read.
+
+        Raises `TypeError`.
+        """
+        raise TypeError("Subscribe to the broadcast channel to read from it")
+
+    def qsize(self) -> int:
+        """
+        Returns the number of items in the buffer.
+        """
+        return self.__channel.get_fill()
+
+    def empty(self) -> bool:
+        """
+        Returns whether nothing has been published yet.
+        """
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        """
+        Always False, since publishing never waits.
+        """
+        return False
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items lost by all subscribers falling behind.
+        """
+        return self.__channel.get_lost_count()
+
+    def close(self) -> None:
+        """
+        Closes the channel, see `BroadcastChannel.close()`.
+        """
+        self.__channel.close()
+
+
+class BroadcastSubscriber:
+    """
+    Subscribing end of a broadcast channel with the interface of a queue.
+    Gets return the subscriber's unread items in order.
+    """
+
+    def __init__(self, channel: BroadcastChannel, index: int) -> None:
+        self.__channel = channel
+        self.__index = index
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Returns the next unread item, the sentinel (None) if the channel is closed.
+
+        Raises `queue.Empty` if no item arrived in time.
+        """
+        items = self.__channel.read(self.__index, 1, timeout if block else 0.0)
+        if items is None:
+            return None
+
+        if not items:
+            raise queue.Empty
+
+        return items[0]
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Returns up to max_items unread items.
+
+        timeout: Time to wait for the first item in seconds, None to wait indefinitely.
+
+        Returns the items, empty if none arrived in time or the channel is closed.
+        """
+        return self.__channel.read(self.__index, max_items, timeout) or []
+
+    # pylint: disable-next=unused-argument
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Not available, publish through the publisher.
+
+        Raises `TypeError`.
+        """
+        raise TypeError("Publish through the publisher of the broadcast channel")
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Not available, publish through the publisher.
+
+        Raises `TypeError`.
+        """
+        self.put(item, False)
+
+    # pylint: disable-next=unused-argument
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Not available, publish through the publisher.
+
+        Raises `TypeError`.
+        """
+        raise TypeError("Publish through the publisher of the broadcast channel")
+
+    def qsize(self) -> int:
+        """
+        Returns the number of items the subscriber can still read.
+        """
+        return min(self.__channel.get_lag(self.__index), self.__channel.capacity)
+
+    def empty(self) -> bool:
+        """
+        Returns whether the subscriber has read everything.
+        """
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        """
+        Returns whether the next publish overwrites an item the subscriber has not read.
+        """
+        return self.qsize() >= self.__channel.capacity
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items the subscriber lost by falling behind.
+        """
+        return self.__channel.get_lost_count(self.__index)
+
+    def close(self) -> None:
+        """
+        Closes the channel, see `BroadcastChannel.close()`.
+        """
+        self.__channel.close()
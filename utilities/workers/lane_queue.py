@@ -0,0 +1,469 @@
+"""
+Queue with several lanes of traffic, served by priority.
+"""
+
+import collections
+import enum
+import queue
+import threading
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_metrics
+
+
+class LaneScheduling(enum.Enum):
+    """
+    Which lane a get takes the next item from.
+    """
+
+    # Always the first lane with items, later lanes only get what earlier lanes leave
+    STRICT = 0
+    # Smooth weighted round robin over lanes with items, so no lane starves
+    WEIGHTED = 1
+
+
+class LaneConfig:
+    """
+    Bound and share of one lane.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        weight: int = 1,
+        overflow_policy: queue_proxy_wrapper.OverflowPolicy = queue_proxy_wrapper.OverflowPolicy.BLOCK,
+        keep_count: int = 1,
+    ) -> None:
+        """
+        name: Lane name.
+        maxsize: Maximum number of items in the lane, `maxsize <= 0` means infinite size.
+        weight: Share of gets when WEIGHTED, greater than 0 .
+        overflow_policy: What a put does when the lane is full,
+        policies other than BLOCK require maxsize greater than 0 .
+        keep_count: Items kept by KEEP_LATEST_N including the new one, from 1 to maxsize.
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.weight = weight
+        self.overflow_policy = overflow_policy
+        self.keep_count = keep_count
+
+
+class LaneStats:
+    """
+    Copy of the state of one lane at one point in time.
+    """
+
+    def __init__(
+        self, name: str, depth: int, dropped_count: int, wait: worker_metrics.HistogramSnapshot
+    ) -> None:
+        """
+        name: Lane name.
+        depth: Items in the lane.
+        dropped_count: Items dropped by the overflow policy of the lane.
+        wait: Time items spent in the lane before a get took them.
+        """
+        self.name = name
+        self.depth = depth
+        self.dropped_count = dropped_count
+        self.wait = wait
+
+
+class LaneQueue:  # pylint: disable=too-many-instance-attributes
+    """
+    Queue whose items travel in lanes, e.g. safety, control, and bulk traffic.
+    Each lane is bounded and has its own overflow policy. Items are FIFO within a lane,
+    and gets choose between lanes by the scheduling policy, so a control message waits
+    behind bulk traffic for at most one item per get instead of the whole backlog.
+
+    Every get records how long the item waited in its lane, see `get_lane_stats()`.
+
+    Served by `QueueManager` (import this module before starting the manager),
+    so producers in other processes put into their lane through a `LaneSender`.
+
+    `close()` works like `BatchQueue.close()`.
+    """
+
+    def __init__(
+        self, lanes: "list[LaneConfig]", scheduling: LaneScheduling = LaneScheduling.STRICT
+    ) -> None:
+        """
+        lanes: Lanes in priority order, the first is served first by STRICT.
+        scheduling: How gets choose between lanes.
+        """
+        if not lanes:
+            raise ValueError("Lane queue requires at least 1 lane")
+
+        for lane in lanes:
+            if lane.weight <= 0:
+                raise ValueError(f"Lane {lane.name}: weight must be greater than 0")
+            if lane.overflow_policy != queue_proxy_wrapper.OverflowPolicy.BLOCK and (
+                lane.maxsize <= 0
+            ):
+                raise ValueError(f"Lane {lane.name}: overflow policy requires maxsize > 0")
+            if lane.overflow_policy == queue_proxy_wrapper.OverflowPolicy.KEEP_LATEST_N and not (
+                0 < lane.keep_count <= lane.maxsize
+            ):
+                raise ValueError(f"Lane {lane.name}: keep count must be between 1 and maxsize")
+
+        self.__lanes = lanes
+        self.__scheduling = scheduling
+        # Enqueue time and item
+        self.__items: "list[collections.deque[tuple[float, object]]]" = [
+            collections.deque() for _ in lanes
+        ]
+        self.__current_weights = [0] * len(lanes)
+        self.__dropped_counts = [0] * len(lanes)
+        self.__wait_counts = [0] * len(lanes)
+        self.__wait_totals = [0.0] * len(lanes)
+        self.__wait_buckets = [[0] * worker_metrics.HISTOGRAM_BUCKET_COUNT for _ in lanes]
+        self.__is_closed = False
+
+        self.__mutex = threading.Lock()
+        self.__not_empty = threading.Condition(self.__mutex)
+        self.__not_full = [threading.Condition(self.__mutex) for _ in lanes]
+
+    def __is_full(self, lane: int) -> bool:
+        return 0 < self.__lanes[lane].maxsize <= len(self.__items[lane])
+
+    def __is_empty(self) -> bool:
+        return not any(self.__items)
+
+    def __wait(
+        self,
+        condition: threading.Condition,
+        is_blocked: "() -> bool",  # type: ignore
+        deadline: "float | None",
+    ) -> bool:
+        """
+        Waits on the held condition while is_blocked() and the queue is open.
+
+        deadline: Monotonic time to give up at, None to wait indefinitely.
+
+        Returns False if the deadline passed or the queue is closed.
+        """
+        while is_blocked() and not self.__is_closed:
+            if deadline is None:
+                condition.wait()
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return False
+            condition.wait(remaining)
+
+        return not self.__is_closed
+
+    @staticmethod
+    def __deadline(block: bool, timeout: "float | None") -> "float | None":
+        if not block:
+            return time.monotonic()
+
+        return None if timeout is None else time.monotonic() + timeout
+
+    def __append(self, lane: int, item: object) -> bool:
+        """
+        Appends an item to a lane, dropping items according to its policy if the lane is full.
+        Call with the mutex held.
+
+        Returns whether the item was appended.
+        """
+        config = self.__lanes[lane]
+        items = self.__items[lane]
+        if self.__is_full(lane):
+            if config.overflow_policy == queue_proxy_wrapper.OverflowPolicy.DROP_NEWEST:
+                self.__dropped_counts[lane] += 1
+                return False
+
+            keep_count = config.maxsize
+            if config.overflow_policy == queue_proxy_wrapper.OverflowPolicy.KEEP_LATEST_N:
+                keep_count = config.keep_count
+            while len(items) >= keep_count:
+                items.popleft()
+                self.__dropped_counts[lane] += 1
+
+        items.append((time.monotonic(), item))
+        self.__not_empty.notify()
+        return True
+
+    def __select_lane(self) -> int:
+        """
+        Returns the lane to take the next item from, call with the mutex held and items queued.
+        """
+        if self.__scheduling == LaneScheduling.STRICT:
+            return next(lane for lane, items in enumerate(self.__items) if items)
+
+        # Smooth weighted round robin: credit every lane with items, serve the richest
+        ready = [lane for lane, items in enumerate(self.__items) if items]
+        for lane in ready:
+            self.__current_weights[lane] += self.__lanes[lane].weight
+        selected = max(ready, key=lambda lane: self.__current_weights[lane])
+        self.__current_weights[selected] -= sum(self.__lanes[lane].weight for lane in ready)
+
+        return selected
+
+    def __pop(self) -> object:
+        """
+        Removes the next item by the scheduling policy and records its wait.
+        Call with the mutex held and items queued.
+        """
+        lane = self.__select_lane()
+        enqueue_time, item = self.__items[lane].popleft()
+
+        wait = time.monotonic() - enqueue_time
+        self.__wait_counts[lane] += 1
+        self.__wait_totals[lane] += wait
+        self.__wait_buckets[lane][worker_metrics.bucket_index(wait)] += 1
+
+        self.__not_full[lane].notify()
+        return item
+
+    def put(
+        self, item: object, block: bool = True, timeout: "float | None" = None, lane: int = 0
+    ) -> None:
+        """
+        Puts an item into a lane, discards it if the queue is closed.
+        A lane with an overflow policy other than BLOCK never blocks.
+
+        Raises `queue.Full` if no space became free in time.
+        """
+        with self.__mutex:
+            if self.__lanes[lane].overflow_policy != queue_proxy_wrapper.OverflowPolicy.BLOCK:
+                if not self.__is_closed:
+                    self.__append(lane, item)
+                return
+
+            deadline = self.__deadline(block, timeout)
+            if not self.__wait(self.__not_full[lane], lambda: self.__is_full(lane), deadline):
+                if self.__is_closed:
+                    return
+                raise queue.Full
+
+            self.__append(lane, item)
+
+    def put_many(self, items: "list", timeout: "float | None" = None, lane: int = 0) -> int:
+        """
+        Puts items into a lane in order.
+
+        timeout: Total time to wait for space in seconds, None to wait indefinitely.
+
+        Returns the number of items put, fewer than all of them if the lane stayed full
+        or its overflow policy dropped new items.
+        Items put into a closed queue are discarded and not counted.
+        """
+        deadline = self.__deadline(True, timeout)
+        count = 0
+        with self.__mutex:
+            for item in items:
+                if self.__lanes[lane].overflow_policy == queue_proxy_wrapper.OverflowPolicy.BLOCK:
+                    if not self.__wait(
+                        self.__not_full[lane], lambda: self.__is_full(lane), deadline
+                    ):
+                        return count
+                elif self.__is_closed:
+                    return count
+
+                if self.__append(lane, item):
+                    count += 1
+
+        return count
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns the next item by the scheduling policy,
+        the sentinel (None) if the queue is closed.
+
+        Raises `queue.Empty` if no item arrived in time.
+        """
+        with self.__mutex:
+            if not self.__wait(self.__not_empty, self.__is_empty, self.__deadline(block, timeout)):
+                if self.__is_closed:
+                    return None
+                raise queue.Empty
+
+            return self.__pop()
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items in the order of the scheduling policy.
+
+        timeout: Time to wait for the first item in seconds, None to wait indefinitely.
+        The rest are only taken if already available.
+
+        Returns the items, empty if none arrived in time or the queue is closed.
+        """
+        if max_items <= 0:
+            return []
+
+        with self.__mutex:
+            if not self.__wait(self.__not_empty, self.__is_empty, self.__deadline(True, timeout)):
+                return []
+
+            items = []
+            while not self.__is_empty() and len(items) < max_items:
+                items.append(self.__pop())
+
+        return items
+
+    def qsize(self, lane: "int | None" = None) -> int:
+        """
+        Returns the number of items in the lane, in all lanes if lane is None.
+        """
+        with self.__mutex:
+            if lane is not None:
+                return len(self.__items[lane])
+
+            return sum(len(items) for items in self.__items)
+
+    def empty(self) -> bool:
+        """
+        Returns whether every lane is empty.
+        """
+        return self.qsize() == 0
+
+    def full(self, lane: "int | None" = None) -> bool:
+        """
+        Returns whether the lane is full, whether every lane is full if lane is None.
+        """
+        with self.__mutex:
+            if lane is not None:
+                return self.__is_full(lane)
+
+            return all(self.__is_full(i) for i in range(len(self.__lanes)))
+
+    def get_dropped_count(self, lane: "int | None" = None) -> int:
+        """
+        Returns the number of items dropped by the overflow policy of the lane,
+        of all lanes if lane is None.
+        """
+        with self.__mutex:
+            if lane is not None:
+                return self.__dropped_counts[lane]
+
+            return sum(self.__dropped_counts)
+
+    def get_lane_stats(self) -> "list[LaneStats]":
+        """
+        Returns the state of each lane, in priority order.
+        """
+        with self.__mutex:
+            return [
+                LaneStats(
+                    config.name,
+                    len(self.__items[lane]),
+                    self.__dropped_counts[lane],
+                    worker_metrics.HistogramSnapshot(
+                        self.__wait_counts[lane],
+                        self.__wait_totals[lane],
+                        list(self.__wait_buckets[lane]),
+                    ),
+                )
+                for lane, config in enumerate(self.__lanes)
+            ]
+
+    def close(self) -> None:
+        """
+        Closes the queue and wakes every blocked producer and consumer.
+        Items still in the queue are never returned.
+        """
+        with self.__mutex:
+            self.__is_closed = True
+            self.__not_empty.notify_all()
+            for condition in self.__not_full:
+                condition.notify_all()
+
+
+queue_proxy_wrapper.QueueManager.register("LaneQueue", LaneQueue)
+
+
+class LaneSender:
+    """
+    Producer end of one lane of a lane queue, with the interface of a queue.
+    Reading is only possible through the whole lane queue.
+    """
+
+    def __init__(self, lane_queue: LaneQueue, lane: int) -> None:
+        """
+        lane_queue: Lane queue, or its proxy from `QueueManager`.
+        lane: Index of the lane.
+        """
+        self.__queue = lane_queue
+        self.__lane = lane
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the lane.
+        """
+        self.__queue.put(item, block, timeout, self.__lane)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items into the lane in order.
+
+        Returns the number of items put.
+        """
+        return self.__queue.put_many(items, timeout, self.__lane)
+
+    # pylint: disable-next=unused-argument
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Not available, get from the lane queue.
+
+        Raises `TypeError`.
+        """
+        raise TypeError("Get from the lane queue instead of one of its lanes")
+
+    def get_nowait(self) -> object:
+        """
+        Not available, get from the lane queue.
+
+        Raises `TypeError`.
+        """
+        return self.get(False)
+
+    # pylint: disable-next=unused-argument
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Not available, get from the lane queue.
+
+        Raises `TypeError`.
+        """
+        raise TypeError("Get from the lane queue instead of one of its lanes")
+
+    def qsize(self) -> int:
+        """
+        Returns the number of items in the lane.
+        """
+        return self.__queue.qsize(self.__lane)
+
+    def empty(self) -> bool:
+        """
+        Returns whether the lane is empty.
+        """
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Returns whether the lane is full.
+        """
+        return self.__queue.full(self.__lane)
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items dropped by the overflow policy of the lane.
+        """
+        return self.__queue.get_dropped_count(self.__lane)
+
+    def close(self) -> None:
+        """
+        Closes the whole lane queue, see `LaneQueue.close()`.
+        """
+        self.__queue.close()
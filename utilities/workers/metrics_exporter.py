@@ -0,0 +1,281 @@
+"""
+Serves worker and queue metrics in the Prometheus text format on a local socket.
+"""
+
+import http.server
+import os
+import socketserver
+
+from modules.common.modules.logger import logger
+from utilities.workers import broadcast_channel
+from utilities.workers import lane_queue
+from utilities.workers import prometheus_text
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_manager
+from utilities.workers import worker_metrics
+
+
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers GET /metrics with the rendered metrics of the server's exporter.
+    """
+
+    # Seconds before a stalled client is dropped, so it cannot hold up other scrapes
+    timeout = 5
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Sends the metrics.
+        """
+        if self.path not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = self.server.render().encode()  # type: ignore
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        """
+        Scrapes are not logged.
+        """
+
+
+class TcpMetricsServer(http.server.HTTPServer):
+    """
+    HTTP server on a TCP socket.
+    """
+
+    allow_reuse_address = True
+
+
+class UnixMetricsServer(socketserver.UnixStreamServer):
+    """
+    HTTP server on a Unix socket.
+    """
+
+    def get_request(self) -> "tuple[object, tuple[str, int]]":
+        """
+        Unix socket clients have no address, the request handler expects a host and port.
+        """
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+class MetricsExporter:  # pylint: disable=too-many-instance-attributes
+    """
+    Serves a text metrics endpoint for scraping.
+
+    Everything is read from what already exists on main's side: queue sizes,
+    the shared memory metrics of each worker, and restart counts. Workers do no extra work.
+    Loop rates are the rate of the `_count` of the loop histograms.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        address: str,
+        managers: "list[worker_manager.WorkerManager]",
+        queues: "dict[str, queue_proxy_wrapper.QueueProxyWrapper]",
+        channels: "dict[str, broadcast_channel.BroadcastChannel]",
+        lane_queues: "dict[str, lane_queue.LaneQueue]",
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, MetricsExporter | None]":
+        """
+        Binds the socket of the endpoint.
+
+        address: "tcp:<host>:<port>" or "unix:<path>", e.g. "tcp:localhost:9101".
+        managers: Managers of the workers to report.
+        queues: Queues to report by name.
+        channels: Broadcast channels to report subscribers of by name.
+        lane_queues: Lane queues to report lanes of by name.
+        local_logger: Existing logger from process.
+
+        Returns the MetricsExporter object.
+        """
+        scheme, _, location = address.partition(":")
+        try:
+            if scheme == "tcp":
+                host, _, port = location.rpartition(":")
+                server = TcpMetricsServer((host, int(port)), MetricsRequestHandler)
+            elif scheme == "unix":
+                # Left behind by an earlier run that did not stop cleanly
+                if os.path.exists(location):
+                    os.unlink(location)
+                server = UnixMetricsServer(location, MetricsRequestHandler)
+            else:
+                local_logger.error(f"Unknown metrics address scheme: {address}", True)
+                return False, None
+        except (OSError, ValueError) as e:
+            local_logger.error(f"Failed to bind metrics endpoint {address}: {e}", True)
+            return False, None
+
+        return True, MetricsExporter(
+            cls.__create_key,
+            server,
+            scheme,
+            location,
+            managers,
+            queues,
+            channels,
+            lane_queues,
+            local_logger,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        server: socketserver.BaseServer,
+        scheme: str,
+        location: str,
+        managers: "list[worker_manager.WorkerManager]",
+        queues: "dict[str, queue_proxy_wrapper.QueueProxyWrapper]",
+        channels: "dict[str, broadcast_channel.BroadcastChannel]",
+        lane_queues: "dict[str, lane_queue.LaneQueue]",
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is MetricsExporter.__create_key, "Use create() method"
+
+        self.__server = server
+        self.__server.render = self.render  # type: ignore
+        self.__scheme = scheme
+        self.__location = location
+        self.__managers = managers
+        self.__queues = queues
+        self.__channels = channels
+        self.__lane_queues = lane_queues
+        self.__local_logger = local_logger
+
+    def render(self) -> str:
+        """
+        Returns the current metrics in the text format.
+        """
+        text = prometheus_text.PrometheusText()
+
+        for name, queue in self.__queues.items():
+            labels = {"queue": name}
+            try:
+                text.add_sample(
+                    "bootcamp_queue_depth",
+                    "gauge",
+                    "Items in the queue.",
+                    labels,
+                    queue.queue.qsize(),
+                )
+            except (OSError, EOFError, NotImplementedError):
+                # Manager already gone during shutdown, or qsize() unsupported by the platform
+                continue
+            text.add_sample(
+                "bootcamp_queue_capacity",
+                "gauge",
+                "Maximum items in the queue, 0 if unbounded.",
+                labels,
+                queue.maxsize,
+            )
+            text.add_sample(
+                "bootcamp_queue_dropped_total",
+                "counter",
+                "Items dropped by the overflow policy of the queue.",
+                labels,
+                queue.get_dropped_count(),
+            )
+
+        for name, channel in self.__channels.items():
+            for subscriber_name, lag, lost in channel.get_subscriber_stats():
+                labels = {"queue": name, "subscriber": subscriber_name}
+                text.add_sample(
+                    "bootcamp_subscriber_lag",
+                    "gauge",
+                    "Items published that the subscriber has not read yet.",
+                    labels,
+                    lag,
+                )
+                text.add_sample(
+                    "bootcamp_subscriber_lost_total",
+                    "counter",
+                    "Items the subscriber lost by falling behind.",
+                    labels,
+                    lost,
+                )
+
+        for name, lanes in self.__lane_queues.items():
+            try:
+                lane_stats = lanes.get_lane_stats()
+            except (OSError, EOFError):
+                # Manager already gone during shutdown
+                continue
+            for stats in lane_stats:
+                labels = {"queue": name, "lane": stats.name}
+                text.add_sample(
+                    "bootcamp_lane_depth", "gauge", "Items in the lane.", labels, stats.depth
+                )
+                text.add_sample(
+                    "bootcamp_lane_dropped_total",
+                    "counter",
+                    "Items dropped by the overflow policy of the lane.",
+                    labels,
+                    stats.dropped_count,
+                )
+                text.add_histogram(
+                    "bootcamp_lane_wait_seconds",
+                    "Time items waited in the lane before a get took them.",
+                    labels,
+                    stats.wait,
+                )
+
+        for manager in self.__managers:
+            target_name = manager.get_target_name()
+            text.add_sample(
+                "bootcamp_worker_restarts_total",
+                "counter",
+                "Workers restarted after ending.",
+                {"worker": target_name},
+                manager.get_restart_count(),
+            )
+            for index, metrics in enumerate(manager.get_metrics_snapshot()):
+                labels = {"worker": target_name, "index": index}
+                for metric, value in metrics.items():
+                    self.__add_worker_metric(text, metric, labels, value)
+
+        return text.render()
+
+    @staticmethod
+    def __add_worker_metric(
+        text: prometheus_text.PrometheusText,
+        metric: str,
+        labels: "dict[str, object]",
+        value: "int | float | worker_metrics.HistogramSnapshot",
+    ) -> None:
+        name = f"bootcamp_worker_{prometheus_text.metric_name(metric)}"
+        if isinstance(value, worker_metrics.HistogramSnapshot):
+            text.add_histogram(
+                f"{name}_seconds", f"Worker {metric} duration in seconds.", labels, value
+            )
+        elif isinstance(value, float):
+            text.add_sample(name, "gauge", f"Worker {metric}.", labels, value)
+        else:
+            text.add_sample(f"{name}_total", "counter", f"Worker {metric} count.", labels, value)
+
+    def run(self) -> None:
+        """
+        Serves scrapes until stop() is called. Intended as the target of a thread in main.
+        """
+        self.__local_logger.info(f"Serving metrics on {self.__scheme}:{self.__location}", True)
+        self.__server.serve_forever()
+
+    def stop(self) -> None:
+        """
+        Stops run() and closes the socket.
+        """
+        self.__server.shutdown()
+        self.__server.server_close()
+        if self.__scheme == "unix" and os.path.exists(self.__location):
+            os.unlink(self.__location)
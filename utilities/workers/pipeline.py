@@ -0,0 +1,399 @@
+"""
+Builds queues and workers from a pipeline description file.
+"""
+
+import multiprocessing.managers
+import pathlib
+
+from modules.common.modules.logger import logger
+from modules.common.modules.read_yaml import read_yaml
+from utilities.workers import broadcast_channel
+from utilities.workers import lane_queue
+from utilities.workers import pipeline_config
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import scaling_policy
+from utilities.workers import shared_memory_blackboard
+from utilities.workers import worker_autoscaler
+from utilities.workers import worker_controller
+from utilities.workers import worker_manager
+
+
+class Pipeline:  # pylint: disable=too-many-instance-attributes
+    """
+    Queues and worker managers of a pipeline description, see `pipeline_config` for the format.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        file_path: pathlib.Path,
+        mp_manager: multiprocessing.managers.SyncManager,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, Pipeline | None]":
+        """
+        Reads and validates the description, then creates its queues.
+
+        file_path: YAML pipeline description.
+        mp_manager: Manager to create manager backed queues from.
+        local_logger: Existing logger from process.
+
+        Returns the Pipeline object.
+        """
+        result, description = read_yaml.open_config(file_path)
+        if not result:
+            local_logger.error(f"Failed to read pipeline description {file_path}", True)
+            return False, None
+
+        result, config, problems = pipeline_config.PipelineConfig.create(description)
+        for problem in problems:
+            if result:
+                local_logger.warning(problem, True)
+            else:
+                local_logger.error(problem, True)
+        if not result:
+            return False, None
+
+        # Get Pylance to stop complaining
+        assert config is not None
+
+        queues = {}
+        channels = {}
+        lane_queues = {}
+        lane_senders = {}
+        for queue_config in config.queues:
+            if queue_config.backend == queue_proxy_wrapper.QueueBackend.BROADCAST:
+                # Queue of a broadcast channel is its publisher, consumers subscribe
+                channel = broadcast_channel.BroadcastChannel(
+                    queue_config.maxsize,
+                    max(queue_config.subscriber_count, 1),
+                    lag_policy=queue_config.lag_policy,
+                )
+                channels[queue_config.name] = channel
+                queues[queue_config.name] = queue_proxy_wrapper.QueueProxyWrapper.from_broadcast(
+                    channel.get_publisher(), queue_config.maxsize, queue_config.codec
+                )
+                local_logger.info(
+                    f"Queue {queue_config.name}: BROADCAST, maxsize {queue_config.maxsize}, "
+                    f"{queue_config.subscriber_count} subscribers, "
+                    f"lag {queue_config.lag_policy.name}",
+                    True,
+                )
+                continue
+
+            if queue_config.backend == queue_proxy_wrapper.QueueBackend.LANES:
+                if not isinstance(mp_manager, queue_proxy_wrapper.QueueManager):
+                    local_logger.error(
+                        f"Queue {queue_config.name}: LANES needs a QueueManager", True
+                    )
+                    return False, None
+
+                # Queue of a lane queue is its consumer end, producers put into their lane
+                proxy = mp_manager.LaneQueue(queue_config.lanes, queue_config.scheduling)
+                lane_queues[queue_config.name] = proxy
+                queues[queue_config.name] = queue_proxy_wrapper.QueueProxyWrapper.from_lanes(
+                    proxy, queue_config.maxsize, queue_config.codec
+                )
+                for lane, lane_config in enumerate(queue_config.lanes):
+                    lane_senders[f"{queue_config.name}.{lane_config.name}"] = (
+                        queue_proxy_wrapper.QueueProxyWrapper.from_lanes(
+                            lane_queue.LaneSender(proxy, lane),
+                            lane_config.maxsize,
+                            queue_config.codec,
+                        )
+                    )
+                    local_logger.info(
+                        f"Queue {queue_config.name} lane {lane_config.name}: "
+                        f"maxsize {lane_config.maxsize}, weight {lane_config.weight}, "
+                        f"overflow {lane_config.overflow_policy.name}",
+                        True,
+                    )
+                continue
+
+            queues[queue_config.name] = queue_proxy_wrapper.QueueProxyWrapper(
+                mp_manager,
+                queue_config.maxsize,
+                queue_config.backend,
+                queue_config.codec,
+                queue_config.overflow_policy,
+                queue_config.keep_count,
+            )
+            local_logger.info(
+                f"Queue {queue_config.name}: {queue_config.backend.name}, "
+                f"maxsize {queue_config.maxsize}, overflow {queue_config.overflow_policy.name}",
+                True,
+            )
+
+        blackboards = {}
+        for blackboard_config in config.blackboards:
+            blackboards[blackboard_config.name] = shared_memory_blackboard.SharedMemoryBlackboard(
+                blackboard_config.codec, blackboard_config.payload_size
+            )
+            local_logger.info(
+                f"Blackboard {blackboard_config.name}: "
+                f"payload size {blackboard_config.payload_size} bytes",
+                True,
+            )
+
+        return True, Pipeline(
+            cls.__create_key,
+            config,
+            queues,
+            channels,
+            lane_queues,
+            lane_senders,
+            blackboards,
+            local_logger,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        config: pipeline_config.PipelineConfig,
+        queues: "dict[str, queue_proxy_wrapper.QueueProxyWrapper]",
+        channels: "dict[str, broadcast_channel.BroadcastChannel]",
+        lane_queues: "dict[str, lane_queue.LaneQueue]",
+        lane_senders: "dict[str, queue_proxy_wrapper.QueueProxyWrapper]",
+        blackboards: "dict[str, shared_memory_blackboard.SharedMemoryBlackboard]",
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is Pipeline.__create_key, "Use create() method"
+
+        self.__config = config
+        self.__queues = queues
+        self.__channels = channels
+        self.__lane_queues = lane_queues
+        self.__lane_senders = lane_senders
+        self.__blackboards = blackboards
+        self.__codecs = {queue_config.name: queue_config.codec for queue_config in config.queues}
+        self.__local_logger = local_logger
+
+        # Stage name -> manager and input queues of autoscaled stages, see create_workers()
+        self.__scalable_stages: "dict[str, tuple[worker_manager.WorkerManager, list]]" = {}
+
+    def get_queue(self, name: str) -> "queue_proxy_wrapper.QueueProxyWrapper | None":
+        """
+        Returns the queue with the name, None if the description has no such queue.
+        For a BROADCAST queue this is the publisher, use subscribe() to read.
+        A lane of a LANES queue is named `<queue name>.<lane name>`.
+        """
+        if name in self.__lane_senders:
+            return self.__lane_senders[name]
+
+        return self.__queues.get(name)
+
+    def subscribe(
+        self, name: str, subscriber_name: str
+    ) -> "queue_proxy_wrapper.QueueProxyWrapper | None":
+        """
+        Returns a queue that reads every item of the queue with the name,
+        for BROADCAST its own subscription, otherwise the queue itself.
+
+        name: Queue name.
+        subscriber_name: Name of the reader in subscriber statistics.
+
+        Returns None if the description has no such queue or no subscription is left.
+        """
+        if name not in self.__channels:
+            return self.__queues.get(name)
+
+        try:
+            subscriber = self.__channels[name].subscribe(subscriber_name)
+        except ValueError as e:
+            self.__local_logger.error(f"Queue {name}: {e}", True)
+            return None
+
+        return queue_proxy_wrapper.QueueProxyWrapper.from_broadcast(
+            subscriber, self.__queues[name].maxsize, self.__codecs[name]
+        )
+
+    def get_channels(self) -> "dict[str, broadcast_channel.BroadcastChannel]":
+        """
+        Returns the channels of BROADCAST queues by name, for subscriber statistics.
+        """
+        return dict(self.__channels)
+
+    def get_lane_queues(self) -> "dict[str, lane_queue.LaneQueue]":
+        """
+        Returns the lane queues of LANES queues by name, for lane statistics.
+        """
+        return dict(self.__lane_queues)
+
+    def get_lane_senders(self, name: str) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Returns the lanes of the LANES queue with the name, empty for other queues.
+        """
+        return [
+            sender
+            for lane_name, sender in self.__lane_senders.items()
+            if lane_name.partition(".")[0] == name
+        ]
+
+    def get_blackboards(self) -> "dict[str, shared_memory_blackboard.SharedMemoryBlackboard]":
+        """
+        Returns the blackboards by name.
+        """
+        return dict(self.__blackboards)
+
+    def get_queues(self) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Returns all queues in the order they were declared, without the lanes of LANES queues.
+        """
+        return list(self.__queues.values())
+
+    def get_named_queues(self) -> "dict[str, queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Returns all queues by name, in the order they were declared.
+        """
+        return dict(self.__queues)
+
+    def __bind(self, value: object, bindings: "dict") -> object:
+        if isinstance(value, pipeline_config.Binding):
+            return bindings[value.name]
+
+        return value
+
+    def create_workers(
+        self,
+        bindings: "dict[str, object]",
+        controller: worker_controller.WorkerController,
+    ) -> "tuple[bool, list[worker_manager.WorkerManager]]":
+        """
+        Creates the worker managers of all stages.
+        ASYNCIO stages with the same host share one process.
+
+        bindings: Objects for the `$name` values of the description, except the blackboards.
+        controller: Worker controller given to every worker.
+
+        Returns whether all workers were created and their managers.
+        """
+        missing = self.__config.get_bindings() - set(bindings)
+        if missing:
+            self.__local_logger.error(f"Pipeline bindings not provided: {sorted(missing)}", True)
+            return False, []
+
+        bindings = bindings | self.__blackboards
+
+        managers = []
+        hosted_properties: "dict[str, list[worker_manager.WorkerProperties]]" = {}
+        for stage in self.__config.stages:
+            # Workers of a stage share its subscriptions
+            input_queues = [self.subscribe(name, stage.name) for name in stage.inputs]
+            if None in input_queues:
+                return False, []
+
+            execution_mode = worker_manager.ExecutionMode[stage.mode]
+            result, properties = worker_manager.WorkerProperties.create(
+                count=stage.count,
+                target=stage.target,
+                work_arguments=tuple(self.__bind(value, bindings) for value in stage.arguments),
+                input_queues=input_queues,
+                output_queues=[self.get_queue(name) for name in stage.outputs],
+                controller=controller,
+                local_logger=self.__local_logger,
+                work_keyword_arguments={
+                    key: self.__bind(value, bindings)
+                    for key, value in stage.keyword_arguments.items()
+                },
+                execution_mode=execution_mode,
+                max_count=stage.max_count,
+                placement=stage.placement,
+            )
+            if not result:
+                self.__local_logger.error(
+                    f"Failed to create properties of stage {stage.name}", True
+                )
+                return False, []
+
+            if execution_mode == worker_manager.ExecutionMode.ASYNCIO:
+                hosted_properties.setdefault(stage.host, []).append(properties)
+                continue
+
+            result, manager = worker_manager.WorkerManager.create(properties, self.__local_logger)
+            if not result:
+                self.__local_logger.error(f"Failed to create workers of stage {stage.name}", True)
+                return False, []
+
+            managers.append(manager)
+            if stage.is_autoscaled():
+                self.__scalable_stages[stage.name] = (manager, input_queues)
+
+        for host, properties_list in hosted_properties.items():
+            result, properties = worker_manager.WorkerProperties.create_asyncio_host(
+                properties_list, self.__local_logger
+            )
+            if result:
+                result, manager = worker_manager.WorkerManager.create(
+                    properties, self.__local_logger
+                )
+            if not result:
+                self.__local_logger.error(f"Failed to create asyncio host {host}", True)
+                return False, []
+
+            managers.append(manager)
+
+        return True, managers
+
+    def create_autoscalers(
+        self,
+        target_utilization: float,
+        scale_up_fill: float,
+        scale_down_delay: float,
+    ) -> "tuple[bool, list[worker_autoscaler.WorkerAutoscaler]]":
+        """
+        Creates an autoscaler for each stage with a max_count, call after create_workers().
+        Each scales its stage between count and max_count, see `scaling_policy.ScalingPolicy`.
+
+        target_utilization: Fraction of time each worker should be busy.
+        scale_up_fill: Input queue fill that adds a worker regardless of utilization.
+        scale_down_delay: Seconds fewer workers must have been enough before retiring one.
+
+        Returns whether all autoscalers were created and the autoscalers.
+        """
+        autoscalers = []
+        for stage in self.__config.stages:
+            if stage.name not in self.__scalable_stages:
+                continue
+
+            manager, input_queues = self.__scalable_stages[stage.name]
+            result, policy = scaling_policy.ScalingPolicy.create(
+                stage.count,
+                stage.max_count,
+                target_utilization,
+                scale_up_fill,
+                scale_down_delay,
+            )
+            if not result:
+                self.__local_logger.error(f"Invalid scaling policy for stage {stage.name}", True)
+                return False, []
+
+            # Get Pylance to stop complaining
+            assert policy is not None
+
+            result, autoscaler = worker_autoscaler.WorkerAutoscaler.create(
+                manager, input_queues, policy, self.__local_logger
+            )
+            if not result:
+                self.__local_logger.error(f"Failed to create autoscaler of {stage.name}", True)
+                return False, []
+
+            autoscalers.append(autoscaler)
+
+        return True, autoscalers
+
+    def release(self) -> None:
+        """
+        Frees resources of all queues, call once all workers have been joined.
+        """
+        for queue in self.__queues.values():
+            queue.release()
+
+        for channel in self.__channels.values():
+            channel.release()
+
+        for blackboard in self.__blackboards.values():
+            blackboard.release()
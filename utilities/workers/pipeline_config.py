@@ -0,0 +1,889 @@
+"""
+Pipeline topology description: parsing, validation, and queue sizing.
+
+A description is a dictionary, usually read from YAML:
+```
+queues:
+  <queue name>:
+    backend: MANAGER | SHARED_MEMORY | THREAD | BROADCAST | LANES  # Default MANAGER
+    codec: <module>.<type>  # Optional
+    maxsize: <int>  # Optional, sized from the rates otherwise
+    overflow: BLOCK | DROP_NEWEST | DROP_OLDEST | KEEP_LATEST_N  # Default BLOCK
+    keep_count: <int>  # Items kept by KEEP_LATEST_N, default 1
+    lag_policy: SKIP_TO_OLDEST | SKIP_TO_LATEST  # Only BROADCAST, default SKIP_TO_OLDEST
+    max_latency: <seconds>  # Longest an item should wait when auto sized, default 1
+    producer_rate: <items per second>  # Producers that are not stages, e.g. the mux
+    consumer_rate: <items per second>  # Consumers that are not stages, e.g. main
+    scheduling: STRICT | WEIGHTED  # Only LANES, default STRICT
+    lanes:  # Only LANES, in priority order, instead of the queue's maxsize and overflow
+      <lane name>:
+        weight: <int>  # Share of gets when WEIGHTED, default 1
+        maxsize, overflow, keep_count, max_latency, producer_rate  # As for a queue
+stages:
+  <stage name>:
+    target: <module>.<worker function>
+    count: <int>  # Default 1, the fewest workers if autoscaled
+    max_count: <int>  # Most workers when autoscaled, default count which disables autoscaling
+    mode: PROCESS | ASYNCIO | THREAD  # Default PROCESS
+    host: <host name>  # ASYNCIO stages with the same host share a process
+    cpu_affinity: [<CPU>, ...]  # Only PROCESS, CPUs each worker may run on, default main's
+    nice: <-20 to 19>  # Only PROCESS, niceness of each worker, default main's
+    memory_limit: <MiB>  # Only PROCESS, address space of each worker, default unlimited
+    arguments: [<value or $binding>, ...]
+    keyword_arguments: {<name>: <value or $binding>, ...}
+    inputs: {<queue name>: <items per second per worker or null>, ...}
+    outputs: {<queue name>: <items per second per worker or null>, ...}
+blackboards:
+  <blackboard name>:
+    codec: <module>.<type>  # Optional
+    payload_size: <bytes>  # Largest encoded item, default 4096
+```
+Worker arguments are `arguments + inputs + outputs + (controller,)` like `WorkerProperties`.
+Rates per worker are multiplied by max_count, so queues fit the most workers.
+Strings starting with `$` are bindings to objects main provides when creating the workers.
+
+A BROADCAST queue gives every consuming stage, and main if it declares a consumer_rate,
+its own subscription, so each of them reads every item. Workers of one stage share theirs.
+
+Stages put into a lane of a LANES queue with the output `<queue name>.<lane name>`,
+and read the whole queue with the input `<queue name>`.
+
+A blackboard holds only the newest item, see `shared_memory_blackboard`.
+Stages get it as the binding `$<blackboard name>`, which main does not provide.
+"""
+
+import importlib
+import inspect
+import math
+import os
+
+from utilities.workers import broadcast_channel
+from utilities.workers import lane_queue
+from utilities.workers import process_resources
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import shared_memory_blackboard
+
+
+EXECUTION_MODE_NAMES = ("PROCESS", "ASYNCIO", "THREAD")
+BINDING_PREFIX = "$"
+DEFAULT_MAX_LATENCY = 1.0  # seconds
+
+
+class Binding:
+    """
+    Reference to an object provided by main when the workers are created.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"{BINDING_PREFIX}{self.name}"
+
+
+def parse_value(value: object) -> object:
+    """
+    Returns a Binding for `$name` strings, otherwise the value unchanged.
+    """
+    if isinstance(value, str) and value.startswith(BINDING_PREFIX):
+        return Binding(value[len(BINDING_PREFIX) :])
+
+    return value
+
+
+def resolve_object(path: str) -> "tuple[bool, object | None]":
+    """
+    Imports `<module>.<name>`.
+
+    Returns whether the object was found and the object.
+    """
+    module_name, _, name = path.rpartition(".")
+    if not module_name:
+        return False, None
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return False, None
+
+    if not hasattr(module, name):
+        return False, None
+
+    return True, getattr(module, name)
+
+
+def size_queue(producer_rate: float, max_latency: float) -> int:
+    """
+    Returns the queue size that holds max_latency seconds of production.
+    A deeper queue only makes items staler, a shallower one drops bursts.
+    """
+    return max(math.ceil(producer_rate * max_latency), 1)
+
+
+def sum_rates(rates: "list[float | None]") -> "float | None":
+    """
+    Returns the total rate, None if any is unknown or there are none.
+    """
+    if not rates or any(rate is None for rate in rates):
+        return None
+
+    return float(sum(rates))
+
+
+def min_rates(rates: "list[float | None]") -> "float | None":
+    """
+    Returns the slowest rate, None if any is unknown or there are none.
+    """
+    if not rates or any(rate is None for rate in rates):
+        return None
+
+    return float(min(rates))
+
+
+class QueueConfig:  # pylint: disable=too-many-instance-attributes
+    """
+    A queue of the pipeline, with its size decided.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: queue_proxy_wrapper.QueueBackend,
+        codec: "type | None",
+        maxsize: int,
+        producer_rate: "float | None",
+        consumer_rate: "float | None",
+        overflow_policy: queue_proxy_wrapper.OverflowPolicy = queue_proxy_wrapper.OverflowPolicy.BLOCK,
+        keep_count: int = 1,
+        lag_policy: broadcast_channel.LagPolicy = broadcast_channel.LagPolicy.SKIP_TO_OLDEST,
+        subscriber_count: int = 0,
+        lanes: "list[lane_queue.LaneConfig] | None" = None,
+        scheduling: lane_queue.LaneScheduling = lane_queue.LaneScheduling.STRICT,
+    ) -> None:
+        """
+        name: Queue name.
+        backend: Underlying queue implementation.
+        codec: Type moved as raw bytes, None to pickle.
+        maxsize: Maximum number of items.
+        producer_rate: Total items per second put, None if unknown.
+        consumer_rate: Total items per second taken, None if unknown.
+        For BROADCAST the rate of the slowest subscriber, since each reads every item.
+        overflow_policy: What a put does when the queue is full.
+        keep_count: Items kept by KEEP_LATEST_N.
+        lag_policy: What a subscriber that fell behind reads next, only for BROADCAST.
+        subscriber_count: Subscriptions to create, only for BROADCAST.
+        lanes: Lanes in priority order, only for LANES.
+        scheduling: How gets choose between lanes, only for LANES.
+        """
+        self.name = name
+        self.backend = backend
+        self.codec = codec
+        self.maxsize = maxsize
+        self.producer_rate = producer_rate
+        self.consumer_rate = consumer_rate
+        self.overflow_policy = overflow_policy
+        self.keep_count = keep_count
+        self.lag_policy = lag_policy
+        self.subscriber_count = subscriber_count
+        self.lanes = lanes or []
+        self.scheduling = scheduling
+
+    def is_saturated(self) -> bool:
+        """
+        Returns whether producers are declared faster than consumers, so the queue fills up.
+        """
+        if self.producer_rate is None or self.consumer_rate is None:
+            return False
+
+        return self.consumer_rate < self.producer_rate
+
+
+class StageConfig:  # pylint: disable=too-many-instance-attributes
+    """
+    A group of identical workers of the pipeline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target: "(...) -> object",  # type: ignore
+        count: int,
+        mode: str,
+        host: str,
+        arguments: "list",
+        keyword_arguments: "dict",
+        inputs: "dict[str, float | None]",
+        outputs: "dict[str, float | None]",
+        max_count: "int | None" = None,
+        placement: "process_resources.ProcessPlacement | None" = None,
+    ) -> None:
+        """
+        name: Stage name.
+        target: Worker function.
+        count: Number of workers, the fewest if autoscaled.
+        mode: Name of the execution mode.
+        host: Name of the asyncio host process, only for ASYNCIO.
+        arguments: Worker arguments, with Binding for values provided by main.
+        keyword_arguments: Worker keyword arguments, with Binding for values provided by main.
+        inputs: Input queue names and the items per second each worker takes.
+        outputs: Output queue names and the items per second each worker puts.
+        max_count: Most workers when autoscaled, default count.
+        placement: Placement of each worker process, None to inherit main's.
+        """
+        self.name = name
+        self.target = target
+        self.count = count
+        self.mode = mode
+        self.host = host
+        self.arguments = arguments
+        self.keyword_arguments = keyword_arguments
+        self.inputs = inputs
+        self.outputs = outputs
+        self.max_count = count if max_count is None else max_count
+        self.placement = placement
+
+    def is_autoscaled(self) -> bool:
+        """
+        Returns whether the worker count changes with the load.
+        """
+        return self.max_count > self.count
+
+    def get_bindings(self) -> "set[str]":
+        """
+        Returns the names of all bindings used by the stage.
+        """
+        values = list(self.arguments) + list(self.keyword_arguments.values())
+        return {value.name for value in values if isinstance(value, Binding)}
+
+
+class BlackboardConfig:
+    """
+    A latest value slot of the pipeline.
+    """
+
+    def __init__(self, name: str, codec: "type | None", payload_size: int) -> None:
+        """
+        name: Blackboard name, also the binding stages use.
+        codec: Type with `to_bytes()` and `from_bytes()`, None to pickle.
+        payload_size: Maximum size of an encoded item in bytes.
+        """
+        self.name = name
+        self.codec = codec
+        self.payload_size = payload_size
+
+
+class PipelineConfig:
+    """
+    Validated pipeline topology.
+    """
+
+    __create_key = object()
+
+    __QUEUE_KEYS = {
+        "backend",
+        "codec",
+        "maxsize",
+        "max_latency",
+        "producer_rate",
+        "consumer_rate",
+        "overflow",
+        "keep_count",
+        "lag_policy",
+        "scheduling",
+        "lanes",
+    }
+    # Queue keys that LANES queues set per lane instead
+    __LANE_KEYS = {
+        "maxsize",
+        "max_latency",
+        "producer_rate",
+        "overflow",
+        "keep_count",
+        "weight",
+    }
+    __STAGE_KEYS = {
+        "target",
+        "count",
+        "max_count",
+        "mode",
+        "host",
+        "cpu_affinity",
+        "nice",
+        "memory_limit",
+        "arguments",
+        "keyword_arguments",
+        "inputs",
+        "outputs",
+    }
+    __BLACKBOARD_KEYS = {"codec", "payload_size"}
+
+    @classmethod
+    def create(
+        cls, description: "dict"
+    ) -> "tuple[True, PipelineConfig, list[str]] | tuple[False, None, list[str]]":
+        """
+        Validates the whole description before anything is created:
+        names, targets and codecs, queue edges, worker argument counts, and queue sizes.
+
+        description: Pipeline description as described in this module.
+
+        Returns the PipelineConfig object and a list of problems.
+        Warnings (e.g. saturated queues) are in the list even on success.
+        """
+        errors = []
+        warnings = []
+
+        if not isinstance(description, dict):
+            return False, None, ["Pipeline description must be a mapping"]
+
+        queue_descriptions = description.get("queues") or {}
+        stage_descriptions = description.get("stages") or {}
+        blackboard_descriptions = description.get("blackboards") or {}
+        if (
+            not isinstance(queue_descriptions, dict)
+            or not isinstance(stage_descriptions, dict)
+            or not isinstance(blackboard_descriptions, dict)
+        ):
+            return False, None, ["queues, stages and blackboards must be mappings"]
+
+        stages = []
+        for name, stage_description in stage_descriptions.items():
+            stage = cls.__parse_stage(name, stage_description, queue_descriptions, errors)
+            if stage is not None:
+                stages.append(stage)
+
+        queues = []
+        for name, queue_description in queue_descriptions.items():
+            queue_config = cls.__parse_queue(name, queue_description, stages, errors)
+            if queue_config is None:
+                continue
+
+            if queue_config.is_saturated():
+                if queue_config.backend == queue_proxy_wrapper.QueueBackend.BROADCAST:
+                    outcome = f"the slowest will lose items ({queue_config.lag_policy.name})"
+                elif queue_config.overflow_policy == queue_proxy_wrapper.OverflowPolicy.BLOCK:
+                    outcome = "it will stay full"
+                else:
+                    outcome = f"it will drop items ({queue_config.overflow_policy.name})"
+                warnings.append(
+                    f"Queue {name}: producers put {queue_config.producer_rate}/s "
+                    f"but consumers take {queue_config.consumer_rate}/s, {outcome}"
+                )
+            queues.append(queue_config)
+
+        blackboards = []
+        for name, blackboard_description in blackboard_descriptions.items():
+            blackboard_config = cls.__parse_blackboard(name, blackboard_description, errors)
+            if blackboard_config is None:
+                continue
+
+            if not any(name in stage.get_bindings() for stage in stages):
+                warnings.append(f"Blackboard {name}: no stage uses {BINDING_PREFIX}{name}")
+            blackboards.append(blackboard_config)
+
+        if errors:
+            return False, None, errors
+
+        return True, PipelineConfig(cls.__create_key, queues, stages, blackboards), warnings
+
+    @staticmethod
+    def __parse_rates(
+        stage_name: str,
+        edges: object,
+        kind: str,
+        queue_descriptions: "dict",
+        errors: "list[str]",
+    ) -> "dict[str, float | None]":
+        """
+        Returns the queue edges of a stage, or an empty mapping after recording errors.
+        """
+        if edges is None:
+            return {}
+
+        if not isinstance(edges, dict):
+            errors.append(f"Stage {stage_name}: {kind} must map queue names to rates")
+            return {}
+
+        for queue_name, rate in edges.items():
+            # Lanes are checked with their queue
+            if queue_name.partition(".")[0] not in queue_descriptions:
+                errors.append(f"Stage {stage_name}: {kind} queue {queue_name} is not declared")
+            if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+                errors.append(f"Stage {stage_name}: rate of {kind} queue {queue_name} must be > 0")
+
+        return dict(edges)
+
+    @classmethod
+    def __parse_stage(
+        cls,
+        name: str,
+        description: object,
+        queue_descriptions: "dict",
+        errors: "list[str]",
+    ) -> "StageConfig | None":
+        """
+        Returns the stage, or None after recording errors.
+        """
+        if not isinstance(description, dict):
+            errors.append(f"Stage {name}: must be a mapping")
+            return None
+
+        error_count = len(errors)
+        unknown_keys = set(description) - cls.__STAGE_KEYS
+        if unknown_keys:
+            errors.append(f"Stage {name}: unknown keys {sorted(unknown_keys)}")
+
+        result, target = resolve_object(str(description.get("target", "")))
+        if not result or not callable(target):
+            errors.append(f"Stage {name}: target {description.get('target')} not found")
+
+        count = description.get("count", 1)
+        if not isinstance(count, int) or count <= 0:
+            errors.append(f"Stage {name}: count must be an integer greater than 0")
+
+        max_count = description.get("max_count", count)
+        if not isinstance(max_count, int) or (isinstance(count, int) and max_count < count):
+            errors.append(f"Stage {name}: max_count must be an integer not less than count")
+
+        mode = description.get("mode", "PROCESS")
+        if mode not in EXECUTION_MODE_NAMES:
+            errors.append(f"Stage {name}: mode must be one of {EXECUTION_MODE_NAMES}")
+        elif result and (mode == "ASYNCIO") != inspect.iscoroutinefunction(target):
+            errors.append(f"Stage {name}: target must be async exactly when mode is ASYNCIO")
+        if mode == "ASYNCIO" and max_count != count:
+            errors.append(f"Stage {name}: ASYNCIO workers share a host process and cannot scale")
+
+        placement = cls.__parse_placement(name, description, mode, errors)
+
+        arguments = description.get("arguments") or []
+        keyword_arguments = description.get("keyword_arguments") or {}
+        if not isinstance(arguments, list) or not isinstance(keyword_arguments, dict):
+            errors.append(f"Stage {name}: arguments must be a list and keyword_arguments a mapping")
+            return None
+
+        inputs = cls.__parse_rates(
+            name, description.get("inputs"), "inputs", queue_descriptions, errors
+        )
+        outputs = cls.__parse_rates(
+            name, description.get("outputs"), "outputs", queue_descriptions, errors
+        )
+
+        if len(errors) > error_count:
+            return None
+
+        stage = StageConfig(
+            name,
+            target,
+            count,
+            mode,
+            str(description.get("host", name)),
+            [parse_value(value) for value in arguments],
+            {key: parse_value(value) for key, value in keyword_arguments.items()},
+            inputs,
+            outputs,
+            max_count,
+            placement,
+        )
+
+        # Same order as WorkerProperties.get_worker_arguments(), values do not matter here
+        worker_arguments = (
+            stage.arguments + list(stage.inputs) + list(stage.outputs) + ["controller"]
+        )
+        try:
+            inspect.signature(target).bind(*worker_arguments, **stage.keyword_arguments)
+        except TypeError as e:
+            errors.append(
+                f"Stage {name}: {len(worker_arguments)} arguments "
+                f"(arguments, inputs, outputs, controller) do not fit "
+                f"{target.__name__}{inspect.signature(target)}: {e}"
+            )
+
+        # Still returned so its rates size the queues, errors fail the description anyway
+        return stage
+
+    @staticmethod
+    def __parse_placement(
+        stage_name: str,
+        description: "dict",
+        mode: str,
+        errors: "list[str]",
+    ) -> "process_resources.ProcessPlacement | None":
+        """
+        Returns the placement of the stage, None if it has none or after recording errors.
+        """
+        cpu_affinity = description.get("cpu_affinity")
+        nice = description.get("nice")
+        memory_limit = description.get("memory_limit")
+        if cpu_affinity is None and nice is None and memory_limit is None:
+            return None
+
+        error_count = len(errors)
+        if mode != "PROCESS":
+            errors.append(f"Stage {stage_name}: only PROCESS workers can be placed")
+
+        unsupported_keys = [
+            key
+            for key, value, is_supported in [
+                ("cpu_affinity", cpu_affinity, process_resources.HAS_CPU_AFFINITY),
+                ("nice", nice, process_resources.HAS_NICE),
+                ("memory_limit", memory_limit, process_resources.HAS_MEMORY_LIMIT),
+            ]
+            if value is not None and not is_supported
+        ]
+        if unsupported_keys:
+            errors.append(f"Stage {stage_name}: {unsupported_keys} not supported on this platform")
+            return None
+
+        if cpu_affinity is not None:
+            available_cpus = os.sched_getaffinity(0)
+            if (
+                not isinstance(cpu_affinity, list)
+                or len(cpu_affinity) == 0
+                or not set(cpu_affinity) <= available_cpus
+            ):
+                errors.append(
+                    f"Stage {stage_name}: cpu_affinity must list CPUs available to main, "
+                    f"{sorted(available_cpus)}"
+                )
+
+        if nice is not None and (
+            not isinstance(nice, int)
+            or not process_resources.MIN_NICE <= nice <= process_resources.MAX_NICE
+        ):
+            errors.append(
+                f"Stage {stage_name}: nice must be an integer from "
+                f"{process_resources.MIN_NICE} to {process_resources.MAX_NICE}"
+            )
+
+        if memory_limit is not None and (
+            not isinstance(memory_limit, (int, float)) or memory_limit <= 0
+        ):
+            errors.append(f"Stage {stage_name}: memory_limit must be > 0 MiB")
+
+        if len(errors) > error_count:
+            return None
+
+        _, placement = process_resources.ProcessPlacement.create(
+            cpu_affinity, nice, memory_limit and int(memory_limit * 2**20)
+        )
+        return placement
+
+    @classmethod
+    def __parse_queue(
+        cls,
+        name: str,
+        description: object,
+        stages: "list[StageConfig]",
+        errors: "list[str]",
+    ) -> "QueueConfig | None":
+        """
+        Returns the queue with its size decided, or None after recording errors.
+        """
+        if description is None:
+            description = {}
+
+        if not isinstance(description, dict):
+            errors.append(f"Queue {name}: must be a mapping")
+            return None
+
+        unknown_keys = set(description) - cls.__QUEUE_KEYS
+        if unknown_keys:
+            errors.append(f"Queue {name}: unknown keys {sorted(unknown_keys)}")
+            return None
+
+        backend_name = description.get("backend", "MANAGER")
+        if backend_name not in queue_proxy_wrapper.QueueBackend.__members__:
+            errors.append(f"Queue {name}: unknown backend {backend_name}")
+            return None
+
+        codec = None
+        if "codec" in description:
+            result, codec = resolve_object(str(description["codec"]))
+            if not result or not isinstance(codec, type):
+                errors.append(f"Queue {name}: codec {description['codec']} not found")
+                return None
+
+        producer_rates = [
+            stage.outputs[name] and stage.outputs[name] * stage.max_count
+            for stage in stages
+            if name in stage.outputs
+        ]
+        consumer_rates = [
+            stage.inputs[name] and stage.inputs[name] * stage.max_count
+            for stage in stages
+            if name in stage.inputs
+        ]
+        if "producer_rate" in description:
+            producer_rates.append(description["producer_rate"])
+        if "consumer_rate" in description:
+            consumer_rates.append(description["consumer_rate"])
+        backend = queue_proxy_wrapper.QueueBackend[backend_name]
+        is_broadcast = backend == queue_proxy_wrapper.QueueBackend.BROADCAST
+        producer_rate = sum_rates(producer_rates)
+        # Every subscriber reads every item, so the slowest one decides
+        consumer_rate = min_rates(consumer_rates) if is_broadcast else sum_rates(consumer_rates)
+
+        if backend == queue_proxy_wrapper.QueueBackend.LANES:
+            return cls.__parse_lanes_queue(name, description, codec, consumer_rate, stages, errors)
+
+        for stage in stages:
+            if any(
+                edge.startswith(f"{name}.") for edge in list(stage.inputs) + list(stage.outputs)
+            ):
+                errors.append(f"Stage {stage.name}: queue {name} has no lanes")
+                return None
+
+        if "scheduling" in description or "lanes" in description:
+            errors.append(f"Queue {name}: scheduling and lanes require the LANES backend")
+            return None
+
+        bound = cls.__parse_bound(f"Queue {name}", description, producer_rate, errors)
+        if bound is None:
+            return None
+
+        maxsize, overflow_policy, keep_count = bound
+        bounded_backends = (
+            queue_proxy_wrapper.QueueBackend.SHARED_MEMORY,
+            queue_proxy_wrapper.QueueBackend.BROADCAST,
+        )
+        if backend in bounded_backends and maxsize <= 0:
+            errors.append(f"Queue {name}: {backend_name} backend requires maxsize greater than 0")
+            return None
+
+        if is_broadcast and overflow_policy != queue_proxy_wrapper.OverflowPolicy.BLOCK:
+            errors.append(
+                f"Queue {name}: BROADCAST never blocks, use lag_policy instead of overflow"
+            )
+            return None
+
+        lag_policy_name = description.get("lag_policy", "SKIP_TO_OLDEST")
+        if lag_policy_name not in broadcast_channel.LagPolicy.__members__:
+            errors.append(f"Queue {name}: unknown lag policy {lag_policy_name}")
+            return None
+
+        if "lag_policy" in description and not is_broadcast:
+            errors.append(f"Queue {name}: lag_policy requires the BROADCAST backend")
+            return None
+
+        return QueueConfig(
+            name,
+            backend,
+            codec,
+            maxsize,
+            producer_rate,
+            consumer_rate,
+            overflow_policy,
+            keep_count,
+            broadcast_channel.LagPolicy[lag_policy_name],
+            len(consumer_rates) if is_broadcast else 0,
+        )
+
+    @staticmethod
+    def __parse_bound(
+        label: str,
+        description: "dict",
+        producer_rate: "float | None",
+        errors: "list[str]",
+    ) -> "tuple[int, queue_proxy_wrapper.OverflowPolicy, int] | None":
+        """
+        Returns the maxsize, overflow policy and keep count of a queue or lane,
+        or None after recording errors.
+
+        label: Queue or lane in error messages.
+        producer_rate: Total items per second put, None if unknown.
+        """
+        maxsize = description.get("maxsize")
+        if maxsize is None:
+            if producer_rate is None:
+                errors.append(f"{label}: needs a maxsize or the rates of all its producers")
+                return None
+
+            max_latency = description.get("max_latency", DEFAULT_MAX_LATENCY)
+            maxsize = size_queue(producer_rate, max_latency)
+        elif not isinstance(maxsize, int):
+            errors.append(f"{label}: maxsize must be an integer")
+            return None
+
+        overflow_name = description.get("overflow", "BLOCK")
+        if overflow_name not in queue_proxy_wrapper.OverflowPolicy.__members__:
+            errors.append(f"{label}: unknown overflow policy {overflow_name}")
+            return None
+
+        overflow_policy = queue_proxy_wrapper.OverflowPolicy[overflow_name]
+        if overflow_policy != queue_proxy_wrapper.OverflowPolicy.BLOCK and maxsize <= 0:
+            errors.append(f"{label}: overflow policy {overflow_name} requires maxsize > 0")
+            return None
+
+        keep_count = description.get("keep_count", 1)
+        if not isinstance(keep_count, int) or not 0 < keep_count <= max(maxsize, 1):
+            errors.append(f"{label}: keep_count must be between 1 and maxsize {maxsize}")
+            return None
+
+        return maxsize, overflow_policy, keep_count
+
+    @classmethod
+    def __parse_lanes_queue(
+        cls,
+        name: str,
+        description: "dict",
+        codec: "type | None",
+        consumer_rate: "float | None",
+        stages: "list[StageConfig]",
+        errors: "list[str]",
+    ) -> "QueueConfig | None":
+        """
+        Returns the LANES queue with the size of each lane decided, or None after recording errors.
+        """
+        error_count = len(errors)
+        misplaced_keys = (set(description) & cls.__LANE_KEYS) - {"max_latency"}
+        if misplaced_keys:
+            errors.append(f"Queue {name}: set {sorted(misplaced_keys)} per lane, not per queue")
+        if "lag_policy" in description:
+            errors.append(f"Queue {name}: lag_policy requires the BROADCAST backend")
+
+        lane_descriptions = description.get("lanes")
+        if not isinstance(lane_descriptions, dict) or not lane_descriptions:
+            errors.append(f"Queue {name}: LANES backend requires lanes mapping names to settings")
+            return None
+
+        for stage in stages:
+            if name in stage.outputs:
+                errors.append(f"Stage {stage.name}: must put into a lane of queue {name}")
+            for edge in stage.outputs:
+                queue_name, _, lane_name = edge.partition(".")
+                if queue_name == name and lane_name not in lane_descriptions:
+                    errors.append(f"Stage {stage.name}: lane {edge} is not declared")
+            if any(edge.startswith(f"{name}.") for edge in stage.inputs):
+                errors.append(f"Stage {stage.name}: must read the whole queue {name}, not a lane")
+
+        lanes = []
+        producer_rates = []
+        for lane_name, lane_description in lane_descriptions.items():
+            label = f"Queue {name} lane {lane_name}"
+            lane_description = lane_description or {}
+            if not isinstance(lane_description, dict):
+                errors.append(f"{label}: must be a mapping")
+                continue
+
+            unknown_keys = set(lane_description) - cls.__LANE_KEYS
+            if unknown_keys:
+                errors.append(f"{label}: unknown keys {sorted(unknown_keys)}")
+                continue
+
+            edge = f"{name}.{lane_name}"
+            lane_rates = [
+                stage.outputs[edge] and stage.outputs[edge] * stage.max_count
+                for stage in stages
+                if edge in stage.outputs
+            ]
+            if "producer_rate" in lane_description:
+                lane_rates.append(lane_description["producer_rate"])
+            producer_rate = sum_rates(lane_rates)
+
+            # Lanes default to the max_latency of their queue
+            bound = cls.__parse_bound(
+                label,
+                {"max_latency": description.get("max_latency", DEFAULT_MAX_LATENCY)}
+                | lane_description,
+                producer_rate,
+                errors,
+            )
+            weight = lane_description.get("weight", 1)
+            if not isinstance(weight, int) or weight <= 0:
+                errors.append(f"{label}: weight must be an integer greater than 0")
+                continue
+            if bound is None:
+                continue
+
+            maxsize, overflow_policy, keep_count = bound
+            lanes.append(
+                lane_queue.LaneConfig(lane_name, maxsize, weight, overflow_policy, keep_count)
+            )
+            producer_rates.append(producer_rate)
+
+        scheduling_name = description.get("scheduling", "STRICT")
+        if scheduling_name not in lane_queue.LaneScheduling.__members__:
+            errors.append(f"Queue {name}: unknown scheduling {scheduling_name}")
+
+        if len(errors) > error_count:
+            return None
+
+        # An unbounded lane makes the whole queue unbounded
+        maxsize = sum(lane.maxsize for lane in lanes)
+        if any(lane.maxsize <= 0 for lane in lanes):
+            maxsize = 0
+
+        return QueueConfig(
+            name,
+            queue_proxy_wrapper.QueueBackend.LANES,
+            codec,
+            maxsize,
+            sum_rates(producer_rates),
+            consumer_rate,
+            lanes=lanes,
+            scheduling=lane_queue.LaneScheduling[scheduling_name],
+        )
+
+    @classmethod
+    def __parse_blackboard(
+        cls,
+        name: str,
+        description: object,
+        errors: "list[str]",
+    ) -> "BlackboardConfig | None":
+        """
+        Returns the blackboard, or None after recording errors.
+        """
+        if description is None:
+            description = {}
+
+        if not isinstance(description, dict):
+            errors.append(f"Blackboard {name}: must be a mapping")
+            return None
+
+        unknown_keys = set(description) - cls.__BLACKBOARD_KEYS
+        if unknown_keys:
+            errors.append(f"Blackboard {name}: unknown keys {sorted(unknown_keys)}")
+            return None
+
+        codec = None
+        if "codec" in description:
+            result, codec = resolve_object(str(description["codec"]))
+            if not result or not isinstance(codec, type):
+                errors.append(f"Blackboard {name}: codec {description['codec']} not found")
+                return None
+
+        payload_size = description.get(
+            "payload_size", shared_memory_blackboard.SharedMemoryBlackboard.DEFAULT_PAYLOAD_SIZE
+        )
+        if not isinstance(payload_size, int) or payload_size <= 0:
+            errors.append(f"Blackboard {name}: payload_size must be an integer greater than 0")
+            return None
+
+        return BlackboardConfig(name, codec, payload_size)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        queues: "list[QueueConfig]",
+        stages: "list[StageConfig]",
+        blackboards: "list[BlackboardConfig]",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is PipelineConfig.__create_key, "Use create() method"
+
+        self.queues = queues
+        self.stages = stages
+        self.blackboards = blackboards
+
+    def get_bindings(self) -> "set[str]":
+        """
+        Returns the names of all bindings main has to provide, without the blackboards.
+        """
+        bindings = set()
+        for stage in self.stages:
+            bindings |= stage.get_bindings()
+
+        return bindings - {blackboard.name for blackboard in self.blackboards}
@@ -0,0 +1,220 @@
+"""
+Placing worker processes on CPUs with a priority and a memory limit,
+and reading the CPU and memory use of processes from /proc.
+Placement settings the platform lacks are rejected, and reading use needs Linux.
+"""
+
+import os
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+
+MAX_NICE = 19
+MIN_NICE = -20
+
+# Placement settings of the platform, e.g. macOS has no CPU affinity and Windows none of them
+HAS_CPU_AFFINITY = hasattr(os, "sched_getaffinity") and hasattr(os, "sched_setaffinity")
+HAS_NICE = hasattr(os, "setpriority")
+HAS_MEMORY_LIMIT = resource is not None
+
+
+class ProcessPlacement:
+    """
+    Where and how a worker process runs, applied by the process itself when it starts,
+    so restarted workers are placed the same way.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        cpu_affinity: "list[int] | None" = None,
+        nice: "int | None" = None,
+        memory_limit: "int | None" = None,
+    ) -> "tuple[bool, ProcessPlacement | None]":
+        """
+        Creates a placement, None for any setting leaves it as inherited from main.
+
+        cpu_affinity: CPUs the process may run on, all of them available to main.
+        nice: Niceness, higher runs less often. Lower than main's needs privileges.
+        memory_limit: Most bytes of address space, allocations beyond it raise MemoryError.
+        Linux does not enforce limits on resident memory, so this is the nearest limit.
+
+        Returns the ProcessPlacement object, False for settings the platform lacks.
+        """
+        if cpu_affinity is not None:
+            if not HAS_CPU_AFFINITY:
+                return False, None
+
+            if len(cpu_affinity) == 0 or not set(cpu_affinity) <= os.sched_getaffinity(0):
+                return False, None
+
+        if nice is not None and (not HAS_NICE or not MIN_NICE <= nice <= MAX_NICE):
+            return False, None
+
+        if memory_limit is not None and (not HAS_MEMORY_LIMIT or memory_limit <= 0):
+            return False, None
+
+        return True, ProcessPlacement(cls.__create_key, cpu_affinity, nice, memory_limit)
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        cpu_affinity: "list[int] | None",
+        nice: "int | None",
+        memory_limit: "int | None",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is ProcessPlacement.__create_key, "Use create() method"
+
+        self.cpu_affinity = cpu_affinity
+        self.nice = nice
+        self.memory_limit = memory_limit
+
+    def apply(self) -> None:
+        """
+        Places the calling process, call at the start of the worker process.
+        Raises OSError or ValueError if the process is not allowed to,
+        e.g. lowering its niceness without privileges or exceeding the hard memory limit.
+        """
+        if self.cpu_affinity is not None:
+            os.sched_setaffinity(0, self.cpu_affinity)
+
+        if self.nice is not None:
+            os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+
+        if self.memory_limit is not None:
+            _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (self.memory_limit, hard_limit))
+
+    def __str__(self) -> str:
+        settings = []
+        if self.cpu_affinity is not None:
+            settings.append(f"CPUs {sorted(self.cpu_affinity)}")
+        if self.nice is not None:
+            settings.append(f"nice {self.nice}")
+        if self.memory_limit is not None:
+            settings.append(f"memory limit {self.memory_limit / 2**20:.0f} MiB")
+
+        return ", ".join(settings) if settings else "inherited"
+
+
+class ProcessUsage:
+    """
+    CPU and memory use of a process, and where it runs.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        cpu_fraction: "float | None",
+        rss: int,
+        last_cpu: int,
+        cpu_affinity: "list[int]",
+        nice: int,
+    ) -> None:
+        """
+        pid: Process ID.
+        cpu_fraction: CPU time over wall time since the previous read, 1.0 is one full CPU,
+        None on the first read.
+        rss: Resident memory in bytes.
+        last_cpu: CPU the process last ran on.
+        cpu_affinity: CPUs the process may run on.
+        nice: Niceness.
+        """
+        self.pid = pid
+        self.cpu_fraction = cpu_fraction
+        self.rss = rss
+        self.last_cpu = last_cpu
+        self.cpu_affinity = cpu_affinity
+        self.nice = nice
+
+    def __str__(self) -> str:
+        cpu = "-" if self.cpu_fraction is None else f"{self.cpu_fraction * 100:.1f}%"
+        return (
+            f"pid {self.pid}: CPU {cpu}, RSS {self.rss / 2**20:.1f} MiB, "
+            f"on CPU {self.last_cpu} of {self.cpu_affinity}, nice {self.nice}"
+        )
+
+
+class ProcessUsageReader:
+    """
+    Reads the use of processes from /proc/<pid>/stat,
+    remembering the CPU time of each process to report the use since the previous read.
+    Reads nothing on platforms without /proc, see is_supported().
+    """
+
+    # Field numbers of /proc/<pid>/stat from proc(5), counting from 1
+    __STAT_UTIME = 14
+    __STAT_STIME = 15
+    __STAT_NICE = 19
+    __STAT_RSS = 24
+    __STAT_PROCESSOR = 39
+    # Fields after the command name, which may contain spaces, start at the state
+    __STAT_FIRST_AFTER_NAME = 3
+
+    def __init__(self) -> None:
+        self.__is_supported = (
+            hasattr(os, "sysconf") and hasattr(os, "sched_getaffinity") and os.path.isdir("/proc")
+        )
+        self.__clock_ticks = 0
+        self.__page_size = 0
+        if self.__is_supported:
+            self.__clock_ticks = os.sysconf("SC_CLK_TCK")
+            self.__page_size = os.sysconf("SC_PAGE_SIZE")
+        # Process ID -> (monotonic time, CPU seconds) of the previous read
+        self.__previous: "dict[int, tuple[float, float]]" = {}
+
+    def __get_field(self, fields: "list[str]", number: int) -> int:
+        return int(fields[number - self.__STAT_FIRST_AFTER_NAME])
+
+    def is_supported(self) -> bool:
+        """
+        Returns whether the platform has /proc and the calls to read the use of processes.
+        """
+        return self.__is_supported
+
+    def read(self, pid: int) -> "tuple[bool, ProcessUsage | None]":
+        """
+        Returns the use of the process, False if it does not exist or reading is not supported.
+        """
+        if not self.__is_supported:
+            return False, None
+
+        try:
+            with open(f"/proc/{pid}/stat", encoding="utf-8") as stat_file:
+                stat = stat_file.read()
+            cpu_affinity = sorted(os.sched_getaffinity(pid))
+        except OSError:
+            self.__previous.pop(pid, None)
+            return False, None
+
+        now = time.monotonic()
+        fields = stat[stat.rindex(")") + 2 :].split()
+        cpu_time = (
+            self.__get_field(fields, self.__STAT_UTIME)
+            + self.__get_field(fields, self.__STAT_STIME)
+        ) / self.__clock_ticks
+
+        cpu_fraction = None
+        previous = self.__previous.get(pid)
+        if previous is not None and now > previous[0]:
+            cpu_fraction = (cpu_time - previous[1]) / (now - previous[0])
+        self.__previous[pid] = (now, cpu_time)
+
+        return True, ProcessUsage(
+            pid,
+            cpu_fraction,
+            self.__get_field(fields, self.__STAT_RSS) * self.__page_size,
+            self.__get_field(fields, self.__STAT_PROCESSOR),
+            cpu_affinity,
+            self.__get_field(fields, self.__STAT_NICE),
+        )
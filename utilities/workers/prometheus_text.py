@@ -0,0 +1,111 @@
+"""
+Prometheus text exposition format.
+"""
+
+import re
+
+from utilities.workers import worker_metrics
+
+
+def metric_name(text: str) -> str:
+    """
+    Returns the text with characters not allowed in metric names replaced by underscores.
+    """
+    name = re.sub(r"[^a-zA-Z0-9_:]", "_", text)
+    if name[:1].isdigit():
+        name = f"_{name}"
+
+    return name
+
+
+def format_labels(labels: "dict[str, object]") -> str:
+    """
+    Returns the label set of a sample, empty if there are no labels.
+    """
+    if not labels:
+        return ""
+
+    pairs = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    """
+    Returns the sample value, using the spellings Prometheus expects for special values.
+    """
+    if value != value:  # pylint: disable=comparison-with-itself
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class PrometheusText:
+    """
+    Collects samples grouped by metric family, and renders them in the text format.
+    """
+
+    def __init__(self) -> None:
+        # Metric family name -> type, help, sample lines
+        self.__families: "dict[str, tuple[str, str, list[str]]]" = {}
+
+    def __get_lines(self, name: str, kind: str, help_text: str) -> "list[str]":
+        if name not in self.__families:
+            self.__families[name] = (kind, help_text, [])
+
+        return self.__families[name][2]
+
+    def add_sample(
+        self, name: str, kind: str, help_text: str, labels: "dict[str, object]", value: float
+    ) -> None:
+        """
+        Adds a sample to its family.
+
+        name: Metric family name, counters should end in `_total`.
+        kind: "counter" or "gauge".
+        help_text: Description of the family.
+        labels: Labels of the sample.
+        value: Value of the sample.
+        """
+        lines = self.__get_lines(name, kind, help_text)
+        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+    def add_histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: "dict[str, object]",
+        histogram: worker_metrics.HistogramSnapshot,
+    ) -> None:
+        """
+        Adds a histogram of durations in seconds to its family,
+        with cumulative buckets at each power of 2 of microseconds.
+        """
+        lines = self.__get_lines(name, "histogram", help_text)
+        cumulative = 0
+        for i, bucket in enumerate(histogram.buckets):
+            cumulative += bucket
+            bucket_labels = dict(labels, le=format_value(2**i / 1e6))
+            lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+        # Counted from the buckets, since the count may be mid update
+        infinity_labels = dict(labels, le="+Inf")
+        lines.append(f"{name}_bucket{format_labels(infinity_labels)} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.total)}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+
+    def render(self) -> str:
+        """
+        Returns all families in the text format.
+        """
+        lines = []
+        for name, (kind, help_text, samples) in self.__families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
@@ -2,24 +2,628 @@
 Queue.
 """
 
+import ctypes
+import enum
+import multiprocessing as mp
 import multiprocessing.managers
 import queue
+import threading
 import time
 
+from utilities.workers import shared_memory_queue
+
+
+class QueueBackend(enum.Enum):
+    """
+    Underlying queue implementation.
+    """
+
+    # Queue proxy to a SyncManager server process
+    MANAGER = 0
+    # Ring buffer in shared memory, requires a bounded maxsize
+    SHARED_MEMORY = 1
+    # In process queue, only for thread workers
+    THREAD = 2
+    # One end of a `broadcast_channel.BroadcastChannel`, see `QueueProxyWrapper.from_broadcast()`
+    BROADCAST = 3
+    # A `lane_queue.LaneQueue` or one of its lanes, see `QueueProxyWrapper.from_lanes()`
+    LANES = 4
+
+
+class OverflowPolicy(enum.Enum):
+    """
+    What a put does when the queue is full.
+    """
+
+    # Wait for space
+    BLOCK = 0
+    # Discard the item being put
+    DROP_NEWEST = 1
+    # Discard the oldest queued item to make room
+    DROP_OLDEST = 2
+    # Discard all but the newest keep_count - 1 queued items,
+    # so consumers catch up to fresh data in one step instead of draining a stale backlog
+    KEEP_LATEST_N = 3
+
+
+class BatchQueue(queue.Queue):
+    """
+    `queue.Queue` that also moves batches of items under a single lock acquisition.
+    Served by `QueueManager` so a batch costs one round trip to the manager.
+
+    `close()` wakes every blocked producer and consumer for shutdown.
+    Afterwards puts discard their items and gets return the sentinel (None) without blocking.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self.__is_closed = False
+
+    def __is_full(self) -> bool:
+        return 0 < self.maxsize <= self._qsize()
+
+    def __is_empty(self) -> bool:
+        return not self._qsize()
+
+    def __wait(
+        self,
+        condition: threading.Condition,
+        is_blocked: "() -> bool",  # type: ignore
+        deadline: "float | None",
+    ) -> bool:
+        """
+        Waits on the held condition while is_blocked() and the queue is open.
+
+        deadline: Monotonic time to give up at, None to wait indefinitely.
+
+        Returns False if the deadline passed or the queue is closed.
+        """
+        while is_blocked() and not self.__is_closed:
+            if deadline is None:
+                condition.wait()
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return False
+            condition.wait(remaining)
+
+        return not self.__is_closed
+
+    @staticmethod
+    def __deadline(block: bool, timeout: "float | None") -> "float | None":
+        if not block:
+            return time.monotonic()
+
+        return None if timeout is None else time.monotonic() + timeout
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue, discards it if the queue is closed.
+
+        Raises `queue.Full` if no space became free in time.
+        """
+        with self.not_full:
+            if not self.__wait(self.not_full, self.__is_full, self.__deadline(block, timeout)):
+                if self.__is_closed:
+                    return
+                raise queue.Full
+
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue, the sentinel (None) if the queue is closed.
+
+        Raises `queue.Empty` if no item arrived in time.
+        """
+        with self.not_empty:
+            if not self.__wait(self.not_empty, self.__is_empty, self.__deadline(block, timeout)):
+                if self.__is_closed:
+                    return None
+                raise queue.Empty
+
+            item = self._get()
+            self.not_full.notify()
+            return item
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items into the queue in order.
+
+        timeout: Total time to wait for space in seconds, None to wait indefinitely.
+
+        Returns the number of items put, fewer than all of them if the queue stayed full.
+        Items put into a closed queue are discarded and not counted.
+        """
+        deadline = self.__deadline(True, timeout)
+        count = 0
+        with self.not_full:
+            for item in items:
+                if not self.__wait(self.not_full, self.__is_full, deadline):
+                    return count
+
+                self._put(item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+                count += 1
+
+        return count
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items from the queue.
+
+        timeout: Time to wait for the first item in seconds, None to wait indefinitely.
+        The rest are only taken if already available.
+
+        Returns the items, empty if none arrived in time or the queue is closed.
+        """
+        if max_items <= 0:
+            return []
+
+        with self.not_empty:
+            if not self.__wait(self.not_empty, self.__is_empty, self.__deadline(True, timeout)):
+                return []
+
+            items = []
+            while self._qsize() and len(items) < max_items:
+                items.append(self._get())
+                self.not_full.notify()
+
+        return items
+
+    def close(self) -> None:
+        """
+        Closes the queue and wakes every blocked producer and consumer.
+        Items still in the queue are never returned.
+        """
+        with self.mutex:
+            self.__is_closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+
+class QueueManager(multiprocessing.managers.SyncManager):
+    """
+    SyncManager that can also create batch capable queues.
+    Use instead of `multiprocessing.Manager()`, e.g.:
+    ```
+    manager = queue_proxy_wrapper.QueueManager()
+    manager.start()
+    ```
+    """
+
+
+QueueManager.register("BatchQueue", BatchQueue)
+
+
+class CodecQueue:
+    """
+    Queue adapter that moves items of the codec type as raw bytes.
+
+    The codec type provides `to_bytes()` and the class method `from_bytes()`.
+    Items of other types (e.g. the None sentinel) pass through unchanged,
+    so raw bytes items cannot be sent through a codec queue.
+    """
+
+    def __init__(self, backend_queue: object, codec: type) -> None:
+        self.__queue = backend_queue
+        self.__codec = codec
+
+    def __encode(self, item: object) -> object:
+        if isinstance(item, self.__codec):
+            return item.to_bytes()
+
+        return item
+
+    def __decode(self, item: object) -> object:
+        if isinstance(item, bytes):
+            return self.__codec.from_bytes(item)
+
+        return item
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Encodes and puts an item into the queue.
+        """
+        self.__queue.put(self.__encode(item), block, timeout)
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes, decodes and returns an item from the queue.
+        """
+        return self.__decode(self.__queue.get(block, timeout))
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Encodes and puts items into the queue, the backend must support batches.
+        """
+        return self.__queue.put_many([self.__encode(item) for item in items], timeout)
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and decodes up to max_items items, the backend must support batches.
+        """
+        return [self.__decode(item) for item in self.__queue.get_many(max_items, timeout)]
+
+    def qsize(self) -> int:
+        """
+        Returns the approximate number of items in the queue.
+        """
+        return self.__queue.qsize()
+
+    def empty(self) -> bool:
+        """
+        Returns whether the queue is (approximately) empty.
+        """
+        return self.__queue.empty()
+
+    def full(self) -> bool:
+        """
+        Returns whether the queue is (approximately) full.
+        """
+        return self.__queue.full()
+
+
+class OverflowQueue:
+    """
+    Queue adapter whose puts never block, and drop items when the queue is full.
+    Dropped items are counted in shared memory.
+    """
+
+    def __init__(
+        self,
+        backend_queue: object,
+        policy: OverflowPolicy,
+        keep_count: int,
+        is_batched: bool,
+    ) -> None:
+        """
+        backend_queue: Queue with a maxsize greater than 0 .
+        policy: Any policy except BLOCK.
+        keep_count: Items kept by KEEP_LATEST_N, including the one being put.
+        is_batched: Whether the backend supports get_many(), to evict in one call.
+        """
+        self.__queue = backend_queue
+        self.__policy = policy
+        self.__keep_count = keep_count
+        self.__is_batched = is_batched
+        self.__dropped_count = mp.Value(ctypes.c_uint64, 0)
+
+    def __count_dropped(self, count: int) -> None:
+        if count <= 0:
+            return
+
+        with self.__dropped_count.get_lock():
+            self.__dropped_count.value += count
+
+    def __evict(self, count: int) -> None:
+        """
+        Removes and discards up to count of the oldest items.
+        """
+        if self.__is_batched:
+            evicted = len(self.__queue.get_many(count, 0.0))
+        else:
+            evicted = 0
+            try:
+                for _ in range(count):
+                    self.__queue.get_nowait()
+                    evicted += 1
+            except queue.Empty:
+                pass
+
+        self.__count_dropped(evicted)
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items dropped by puts of every process.
+        """
+        return self.__dropped_count.value
+
+    # Same signature as the other queues, but never blocks
+    # pylint: disable-next=unused-argument
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> bool:
+        """
+        Puts an item into the queue without blocking, dropping items according to the policy.
+        block and timeout are ignored.
+
+        Returns whether the item was put.
+        """
+        # Other producers and consumers may race, so retry until the put fits
+        while True:
+            try:
+                self.__queue.put_nowait(item)
+                return True
+            except queue.Full:
+                pass
+
+            if self.__policy == OverflowPolicy.DROP_NEWEST:
+                self.__count_dropped(1)
+                return False
+
+            if self.__policy == OverflowPolicy.DROP_OLDEST:
+                self.__evict(1)
+            else:
+                self.__evict(max(self.__queue.qsize() - self.__keep_count + 1, 1))
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue.
+        """
+        return self.__queue.get(block, timeout)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    # pylint: disable-next=unused-argument
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items in order without blocking, dropping items according to the policy.
+        timeout is ignored.
+
+        Returns the number of items put, which excludes dropped new items but not evicted ones.
+        """
+        return sum(1 for item in items if self.put(item))
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items, the backend must support batches.
+        """
+        return self.__queue.get_many(max_items, timeout)
+
+    def qsize(self) -> int:
+        """
+        Returns the approximate number of items in the queue.
+        """
+        return self.__queue.qsize()
+
+    def empty(self) -> bool:
+        """
+        Returns whether the queue is (approximately) empty.
+        """
+        return self.__queue.empty()
+
+    def full(self) -> bool:
+        """
+        Returns whether the queue is (approximately) full.
+        """
+        return self.__queue.full()
+
 
 class QueueProxyWrapper:
     """
     Wrapper for an underlying queue proxy which also stores `maxsize`.
 
     `maxsize <= 0` means infinite size.
+
+    `put_many()` and `get_many()` move a batch in one call when the backend supports it
+    (shared memory, thread, or a manager backend created by `QueueManager`),
+    otherwise they fall back to one call per item.
+
+    `close()` is the shutdown protocol: it wakes blocked workers right away instead of
+    waiting on them like `fill_and_drain_queue()`.
+
+    An overflow policy other than BLOCK makes puts never block, and drop items instead
+    when the queue is full, favouring fresh data over complete data.
+
+    `from_broadcast()` wraps an end of a broadcast channel, to fan out items to several consumers.
+    `from_lanes()` wraps a lane queue or one of its lanes, to serve traffic by priority.
     """
 
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
+    # Plain manager queues without maxsize get this many sentinels on close
+    __CLOSE_SENTINEL_COUNT = 16
+
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager,
+        maxsize: int = 0,
+        backend: QueueBackend = QueueBackend.MANAGER,
+        codec: "type | None" = None,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        keep_count: int = 1,
+    ) -> None:
+        """
+        mp_manager: Manager to create the queue proxy from, only used by the manager backend.
+        A `QueueManager` creates batch capable queues.
+        maxsize: Maximum number of items, the shared memory backend requires greater than 0 .
+        backend: Underlying queue implementation.
+        codec: Type with `to_bytes()` and `from_bytes()` to move as raw bytes instead of pickling.
+        overflow_policy: What a put does when the queue is full,
+        policies other than BLOCK require maxsize greater than 0 .
+        keep_count: Items kept by KEEP_LATEST_N including the new one, from 1 to maxsize.
+        """
+        if backend == QueueBackend.BROADCAST:
+            raise ValueError("Broadcast channel ends are wrapped with from_broadcast()")
+
+        if backend == QueueBackend.LANES:
+            raise ValueError("Lane queues are wrapped with from_lanes()")
+
+        if overflow_policy != OverflowPolicy.BLOCK and maxsize <= 0:
+            raise ValueError(
+                f"Overflow policy {overflow_policy.name} requires maxsize greater than 0"
+            )
+
+        if overflow_policy == OverflowPolicy.KEEP_LATEST_N and not 0 < keep_count <= maxsize:
+            raise ValueError("Keep count must be between 1 and maxsize")
+
+        if backend == QueueBackend.SHARED_MEMORY:
+            backend_queue = shared_memory_queue.SharedMemoryQueue(maxsize)
+            is_batched = True
+        elif backend == QueueBackend.THREAD:
+            backend_queue = BatchQueue(maxsize)
+            is_batched = True
+        elif isinstance(mp_manager, QueueManager):
+            backend_queue = mp_manager.BatchQueue(maxsize)
+            is_batched = True
+        else:
+            backend_queue = mp_manager.Queue(maxsize)
+            is_batched = False
+
+        # BLOCK needs no adapter, so it costs nothing
+        overflow_queue = None
+        if overflow_policy != OverflowPolicy.BLOCK:
+            overflow_queue = OverflowQueue(backend_queue, overflow_policy, keep_count, is_batched)
+
+        self.__attach(backend_queue, is_batched, overflow_queue, maxsize, backend, codec)
+        self.overflow_policy = overflow_policy
+
+    def __attach(
+        self,
+        backend_queue: object,
+        is_batched: bool,
+        overflow_queue: "OverflowQueue | None",
+        maxsize: int,
+        backend: QueueBackend,
+        codec: "type | None",
+    ) -> None:
+        """
+        Stacks the adapters on the backend queue.
+        """
+        self.__backend_queue = backend_queue
+        self.__is_batched = is_batched
+        self.__overflow_queue = overflow_queue
+
+        put_queue = overflow_queue or backend_queue
+        if codec is not None:
+            self.queue = CodecQueue(put_queue, codec)
+        else:
+            self.queue = put_queue
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, maxsize: int = 0) -> None:
-        self.queue = mp_manager.Queue(maxsize)
         self.maxsize = maxsize
+        self.backend = backend
+
+    @classmethod
+    def from_broadcast(
+        cls,
+        channel_end: object,
+        capacity: int,
+        codec: "type | None" = None,
+    ) -> "QueueProxyWrapper":
+        """
+        Wraps one end of a broadcast channel, so workers use it like any other queue.
+        Puts to the publisher never block, the channel has no overflow policy but a lag policy.
+
+        channel_end: `BroadcastPublisher` or `BroadcastSubscriber` of the channel.
+        capacity: Capacity of the channel.
+        codec: Type with `to_bytes()` and `from_bytes()`, the same for every end of the channel.
+
+        Returns the wrapper.
+        """
+        wrapper = cls.__new__(cls)
+        wrapper.__attach(channel_end, True, None, capacity, QueueBackend.BROADCAST, codec)
+        wrapper.overflow_policy = OverflowPolicy.BLOCK
+
+        return wrapper
+
+    @classmethod
+    def from_lanes(
+        cls,
+        lanes_end: object,
+        maxsize: int,
+        codec: "type | None" = None,
+    ) -> "QueueProxyWrapper":
+        """
+        Wraps a lane queue for its consumers, or one of its lanes for its producers.
+        Overflow policies are set per lane on the lane queue.
+
+        lanes_end: `LaneQueue` proxy from a `QueueManager`, or `LaneSender` of one lane.
+        maxsize: Maximum number of items of the lane, of all lanes for the whole queue.
+        codec: Type with `to_bytes()` and `from_bytes()`, the same for every end of the queue.
+
+        Returns the wrapper.
+        """
+        wrapper = cls.__new__(cls)
+        wrapper.__attach(lanes_end, True, None, maxsize, QueueBackend.LANES, codec)
+        wrapper.overflow_policy = OverflowPolicy.BLOCK
+
+        return wrapper
+
+    def get_dropped_count(self) -> int:
+        """
+        Returns the number of items dropped by the overflow policy in every process,
+        always 0 for BLOCK.
+        For a broadcast channel, the items its subscribers lost by falling behind.
+        For a lane queue, the items dropped by the overflow policies of its lanes.
+        """
+        if self.backend in (QueueBackend.BROADCAST, QueueBackend.LANES):
+            return self.__backend_queue.get_dropped_count()
+
+        if self.__overflow_queue is None:
+            return 0
+
+        return self.__overflow_queue.get_dropped_count()
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items into the queue in order.
+
+        timeout: Total time to wait for space in seconds, None to wait indefinitely.
+
+        Returns the number of items put, fewer than all of them if the queue stayed full.
+        """
+        if self.__is_batched or self.__overflow_queue is not None:
+            return self.queue.put_many(items, timeout)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        count = 0
+        try:
+            for item in items:
+                remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+                self.queue.put(item, timeout=remaining)
+                count += 1
+        except queue.Full:
+            pass
+
+        return count
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items from the queue.
+
+        timeout: Time to wait for the first item in seconds, None to wait indefinitely.
+        The rest are only taken if already available.
+
+        Returns the items, empty if none arrived in time.
+        """
+        if self.__is_batched:
+            return self.queue.get_many(max_items, timeout)
+
+        items = []
+        try:
+            if max_items > 0:
+                items.append(self.queue.get(timeout=timeout))
+            while len(items) < max_items:
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        return items
 
     def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
         """
@@ -58,3 +662,43 @@ class QueueProxyWrapper:
         self.fill_queue_with_sentinel()
         time.sleep(self.__QUEUE_DELAY)
         self.drain_queue()
+
+    def close(self) -> None:
+        """
+        Closes the queue for shutdown, call after requesting workers to exit.
+        Does not wait, so closing every queue of a pipeline takes no time.
+
+        Blocked producers and consumers wake immediately. Afterwards puts discard their items,
+        gets return the sentinel (None) and `get_many()` an empty list, all without blocking.
+
+        A queue from a plain `SyncManager` cannot be closed, so it is instead drained and
+        filled with sentinels without waiting. This wakes workers blocked at the time,
+        but a later put may still block until its timeout.
+        """
+        # The batch capable backends are the ones implemented here, which support closing
+        if self.__is_batched:
+            self.__backend_queue.close()
+            return
+
+        # Drain to wake blocked producers, then fill to wake blocked consumers
+        try:
+            while True:
+                self.__backend_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        sentinel_count = self.maxsize if self.maxsize > 0 else self.__CLOSE_SENTINEL_COUNT
+        try:
+            for _ in range(sentinel_count):
+                self.__backend_queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def release(self) -> None:
+        """
+        Frees resources owned by the underlying queue.
+        Only required for the shared memory backend, call once all workers have been joined.
+        A broadcast channel is released through the channel itself.
+        """
+        if self.backend == QueueBackend.SHARED_MEMORY:
+            self.__backend_queue.release()
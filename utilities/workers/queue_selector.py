@@ -0,0 +1,133 @@
+"""
+Blocking wait on several queues at once.
+"""
+
+import multiprocessing as mp
+import time
+
+from utilities.workers import queue_proxy_wrapper
+
+
+class NotifyingQueue:
+    """
+    Queue adapter that sets an event after every put, so a selector can sleep until data arrives.
+    """
+
+    def __init__(self, backend_queue: object, notifier: "mp.synchronize.Event") -> None:
+        self.__queue = backend_queue
+        self.__notifier = notifier
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue and notifies.
+        """
+        self.__queue.put(item, block, timeout)
+        self.__notifier.set()
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue.
+        """
+        return self.__queue.get(block, timeout)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items into the queue and notifies if any were put, the backend must support batches.
+        """
+        count = self.__queue.put_many(items, timeout)
+        if count > 0:
+            self.__notifier.set()
+
+        return count
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items, the backend must support batches.
+        """
+        return self.__queue.get_many(max_items, timeout)
+
+    def qsize(self) -> int:
+        """
+        Returns the approximate number of items in the queue.
+        """
+        return self.__queue.qsize()
+
+    def empty(self) -> bool:
+        """
+        Returns whether the queue is (approximately) empty.
+        """
+        return self.__queue.empty()
+
+    def full(self) -> bool:
+        """
+        Returns whether the queue is (approximately) full.
+        """
+        return self.__queue.full()
+
+
+class QueueSelector:
+    """
+    Waits until any of several queues has data, like `select()` on file descriptors.
+
+    Every registered queue sets a shared event after a put. The selector clears the event
+    before checking the queues, so a put that lands after the check still wakes the wait.
+
+    Create the selector before starting the workers that put into the queues,
+    since workers get their copy of the queue when they start.
+    """
+
+    def __init__(
+        self,
+        queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        publishers: "list[queue_proxy_wrapper.QueueProxyWrapper] | None" = None,
+    ) -> None:
+        """
+        queues: Queues to wait on, put notifications are added to each of them.
+        publishers: Publishers of broadcast channels that some of the queues subscribe to.
+        Nothing puts into a subscription, so the notifications are added to its publisher instead.
+        """
+        self.__queues = queues
+        self.__notifier = mp.Event()
+        for wrapper in queues + (publishers or []):
+            wrapper.queue = NotifyingQueue(wrapper.queue, self.__notifier)
+
+        self.wake_count = 0
+
+    def select(
+        self, timeout: "float | None" = None
+    ) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Blocks until at least one queue is not empty.
+
+        timeout: Time to wait in seconds, None to wait indefinitely.
+
+        Returns the queues that are not empty, empty if none were in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.__notifier.clear()
+            ready = [wrapper for wrapper in self.__queues if not wrapper.queue.empty()]
+            if ready:
+                return ready
+
+            if deadline is None:
+                remaining = None
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0.0:
+                    return []
+
+            if self.__notifier.wait(remaining):
+                self.wake_count += 1
@@ -0,0 +1,141 @@
+"""
+Deciding how many workers a stage needs from its input queue depth and how busy its workers are.
+"""
+
+import math
+
+
+class LoadSample:
+    """
+    Load of a stage over the time since the previous sample.
+    """
+
+    def __init__(
+        self,
+        timestamp: float,
+        worker_count: int,
+        fill: "float | None",
+        utilization: "float | None",
+        throughput: float,
+    ) -> None:
+        """
+        timestamp: Monotonic time of the sample in seconds.
+        worker_count: Number of running workers.
+        fill: Fraction of the input queue capacity in use, None if the inputs are unbounded.
+        utilization: Fraction of loop time the workers spent not waiting for input,
+        None if they did not loop.
+        throughput: Loops per second of all workers.
+        """
+        self.timestamp = timestamp
+        self.worker_count = worker_count
+        self.fill = fill
+        self.utilization = utilization
+        self.throughput = throughput
+
+
+class ScalingPolicy:
+    """
+    Scales up as soon as the workers are busier than the target or the input backs up,
+    and scales down one worker at a time once fewer would have been enough for a while,
+    so a short lull does not retire workers that are needed again right after.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        min_count: int,
+        max_count: int,
+        target_utilization: float,
+        scale_up_fill: float,
+        scale_down_delay: float,
+    ) -> "tuple[bool, ScalingPolicy | None]":
+        """
+        Creates a policy.
+
+        min_count: Fewest workers.
+        max_count: Most workers.
+        target_utilization: Fraction of time each worker should be busy, between 0 and 1.
+        scale_up_fill: Input queue fill that adds a worker regardless of utilization.
+        scale_down_delay: Seconds fewer workers must have been enough before retiring one.
+
+        Returns the ScalingPolicy object.
+        """
+        if min_count <= 0 or max_count < min_count:
+            return False, None
+
+        if not 0.0 < target_utilization <= 1.0 or not 0.0 < scale_up_fill <= 1.0:
+            return False, None
+
+        if scale_down_delay < 0.0:
+            return False, None
+
+        return True, ScalingPolicy(
+            cls.__create_key,
+            min_count,
+            max_count,
+            target_utilization,
+            scale_up_fill,
+            scale_down_delay,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        min_count: int,
+        max_count: int,
+        target_utilization: float,
+        scale_up_fill: float,
+        scale_down_delay: float,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is ScalingPolicy.__create_key, "Use create() method"
+
+        self.min_count = min_count
+        self.max_count = max_count
+        self.__target_utilization = target_utilization
+        self.__scale_up_fill = scale_up_fill
+        self.__scale_down_delay = scale_down_delay
+
+        # Since when fewer workers would have been enough, None if they would not
+        self.__surplus_since: "float | None" = None
+
+    def get_needed_count(self, sample: LoadSample) -> int:
+        """
+        Returns the workers needed for the load of the sample, without bounds or delays.
+        """
+        needed = sample.worker_count
+        if sample.utilization is not None:
+            # Rounded so a utilization right at the target does not add a worker
+            needed = math.ceil(
+                round(sample.worker_count * sample.utilization / self.__target_utilization, 6)
+            )
+
+        if sample.fill is not None and sample.fill >= self.__scale_up_fill:
+            # Backed up input, more workers are needed whatever the utilization says
+            needed = max(needed, sample.worker_count + 1)
+
+        return needed
+
+    def decide(self, sample: LoadSample) -> int:
+        """
+        Returns the worker count to scale to.
+
+        sample: Latest load of the stage.
+        """
+        needed = min(max(self.get_needed_count(sample), self.min_count), self.max_count)
+        if needed >= sample.worker_count:
+            self.__surplus_since = None
+            return needed
+
+        if self.__surplus_since is None:
+            self.__surplus_since = sample.timestamp
+        if sample.timestamp - self.__surplus_since < self.__scale_down_delay:
+            return sample.worker_count
+
+        # Restart the delay so each retirement is judged on the load without that worker
+        self.__surplus_since = None
+        return sample.worker_count - 1
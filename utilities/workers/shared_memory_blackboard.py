@@ -0,0 +1,160 @@
+"""
+Latest value slot in shared memory.
+"""
+
+import multiprocessing.shared_memory
+import os
+import pickle
+import struct
+import time
+
+
+class SharedMemoryBlackboard:
+    """
+    Single writer, multiple reader slot holding only the newest item.
+
+    Guarded by a seqlock: the sequence number is odd while the writer is
+    updating the slot, and readers retry if it was odd or changed during their copy.
+    Neither side takes a lock, and readers never block the writer.
+    """
+
+    # Header: sequence number, publish time (monotonic ns), payload length
+    __HEADER = struct.Struct("=QqI")
+    __SEQUENCE = struct.Struct("=Q")
+
+    DEFAULT_PAYLOAD_SIZE = 4096  # bytes
+
+    def __init__(
+        self, codec: "type | None" = None, payload_size: int = DEFAULT_PAYLOAD_SIZE
+    ) -> None:
+        """
+        codec: Type with `to_bytes()` and `from_bytes()`, None to pickle items instead.
+        payload_size: Maximum size of an encoded item in bytes.
+        """
+        if payload_size <= 0:
+            raise ValueError("Payload size must be greater than 0")
+
+        self.__codec = codec
+        self.payload_size = payload_size
+
+        self.__memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__HEADER.size + payload_size,
+        )
+        self.__HEADER.pack_into(self.__memory.buf, 0, 0, 0, 0)
+        self.__owner_pid = os.getpid()
+
+        # Copies this process threw away because the writer was updating the slot
+        self.retry_count = 0
+
+    def publish(self, item: object) -> None:
+        """
+        Replaces the item. Only one process may publish.
+
+        Raises `ValueError` if the encoded item does not fit.
+        """
+        if self.__codec is not None:
+            payload = item.to_bytes()
+        else:
+            payload = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+
+        if len(payload) > self.payload_size:
+            raise ValueError(f"Item of {len(payload)} bytes does not fit in {self.payload_size}")
+
+        buffer = self.__memory.buf
+        (sequence,) = self.__SEQUENCE.unpack_from(buffer, 0)
+
+        # Odd while writing
+        self.__SEQUENCE.pack_into(buffer, 0, sequence + 1)
+        start = self.__HEADER.size
+        buffer[start : start + len(payload)] = payload
+        self.__HEADER.pack_into(buffer, 0, sequence + 1, time.monotonic_ns(), len(payload))
+        self.__SEQUENCE.pack_into(buffer, 0, sequence + 2)
+
+    def read(self) -> "tuple[int, int, object | None]":
+        """
+        Copies the newest item without blocking the writer.
+
+        Returns the number of items published so far, the publish time (monotonic ns),
+        and the item (None if nothing has been published).
+        """
+        buffer = self.__memory.buf
+        start = self.__HEADER.size
+        while True:
+            sequence, published_ns, length = self.__HEADER.unpack_from(buffer, 0)
+            if sequence & 1:
+                self.retry_count += 1
+                continue
+
+            payload = bytes(buffer[start : start + length])
+
+            (sequence_after,) = self.__SEQUENCE.unpack_from(buffer, 0)
+            if sequence_after == sequence:
+                break
+
+            self.retry_count += 1
+
+        if sequence == 0:
+            return 0, 0, None
+
+        if self.__codec is not None:
+            item = self.__codec.from_bytes(payload)
+        else:
+            item = pickle.loads(payload)
+
+        return sequence // 2, published_ns, item
+
+    def published_count(self) -> int:
+        """
+        Returns the number of items published so far.
+        """
+        (sequence,) = self.__SEQUENCE.unpack_from(self.__memory.buf, 0)
+        return sequence // 2
+
+    def release(self) -> None:
+        """
+        Detaches from the shared memory, and frees it if called by the creating process.
+        The blackboard must not be used afterwards.
+        """
+        self.__memory.close()
+        if os.getpid() == self.__owner_pid:
+            self.__memory.unlink()
+
+
+class BlackboardReader:
+    """
+    A reader's view of a blackboard, which tracks what this reader has already seen.
+    Create one per reading process.
+    """
+
+    def __init__(self, blackboard: SharedMemoryBlackboard) -> None:
+        self.__blackboard = blackboard
+        self.last_sequence = 0
+        self.__last_published_ns = 0
+
+        # Items this reader never saw because a newer one replaced them first
+        self.skipped_count = 0
+        self.new_count = 0
+
+    def read_latest(self) -> "tuple[bool, object | None]":
+        """
+        Returns whether the item is newer than the previous read, and the newest item.
+        """
+        sequence, published_ns, item = self.__blackboard.read()
+        if sequence == self.last_sequence:
+            return False, item
+
+        self.skipped_count += sequence - self.last_sequence - 1
+        self.new_count += 1
+        self.last_sequence = sequence
+        self.__last_published_ns = published_ns
+        return True, item
+
+    def staleness(self) -> "float | None":
+        """
+        Returns the age in seconds of the newest item read, None if nothing has been read.
+        """
+        if self.last_sequence == 0:
+            return None
+
+        return (time.monotonic_ns() - self.__last_published_ns) / 1e9
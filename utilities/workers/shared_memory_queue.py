@@ -0,0 +1,252 @@
+"""
+Queue backed by a shared memory ring buffer.
+"""
+
+import multiprocessing as mp
+import multiprocessing.shared_memory
+import os
+import pickle
+import queue
+import struct
+import time
+
+
+class SharedMemoryQueue:
+    """
+    Bounded multi-producer multi-consumer queue on a fixed-slot ring buffer.
+
+    Items are pickled into fixed size slots in shared memory, so a put or get
+    never round trips through a manager server process.
+    Same interface as `queue.Queue` (put, get, put_nowait, get_nowait, qsize, empty, full),
+    plus put_many and get_many which take the ring buffer lock once per batch.
+
+    `close()` wakes every blocked producer and consumer for shutdown.
+    Afterwards puts discard their items and gets return the sentinel (None) without blocking.
+    """
+
+    # Header: read index, write index, closed
+    __HEADER = struct.Struct("=QQQ")
+    # Slot prefix: payload length
+    __SLOT_PREFIX = struct.Struct("=I")
+
+    DEFAULT_SLOT_SIZE = 4096  # bytes
+
+    def __init__(self, maxsize: int, slot_size: int = DEFAULT_SLOT_SIZE) -> None:
+        """
+        maxsize: Number of slots, must be greater than 0 .
+        slot_size: Size of each slot in bytes, including the length prefix.
+        """
+        if maxsize <= 0:
+            raise ValueError("Shared memory queue requires maxsize greater than 0")
+
+        if slot_size <= self.__SLOT_PREFIX.size:
+            raise ValueError(f"Slot size must be greater than {self.__SLOT_PREFIX.size} bytes")
+
+        self.maxsize = maxsize
+        self.slot_size = slot_size
+
+        self.__memory = multiprocessing.shared_memory.SharedMemory(
+            create=True,
+            size=self.__HEADER.size + maxsize * slot_size,
+        )
+        self.__HEADER.pack_into(self.__memory.buf, 0, 0, 0, 0)
+        self.__owner_pid = os.getpid()
+
+        self.__lock = mp.Lock()
+        self.__free_slots = mp.Semaphore(maxsize)
+        self.__used_slots = mp.Semaphore(0)
+
+    def __slot_offset(self, index: int) -> int:
+        return self.__HEADER.size + (index % self.maxsize) * self.slot_size
+
+    def __encode(self, item: object) -> bytes:
+        payload = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.slot_size - self.__SLOT_PREFIX.size:
+            raise ValueError(
+                f"Item of {len(payload)} bytes does not fit in slot of {self.slot_size} bytes"
+            )
+
+        return payload
+
+    def __write(self, payloads: "list[bytes]") -> None:
+        """
+        Writes payloads into slots already acquired from the free slots.
+        """
+        with self.__lock:
+            read_index, write_index, closed = self.__HEADER.unpack_from(self.__memory.buf, 0)
+            for payload in payloads:
+                offset = self.__slot_offset(write_index)
+                self.__SLOT_PREFIX.pack_into(self.__memory.buf, offset, len(payload))
+                start = offset + self.__SLOT_PREFIX.size
+                self.__memory.buf[start : start + len(payload)] = payload
+                write_index += 1
+            self.__HEADER.pack_into(self.__memory.buf, 0, read_index, write_index, closed)
+
+        for _ in payloads:
+            self.__used_slots.release()
+
+    def __read(self, count: int) -> "list[bytes]":
+        """
+        Reads payloads from slots already acquired from the used slots.
+        """
+        payloads = []
+        with self.__lock:
+            read_index, write_index, closed = self.__HEADER.unpack_from(self.__memory.buf, 0)
+            for _ in range(count):
+                offset = self.__slot_offset(read_index)
+                (length,) = self.__SLOT_PREFIX.unpack_from(self.__memory.buf, offset)
+                start = offset + self.__SLOT_PREFIX.size
+                payloads.append(bytes(self.__memory.buf[start : start + length]))
+                read_index += 1
+            self.__HEADER.pack_into(self.__memory.buf, 0, read_index, write_index, closed)
+
+        for _ in range(count):
+            self.__free_slots.release()
+
+        return payloads
+
+    def __is_closed(self) -> bool:
+        return self.__HEADER.unpack_from(self.__memory.buf, 0)[2] != 0
+
+    def __acquire(self, semaphore: object, block: bool, timeout: "float | None") -> bool:
+        """
+        Acquires a slot, or returns False if none became available in time or the queue is closed.
+        """
+        if self.__is_closed() or not semaphore.acquire(block, timeout):
+            return False
+
+        if self.__is_closed():
+            # Woken by close(), pass the wake up on to the next blocked caller
+            semaphore.release()
+            return False
+
+        return True
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue.
+
+        Raises `queue.Full` if no slot became free in time.
+        Raises `ValueError` if the pickled item does not fit in a slot.
+        Discards the item if the queue is closed.
+        """
+        payload = self.__encode(item)
+
+        if not self.__acquire(self.__free_slots, block, timeout):
+            if self.__is_closed():
+                return
+            raise queue.Full
+
+        self.__write([payload])
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue.
+
+        Raises `queue.Empty` if no item arrived in time.
+        Returns the sentinel (None) if the queue is closed.
+        """
+        if not self.__acquire(self.__used_slots, block, timeout):
+            if self.__is_closed():
+                return None
+            raise queue.Empty
+
+        payload = self.__read(1)[0]
+
+        return pickle.loads(payload)
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items into the queue in order.
+
+        timeout: Total time to wait for free slots in seconds, None to wait indefinitely.
+
+        Returns the number of items put, fewer than all of them if the queue stayed full.
+        Items put into a closed queue are discarded and not counted.
+        Raises `ValueError` if any pickled item does not fit in a slot, before putting any.
+        """
+        payloads = [self.__encode(item) for item in items]
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        acquired = 0
+        for _ in payloads:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            if not self.__acquire(self.__free_slots, True, remaining):
+                break
+            acquired += 1
+
+        if acquired > 0:
+            self.__write(payloads[:acquired])
+
+        return acquired
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items from the queue.
+
+        timeout: Time to wait for the first item in seconds, None to wait indefinitely.
+        The rest are only taken if already available.
+
+        Returns the items, empty if none arrived in time or the queue is closed.
+        """
+        if max_items <= 0 or not self.__acquire(self.__used_slots, True, timeout):
+            return []
+
+        acquired = 1
+        while acquired < max_items and self.__acquire(self.__used_slots, False, None):
+            acquired += 1
+
+        return [pickle.loads(payload) for payload in self.__read(acquired)]
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Returns the approximate number of items in the queue.
+        """
+        read_index, write_index, _ = self.__HEADER.unpack_from(self.__memory.buf, 0)
+        return write_index - read_index
+
+    def empty(self) -> bool:
+        """
+        Returns whether the queue is (approximately) empty.
+        """
+        return self.qsize() <= 0
+
+    def full(self) -> bool:
+        """
+        Returns whether the queue is (approximately) full.
+        """
+        return self.qsize() >= self.maxsize
+
+    def close(self) -> None:
+        """
+        Closes the queue and wakes every blocked producer and consumer.
+        Items still in the queue are never returned.
+        """
+        with self.__lock:
+            read_index, write_index, _ = self.__HEADER.unpack_from(self.__memory.buf, 0)
+            self.__HEADER.pack_into(self.__memory.buf, 0, read_index, write_index, 1)
+
+        # Each woken caller releases again for the next one
+        self.__free_slots.release()
+        self.__used_slots.release()
+
+    def release(self) -> None:
+        """
+        Detaches from the shared memory, and frees it if called by the creating process.
+        The queue must not be used afterwards.
+        """
+        self.__memory.close()
+        if os.getpid() == self.__owner_pid:
+            self.__memory.unlink()
@@ -0,0 +1,179 @@
+"""
+For scaling workers with their load.
+"""
+
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import scaling_policy
+from utilities.workers import worker_manager
+from utilities.workers import worker_metrics
+
+
+class WorkerAutoscaler:
+    """
+    Scales the workers of a manager with the depth of their input queues and how busy they are,
+    see `scaling_policy.ScalingPolicy`.
+
+    Busy is loop time spent neither waiting for input nor waiting to put output,
+    so a stage held up by a full output queue is not scaled up, since more workers would not help.
+    Reads the shared memory metrics of the workers, so checking costs no IPC round trip
+    except for the depth of manager backed queues.
+    """
+
+    __create_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        manager: worker_manager.WorkerManager,
+        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        policy: scaling_policy.ScalingPolicy,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, WorkerAutoscaler | None]":
+        """
+        Creates an autoscaler.
+
+        manager: Manager of the workers to scale.
+        input_queues: Input queues of the workers.
+        policy: Decides the worker count, within the bounds of the manager.
+        local_logger: Existing logger from process.
+
+        Returns the WorkerAutoscaler object.
+        """
+        max_count = manager.get_max_worker_count()
+        if policy.max_count > max_count:
+            local_logger.error(
+                f"{manager.get_target_name()} can have at most {max_count} workers, "
+                f"not {policy.max_count}",
+                True,
+            )
+            return False, None
+
+        return True, WorkerAutoscaler(
+            cls.__create_key,
+            manager,
+            input_queues,
+            policy,
+            local_logger,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        manager: worker_manager.WorkerManager,
+        input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        policy: scaling_policy.ScalingPolicy,
+        local_logger: logger.Logger,
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WorkerAutoscaler.__create_key, "Use create() method"
+
+        self.__manager = manager
+        self.__input_queues = input_queues
+        self.__policy = policy
+        self.__local_logger = local_logger
+
+        # Worker index -> (loop count, loop seconds, waiting seconds) at the previous check
+        self.__previous_totals: "dict[int, tuple[int, float, float]]" = {}
+        self.__previous_time = time.monotonic()
+
+    @staticmethod
+    def __get_totals(
+        snapshot: "dict[str, int | float | worker_metrics.HistogramSnapshot]",
+    ) -> "tuple[int, float, float]":
+        """
+        Returns the loop count, loop seconds, and seconds waiting on queues of a worker.
+        """
+        loop = snapshot.get("loop")
+        if not isinstance(loop, worker_metrics.HistogramSnapshot):
+            return 0, 0.0, 0.0
+
+        waiting = 0.0
+        for name in ("get_wait", "put_wait"):
+            histogram = snapshot.get(name)
+            if isinstance(histogram, worker_metrics.HistogramSnapshot):
+                waiting += histogram.total
+
+        return loop.count, loop.total, waiting
+
+    def __get_fill(self) -> "float | None":
+        """
+        Returns the fraction of the bounded input queue capacity in use,
+        None if there are no bounded input queues.
+        """
+        capacity = 0
+        depth = 0
+        for input_queue in self.__input_queues:
+            if input_queue.maxsize <= 0:
+                continue
+
+            capacity += input_queue.maxsize
+            depth += input_queue.queue.qsize()
+
+        if capacity == 0:
+            return None
+
+        return min(depth / capacity, 1.0)
+
+    def sample(self) -> scaling_policy.LoadSample:
+        """
+        Returns the load since the previous sample.
+        Workers started since then only count from the next sample.
+        """
+        now = time.monotonic()
+        loops = 0
+        loop_seconds = 0.0
+        waiting_seconds = 0.0
+        totals = {}
+        for index, snapshot in enumerate(self.__manager.get_metrics_snapshot()):
+            totals[index] = self.__get_totals(snapshot)
+            if index not in self.__previous_totals:
+                continue
+
+            previous_loops, previous_loop_seconds, previous_waiting = self.__previous_totals[index]
+            loops += totals[index][0] - previous_loops
+            loop_seconds += totals[index][1] - previous_loop_seconds
+            waiting_seconds += totals[index][2] - previous_waiting
+
+        utilization = None
+        if loop_seconds > 0.0:
+            utilization = min(max(1.0 - waiting_seconds / loop_seconds, 0.0), 1.0)
+
+        elapsed = now - self.__previous_time
+        sample = scaling_policy.LoadSample(
+            now,
+            self.__manager.get_worker_count(),
+            self.__get_fill(),
+            utilization,
+            loops / elapsed if elapsed > 0.0 else 0.0,
+        )
+
+        self.__previous_totals = totals
+        self.__previous_time = now
+        return sample
+
+    def run_once(self) -> bool:
+        """
+        Samples the load and scales the workers to the count the policy decides.
+        Call periodically, e.g. every second.
+
+        Returns whether the workers are at the decided count.
+        """
+        sample = self.sample()
+        count = self.__policy.decide(sample)
+        if count == sample.worker_count:
+            return True
+
+        utilization_text = "-" if sample.utilization is None else f"{sample.utilization:.0%}"
+        fill_text = "-" if sample.fill is None else f"{sample.fill:.0%}"
+        self.__local_logger.info(
+            f"Scaling {self.__manager.get_target_name()} from {sample.worker_count} "
+            f"to {count} workers: utilization {utilization_text}, input fill {fill_text}, "
+            f"{sample.throughput:.1f} loops/s",
+            True,
+        )
+        return self.__manager.scale_to(count)
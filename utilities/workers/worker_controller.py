@@ -2,7 +2,10 @@
 For controlling workers.
 """
 
+import asyncio
+import ctypes
 import multiprocessing as mp
+import threading
 import time
 
 
@@ -10,58 +13,93 @@ class WorkerController:
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
+
+    Requests are bits of a flag word in shared memory, so the checks
+    in worker loops are a plain memory read. Pausing additionally clears
+    an event which paused workers block on until resumed, and exiting sets
+    an event which workers waiting between iterations wake on.
+
+    A controller for thread workers only uses plain memory and thread primitives instead,
+    and cannot be passed to other processes.
     """
 
-    __QUEUE_DELAY = 0.1  # seconds
+    __EXIT_FLAG = 0x1
+    __PAUSE_FLAG = 0x2
+
+    __ASYNC_POLL_PERIOD = 0.05  # seconds
 
-    def __init__(self) -> None:
+    def __init__(self, is_thread_only: bool = False) -> None:
         """
-        Constructor creates internal queue and semaphore.
+        Constructor creates shared flags, resume event, and exit event.
+
+        is_thread_only: Whether all workers are threads of this process.
         """
-        self.__pause = mp.BoundedSemaphore(1)
-        self.__is_paused = False
-        self.__exit_queue = mp.Queue(1)
+        if is_thread_only:
+            self.__flags = ctypes.c_uint32(0)
+            self.__flags_lock = threading.Lock()
+            self.__resume = threading.Event()
+            self.__exit = threading.Event()
+        else:
+            self.__flags = mp.RawValue(ctypes.c_uint32, 0)
+            # Only the requesting side writes the flags, but it may be several threads
+            self.__flags_lock = mp.Lock()
+            self.__resume = mp.Event()
+            self.__exit = mp.Event()
+        self.__resume.set()
+
+    def __set_flag(self, flag: int) -> None:
+        with self.__flags_lock:
+            self.__flags.value |= flag
+
+    def __clear_flag(self, flag: int) -> None:
+        with self.__flags_lock:
+            self.__flags.value &= ~flag
 
     def request_pause(self) -> None:
         """
         Requests worker processes to pause.
         """
-        if not self.__is_paused:
-            self.__pause.acquire()
-            self.__is_paused = True
+        # Clear before flagging so a worker that sees the flag always blocks
+        self.__resume.clear()
+        self.__set_flag(self.__PAUSE_FLAG)
 
     def request_resume(self) -> None:
         """
         Requests worker processes to resume.
         """
-        if self.__is_paused:
-            self.__pause.release()
-            self.__is_paused = False
+        self.__clear_flag(self.__PAUSE_FLAG)
+        self.__resume.set()
 
     def check_pause(self) -> None:
         """
         Blocks worker if main has requested it to pause, otherwise continues.
         """
-        self.__pause.acquire()
-        self.__pause.release()
+        if self.__flags.value & self.__PAUSE_FLAG:
+            self.__resume.wait()
+
+    async def check_pause_async(self) -> None:
+        """
+        Same as check_pause() for coroutine workers,
+        but yields to the event loop instead of blocking it while paused.
+        """
+        while self.__flags.value & self.__PAUSE_FLAG:
+            await asyncio.sleep(self.__ASYNC_POLL_PERIOD)
 
     def request_exit(self) -> None:
         """
         Requests worker processes to exit.
         Does nothing if already requested.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if self.__exit_queue.empty():
-            self.__exit_queue.put(None)
+        self.__set_flag(self.__EXIT_FLAG)
+        self.__exit.set()
 
     def clear_exit(self) -> None:
         """
         Clears the exit request condition.
         Does nothing if already cleared.
         """
-        time.sleep(self.__QUEUE_DELAY)
-        if not self.__exit_queue.empty():
-            _ = self.__exit_queue.get()
+        self.__exit.clear()
+        self.__clear_flag(self.__EXIT_FLAG)
 
     def is_exit_requested(self) -> bool:
         """
@@ -69,4 +107,33 @@ class WorkerController:
         There is a race condition, but it's fine because the worker process
         will do at most 1 additional loop.
         """
-        return not self.__exit_queue.empty()
+        return (self.__flags.value & self.__EXIT_FLAG) != 0
+
+    def wait_for_exit(self, timeout: float) -> bool:
+        """
+        Use instead of sleeping between loop iterations,
+        so the worker wakes as soon as main requests it to exit.
+
+        timeout: Longest time to wait in seconds.
+
+        Returns whether main has requested the worker process to exit.
+        """
+        if self.is_exit_requested():
+            return True
+
+        return self.__exit.wait(timeout)
+
+    async def wait_for_exit_async(self, timeout: float) -> bool:
+        """
+        Same as wait_for_exit() for coroutine workers,
+        but yields to the event loop instead of blocking it while waiting.
+        """
+        deadline = time.monotonic() + timeout
+        while not self.is_exit_requested():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return False
+
+            await asyncio.sleep(min(remaining, self.__ASYNC_POLL_PERIOD))
+
+        return True
@@ -0,0 +1,107 @@
+"""
+Detecting hung workers: alive, but making no progress.
+"""
+
+import ctypes
+import multiprocessing as mp
+import time
+
+
+class LivenessCounters:
+    """
+    Per worker tick counter, bumped on every loop, and whether the worker is waiting
+    for something that may legitimately take long, e.g. input, a resume, or its period.
+    Kept in shared memory, only the worker writes its own.
+    """
+
+    # Per worker: ticks, waiting
+    __FIELD_COUNT = 2
+    __TICKS = 0
+    __WAITING = 1
+
+    def __init__(self, worker_count: int) -> None:
+        """
+        worker_count: Most workers of the manager.
+        """
+        self.__values = mp.RawArray(ctypes.c_uint64, worker_count * self.__FIELD_COUNT)
+
+    def reset(self, index: int) -> None:
+        """
+        Clears the counters, call before starting a worker in the slot.
+        """
+        start = index * self.__FIELD_COUNT
+        self.__values[start : start + self.__FIELD_COUNT] = [0] * self.__FIELD_COUNT
+
+    def tick(self, index: int) -> None:
+        """
+        Records progress of the worker.
+        """
+        self.__values[index * self.__FIELD_COUNT + self.__TICKS] += 1
+
+    def set_waiting(self, index: int, is_waiting: bool) -> None:
+        """
+        Records whether the worker is waiting, a waiting worker is not hung.
+        """
+        self.__values[index * self.__FIELD_COUNT + self.__WAITING] = int(is_waiting)
+
+    def get_ticks(self, index: int) -> int:
+        """
+        Returns the progress of the worker so far.
+        """
+        return self.__values[index * self.__FIELD_COUNT + self.__TICKS]
+
+    def is_waiting(self, index: int) -> bool:
+        """
+        Returns whether the worker is waiting.
+        """
+        return self.__values[index * self.__FIELD_COUNT + self.__WAITING] != 0
+
+
+class HangDetector:
+    """
+    Finds workers whose tick counter did not move for longer than a deadline
+    while they were not waiting, e.g. stuck in a blocking receive or a put into a full queue.
+    The deadline must be longer than the slowest legitimate loop, including startup.
+    """
+
+    def __init__(self, liveness: LivenessCounters) -> None:
+        """
+        liveness: Liveness counters of the manager.
+        """
+        self.__liveness = liveness
+        # Worker index -> (ticks, monotonic time the ticks were first seen)
+        self.__progress: "dict[int, tuple[int, float]]" = {}
+
+    def reset(self, index: int) -> None:
+        """
+        Forgets the progress of the worker, call when it is started again.
+        """
+        self.__progress.pop(index, None)
+
+    def get_stalled_time(self, index: int, now: "float | None" = None) -> float:
+        """
+        Returns the seconds the worker has made no progress while not waiting.
+
+        now: Monotonic time, the current time if None.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        ticks = self.__liveness.get_ticks(index)
+        previous = self.__progress.get(index)
+        if previous is None or previous[0] != ticks or self.__liveness.is_waiting(index):
+            self.__progress[index] = (ticks, now)
+            return 0.0
+
+        return now - previous[1]
+
+    def is_hung(self, index: int, deadline: float, now: "float | None" = None) -> bool:
+        """
+        Returns whether the worker has made no progress for longer than the deadline.
+        Call periodically, since progress is only noticed when checked,
+        a hang is detected up to one check period after the deadline.
+
+        deadline: Seconds without progress after which a worker is hung.
+        now: Monotonic time, the current time if None.
+        """
+        return self.get_stalled_time(index, now) > deadline
@@ -2,14 +2,72 @@
 For managing workers.
 """
 
+import enum
+import inspect
 import multiprocessing as mp
+import multiprocessing.forkserver
+import os
+import sys
+import threading
+import time
+import traceback
 
 from modules.common.modules.logger import logger
+from utilities.workers import asyncio_host
+from utilities.workers import process_resources
 from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from utilities.workers import worker_metrics
+from utilities.workers import worker_trampoline
 from utilities.workers import queue_proxy_wrapper
 
 
-class WorkerProperties:
+class ExecutionMode(enum.Enum):
+    """
+    How workers are run.
+    """
+
+    # One process per worker
+    PROCESS = 0
+    # Coroutine workers sharing one event loop in one process
+    ASYNCIO = 1
+    # One thread of main per worker, use thread queues and a thread only controller
+    THREAD = 2
+
+
+def configure_start_method(
+    start_method: "str | None",
+    preload_modules: "list[str]",
+    local_logger: logger.Logger,
+) -> bool:
+    """
+    Sets how worker processes are started. Call before creating any queue, controller,
+    or other multiprocessing object, since they are bound to the start method.
+
+    start_method: "fork", "spawn", or "forkserver", None to keep the platform default.
+    preload_modules: Modules the fork server imports once, so forked workers do not import them.
+    Only used by "forkserver".
+    local_logger: Existing logger from process.
+
+    Returns whether the start method was set.
+    """
+    if start_method is None:
+        return True
+
+    if start_method not in mp.get_all_start_methods():
+        local_logger.error(f"Start method {start_method} is not available", True)
+        return False
+
+    mp.set_start_method(start_method, force=True)
+    if start_method == "forkserver":
+        mp.set_forkserver_preload(preload_modules)
+        # Pay for the preload now instead of at the first worker start
+        multiprocessing.forkserver.ensure_running()
+
+    return True
+
+
+class WorkerProperties:  # pylint: disable=too-many-instance-attributes
     """
     Worker Properties.
     """
@@ -26,17 +84,26 @@ class WorkerProperties:
         output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         controller: worker_controller.WorkerController,
         local_logger: logger.Logger,
+        work_keyword_arguments: "dict | None" = None,
+        execution_mode: ExecutionMode = ExecutionMode.PROCESS,
+        max_count: "int | None" = None,
+        placement: "process_resources.ProcessPlacement | None" = None,
     ) -> "tuple[bool, WorkerProperties | None]":
         """
         Creates worker properties.
 
-        count: Number of workers.
+        count: Number of workers to start with.
         target: Function.
         work_arguments: Arguments for worker internals.
         input_queues: Input queues.
         output_queues: Output queues.
         controller: Worker controller.
         local_logger: Existing logger from process.
+        work_keyword_arguments: Optional keyword arguments for worker internals.
+        execution_mode: How the workers are run, ASYNCIO requires an async target.
+        max_count: Most workers when scaled, default count. ASYNCIO workers cannot be scaled.
+        placement: CPUs, niceness, and memory limit of each worker process, None to inherit main's.
+        Only PROCESS workers have their own process.
 
         Returns the WorkerProperties object.
         """
@@ -47,6 +114,33 @@ class WorkerProperties:
             )
             return False, None
 
+        if (execution_mode == ExecutionMode.ASYNCIO) != inspect.iscoroutinefunction(target):
+            local_logger.error(
+                f"{target.__name__} must be async exactly when the execution mode is ASYNCIO",
+                True,
+            )
+            return False, None
+
+        if max_count is None:
+            max_count = count
+
+        if max_count < count:
+            local_logger.error(f"Maximum worker count {max_count} is less than {count}", True)
+            return False, None
+
+        if execution_mode == ExecutionMode.ASYNCIO and max_count != count:
+            local_logger.error("Coroutine workers share a host process and cannot be scaled", True)
+            return False, None
+
+        if placement is not None and execution_mode != ExecutionMode.PROCESS:
+            local_logger.error(
+                f"Only worker processes can be placed, not {execution_mode.name}", True
+            )
+            return False, None
+
+        if work_keyword_arguments is None:
+            work_keyword_arguments = {}
+
         return True, WorkerProperties(
             cls.__create_key,
             count,
@@ -55,6 +149,55 @@ class WorkerProperties:
             input_queues,
             output_queues,
             controller,
+            work_keyword_arguments,
+            execution_mode,
+            max_count,
+            placement,
+        )
+
+    @classmethod
+    def create_asyncio_host(
+        cls,
+        worker_properties: "list[WorkerProperties]",
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, WorkerProperties | None]":
+        """
+        Creates properties of a single process running all the given coroutine workers
+        on one event loop, e.g. several lightweight periodic workers.
+
+        worker_properties: Properties of coroutine workers, all with ASYNCIO execution mode.
+        local_logger: Existing logger from process.
+
+        Returns the WorkerProperties object of the host process.
+        """
+        if len(worker_properties) == 0:
+            local_logger.error("No coroutine workers to host", True)
+            return False, None
+
+        workers = []
+        for properties in worker_properties:
+            if properties.get_execution_mode() != ExecutionMode.ASYNCIO:
+                local_logger.error(
+                    f"{properties.get_target_name()} is not a coroutine worker", True
+                )
+                return False, None
+
+            workers += [
+                (
+                    properties.get_worker_target(),
+                    properties.get_worker_arguments(),
+                    properties.get_worker_keyword_arguments(),
+                )
+            ] * properties.get_worker_count()
+
+        return cls.create(
+            count=1,
+            target=asyncio_host.asyncio_host_worker,
+            work_arguments=(workers,),
+            input_queues=[],
+            output_queues=[],
+            controller=worker_properties[0].get_controller(),
+            local_logger=local_logger,
         )
 
     def __init__(
@@ -66,6 +209,10 @@ class WorkerProperties:
         input_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         output_queues: "list[queue_proxy_wrapper.QueueProxyWrapper]",
         controller: worker_controller.WorkerController,
+        work_keyword_arguments: "dict",
+        execution_mode: ExecutionMode,
+        max_count: int,
+        placement: "process_resources.ProcessPlacement | None",
     ) -> None:
         """
         Private constructor, use create() method.
@@ -78,6 +225,10 @@ class WorkerProperties:
         self.__input_queues = input_queues
         self.__output_queues = output_queues
         self.__controller = controller
+        self.__work_keyword_arguments = work_keyword_arguments
+        self.__execution_mode = execution_mode
+        self.__max_count = max_count
+        self.__placement = placement
 
     def get_worker_arguments(self) -> "tuple":
         """
@@ -92,12 +243,42 @@ class WorkerProperties:
             + (self.__controller,)
         )
 
+    def get_worker_keyword_arguments(self) -> "dict":
+        """
+        Returns the keyword arguments for worker internals.
+        """
+        return self.__work_keyword_arguments
+
+    def get_controller(self) -> worker_controller.WorkerController:
+        """
+        Returns the worker controller.
+        """
+        return self.__controller
+
+    def get_execution_mode(self) -> ExecutionMode:
+        """
+        Returns how the workers are run.
+        """
+        return self.__execution_mode
+
     def get_worker_count(self) -> int:
         """
         Returns the worker count.
         """
         return self.__count
 
+    def get_max_worker_count(self) -> int:
+        """
+        Returns the most workers when scaled.
+        """
+        return self.__max_count
+
+    def get_placement(self) -> "process_resources.ProcessPlacement | None":
+        """
+        Returns the placement of the worker processes, None if they inherit main's.
+        """
+        return self.__placement
+
     def get_worker_target(self) -> "(...) -> object":  # type: ignore
         """
         Returns the worker target.
@@ -117,7 +298,7 @@ class WorkerProperties:
         return self.__target.__name__
 
 
-class WorkerManager:
+class WorkerManager:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """
     For interprocess communication from main to worker.
     Contains exit and pause requests.
@@ -125,6 +306,9 @@ class WorkerManager:
 
     __create_key = object()
 
+    __STACK_DUMP_TIME = 0.2  # seconds
+    __KILL_JOIN_TIMEOUT = 1.0  # seconds
+
     @classmethod
     def create(
         cls,
@@ -133,17 +317,35 @@ class WorkerManager:
     ) -> "tuple[bool, WorkerManager | None]":
         """
         Create identical workers and append them to a workers list.
+        Coroutine workers all share a single host process.
 
         worker_properties: Worker properties.
         local_logger: Existing logger from process.
 
         Returns whether the workers were able to be created and the Worker Manager.
         """
+        if worker_properties.get_execution_mode() == ExecutionMode.ASYNCIO:
+            result, worker_properties = WorkerProperties.create_asyncio_host(
+                [worker_properties], local_logger
+            )
+            if not result:
+                return False, None
+
+        # Sized for the most workers, since scaling up reuses the slots of retired workers
+        max_count = worker_properties.get_max_worker_count()
+        timeline = worker_trampoline.StartupTimeline(max_count)
+        metrics_registry = worker_metrics.MetricsRegistry(max_count)
+        retirement = worker_trampoline.RetirementFlags(max_count)
+        liveness = worker_liveness.LivenessCounters(max_count)
         workers = []
-        for _ in range(0, worker_properties.get_worker_count()):
+        for i in range(0, worker_properties.get_worker_count()):
             result, worker = WorkerManager.__create_single_worker(
-                worker_properties.get_worker_target(),
-                worker_properties.get_worker_arguments(),
+                worker_properties,
+                timeline,
+                metrics_registry,
+                retirement,
+                liveness,
+                i,
                 local_logger,
             )
             if not result:
@@ -156,14 +358,22 @@ class WorkerManager:
             cls.__create_key,
             workers,
             worker_properties,
+            timeline,
+            metrics_registry,
+            retirement,
+            liveness,
             local_logger,
         )
 
     def __init__(
         self,
         class_private_create_key: object,
-        workers: "list[mp.Process]",
+        workers: "list[mp.Process | threading.Thread]",
         worker_properties: WorkerProperties,
+        timeline: worker_trampoline.StartupTimeline,
+        metrics_registry: worker_metrics.MetricsRegistry,
+        retirement: worker_trampoline.RetirementFlags,
+        liveness: worker_liveness.LivenessCounters,
         local_logger: logger.Logger,
     ) -> None:
         """
@@ -173,21 +383,60 @@ class WorkerManager:
 
         self.__workers = workers
         self.__worker_properties = worker_properties
+        self.__timeline = timeline
+        self.__metrics_registry = metrics_registry
+        self.__retirement = retirement
+        self.__liveness = liveness
+        self.__hang_detector = worker_liveness.HangDetector(liveness)
         self.__local_logger = local_logger
+        self.__restart_count = 0
+        # Index -> worker asked to retire that may still be handling its last items
+        self.__retiring: "dict[int, mp.Process | threading.Thread]" = {}
+        # A supervisor thread restarts workers while main scales them
+        self.__lock = threading.RLock()
 
     @staticmethod
-    def __create_single_worker(target: "(...) -> object", args: "tuple", local_logger: logger.Logger) -> "tuple[bool, mp.Process | None]":  # type: ignore
+    def __create_single_worker(
+        worker_properties: WorkerProperties,
+        timeline: worker_trampoline.StartupTimeline,
+        metrics_registry: worker_metrics.MetricsRegistry,
+        retirement: worker_trampoline.RetirementFlags,
+        liveness: worker_liveness.LivenessCounters,
+        index: int,
+        local_logger: logger.Logger,
+    ) -> "tuple[bool, mp.Process | threading.Thread | None]":
         """
-        Creates a single worker.
+        Creates a single worker, which runs its target through the trampoline.
 
-        target: Function.
-        args: Target function arguments.
+        worker_properties: Worker properties.
+        timeline: Startup timeline of the manager.
+        metrics_registry: Metrics of the manager.
+        retirement: Retirement flags of the manager.
+        liveness: Liveness counters of the manager.
+        index: Index of the worker in the manager.
         local_logger: Existing logger from process.
 
         Returns whether a worker was created and the worker.
         """
+        trampoline_args = (
+            worker_properties.get_worker_target(),
+            worker_properties.get_worker_arguments(),
+            worker_properties.get_worker_keyword_arguments(),
+            timeline,
+            index,
+            metrics_registry,
+            retirement,
+            liveness,
+            worker_properties.get_placement(),
+        )
         try:
-            worker = mp.Process(target=target, args=args)
+            if worker_properties.get_execution_mode() == ExecutionMode.THREAD:
+                # Daemon so a stuck worker cannot keep main from exiting
+                worker = threading.Thread(
+                    target=worker_trampoline.run_worker, args=trampoline_args, daemon=True
+                )
+            else:
+                worker = mp.Process(target=worker_trampoline.run_worker, args=trampoline_args)
         # Catching all exceptions for library call
         # pylint: disable-next=broad-exception-caught
         except Exception as e:
@@ -196,30 +445,320 @@ class WorkerManager:
 
         return True, worker
 
+    def __mark_started(self, index: int) -> None:
+        """
+        Clears what is recorded about the previous worker of the slot.
+        """
+        self.__timeline.mark_started(index)
+        self.__liveness.reset(index)
+        self.__hang_detector.reset(index)
+
     def start_workers(self) -> None:
         """
         Start workers.
         """
-        for worker in self.__workers:
+        for i, worker in enumerate(self.__workers):
+            self.__mark_started(i)
             worker.start()
 
     def join_workers(self) -> None:
         """
-        Join workers.
+        Join workers, including retired ones.
         """
-        for worker in self.__workers:
+        for worker in self.__workers + list(self.__retiring.values()):
             worker.join()
 
+        self.__retiring.clear()
+
+    def get_target_name(self) -> str:
+        """
+        Returns the name of the target.
+        """
+        return self.__worker_properties.get_target_name()
+
+    def get_startup_timeline(self) -> "list[tuple[float | None, float | None]]":
+        """
+        Returns for each worker the seconds from its latest start to entering its target
+        and to its first loop, None for each that has not happened yet.
+        """
+        return [self.__timeline.get_durations(i) for i in range(len(self.__workers))]
+
+    def log_startup_timeline(self) -> None:
+        """
+        Logs the startup timeline of each worker.
+        """
+        for i, (entered, first_loop) in enumerate(self.get_startup_timeline()):
+            entered_text = "-" if entered is None else f"{entered * 1000:.1f} ms"
+            first_loop_text = "-" if first_loop is None else f"{first_loop * 1000:.1f} ms"
+            self.__local_logger.info(
+                f"Startup {self.get_target_name()}[{i}]: entered after {entered_text}, "
+                f"first loop after {first_loop_text}",
+                True,
+            )
+
+    def get_metrics_snapshot(
+        self,
+    ) -> "list[dict[str, int | float | worker_metrics.HistogramSnapshot]]":
+        """
+        Returns a copy of the metrics of each worker, read from shared memory without IPC.
+        Every worker has a "loop" histogram of the time between its exit checks,
+        and "get_wait" and "put_wait" histograms of its queue arguments.
+        """
+        return [self.__metrics_registry.snapshot(i) for i in range(len(self.__workers))]
+
+    def get_worker_sentinels(self) -> "dict[int, int]":
+        """
+        Returns the sentinel of each started worker mapped to its index.
+        A sentinel becomes ready in `multiprocessing.connection.wait()` when the worker ends.
+        Thread workers have no sentinel.
+        """
+        with self.__lock:
+            return {
+                worker.sentinel: i
+                for i, worker in enumerate(self.__workers)
+                if isinstance(worker, mp.Process) and worker.pid is not None
+            }
+
+    def get_worker_pids(self) -> "dict[int, int]":
+        """
+        Returns the process ID of each started worker process mapped to its index.
+        Thread workers run in main's process and are left out.
+        """
+        with self.__lock:
+            return {
+                i: worker.pid
+                for i, worker in enumerate(self.__workers)
+                if isinstance(worker, mp.Process) and worker.pid is not None
+            }
+
+    def __get_worker(self, index: int) -> "mp.Process | threading.Thread":
+        """
+        Returns the worker of the slot, the retired one if the slot is not in use.
+        """
+        with self.__lock:
+            if index < len(self.__workers):
+                return self.__workers[index]
+
+            return self.__retiring[index]
+
+    def join_worker(self, index: int, timeout: "float | None" = None) -> None:
+        """
+        Join a single worker.
+        """
+        self.__get_worker(index).join(timeout)
+
+    def get_worker_exit_code(self, index: int) -> "int | None":
+        """
+        Returns the exit code of the worker, None if it is still running or is a thread.
+        """
+        worker = self.__get_worker(index)
+        if not isinstance(worker, mp.Process):
+            return None
+
+        return worker.exitcode
+
+    def get_restart_count(self) -> int:
+        """
+        Returns the number of workers restarted so far.
+        """
+        return self.__restart_count
+
+    def restart_worker(self, index: int) -> bool:
+        """
+        Replaces the worker with a newly started one.
+
+        Returns whether the worker was able to be restarted, False if it was retired.
+        """
+        with self.__lock:
+            if index >= len(self.__workers):
+                return False
+
+            target_and_worker_name = (
+                f"{self.__worker_properties.get_target_name()} {self.__workers[index].name}"
+            )
+
+            # Create a new worker
+            result, new_worker = WorkerManager.__create_single_worker(
+                self.__worker_properties,
+                self.__timeline,
+                self.__metrics_registry,
+                self.__retirement,
+                self.__liveness,
+                index,
+                self.__local_logger,
+            )
+            if not result:
+                self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+                return False
+
+            # Replace the dead worker
+            self.__mark_started(index)
+            new_worker.start()
+            self.__workers[index] = new_worker
+            self.__restart_count += 1
+
+            return True
+
+    def get_worker_count(self) -> int:
+        """
+        Returns the number of workers, not counting retired ones.
+        """
+        return len(self.__workers)
+
+    def get_max_worker_count(self) -> int:
+        """
+        Returns the most workers the manager can scale to.
+        """
+        return self.__worker_properties.get_max_worker_count()
+
+    def scale_to(self, count: int) -> bool:
+        """
+        Starts or retires workers until count are running.
+        Retired workers see an exit request at their next exit check, so they end
+        after handling the items they hold, and the others take over the queued items.
+        The newest workers are retired first, and their slots are reused when scaling up.
+
+        count: Number of workers, between 1 and the maximum of the worker properties.
+
+        Returns whether count workers are running. Scaling up stops early at a slot
+        whose retired worker has not ended yet.
+        """
+        with self.__lock:
+            if not 0 < count <= self.__worker_properties.get_max_worker_count():
+                self.__local_logger.error(
+                    f"Cannot scale {self.get_target_name()} to {count} workers, "
+                    f"must be between 1 and {self.__worker_properties.get_max_worker_count()}",
+                    True,
+                )
+                return False
+
+            while len(self.__workers) > count:
+                index = len(self.__workers) - 1
+                self.__retirement.request(index)
+                self.__retiring[index] = self.__workers.pop()
+
+            # Reap retired workers that ended
+            for index, worker in list(self.__retiring.items()):
+                if not worker.is_alive():
+                    worker.join()
+                    del self.__retiring[index]
+
+            while len(self.__workers) < count:
+                index = len(self.__workers)
+                if index in self.__retiring:
+                    return False
+
+                result, worker = WorkerManager.__create_single_worker(
+                    self.__worker_properties,
+                    self.__timeline,
+                    self.__metrics_registry,
+                    self.__retirement,
+                    self.__liveness,
+                    index,
+                    self.__local_logger,
+                )
+                if not result:
+                    self.__local_logger.error(f"Failed to scale up {self.get_target_name()}", True)
+                    return False
+
+                self.__retirement.clear(index)
+                self.__mark_started(index)
+                worker.start()
+                self.__workers.append(worker)
+
+            return True
+
+    def find_hung_workers(self, deadline: float) -> "list[int]":
+        """
+        Returns the indices of workers that are alive but made no progress for longer
+        than the deadline while not waiting for input, a resume, or their period.
+        Call periodically, see `worker_liveness.HangDetector`.
+
+        deadline: Seconds without progress, longer than the slowest legitimate loop.
+        """
+        with self.__lock:
+            return [
+                i
+                for i, worker in enumerate(self.__workers)
+                if worker.is_alive() and self.__hang_detector.is_hung(i, deadline)
+            ]
+
+    def dump_worker_stack(self, index: int) -> None:
+        """
+        Writes the stack of the worker: a worker process writes each of its threads
+        to its stderr, a thread worker is logged.
+        """
+        worker = self.__get_worker(index)
+        if isinstance(worker, threading.Thread):
+            # Get Pylance to stop complaining
+            assert worker.ident is not None
+
+            # pylint: disable-next=protected-access
+            frame = sys._current_frames().get(worker.ident)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "-"
+            self.__local_logger.warning(
+                f"Stack of {self.get_target_name()}[{index}]:\n{stack}", True
+            )
+            return
+
+        if worker_trampoline.STACK_DUMP_SIGNAL is None or worker.pid is None:
+            self.__local_logger.warning("Stack dumps are not supported on this platform", True)
+            return
+
+        try:
+            os.kill(worker.pid, worker_trampoline.STACK_DUMP_SIGNAL)
+        except ProcessLookupError:
+            return
+
+        # The dump is written from the worker's signal handler
+        time.sleep(self.__STACK_DUMP_TIME)
+
+    def kill_hung_worker(self, index: int) -> bool:
+        """
+        Dumps the stack of the worker and kills it, so it can be restarted.
+        A hung worker may not check for exit requests, so it is not asked to exit.
+        A worker killed while holding a queue's lock leaves the queue unusable.
+
+        Returns whether the worker was killed, thread workers cannot be.
+        """
+        worker = self.__get_worker(index)
+        self.__local_logger.error(
+            f"{self.get_target_name()}[{index}] made no progress, dumping its stack", True
+        )
+        self.dump_worker_stack(index)
+        if not isinstance(worker, mp.Process):
+            self.__local_logger.error(
+                f"{self.get_target_name()}[{index}] is a thread and cannot be killed", True
+            )
+            return False
+
+        worker.kill()
+        worker.join(self.__KILL_JOIN_TIMEOUT)
+        return True
+
+    def check_and_restart_hung_workers(self, deadline: float) -> bool:
+        """
+        Check for hung workers, and kill and restart them.
+        Use either this or a supervisor with a hang deadline, which restarts with backoff.
+
+        deadline: Seconds without progress, longer than the slowest legitimate loop.
+
+        Returns whether the hung workers were able to be restarted.
+        """
+        for i in self.find_hung_workers(deadline):
+            if not self.kill_hung_worker(i) or not self.restart_worker(i):
+                return False
+
+        return True
+
     def check_and_restart_dead_workers(self) -> bool:
         """
         Check and restart dead workers.
 
         Returns whether the dead workers were able to be restarted.
         """
-        new_workers = []
-        for worker in self.__workers:
+        for i, worker in enumerate(self.__workers):
             if worker.is_alive():
-                new_workers.append(worker)
                 continue
 
             # Log dead worker
@@ -229,19 +768,51 @@ class WorkerManager:
                 True,
             )
 
-            # Create a new worker
-            result, new_worker = WorkerManager.__create_single_worker(
-                self.__worker_properties.get_worker_target(),
-                self.__worker_properties.get_worker_arguments(),
-                self.__local_logger,
-            )
-            if not result:
-                self.__local_logger.error(f"Failed to restart {target_and_worker_name}", True)
+            if not self.restart_worker(i):
                 return False
 
-            # Append the new worker
-            new_workers.append(new_worker)
+        return True
 
-        self.__workers = new_workers
 
-        return True
+def log_metrics_summary(managers: "list[WorkerManager]", local_logger: logger.Logger) -> None:
+    """
+    Logs a table of the metrics of every worker.
+
+    managers: Managers of the workers.
+    local_logger: Existing logger from process.
+    """
+    snapshots = {}
+    for manager in managers:
+        for i, snapshot in enumerate(manager.get_metrics_snapshot()):
+            snapshots[f"{manager.get_target_name()}[{i}]"] = snapshot
+
+    for line in worker_metrics.format_summary(snapshots):
+        local_logger.info(line, True)
+
+
+def log_resource_usage(
+    managers: "list[WorkerManager]",
+    reader: process_resources.ProcessUsageReader,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Logs the CPU and memory use of main and every worker process, and the CPUs they run on,
+    to check their placement. CPU use is since the previous call with the same reader.
+    Logs nothing on platforms the reader does not support.
+
+    managers: Managers of the workers.
+    reader: Reader kept between calls.
+    local_logger: Existing logger from process.
+    """
+    if not reader.is_supported():
+        return
+
+    pids = {"main": os.getpid()}
+    for manager in managers:
+        for i, pid in manager.get_worker_pids().items():
+            pids[f"{manager.get_target_name()}[{i}]"] = pid
+
+    for name, pid in pids.items():
+        result, usage = reader.read(pid)
+        if result:
+            local_logger.info(f"{name} {usage}", True)
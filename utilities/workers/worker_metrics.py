@@ -0,0 +1,291 @@
+"""
+Counters, gauges, and latency histograms of workers, kept in shared memory
+so main reads them without any IPC round trip.
+"""
+
+import ctypes
+import enum
+import multiprocessing as mp
+import threading
+
+
+HISTOGRAM_BUCKET_COUNT = 32
+METRIC_NAME_LENGTH = 32  # bytes
+
+
+class MetricKind(enum.Enum):
+    """
+    What a metric slot holds.
+    """
+
+    UNUSED = 0
+    # Monotonic count of events
+    COUNTER = 1
+    # Latest value of something
+    GAUGE = 2
+    # Distribution of durations
+    HISTOGRAM = 3
+
+
+class MetricSlot(ctypes.Structure):
+    """
+    One metric of one worker in shared memory. Only its worker writes to it.
+    """
+
+    _fields_ = [
+        ("name", ctypes.c_char * METRIC_NAME_LENGTH),
+        ("kind", ctypes.c_uint32),
+        # Counter value, or number of histogram observations
+        ("count", ctypes.c_uint64),
+        # Gauge value, or sum of histogram observations in seconds
+        ("value", ctypes.c_double),
+        # Bucket i counts durations in [2 ** (i - 1), 2 ** i) microseconds
+        ("buckets", ctypes.c_uint64 * HISTOGRAM_BUCKET_COUNT),
+    ]
+
+
+def bucket_index(seconds: float) -> int:
+    """
+    Returns the histogram bucket of a duration.
+    """
+    microseconds = max(int(seconds * 1e6), 0)
+    return min(microseconds.bit_length(), HISTOGRAM_BUCKET_COUNT - 1)
+
+
+class HistogramSnapshot:
+    """
+    Copy of a histogram at one point in time.
+    """
+
+    def __init__(self, count: int, total: float, buckets: "list[int]") -> None:
+        """
+        count: Number of observations.
+        total: Sum of observations in seconds.
+        buckets: Observations by power of 2 of microseconds.
+        """
+        self.count = count
+        self.total = total
+        self.buckets = buckets
+
+    def mean(self) -> "float | None":
+        """
+        Returns the mean in seconds, None if there are no observations.
+        """
+        if self.count == 0:
+            return None
+
+        return self.total / self.count
+
+    def percentile(self, fraction: float) -> "float | None":
+        """
+        Returns the upper bound in seconds of the bucket containing the percentile,
+        None if there are no observations.
+
+        fraction: Percentile between 0 and 1, e.g. 0.99 .
+        """
+        observed = sum(self.buckets)
+        if observed == 0:
+            return None
+
+        rank = fraction * observed
+        cumulative = 0
+        for i, bucket in enumerate(self.buckets):
+            cumulative += bucket
+            if cumulative >= rank:
+                return 2**i / 1e6
+
+        return 2 ** (HISTOGRAM_BUCKET_COUNT - 1) / 1e6
+
+
+class MetricsRegistry:
+    """
+    Shared memory block with a fixed number of metric slots for each worker of a manager.
+    """
+
+    DEFAULT_METRICS_PER_WORKER = 16
+
+    def __init__(
+        self, worker_count: int, metrics_per_worker: int = DEFAULT_METRICS_PER_WORKER
+    ) -> None:
+        """
+        worker_count: Number of workers of the manager.
+        metrics_per_worker: Most metrics each worker can record, further metrics are ignored.
+        """
+        self.__metrics_per_worker = metrics_per_worker
+        self.__slots = mp.RawArray(MetricSlot, worker_count * metrics_per_worker)
+
+    def get_slots(self, index: int) -> "list[MetricSlot]":
+        """
+        Returns the metric slots of the worker, as views into shared memory.
+        """
+        start = index * self.__metrics_per_worker
+        return [self.__slots[i] for i in range(start, start + self.__metrics_per_worker)]
+
+    def get_recorder(self, index: int) -> "WorkerMetrics":
+        """
+        Returns the recorder the worker writes its metrics with.
+        """
+        return WorkerMetrics(self.get_slots(index))
+
+    def snapshot(self, index: int) -> "dict[str, int | float | HistogramSnapshot]":
+        """
+        Returns a copy of the metrics of the worker by name.
+        Each metric is consistent enough for monitoring, but may be mid update.
+        """
+        metrics = {}
+        for slot in self.get_slots(index):
+            kind = MetricKind(slot.kind)
+            name = slot.name.decode(errors="replace")
+            if kind == MetricKind.COUNTER:
+                metrics[name] = slot.count
+            elif kind == MetricKind.GAUGE:
+                metrics[name] = slot.value
+            elif kind == MetricKind.HISTOGRAM:
+                metrics[name] = HistogramSnapshot(slot.count, slot.value, list(slot.buckets))
+
+        return metrics
+
+
+class WorkerMetrics:
+    """
+    Records the metrics of one worker.
+
+    Workers get theirs with `WorkerMetrics.get_current()`. The trampoline sets it for every
+    worker created by `WorkerManager`, otherwise metrics go to private memory nobody reads.
+    """
+
+    __current = threading.local()
+
+    @classmethod
+    def get_current(cls) -> "WorkerMetrics":
+        """
+        Returns the recorder of the worker running in this thread.
+        """
+        recorder = getattr(cls.__current, "recorder", None)
+        if recorder is None:
+            recorder = MetricsRegistry(1).get_recorder(0)
+            cls.__current.recorder = recorder
+
+        return recorder
+
+    @classmethod
+    def set_current(cls, recorder: "WorkerMetrics") -> None:
+        """
+        Sets the recorder of the worker running in this thread.
+        """
+        cls.__current.recorder = recorder
+
+    def __init__(self, slots: "list[MetricSlot]") -> None:
+        """
+        slots: Metric slots of the worker.
+        """
+        self.__slots = slots
+        self.__by_name: "dict[str, MetricSlot | None]" = {}
+
+    def __get_slot(self, name: str, kind: MetricKind) -> "MetricSlot | None":
+        """
+        Returns the slot of the metric, claiming a free one on first use.
+        A restarted worker continues the metrics of its predecessor.
+
+        Returns None if the name is used by another kind or there is no free slot.
+        """
+        if name in self.__by_name:
+            return self.__by_name[name]
+
+        encoded_name = name.encode()[:METRIC_NAME_LENGTH]
+        found = None
+        free = None
+        for slot in self.__slots:
+            if slot.kind == MetricKind.UNUSED.value:
+                if free is None:
+                    free = slot
+            elif slot.name == encoded_name:
+                found = slot if slot.kind == kind.value else None
+                break
+        else:
+            found = free
+            if found is not None:
+                found.name = encoded_name
+                # Written last, readers skip the slot until then
+                found.kind = kind.value
+
+        self.__by_name[name] = found
+        return found
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """
+        Adds to a counter.
+        """
+        slot = self.__get_slot(name, MetricKind.COUNTER)
+        if slot is not None:
+            slot.count += amount
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Sets a gauge.
+        """
+        slot = self.__get_slot(name, MetricKind.GAUGE)
+        if slot is not None:
+            slot.value = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Adds a duration to a histogram.
+        """
+        slot = self.__get_slot(name, MetricKind.HISTOGRAM)
+        if slot is not None:
+            slot.buckets[bucket_index(seconds)] += 1
+            slot.count += 1
+            slot.value += seconds
+
+
+def format_milliseconds(seconds: "float | None") -> str:
+    """
+    Returns the duration in milliseconds for a table cell.
+    """
+    if seconds is None:
+        return "-"
+
+    return f"{seconds * 1000:.2f}"
+
+
+def format_summary(
+    snapshots: "dict[str, dict[str, int | float | HistogramSnapshot]]",
+) -> "list[str]":
+    """
+    Returns a table of the metrics of each worker, one line per row.
+    Loop and queue wait percentiles are in milliseconds, other metrics are listed at the end.
+
+    snapshots: Worker label mapped to its metrics.
+    """
+    header = (
+        f"{'worker':<32} {'loops':>9} {'loop p50':>9} {'loop p99':>9} "
+        f"{'get p99':>9} {'put p99':>9}  other"
+    )
+    lines = [header]
+    empty = HistogramSnapshot(0, 0.0, [0] * HISTOGRAM_BUCKET_COUNT)
+    for label, metrics in snapshots.items():
+        loop = metrics.get("loop", empty)
+        get_wait = metrics.get("get_wait", empty)
+        put_wait = metrics.get("put_wait", empty)
+        others = []
+        for name, value in metrics.items():
+            if name in ("loop", "get_wait", "put_wait"):
+                continue
+            if isinstance(value, HistogramSnapshot):
+                others.append(f"{name} p99={format_milliseconds(value.percentile(0.99))}")
+            elif isinstance(value, float):
+                others.append(f"{name}={value:g}")
+            else:
+                others.append(f"{name}={value}")
+
+        row = (
+            f"{label:<32} {loop.count:>9} "
+            f"{format_milliseconds(loop.percentile(0.5)):>9} "
+            f"{format_milliseconds(loop.percentile(0.99)):>9} "
+            f"{format_milliseconds(get_wait.percentile(0.99)):>9} "
+            f"{format_milliseconds(put_wait.percentile(0.99)):>9}  "
+        )
+        lines.append((row + " ".join(others)).rstrip())
+
+    return lines
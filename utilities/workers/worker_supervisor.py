@@ -0,0 +1,283 @@
+"""
+For supervising workers.
+"""
+
+import collections
+import multiprocessing as mp
+import multiprocessing.connection
+import time
+
+from modules.common.modules.logger import logger
+from utilities.workers import worker_manager
+
+
+class RestartRecord:
+    """
+    A worker that ended and what the supervisor did about it.
+    """
+
+    def __init__(
+        self,
+        target_name: str,
+        worker_index: int,
+        exit_code: "int | None",
+        restart_latency: "float | None",
+    ) -> None:
+        """
+        target_name: Name of the worker target.
+        worker_index: Index of the worker in its manager.
+        exit_code: Exit code of the ended worker.
+        restart_latency: Seconds from detection to the replacement starting,
+        None if the worker was not restarted.
+        """
+        self.target_name = target_name
+        self.worker_index = worker_index
+        self.exit_code = exit_code
+        self.restart_latency = restart_latency
+
+    def __str__(self) -> str:
+        if self.restart_latency is None:
+            return (
+                f"{self.target_name}[{self.worker_index}] exit code {self.exit_code}, not restarted"
+            )
+
+        return (
+            f"{self.target_name}[{self.worker_index}] exit code {self.exit_code}, "
+            f"restarted after {self.restart_latency:.3f} s"
+        )
+
+
+class WorkerSupervisor:  # pylint: disable=too-many-instance-attributes
+    """
+    Restarts workers that end, with exponential backoff and a crash budget per worker.
+    Optionally kills hung workers, alive but making no progress, so they are restarted the same way.
+
+    Blocks on the worker sentinels instead of polling on a timer,
+    and schedules backed off restarts instead of sleeping on them,
+    so one crash looping worker does not delay restarts of the others.
+    """
+
+    __create_key = object()
+
+    __REAP_TIMEOUT = 1.0  # seconds
+    # Hangs are detected at most 1 / __HANG_CHECKS_PER_DEADLINE of the deadline late
+    __HANG_CHECKS_PER_DEADLINE = 4
+
+    @classmethod
+    def create(
+        cls,
+        managers: "list[worker_manager.WorkerManager]",
+        initial_backoff: float,
+        max_backoff: float,
+        crash_budget: int,
+        budget_window: float,
+        local_logger: logger.Logger,
+        hang_deadline: "float | None" = None,
+    ) -> "tuple[bool, WorkerSupervisor | None]":
+        """
+        Creates a supervisor.
+
+        managers: Managers of the workers to supervise.
+        initial_backoff: Delay before the first restart in seconds.
+        max_backoff: Upper bound of the doubling delay in seconds.
+        crash_budget: Crashes allowed per worker within budget_window before giving up on it.
+        budget_window: Time window of the crash budget in seconds.
+        local_logger: Existing logger from process.
+        hang_deadline: Seconds without progress after which a worker is killed and restarted,
+        None to not check. Must be longer than the slowest legitimate loop.
+
+        Returns the WorkerSupervisor object.
+        """
+        if initial_backoff < 0.0 or max_backoff < initial_backoff:
+            local_logger.error("Backoff must satisfy 0 <= initial <= max", True)
+            return False, None
+
+        if crash_budget <= 0 or budget_window <= 0.0:
+            local_logger.error("Crash budget and window must be greater than 0", True)
+            return False, None
+
+        if hang_deadline is not None and hang_deadline <= 0.0:
+            local_logger.error("Hang deadline must be greater than 0", True)
+            return False, None
+
+        return True, WorkerSupervisor(
+            cls.__create_key,
+            managers,
+            initial_backoff,
+            max_backoff,
+            crash_budget,
+            budget_window,
+            local_logger,
+            hang_deadline,
+        )
+
+    def __init__(
+        self,
+        class_private_create_key: object,
+        managers: "list[worker_manager.WorkerManager]",
+        initial_backoff: float,
+        max_backoff: float,
+        crash_budget: int,
+        budget_window: float,
+        local_logger: logger.Logger,
+        hang_deadline: "float | None",
+    ) -> None:
+        """
+        Private constructor, use create() method.
+        """
+        assert class_private_create_key is WorkerSupervisor.__create_key, "Use create() method"
+
+        self.__managers = managers
+        self.__initial_backoff = initial_backoff
+        self.__max_backoff = max_backoff
+        self.__crash_budget = crash_budget
+        self.__budget_window = budget_window
+        self.__local_logger = local_logger
+        self.__hang_deadline = hang_deadline
+
+        # (manager index, worker index) -> crash times within the budget window
+        self.__crash_times: "dict[tuple[int, int], collections.deque]" = {}
+        # (manager index, worker index) -> (due time, detection time, exit code)
+        self.__pending: "dict[tuple[int, int], tuple[float, float, int | None]]" = {}
+        # Workers that used up their crash budget, or hung and could not be killed
+        self.__abandoned: "set[tuple[int, int]]" = set()
+
+        # Wakes run_once() when stop() is called
+        self.__stop_receiver, self.__stop_sender = mp.Pipe(duplex=False)
+        self.records: "list[RestartRecord]" = []
+
+    def __handle_ended(self, key: "tuple[int, int]") -> None:
+        """
+        Schedules a restart of the ended worker, or gives up on it if it is over budget.
+        """
+        manager_index, worker_index = key
+        manager = self.__managers[manager_index]
+        if worker_index >= manager.get_worker_count():
+            # Retired by scaling down, it was supposed to end
+            return
+
+        # The sentinel is ready slightly before the process can be reaped
+        manager.join_worker(worker_index, self.__REAP_TIMEOUT)
+        exit_code = manager.get_worker_exit_code(worker_index)
+        now = time.monotonic()
+
+        crash_times = self.__crash_times.setdefault(key, collections.deque())
+        crash_times.append(now)
+        while crash_times[0] < now - self.__budget_window:
+            crash_times.popleft()
+
+        if len(crash_times) > self.__crash_budget:
+            self.__local_logger.error(
+                f"{manager.get_target_name()}[{worker_index}] crashed {len(crash_times)} times "
+                f"in {self.__budget_window} s, not restarting",
+                True,
+            )
+            self.__abandoned.add(key)
+            self.records.append(
+                RestartRecord(manager.get_target_name(), worker_index, exit_code, None)
+            )
+            return
+
+        backoff = min(
+            self.__initial_backoff * 2 ** (len(crash_times) - 1),
+            self.__max_backoff,
+        )
+        self.__local_logger.warning(
+            f"{manager.get_target_name()}[{worker_index}] ended with exit code {exit_code}, "
+            f"restarting in {backoff:.2f} s",
+            True,
+        )
+        self.__pending[key] = (now + backoff, now, exit_code)
+
+    def __restart_due(self) -> None:
+        """
+        Restarts every worker whose backoff has elapsed.
+        """
+        now = time.monotonic()
+        for key, (due, detected, exit_code) in list(self.__pending.items()):
+            if due > now:
+                continue
+
+            del self.__pending[key]
+            manager_index, worker_index = key
+            manager = self.__managers[manager_index]
+            if worker_index >= manager.get_worker_count():
+                # Retired by scaling down while waiting for the restart
+                continue
+
+            if not manager.restart_worker(worker_index):
+                self.__abandoned.add(key)
+                self.records.append(
+                    RestartRecord(manager.get_target_name(), worker_index, exit_code, None)
+                )
+                continue
+
+            self.records.append(
+                RestartRecord(
+                    manager.get_target_name(),
+                    worker_index,
+                    exit_code,
+                    time.monotonic() - detected,
+                )
+            )
+
+    def __kill_hung(self) -> None:
+        """
+        Kills hung workers, their sentinels then restart them like any ended worker.
+        """
+        for manager_index, manager in enumerate(self.__managers):
+            for worker_index in manager.find_hung_workers(self.__hang_deadline):
+                key = (manager_index, worker_index)
+                if key in self.__pending or key in self.__abandoned:
+                    continue
+
+                if not manager.kill_hung_worker(worker_index):
+                    # Left running, but not reported again
+                    self.__abandoned.add(key)
+                    self.records.append(
+                        RestartRecord(manager.get_target_name(), worker_index, None, None)
+                    )
+
+    def run_once(self, timeout: float) -> None:
+        """
+        Waits up to timeout seconds for a worker to end or a restart to become due,
+        and handles both. Checks for hung workers if there is a hang deadline.
+        """
+        sentinels = {}
+        for manager_index, manager in enumerate(self.__managers):
+            for sentinel, worker_index in manager.get_worker_sentinels().items():
+                key = (manager_index, worker_index)
+                if key not in self.__pending and key not in self.__abandoned:
+                    sentinels[sentinel] = key
+
+        if self.__pending:
+            next_due = min(due for due, _, _ in self.__pending.values())
+            timeout = max(min(timeout, next_due - time.monotonic()), 0.0)
+
+        if self.__hang_deadline is not None:
+            timeout = min(timeout, self.__hang_deadline / self.__HANG_CHECKS_PER_DEADLINE)
+
+        ready = multiprocessing.connection.wait(list(sentinels) + [self.__stop_receiver], timeout)
+        for sentinel in ready:
+            if sentinel in sentinels:
+                self.__handle_ended(sentinels[sentinel])
+
+        self.__restart_due()
+
+        if self.__hang_deadline is not None:
+            self.__kill_hung()
+
+    def run(self, poll_timeout: float = 1.0) -> None:
+        """
+        Supervises until stop() is called. Intended as the target of a thread in main.
+
+        poll_timeout: Time between refreshes of the worker list in seconds.
+        """
+        while not self.__stop_receiver.poll():
+            self.run_once(poll_timeout)
+
+    def stop(self) -> None:
+        """
+        Stops run() immediately. Call before requesting workers to exit so they are not restarted.
+        """
+        self.__stop_sender.send(None)
@@ -0,0 +1,389 @@
+"""
+Entry point wrapped around every worker target, for instrumenting workers without changing them.
+"""
+
+import copy
+import ctypes
+import faulthandler
+import multiprocessing as mp
+import signal
+import threading
+import time
+
+from utilities.workers import process_resources
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from utilities.workers import worker_liveness
+from utilities.workers import worker_metrics
+
+
+# Signal that makes a worker process write the stack of each of its threads to stderr
+STACK_DUMP_SIGNAL = getattr(signal, "SIGUSR1", None)
+
+
+class StartupTimeline:
+    """
+    When each worker of a manager was started, entered its target, and reached its first loop.
+    Times are monotonic nanoseconds, which are comparable across processes.
+    """
+
+    # Per worker: started, entered, first loop
+    __FIELD_COUNT = 3
+    __STARTED = 0
+    __ENTERED = 1
+    __FIRST_LOOP = 2
+
+    def __init__(self, worker_count: int) -> None:
+        """
+        worker_count: Number of workers of the manager.
+        """
+        self.__times = mp.RawArray(ctypes.c_int64, worker_count * self.__FIELD_COUNT)
+
+    def __set(self, index: int, field: int) -> None:
+        self.__times[index * self.__FIELD_COUNT + field] = time.monotonic_ns()
+
+    def mark_started(self, index: int) -> None:
+        """
+        Records that the worker is about to be started, and clears its previous times.
+        """
+        start = index * self.__FIELD_COUNT
+        self.__times[start : start + self.__FIELD_COUNT] = [0] * self.__FIELD_COUNT
+        self.__set(index, self.__STARTED)
+
+    def mark_entered(self, index: int) -> None:
+        """
+        Records that the worker process or thread is running the trampoline.
+        """
+        self.__set(index, self.__ENTERED)
+
+    def mark_first_loop(self, index: int) -> None:
+        """
+        Records that the worker checked for an exit request for the first time.
+        """
+        self.__set(index, self.__FIRST_LOOP)
+
+    def get_durations(self, index: int) -> "tuple[float | None, float | None]":
+        """
+        Returns the seconds from start to entering the target and to the first loop,
+        None for each that has not happened yet.
+        """
+        start = index * self.__FIELD_COUNT
+        started, entered, first_loop = self.__times[start : start + self.__FIELD_COUNT]
+        if started == 0:
+            return None, None
+
+        return (
+            (entered - started) / 1e9 if entered else None,
+            (first_loop - started) / 1e9 if first_loop else None,
+        )
+
+
+class RetirementFlags:
+    """
+    Which workers of a manager are asked to exit on their own, e.g. when scaling down.
+    Only main writes them.
+    """
+
+    def __init__(self, worker_count: int) -> None:
+        """
+        worker_count: Most workers the manager can have.
+        """
+        self.__flags = mp.RawArray(ctypes.c_uint8, worker_count)
+
+    def request(self, index: int) -> None:
+        """
+        Asks the worker to exit at its next exit check.
+        """
+        self.__flags[index] = 1
+
+    def clear(self, index: int) -> None:
+        """
+        Clears the request, call before starting a worker in the slot again.
+        """
+        self.__flags[index] = 0
+
+    def is_requested(self, index: int) -> bool:
+        """
+        Returns whether the worker is asked to exit.
+        """
+        return self.__flags[index] != 0
+
+
+class InstrumentedController:
+    """
+    Stand-in for the worker's controller that records its first loop,
+    and the time between exit checks as the "loop" histogram.
+    A worker asked to retire sees an exit request, so it ends after the items it holds.
+    Every exit check ticks the liveness counter, and pausing and waiting for exit count as waiting.
+    A coroutine awaiting does not block its event loop, so the asyncio host ticks for it instead.
+    Only the worker side methods are available.
+    """
+
+    def __init__(
+        self,
+        controller: worker_controller.WorkerController,
+        timeline: StartupTimeline,
+        index: int,
+        metrics: worker_metrics.WorkerMetrics,
+        retirement: "RetirementFlags | None" = None,
+        liveness: worker_liveness.LivenessCounters | None = None,
+    ) -> None:
+        self.__controller = controller
+        self.__timeline = timeline
+        self.__index = index
+        self.__metrics = metrics
+        self.__retirement = retirement
+        self.__liveness = liveness
+        self.__last_loop_time: "float | None" = None
+
+    def __is_retiring(self) -> bool:
+        return self.__retirement is not None and self.__retirement.is_requested(self.__index)
+
+    def __set_waiting(self, is_waiting: bool) -> None:
+        if self.__liveness is not None:
+            self.__liveness.set_waiting(self.__index, is_waiting)
+
+    def is_exit_requested(self) -> bool:
+        """
+        Same as `WorkerController.is_exit_requested()`.
+        """
+        now = time.perf_counter()
+        if self.__last_loop_time is None:
+            self.__timeline.mark_first_loop(self.__index)
+        else:
+            self.__metrics.observe("loop", now - self.__last_loop_time)
+        self.__last_loop_time = now
+        if self.__liveness is not None:
+            self.__liveness.tick(self.__index)
+
+        return self.__is_retiring() or self.__controller.is_exit_requested()
+
+    def check_pause(self) -> None:
+        """
+        Same as `WorkerController.check_pause()`.
+        """
+        self.__set_waiting(True)
+        try:
+            self.__controller.check_pause()
+        finally:
+            self.__set_waiting(False)
+
+    async def check_pause_async(self) -> None:
+        """
+        Same as `WorkerController.check_pause_async()`.
+        """
+        await self.__controller.check_pause_async()
+
+    def wait_for_exit(self, timeout: float) -> bool:
+        """
+        Same as `WorkerController.wait_for_exit()`, but a retiring worker does not wait.
+        """
+        if self.__is_retiring():
+            return True
+
+        self.__set_waiting(True)
+        try:
+            return self.__controller.wait_for_exit(timeout)
+        finally:
+            self.__set_waiting(False)
+
+    async def wait_for_exit_async(self, timeout: float) -> bool:
+        """
+        Same as `WorkerController.wait_for_exit_async()`, but a retiring worker does not wait.
+        """
+        if self.__is_retiring():
+            return True
+
+        return await self.__controller.wait_for_exit_async(timeout)
+
+    def tick(self) -> None:
+        """
+        Records progress without a loop, e.g. of an asyncio host whose event loop is not blocked.
+        """
+        if self.__liveness is not None:
+            self.__liveness.tick(self.__index)
+
+    def instrument_hosted_arguments(self, args: "tuple", kwargs: "dict") -> "tuple[tuple, dict]":
+        """
+        Returns the arguments of a worker hosted by this one, e.g. a coroutine of an asyncio host,
+        with its controller and queues instrumented as part of this worker.
+        """
+        instrumentation = (
+            self.__timeline,
+            self.__index,
+            self.__metrics,
+            self.__retirement,
+            self.__liveness,
+        )
+        return tuple(instrument_argument(arg, *instrumentation) for arg in args), {
+            key: instrument_argument(value, *instrumentation) for key, value in kwargs.items()
+        }
+
+
+class TimedQueue:
+    """
+    Queue adapter that records how long each put and get takes
+    as the "put_wait" and "get_wait" histograms.
+    A worker waiting for input is idle, not hung, but one blocked on a full queue is not waiting.
+    """
+
+    def __init__(
+        self,
+        backend_queue: object,
+        metrics: worker_metrics.WorkerMetrics,
+        liveness: worker_liveness.LivenessCounters | None = None,
+        index: int = 0,
+    ) -> None:
+        self.__queue = backend_queue
+        self.__metrics = metrics
+        self.__liveness = liveness
+        self.__index = index
+
+    def __set_waiting(self, is_waiting: bool) -> None:
+        if self.__liveness is not None:
+            self.__liveness.set_waiting(self.__index, is_waiting)
+
+    def put(self, item: object, block: bool = True, timeout: "float | None" = None) -> None:
+        """
+        Puts an item into the queue.
+        """
+        start = time.perf_counter()
+        try:
+            self.__queue.put(item, block, timeout)
+        finally:
+            self.__metrics.observe("put_wait", time.perf_counter() - start)
+
+    def get(self, block: bool = True, timeout: "float | None" = None) -> object:
+        """
+        Removes and returns an item from the queue.
+        """
+        start = time.perf_counter()
+        self.__set_waiting(True)
+        try:
+            return self.__queue.get(block, timeout)
+        finally:
+            self.__set_waiting(False)
+            self.__metrics.observe("get_wait", time.perf_counter() - start)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Equivalent to put(item, False).
+        """
+        self.put(item, False)
+
+    def get_nowait(self) -> object:
+        """
+        Equivalent to get(False).
+        """
+        return self.get(False)
+
+    def put_many(self, items: "list", timeout: "float | None" = None) -> int:
+        """
+        Puts items into the queue, the backend must support batches.
+        """
+        start = time.perf_counter()
+        try:
+            return self.__queue.put_many(items, timeout)
+        finally:
+            self.__metrics.observe("put_wait", time.perf_counter() - start)
+
+    def get_many(self, max_items: int, timeout: "float | None" = None) -> list:
+        """
+        Removes and returns up to max_items items, the backend must support batches.
+        """
+        start = time.perf_counter()
+        self.__set_waiting(True)
+        try:
+            return self.__queue.get_many(max_items, timeout)
+        finally:
+            self.__set_waiting(False)
+            self.__metrics.observe("get_wait", time.perf_counter() - start)
+
+    def qsize(self) -> int:
+        """
+        Returns the approximate number of items in the queue.
+        """
+        return self.__queue.qsize()
+
+    def empty(self) -> bool:
+        """
+        Returns whether the queue is (approximately) empty.
+        """
+        return self.__queue.empty()
+
+    def full(self) -> bool:
+        """
+        Returns whether the queue is (approximately) full.
+        """
+        return self.__queue.full()
+
+
+def instrument_argument(
+    arg: object,
+    timeline: StartupTimeline,
+    index: int,
+    metrics: worker_metrics.WorkerMetrics,
+    retirement: "RetirementFlags | None" = None,
+    liveness: worker_liveness.LivenessCounters | None = None,
+) -> object:
+    """
+    Returns an instrumented stand-in for a controller or queue argument,
+    other arguments unchanged.
+    """
+    if isinstance(arg, worker_controller.WorkerController):
+        return InstrumentedController(arg, timeline, index, metrics, retirement, liveness)
+
+    if isinstance(arg, queue_proxy_wrapper.QueueProxyWrapper):
+        # Copy since thread workers share the wrapper with main and each other
+        timed_wrapper = copy.copy(arg)
+        timed_wrapper.queue = TimedQueue(arg.queue, metrics, liveness, index)
+        return timed_wrapper
+
+    return arg
+
+
+def run_worker(
+    target: "(...) -> object",  # type: ignore
+    args: "tuple",
+    kwargs: "dict",
+    timeline: StartupTimeline,
+    index: int,
+    metrics_registry: worker_metrics.MetricsRegistry,
+    retirement: "RetirementFlags | None" = None,
+    liveness: worker_liveness.LivenessCounters | None = None,
+    placement: process_resources.ProcessPlacement | None = None,
+) -> None:
+    """
+    Runs the worker target with its controller and queues instrumented.
+
+    target: Worker function.
+    args: Worker arguments, the controller and queues among them are replaced
+    by instrumented ones.
+    kwargs: Worker keyword arguments, queues among them are replaced by instrumented ones.
+    timeline: Startup timeline of the worker's manager.
+    index: Index of the worker in its manager.
+    metrics_registry: Metrics of the worker's manager.
+    retirement: Retirement flags of the worker's manager, None if it does not scale.
+    liveness: Liveness counters of the worker's manager, None if it is not watched.
+    placement: Placement of the worker process, None to stay as inherited.
+    """
+    timeline.mark_entered(index)
+
+    if placement is not None:
+        placement.apply()
+
+    # Only in a worker process, thread workers would replace the handler of main
+    if STACK_DUMP_SIGNAL is not None and threading.current_thread() is threading.main_thread():
+        faulthandler.register(STACK_DUMP_SIGNAL, all_threads=True)
+
+    metrics = metrics_registry.get_recorder(index)
+    worker_metrics.WorkerMetrics.set_current(metrics)
+
+    args = tuple(
+        instrument_argument(arg, timeline, index, metrics, retirement, liveness) for arg in args
+    )
+    kwargs = {
+        key: instrument_argument(value, timeline, index, metrics, retirement, liveness)
+        for key, value in kwargs.items()
+    }
+    target(*args, **kwargs)